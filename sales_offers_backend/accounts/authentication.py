@@ -0,0 +1,122 @@
+import copy
+import threading
+import time
+from collections import OrderedDict
+from django.conf import settings
+from rest_framework.authentication import TokenAuthentication
+from backend import content_versions
+
+
+class TokenSnapshotCache:
+    """
+    Bounded LRU of token key -> (user, token) with a TTL.
+
+    Logout, token deletion, password changes and deactivation bump the
+    'auth' content version (see backend/content_versions.py), which lives in
+    the database so every worker sees it. Each process re-reads it at most
+    every ``check_interval`` seconds and drops all of its snapshots when it
+    moved, so a revoked token stops working everywhere within that interval
+    (immediately in the process that revoked it). Entries remember the
+    version read before their user was fetched, so a bump racing the fetch
+    is never cached as current.
+    """
+
+    def __init__(self, max_size=10000, ttl=60, check_interval=1):
+        self.max_size = max_size
+        self.ttl = ttl
+        self.check_interval = check_interval
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self._version = None
+        self._checked_at = None
+        self.hits = 0
+        self.misses = 0
+
+    def sync(self):
+        """The current auth version, re-read when due; snapshots from older versions are dropped"""
+        now = time.monotonic()
+        if self._checked_at is None or now - self._checked_at >= self.check_interval:
+            version = get_auth_version()
+            with self._lock:
+                if version != self._version:
+                    self._entries.clear()
+                    self._version = version
+                self._checked_at = now
+        return self._version
+
+    def get(self, key, version):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                user, token, entry_version, expires = entry
+                if expires < time.monotonic() or entry_version != version:
+                    del self._entries[key]
+                    entry = None
+            if entry is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+        return user, token
+
+    def set(self, key, user, token, version):
+        with self._lock:
+            self._entries[key] = (user, token, version, time.monotonic() + self.ttl)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+    def discard(self, key):
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def discard_user(self, user_id):
+        with self._lock:
+            for key in [k for k, entry in self._entries.items() if entry[0].pk == user_id]:
+                del self._entries[key]
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._version = None
+            self._checked_at = None
+
+
+AUTH_VERSION_NAME = 'auth'
+
+
+def get_auth_version():
+    return content_versions.get_versions(AUTH_VERSION_NAME)[AUTH_VERSION_NAME]
+
+
+token_cache = TokenSnapshotCache(
+    max_size=getattr(settings, 'TOKEN_AUTH_CACHE_SIZE', 10000),
+    ttl=getattr(settings, 'TOKEN_AUTH_CACHE_TTL', 60),
+    check_interval=getattr(settings, 'TOKEN_AUTH_VERSION_CHECK_INTERVAL', 1),
+)
+
+
+def invalidate_user_tokens(user_id):
+    """Drop cached auth for a user here at once and, via the version bump, in every other process"""
+    content_versions.bump(AUTH_VERSION_NAME)
+    token_cache.discard_user(user_id)
+
+
+class CachingTokenAuthentication(TokenAuthentication):
+    """
+    TokenAuthentication that serves repeat requests from an in-process
+    snapshot instead of joining authtoken_token to accounts_user every time.
+    """
+
+    def authenticate_credentials(self, key):
+        # Captured before any lookup; a revocation landing during it makes the new entry stale
+        version = token_cache.sync()
+        cached = token_cache.get(key, version)
+        if cached is not None:
+            user, token = cached
+            # Hand out copies so per-request mutations never leak between requests
+            return copy.copy(user), token
+
+        user, token = super().authenticate_credentials(key)
+        token_cache.set(key, copy.copy(user), token, version)
+        return user, token
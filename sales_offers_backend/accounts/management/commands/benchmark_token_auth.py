@@ -0,0 +1,46 @@
+import time
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+from django.test.utils import CaptureQueriesContext
+from rest_framework.authentication import TokenAuthentication
+from rest_framework.authtoken.models import Token
+from rest_framework.test import APIRequestFactory
+from accounts.authentication import CachingTokenAuthentication, token_cache
+from accounts.models import User
+
+class Command(BaseCommand):
+    help = 'Measure per-request token authentication overhead with and without the snapshot cache'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--iterations', type=int, default=2000)
+
+    def measure(self, authenticator, request, iterations):
+        with CaptureQueriesContext(connection) as queries:
+            started = time.perf_counter()
+            for _ in range(iterations):
+                authenticator.authenticate(request)
+            elapsed = time.perf_counter() - started
+        return elapsed / iterations * 1_000_000, len(queries) / iterations
+
+    def handle(self, *args, **options):
+        iterations = options['iterations']
+        
+        # Everything runs in a rolled-back transaction so no benchmark data is left behind
+        with transaction.atomic():
+            user = User.objects.create_user(username='__auth_benchmark__', password='unused-password')
+            token = Token.objects.create(user=user)
+            request = APIRequestFactory().get('/', HTTP_AUTHORIZATION=f'Token {token.key}')
+            token_cache.clear()
+            
+            results = [
+                ('TokenAuthentication', *self.measure(TokenAuthentication(), request, iterations)),
+                ('CachingTokenAuthentication', *self.measure(CachingTokenAuthentication(), request, iterations)),
+            ]
+            token_cache.clear()
+            transaction.set_rollback(True)
+        
+        self.stdout.write(f'{iterations} authentications per backend ({connection.vendor})')
+        for name, micros, queries in results:
+            self.stdout.write(f'  {name:<28} {micros:8.1f} us/request  {queries:.3f} queries/request')
+        baseline, cached = results[0][1], results[1][1]
+        self.stdout.write(self.style.SUCCESS(f'Speedup: {baseline / cached:.1f}x'))
@@ -0,0 +1,57 @@
+# Generated by Django 5.1.5 on 2026-10-19 12:03
+
+import unicodedata
+
+from django.db import migrations, models
+
+
+def normalize_search_text(value):
+    value = unicodedata.normalize('NFKD', value or '')
+    value = ''.join(c for c in value if not unicodedata.combining(c))
+    return ' '.join(value.lower().split())
+
+
+def populate_search_names(apps, schema_editor):
+    User = apps.get_model('accounts', 'User')
+    batch = []
+    for user in User.objects.only('id', 'first_name', 'last_name', 'username').iterator(chunk_size=1000):
+        user.search_name = normalize_search_text(f"{user.first_name} {user.last_name} {user.username}")
+        batch.append(user)
+        if len(batch) >= 1000:
+            User.objects.bulk_update(batch, ['search_name'])
+            batch = []
+    if batch:
+        User.objects.bulk_update(batch, ['search_name'])
+
+
+def create_trigram_index(apps, schema_editor):
+    # GIN trigram indexes only exist on PostgreSQL; SQLite keeps the plain
+    # b-tree index on search_name and searches by prefix range instead
+    if schema_editor.connection.vendor == 'postgresql':
+        schema_editor.execute('CREATE EXTENSION IF NOT EXISTS pg_trgm')
+        schema_editor.execute(
+            'CREATE INDEX IF NOT EXISTS accounts_user_search_name_trgm '
+            'ON accounts_user USING gin (search_name gin_trgm_ops)'
+        )
+
+
+def drop_trigram_index(apps, schema_editor):
+    if schema_editor.connection.vendor == 'postgresql':
+        schema_editor.execute('DROP INDEX IF EXISTS accounts_user_search_name_trgm')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0008_notification_related_conversation_id_and_more'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='user',
+            name='search_name',
+            field=models.TextField(blank=True, db_index=True, editable=False),
+        ),
+        migrations.RunPython(populate_search_names, migrations.RunPython.noop),
+        migrations.RunPython(create_trigram_index, drop_trigram_index),
+    ]
@@ -0,0 +1,41 @@
+# Generated by Django 5.1.5 on 2026-10-19 16:30
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+def populate_search_tokens(apps, schema_editor):
+    User = apps.get_model('accounts', 'User')
+    UserSearchToken = apps.get_model('accounts', 'UserSearchToken')
+    batch = []
+    for user_id, search_name in User.objects.values_list('id', 'search_name').iterator(chunk_size=1000):
+        batch.extend(UserSearchToken(user_id=user_id, token=token) for token in set(search_name.split()))
+        if len(batch) >= 1000:
+            UserSearchToken.objects.bulk_create(batch, ignore_conflicts=True)
+            batch = []
+    if batch:
+        UserSearchToken.objects.bulk_create(batch, ignore_conflicts=True)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0010_admin_list_indexes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='UserSearchToken',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('token', models.TextField()),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='search_tokens', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'indexes': [models.Index(fields=['token', 'user'], name='user_search_token_idx')],
+                'constraints': [models.UniqueConstraint(fields=('user', 'token'), name='user_search_token_unique')],
+            },
+        ),
+        migrations.RunPython(populate_search_tokens, migrations.RunPython.noop),
+    ]
@@ -1,7 +1,14 @@
+import unicodedata
 from django.contrib.auth.models import AbstractUser
 from django.db import models
 from django.conf import settings
 
+def normalize_search_text(value):
+    """Lowercase, strip accents and collapse whitespace for search matching"""
+    value = unicodedata.normalize('NFKD', value or '')
+    value = ''.join(c for c in value if not unicodedata.combining(c))
+    return ' '.join(value.lower().split())
+
 class User(AbstractUser):
     is_seller = models.BooleanField(default=True)
     is_buyer = models.BooleanField(default=True)
@@ -16,10 +23,57 @@ class User(AbstractUser):
     is_verified = models.BooleanField(default=False)
     verification_date = models.DateTimeField(null=True, blank=True)
     bio = models.TextField(blank=True, max_length=500)
+    # "first last username", normalized; trigram-indexed on PostgreSQL for typeahead
+    search_name = models.TextField(blank=True, db_index=True, editable=False)
+
+    class Meta(AbstractUser.Meta):
+        indexes = [
+            models.Index(fields=['date_joined', 'id'], name='user_date_joined_idx'),
+        ]
 
     def __str__(self):
         return self.username
 
+    def save(self, *args, **kwargs):
+        search_name = normalize_search_text(f"{self.first_name} {self.last_name} {self.username}")
+        created = self._state.adding
+        # A deferred search_name is missing from __dict__ and counts as changed
+        renamed = created or self.__dict__.get('search_name') != search_name
+        self.search_name = search_name
+        update_fields = kwargs.get('update_fields')
+        if update_fields is not None and {'first_name', 'last_name', 'username'}.intersection(update_fields):
+            kwargs['update_fields'] = set(update_fields) | {'search_name'}
+        super().save(*args, **kwargs)
+        if renamed and (kwargs.get('update_fields') is None or 'search_name' in kwargs['update_fields']):
+            UserSearchToken.sync(self, created)
+
+class UserSearchToken(models.Model):
+    """
+    One row per word of a user's search_name. Where pg_trgm is not available
+    (see messaging/search.py), a prefix of any word is a range scan over the
+    token index instead of a leading-wildcard LIKE over every user.
+    """
+    user = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name='search_tokens')
+    token = models.TextField()
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['user', 'token'], name='user_search_token_unique'),
+        ]
+        indexes = [
+            models.Index(fields=['token', 'user'], name='user_search_token_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.user_id}: {self.token}"
+
+    @classmethod
+    def sync(cls, user, created=False):
+        tokens = set(user.search_name.split())
+        if not created:
+            cls.objects.filter(user=user).exclude(token__in=tokens).delete()
+        cls.objects.bulk_create([cls(user=user, token=token) for token in tokens], ignore_conflicts=True)
+
 class Favorite(models.Model):
     user = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE)
     offer = models.ForeignKey('deals.Deal', on_delete=models.CASCADE)
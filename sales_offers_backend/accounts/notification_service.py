@@ -64,37 +64,58 @@ class NotificationService:
     @staticmethod
     def notify_offer_expiring_soon(offer):
         """Notify users about offers expiring soon"""
+        return NotificationService.notify_offers_expiring_soon([offer])
+    
+    @staticmethod
+    def notify_offers_expiring_soon(offers):
+        """
+        Notify everyone who favorited one of the offers that it expires soon,
+        with one query for the favorites and one bulk insert. Returns the
+        notifications created.
+        """
         from .models import Favorite
-        favorited_users = User.objects.filter(
-            id__in=Favorite.objects.filter(offer=offer).values_list('user_id', flat=True)
-        )
-        
+        titles = {offer.id: offer.title for offer in offers}
         notifications = []
-        for user in favorited_users:
+        favorites = Favorite.objects.filter(offer_id__in=titles).values_list('user_id', 'offer_id')
+        for user_id, offer_id in favorites.iterator(chunk_size=2000):
             notifications.append(Notification(
-                user=user,
+                user_id=user_id,
                 title="Offer Expiring Soon! ⏰",
-                message=f"Your favorite offer '{offer.title}' expires soon. Don't miss out!",
+                message=f"Your favorite offer '{titles[offer_id]}' expires soon. Don't miss out!",
                 type='favorite',
-                related_offer_id=offer.id
+                related_offer_id=offer_id
             ))
-        Notification.objects.bulk_create(notifications)
+        Notification.objects.bulk_create(notifications, batch_size=1000)
+        return len(notifications)
     
     @staticmethod
-    def notify_price_drop(offer, old_price):
-        """Notify users about price drops on favorited offers"""
+    def notify_price_drop(offer, old_price, new_price):
+        """Notify users about a price drop on a favorited offer"""
+        return NotificationService.notify_price_drops([{
+            'deal_id': offer.id, 'title': offer.title, 'old_price': old_price, 'new_price': new_price,
+        }])
+    
+    @staticmethod
+    def notify_price_drops(drops):
+        """
+        Notify everyone who favorited one of the dropped deals, with one query
+        for the favorites and one bulk insert. ``drops`` are dicts of deal_id,
+        title, old_price, new_price and optionally store_name; returns the
+        notifications created.
+        """
         from .models import Favorite
-        favorited_users = User.objects.filter(
-            id__in=Favorite.objects.filter(offer=offer).values_list('user_id', flat=True)
-        )
-        
+        by_deal = {drop['deal_id']: drop for drop in drops}
         notifications = []
-        for user in favorited_users:
+        favorites = Favorite.objects.filter(offer_id__in=by_deal).values_list('user_id', 'offer_id')
+        for user_id, offer_id in favorites.iterator(chunk_size=2000):
+            drop = by_deal[offer_id]
+            store = f" at {drop['store_name']}" if drop.get('store_name') else ''
             notifications.append(Notification(
-                user=user,
+                user_id=user_id,
                 title="Price Drop Alert! 💰",
-                message=f"Great news! '{offer.title}' price dropped from KES {old_price} to KES {offer.discounted_price}",
+                message=f"Great news! '{drop['title']}' price dropped from KES {drop['old_price']:.2f} to KES {drop['new_price']:.2f}{store}",
                 type='favorite',
-                related_offer_id=offer.id
+                related_offer_id=offer_id
             ))
-        Notification.objects.bulk_create(notifications)
\ No newline at end of file
+        Notification.objects.bulk_create(notifications, batch_size=1000)
+        return len(notifications)
@@ -0,0 +1,17 @@
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import receiver
+from rest_framework.authtoken.models import Token
+from .models import User
+from .authentication import invalidate_user_tokens
+
+@receiver(post_save, sender=User)
+def invalidate_auth_on_user_change(sender, instance, created, **kwargs):
+    """Password resets, deactivation and permission changes must not be served from a stale snapshot"""
+    # Logging in only stamps last_login, which no snapshot depends on
+    if not created and set(kwargs.get('update_fields') or ()) != {'last_login'}:
+        invalidate_user_tokens(instance.pk)
+
+@receiver(post_delete, sender=Token)
+def invalidate_auth_on_token_delete(sender, instance, **kwargs):
+    """Logout deletes the token"""
+    invalidate_user_tokens(instance.user_id)
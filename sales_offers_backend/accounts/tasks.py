@@ -1,9 +1,12 @@
+import logging
 from datetime import datetime, timedelta
 from django.utils import timezone
 from .models import User, Notification
 from .notification_service import NotificationService
 from deals.models import Deal
 
+logger = logging.getLogger(__name__)
+
 def send_daily_digest():
     """Send daily digest notifications to active users"""
     yesterday = timezone.now() - timedelta(days=1)
@@ -19,15 +22,10 @@ def send_daily_digest():
 
 def check_expiring_offers():
     """Check for offers expiring in 24 hours and notify users"""
-    tomorrow = timezone.now() + timedelta(days=1)
-    expiring_offers = Deal.objects.filter(
-        expires_at__lte=tomorrow,
-        expires_at__gte=timezone.now(),
-        is_active=True
-    )
-    
-    for offer in expiring_offers:
-        NotificationService.notify_offer_expiring_soon(offer)
+    from deals.expiry import DealExpirySweeper
+    # Reminders go out as part of the locked sweep, so this can never race a cron run
+    stats = DealExpirySweeper().run()
+    return stats['notifications'] if stats else 0
 
 def cleanup_old_notifications():
     """Clean up notifications older than 30 days"""
@@ -35,4 +33,4 @@ def cleanup_old_notifications():
     old_notifications = Notification.objects.filter(created_at__lt=thirty_days_ago, is_read=True)
     deleted_count = old_notifications.count()
     old_notifications.delete()
-    print(f"Cleaned up {deleted_count} old notifications")
\ No newline at end of file
+    logger.info('Cleaned up %s old notifications', deleted_count)
\ No newline at end of file
@@ -1,3 +1,156 @@
-from django.test import TestCase
+from datetime import timedelta
+from unittest import mock
+from django.core.cache import cache
+from django.db import connection
+from django.test import override_settings
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from rest_framework.test import APITestCase
+from rest_framework import status
+from rest_framework.authtoken.models import Token
+from rest_framework.authentication import TokenAuthentication
+from .authentication import TokenSnapshotCache, invalidate_user_tokens, token_cache
+from .models import User, Favorite, Notification
+from deals.models import Deal, StoreLink
+from sellers.models import Seller
 
-# Create your tests here.
+@override_settings(BACKGROUND_TASK_QUEUE='backend.background.ImmediateTaskQueue')
+class FavoritesAPITestCase(APITestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username='buyer', email='buyer@example.com', password='testpass123')
+        seller_user = User.objects.create_user(username='seller', email='seller@example.com', password='testpass123')
+        self.seller = Seller.objects.create(
+            user=seller_user,
+            business_name='Test Business',
+            business_description='Test business description',
+            address='Test Address'
+        )
+        self.deals = [
+            Deal.objects.create(
+                title=f'Deal {i}',
+                description='Description',
+                seller=self.seller,
+                expires_at=timezone.now() + timedelta(days=7)
+            )
+            for i in range(4)
+        ]
+        for deal in self.deals:
+            StoreLink.objects.create(deal=deal, store_name='Jumia', store_url='https://jumia.co.ke/x', price=100)
+        self.client.force_authenticate(user=self.user)
+        
+    def test_bulk_favorite_status(self):
+        """Test favorited subset is returned for a batch of deal ids"""
+        Favorite.objects.create(user=self.user, offer=self.deals[1])
+        Favorite.objects.create(user=self.user, offer=self.deals[3])
+        ids = [deal.id for deal in self.deals]
+        
+        with self.assertNumQueries(1):
+            response = self.client.post('/api/accounts/favorites/status/', {'ids': ids}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['favorited_ids'], [self.deals[1].id, self.deals[3].id])
+        self.assertFalse(response.data['status'][str(self.deals[0].id)])
+        
+        response = self.client.get('/api/accounts/favorites/status/', {'ids': f'{ids[1]},{ids[2]}'})
+        self.assertEqual(response.data['favorited_ids'], [self.deals[1].id])
+        
+    def test_bulk_favorite_status_is_bounded(self):
+        """Test oversized and malformed id lists are rejected"""
+        response = self.client.post('/api/accounts/favorites/status/', {'ids': list(range(500))}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        response = self.client.get('/api/accounts/favorites/status/', {'ids': 'a,b'})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        
+    def test_favorites_list_paginated(self):
+        """Test favorites list is paginated and notifications are written after commit"""
+        for deal in self.deals:
+            with self.captureOnCommitCallbacks(execute=True):
+                self.client.post(f'/api/accounts/deals/{deal.id}/favorite/')
+        self.assertEqual(Notification.objects.filter(user=self.user, type='system').count(), 4)
+        
+        response = self.client.get('/api/accounts/favorites/', {'limit': 3})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['count'], 4)
+        self.assertEqual(len(response.data['results']), 3)
+        self.assertEqual(response.data['results'][0]['offer']['lowest_price'], 100)
+
+
+class CachingTokenAuthenticationTestCase(APITestCase):
+    def setUp(self):
+        token_cache.clear()
+        self.user = User.objects.create_user(username='tokenuser', email='token@example.com', password='testpass123')
+        self.token = Token.objects.create(user=self.user)
+        self.client.credentials(HTTP_AUTHORIZATION=f'Token {self.token.key}')
+        
+    def test_repeat_requests_skip_auth_query(self):
+        """Test a cached token authenticates without touching the token table"""
+        self.client.get('/api/accounts/auth-test/')
+        with self.assertNumQueries(0):
+            response = self.client.get('/api/accounts/auth-test/')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['user_id'], self.user.id)
+        
+    def test_logout_invalidates_snapshot(self):
+        """Test a logged out token is rejected immediately"""
+        self.client.get('/api/accounts/auth-test/')
+        self.client.post('/api/accounts/logout/')
+        response = self.client.get('/api/accounts/auth-test/')
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+        
+    def test_revocation_reaches_other_processes(self):
+        """A worker with its own snapshot and cache drops a token deleted elsewhere"""
+        other = TokenSnapshotCache(check_interval=0)
+        with mock.patch('accounts.authentication.token_cache', other):
+            self.assertEqual(self.client.get('/api/accounts/auth-test/').status_code, status.HTTP_200_OK)
+        with self.captureOnCommitCallbacks(execute=True):
+            self.token.delete()
+        cache.clear()
+        with mock.patch('accounts.authentication.token_cache', other):
+            response = self.client.get('/api/accounts/auth-test/')
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+
+    def test_revocation_during_lookup_not_cached(self):
+        """A bump landing between reading the version and fetching the token leaves no live entry"""
+        other = TokenSnapshotCache(check_interval=0)
+        original = TokenAuthentication.authenticate_credentials
+
+        def lookup_then_revoke(authenticator, key):
+            result = original(authenticator, key)
+            with self.captureOnCommitCallbacks(execute=True):
+                invalidate_user_tokens(self.user.pk)
+            return result
+
+        with mock.patch('accounts.authentication.token_cache', other):
+            with mock.patch.object(TokenAuthentication, 'authenticate_credentials', lookup_then_revoke):
+                self.client.get('/api/accounts/auth-test/')
+            self.assertIsNone(other.get(self.token.key, other.sync()))
+
+    def test_deactivation_invalidates_snapshot(self):
+        """Test deactivating a user drops their cached auth"""
+        self.client.get('/api/accounts/auth-test/')
+        self.user.is_active = False
+        self.user.save()
+        response = self.client.get('/api/accounts/auth-test/')
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+
+class AdminUserListingTestCase(APITestCase):
+    def setUp(self):
+        self.admin = User.objects.create_user(username='admin', email='admin@example.com', password='testpass123', is_staff=True)
+        User.objects.create_user(username='wanjiku', email='w@example.com', password='testpass123', first_name='Wanjiku', last_name='Kamau')
+        User.objects.create_user(username='otieno', email='o@example.com', password='testpass123', is_active=False)
+        self.client.force_authenticate(user=self.admin)
+
+    def test_search_uses_normalized_name(self):
+        """Search matches the normalized name column and email"""
+        response = self.client.get('/api/accounts/admin/users/', {'search': 'Kamau'})
+        self.assertEqual([user['username'] for user in response.data['results']], ['wanjiku'])
+        response = self.client.get('/api/accounts/admin/users/', {'search': 'o@example'})
+        self.assertEqual([user['username'] for user in response.data['results']], ['otieno'])
+
+    def test_boolean_filter_and_projection(self):
+        """Filters apply server-side and the password column is never loaded"""
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get('/api/accounts/admin/users/', {'is_active': 'false'})
+        self.assertEqual(response.data['total'], 1)
+        self.assertEqual(response.data['results'][0]['username'], 'otieno')
+        self.assertEqual(len(queries), 2)
+        self.assertNotIn('password', queries[-1]['sql'])
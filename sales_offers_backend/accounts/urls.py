@@ -3,7 +3,7 @@ from .views import (
     register, login, google_auth, logout, forgot_password, reset_password, verify_email,
     profile, dashboard_stats, favorites, remove_favorite, notifications, 
     update_notification, delete_notification, mark_all_notifications_read,
-    toggle_favorite_deal, check_favorite_status, auth_test, admin_users
+    toggle_favorite_deal, check_favorite_status, bulk_favorite_status, auth_test, admin_users
 )
 
 urlpatterns = [
@@ -17,6 +17,7 @@ urlpatterns = [
     path('profile/', profile, name='profile'),
     path('dashboard-stats/', dashboard_stats, name='dashboard_stats'),
     path('favorites/', favorites, name='favorites'),
+    path('favorites/status/', bulk_favorite_status, name='bulk_favorite_status'),
     path('favorites/<int:favorite_id>/', remove_favorite, name='remove_favorite'),
     path('notifications/', notifications, name='notifications'),
     path('notifications/<int:notification_id>/', update_notification, name='update_notification'),
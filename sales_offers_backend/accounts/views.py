@@ -2,6 +2,7 @@ from rest_framework import status
 from rest_framework.decorators import api_view, permission_classes
 from rest_framework.permissions import AllowAny, IsAuthenticated
 from rest_framework.response import Response
+from rest_framework.pagination import LimitOffsetPagination
 from rest_framework.authtoken.models import Token
 from django.contrib.auth import authenticate
 from django.contrib.auth.hashers import make_password
@@ -10,21 +11,53 @@ from django.utils.http import urlsafe_base64_encode, urlsafe_base64_decode
 from django.utils.encoding import force_bytes, force_str
 from django.core.mail import send_mail
 from django.conf import settings
-from .models import User, Favorite, Notification
+from .models import User, Favorite, Notification, normalize_search_text
 from .serializers import UserSerializer, FavoriteSerializer, NotificationSerializer
 from .notification_service import NotificationService
 from deals.models import Deal
+from backend.background import enqueue_on_commit
+from backend.admin_listing import AdminListing
+from admin_system.settings_registry import registry as system_settings
+from django.db.models import Q
+import logging
 import os
 
+logger = logging.getLogger(__name__)
+
+MAX_FAVORITE_STATUS_IDS = 200
+
+class FavoritePagination(LimitOffsetPagination):
+    default_limit = 24
+    max_limit = 100
+
+ADMIN_USER_FIELDS = UserSerializer.Meta.fields + ('date_joined',)
+
+class UserAdminListing(AdminListing):
+    filter_fields = {
+        'is_active': 'is_active',
+        'is_staff': 'is_staff',
+        'is_seller': 'is_seller',
+        'is_verified': 'is_verified',
+    }
+    date_field = 'date_joined'
+    sort_fields = {'joined': 'date_joined', 'username': 'username'}
+    default_sort = '-joined'
+    
+    def get_search_filter(self, search):
+        # search_name is the indexed, normalized full-name column
+        return Q(search_name__contains=normalize_search_text(search)) | Q(email__icontains=search)
+
 @api_view(['GET'])
 @permission_classes([IsAuthenticated])
 def admin_users(request):
     if not request.user.is_staff:
         return Response({'error': 'Permission denied'}, status=403)
     
-    users = User.objects.all().order_by('-date_joined')
-    serializer = UserSerializer(users, many=True)
-    return Response(serializer.data)
+    users = User.objects.only(*ADMIN_USER_FIELDS)
+    listing = UserAdminListing(request)
+    page = listing.paginate_queryset(users)
+    serializer = UserSerializer(page, many=True)
+    return listing.get_paginated_response(serializer.data)
 try:
     import firebase_admin
     from firebase_admin import auth as firebase_auth, credentials
@@ -50,14 +83,17 @@ if FIREBASE_AVAILABLE and not firebase_admin._apps:
             })
             firebase_admin.initialize_app(cred)
             firebase_initialized = True
-    except Exception as e:
-        print(f"Firebase initialization failed: {e}")
+    except Exception:
+        logger.exception('Firebase initialization failed')
 
 @api_view(['POST'])
 @permission_classes([AllowAny])
 def register(request):
     data = request.data
     
+    if not system_settings.get('userRegistration'):
+        return Response({'error': 'Registration is currently closed'}, status=status.HTTP_403_FORBIDDEN)
+    
     if User.objects.filter(email=data.get('email')).exists():
         return Response({'error': 'Email already exists'}, status=status.HTTP_400_BAD_REQUEST)
     
@@ -151,6 +187,10 @@ def google_auth(request):
         name = decoded_token.get('name', '')
         photo_url = request.data.get('photo_url')
         
+        # Existing users may still sign in while registration is closed
+        if not system_settings.get('userRegistration') and not User.objects.filter(email=email).exists():
+            return Response({'error': 'Registration is currently closed'}, status=status.HTTP_403_FORBIDDEN)
+        
         # Get or create user
         user, created = User.objects.get_or_create(
             email=email,
@@ -344,9 +384,15 @@ def dashboard_stats(request):
 @permission_classes([IsAuthenticated])
 def favorites(request):
     if request.method == 'GET':
-        favorites = Favorite.objects.filter(user=request.user).select_related('offer__seller')
-        serializer = FavoriteSerializer(favorites, many=True)
-        return Response(serializer.data)
+        favorites = Favorite.objects.filter(user=request.user).select_related(
+            'offer__seller__user', 'offer__seller__profile'
+        ).prefetch_related(
+            'offer__images', 'offer__store_links', 'offer__physical_stores__images'
+        ).order_by('-created_at', '-id')
+        paginator = FavoritePagination()
+        page = paginator.paginate_queryset(favorites, request)
+        serializer = FavoriteSerializer(page, many=True)
+        return paginator.get_paginated_response(serializer.data)
     
     elif request.method == 'POST':
         offer_id = request.data.get('offer_id')
@@ -355,7 +401,8 @@ def favorites(request):
             favorite, created = Favorite.objects.get_or_create(user=request.user, offer=offer)
             if created:
                 # Create system notification for adding to favorites
-                NotificationService.create_system_notification(
+                enqueue_on_commit(
+                    NotificationService.create_system_notification,
                     request.user,
                     "Added to Favorites! ❤️",
                     f"You've added '{offer.title}' to your favorites. We'll notify you of any updates!"
@@ -433,7 +480,8 @@ def toggle_favorite_deal(request, deal_id):
             return Response({'favorited': False, 'message': 'Removed from favorites'})
         
         # Create notification for adding to favorites
-        NotificationService.create_system_notification(
+        enqueue_on_commit(
+            NotificationService.create_system_notification,
             request.user,
             "Added to Favorites! ❤️",
             f"You've added '{deal.title}' to your favorites."
@@ -453,6 +501,33 @@ def check_favorite_status(request, deal_id):
     except Deal.DoesNotExist:
         return Response({'error': 'Deal not found'}, status=404)
 
+@api_view(['GET', 'POST'])
+@permission_classes([IsAuthenticated])
+def bulk_favorite_status(request):
+    """Favorited subset of up to MAX_FAVORITE_STATUS_IDS deals, for rendering a whole grid at once"""
+    raw_ids = request.data.get('ids') if request.method == 'POST' else request.GET.get('ids', '')
+    if isinstance(raw_ids, str):
+        raw_ids = [part for part in raw_ids.split(',') if part.strip()]
+    try:
+        deal_ids = list(dict.fromkeys(int(deal_id) for deal_id in raw_ids or []))
+    except (TypeError, ValueError):
+        return Response({'error': 'ids must be a list of integers'}, status=status.HTTP_400_BAD_REQUEST)
+    
+    if len(deal_ids) > MAX_FAVORITE_STATUS_IDS:
+        return Response(
+            {'error': f'At most {MAX_FAVORITE_STATUS_IDS} ids per request'},
+            status=status.HTTP_400_BAD_REQUEST
+        )
+    
+    # Served by the (user, offer) unique index
+    favorited = set(
+        Favorite.objects.filter(user=request.user, offer_id__in=deal_ids).values_list('offer_id', flat=True)
+    )
+    return Response({
+        'favorited_ids': [deal_id for deal_id in deal_ids if deal_id in favorited],
+        'status': {str(deal_id): deal_id in favorited for deal_id in deal_ids}
+    })
+
 @api_view(['GET'])
 @permission_classes([IsAuthenticated])
 def auth_test(request):
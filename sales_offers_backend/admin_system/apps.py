@@ -0,0 +1,9 @@
+from django.apps import AppConfig
+
+
+class AdminSystemConfig(AppConfig):
+    default_auto_field = 'django.db.models.BigAutoField'
+    name = 'admin_system'
+    
+    def ready(self):
+        import admin_system.signals
@@ -0,0 +1,189 @@
+"""
+Host metrics sampled from /proc.
+
+A daemon thread reads /proc/stat, /proc/meminfo, /proc/self/status and
+/proc/net/dev every HOST_METRICS_INTERVAL seconds and keeps the results in a
+ring buffer, so the admin endpoint only ever reads memory. Rates (CPU,
+network, requests) are deltas between consecutive samples. Values are per
+worker process where that matters (RSS, request rate). Off Linux the /proc
+readers return None and the corresponding metrics are reported as 0.
+"""
+import itertools
+import os
+import threading
+import time
+from collections import deque
+from django.conf import settings
+
+PROC = '/proc'
+
+# request_started bumps this; next() on itertools.count is atomic under the GIL
+_request_counter = itertools.count()
+_requests_seen = 0
+
+
+def count_request(**kwargs):
+    global _requests_seen
+    _requests_seen = next(_request_counter) + 1
+
+
+def _read(path):
+    try:
+        with open(path) as f:
+            return f.read()
+    except OSError:
+        return None
+
+
+def read_cpu_times():
+    """Return (busy, total) jiffies from the aggregate cpu line"""
+    content = _read(os.path.join(PROC, 'stat'))
+    if not content:
+        return None
+    fields = [int(value) for value in content.splitlines()[0].split()[1:]]
+    idle = fields[3] + (fields[4] if len(fields) > 4 else 0)
+    total = sum(fields[:8])
+    return total - idle, total
+
+
+def read_meminfo():
+    content = _read(os.path.join(PROC, 'meminfo'))
+    if not content:
+        return None
+    info = {}
+    for line in content.splitlines():
+        key, _, value = line.partition(':')
+        info[key] = int(value.split()[0])
+    return info
+
+
+def read_rss_kb(pid='self'):
+    content = _read(os.path.join(PROC, str(pid), 'status'))
+    if not content:
+        return None
+    for line in content.splitlines():
+        if line.startswith('VmRSS:'):
+            return int(line.split()[1])
+    return None
+
+
+def read_worker_pids():
+    """Sibling worker pids (gunicorn master's children), or just this process"""
+    ppid = os.getppid()
+    if 'gunicorn' in (_read(os.path.join(PROC, str(ppid), 'cmdline')) or ''):
+        content = _read(os.path.join(PROC, str(ppid), 'task', str(ppid), 'children'))
+        if content:
+            return [int(pid) for pid in content.split()]
+    return [os.getpid()]
+
+
+def read_net_bytes():
+    content = _read(os.path.join(PROC, 'net', 'dev'))
+    if not content:
+        return None
+    total = 0
+    for line in content.splitlines()[2:]:
+        interface, _, data = line.partition(':')
+        if interface.strip() == 'lo':
+            continue
+        fields = data.split()
+        total += int(fields[0]) + int(fields[8])
+    return total
+
+
+def read_uptime_seconds():
+    content = _read(os.path.join(PROC, 'uptime'))
+    return float(content.split()[0]) if content else None
+
+
+def format_uptime(seconds):
+    seconds = int(seconds or 0)
+    days, remainder = divmod(seconds, 86400)
+    hours, remainder = divmod(remainder, 3600)
+    return f'{days}d {hours}h {remainder // 60}m'
+
+
+def disk_percent(path):
+    try:
+        stat = os.statvfs(path)
+    except (OSError, AttributeError):
+        return 0.0
+    total = stat.f_blocks * stat.f_frsize
+    free = stat.f_bavail * stat.f_frsize
+    return round((total - free) / total * 100, 1) if total else 0.0
+
+
+class HostMetricsSampler:
+    def __init__(self, interval=5, history=120):
+        self.interval = interval
+        self.samples = deque(maxlen=history)
+        self._lock = threading.Lock()
+        self._thread = None
+        self._previous = None
+
+    def ensure_started(self):
+        if self._thread is None or not self._thread.is_alive():
+            with self._lock:
+                if self._thread is None or not self._thread.is_alive():
+                    self._thread = threading.Thread(target=self._run, name='host-metrics', daemon=True)
+                    self._thread.start()
+
+    def _run(self):
+        while True:
+            self.sample()
+            time.sleep(self.interval)
+
+    def sample(self):
+        now = time.monotonic()
+        raw = {
+            'cpu': read_cpu_times(),
+            'net': read_net_bytes(),
+            'requests': _requests_seen,
+        }
+        previous, self._previous = self._previous, (now, raw)
+
+        cpu = network = request_rate = 0.0
+        if previous:
+            elapsed = max(now - previous[0], 1e-6)
+            before = previous[1]
+            if raw['cpu'] and before['cpu']:
+                busy = raw['cpu'][0] - before['cpu'][0]
+                total = raw['cpu'][1] - before['cpu'][1]
+                cpu = busy / total * 100 if total > 0 else 0.0
+            if raw['net'] is not None and before['net'] is not None:
+                network = (raw['net'] - before['net']) / elapsed / (1024 * 1024)
+            request_rate = max(0, raw['requests'] - before['requests']) / elapsed
+
+        meminfo = read_meminfo() or {}
+        mem_total = meminfo.get('MemTotal', 0)
+        mem_available = meminfo.get('MemAvailable', mem_total)
+        workers = {pid: read_rss_kb(pid) for pid in read_worker_pids()}
+
+        point = {
+            'timestamp': time.time(),
+            'cpu': round(cpu, 1),
+            'memory': round((mem_total - mem_available) / mem_total * 100, 1) if mem_total else 0.0,
+            'disk': disk_percent(settings.BASE_DIR),
+            'network': round(network, 3),
+            'requestRate': round(request_rate, 2),
+            'rssMb': round((read_rss_kb() or 0) / 1024, 1),
+            'workersRssMb': {str(pid): round(rss / 1024, 1) for pid, rss in workers.items() if rss is not None},
+            'uptimeSeconds': read_uptime_seconds() or 0,
+        }
+        with self._lock:
+            self.samples.append(point)
+        return point
+
+    def latest(self):
+        with self._lock:
+            return self.samples[-1] if self.samples else None
+
+    def series(self, fields=('timestamp', 'cpu', 'memory', 'network', 'requestRate', 'rssMb')):
+        with self._lock:
+            return [{field: point[field] for field in fields} for point in self.samples]
+
+
+sampler = HostMetricsSampler(
+    interval=getattr(settings, 'HOST_METRICS_INTERVAL', 5),
+    history=getattr(settings, 'HOST_METRICS_HISTORY', 120),
+)
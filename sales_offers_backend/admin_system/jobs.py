@@ -0,0 +1,77 @@
+"""
+Database-backed locks and resume state for scheduled jobs.
+
+Cron jobs run as separate ``manage.py`` processes, so anything they keep in
+the default per-process cache is gone by the next run. Each job instead owns
+a JobState row:
+
+* ``job_lock(name, timeout)`` leases the row with one conditional UPDATE, so
+  exactly one of several overlapping runs gets it on any database. The lease
+  expires after ``timeout`` seconds so a crashed run cannot block the job
+  forever, and is only released by the run that holds it. Runs that may
+  outlast ``timeout`` call ``lease.renew()`` as they go.
+* ``load_state(name)`` / ``save_state(name, state)`` keep a small JSON dict
+  such as a watermark between runs.
+"""
+import uuid
+from contextlib import contextmanager
+from datetime import timedelta
+from django.db.models import Q
+from django.utils import timezone
+from .models import JobState
+
+
+def acquire_lock(name, timeout):
+    """A lock token when the lease was taken, None while another run holds it"""
+    JobState.objects.get_or_create(name=name)
+    now = timezone.now()
+    token = uuid.uuid4().hex
+    taken = JobState.objects.filter(name=name).filter(
+        Q(locked_until__isnull=True) | Q(locked_until__lte=now)
+    ).update(locked_until=now + timedelta(seconds=timeout), lock_token=token)
+    return token if taken else None
+
+
+def release_lock(name, token):
+    JobState.objects.filter(name=name, lock_token=token).update(locked_until=None, lock_token='')
+
+
+class Lease:
+    """Truthy while this run holds the named lock"""
+
+    def __init__(self, name, token, timeout):
+        self.name = name
+        self.token = token
+        self.timeout = timeout
+
+    def __bool__(self):
+        return self.token is not None
+
+    def renew(self):
+        """Extend the lease ``timeout`` seconds from now; False if it was lost to another run"""
+        if self.token is None:
+            return False
+        return bool(JobState.objects.filter(name=self.name, lock_token=self.token).update(
+            locked_until=timezone.now() + timedelta(seconds=self.timeout)
+        ))
+
+
+@contextmanager
+def job_lock(name, timeout):
+    """Yield a Lease, truthy while this run holds the named lock and falsy if another run does"""
+    token = acquire_lock(name, timeout)
+    try:
+        yield Lease(name, token, timeout)
+    finally:
+        if token:
+            release_lock(name, token)
+
+
+def load_state(name):
+    return JobState.objects.filter(name=name).values_list('state', flat=True).first() or {}
+
+
+def save_state(name, state):
+    # A targeted UPDATE so saving state never rewrites the lock columns
+    if not JobState.objects.filter(name=name).update(state=state, updated_at=timezone.now()):
+        JobState.objects.get_or_create(name=name, defaults={'state': state})
@@ -0,0 +1,212 @@
+"""
+Structured log sink for SystemLog and SecurityEvent.
+
+``DatabaseLogHandler`` is a logging.Handler attached to the root logger in
+LOGGING, so any ``logging.getLogger(...)`` call in the app can end up on the
+admin logs page.
+emit() only turns the record into a plain dict and drops it on a bounded
+queue; a daemon thread drains the queue and bulk inserts in batches. When the
+queue is full records are dropped and counted rather than blocking the
+request. Whatever is still queued when the process exits is flushed by an
+atexit hook. A batch that cannot be written is counted and reported on
+stderr through logging's handleError, never logged again. The test runner
+closes the sink so test runs do not write SystemLog rows. Records carrying a ``security_event`` extra become SecurityEvent
+rows instead:
+
+    logger.warning('Failed login for %s', email, extra={
+        'security_event': 'failed_login', 'severity': 'medium', 'ip_address': ip,
+    })
+"""
+import atexit
+import logging
+import queue
+import threading
+from datetime import timedelta
+from django.conf import settings
+from django.db import close_old_connections
+from django.utils import timezone
+
+LEVELS = {
+    logging.DEBUG: 'debug',
+    logging.INFO: 'info',
+    logging.WARNING: 'warning',
+    logging.ERROR: 'error',
+    logging.CRITICAL: 'error',
+}
+
+# Never persist the sink's own output or per-query SQL logging
+IGNORED_LOGGERS = ('admin_system.log_sink', 'django.db.backends')
+
+audit_logger = logging.getLogger('salesandoffers.audit')
+
+
+class LogSink:
+    def __init__(self, maxsize=10000, batch_size=200, flush_interval=2.0, background=True):
+        self.enabled = True
+        # Set by the DatabaseLogHandler feeding this sink; reports failed writes on stderr
+        self.error_handler = None
+        self._queue = queue.Queue(maxsize=maxsize)
+        self.batch_size = batch_size
+        self.background = background
+        self.flush_interval = flush_interval
+        self._lock = threading.Lock()
+        self._thread = None
+        self.dropped = 0
+        self.written = 0
+        self.failed = 0
+
+    def _ensure_worker(self):
+        if self._thread is None or not self._thread.is_alive():
+            with self._lock:
+                if self._thread is None or not self._thread.is_alive():
+                    self._thread = threading.Thread(target=self._run, name='log-sink', daemon=True)
+                    self._thread.start()
+
+    def put(self, entry):
+        if not self.enabled:
+            return False
+        try:
+            self._queue.put_nowait(entry)
+        except queue.Full:
+            with self._lock:
+                self.dropped += 1
+            return False
+        if self.background:
+            self._ensure_worker()
+        return True
+
+    def _drain(self, first=None):
+        batch = [first] if first is not None else []
+        while len(batch) < self.batch_size:
+            try:
+                batch.append(self._queue.get_nowait())
+            except queue.Empty:
+                break
+        return batch
+
+    def _run(self):
+        while True:
+            try:
+                first = self._queue.get(timeout=self.flush_interval)
+            except queue.Empty:
+                continue
+            close_old_connections()
+            self.write(self._drain(first))
+            close_old_connections()
+
+    def flush(self):
+        """Write everything queued so far in the calling thread"""
+        while True:
+            batch = self._drain()
+            if not batch:
+                return
+            self.write(batch)
+
+    def close(self):
+        """Write what is queued and accept nothing further"""
+        self.enabled = False
+        self.flush()
+
+    def write(self, batch):
+        from .models import SystemLog, SecurityEvent
+        logs = [SystemLog(**entry['fields']) for entry in batch if entry['kind'] == 'log']
+        events = [SecurityEvent(**entry['fields']) for entry in batch if entry['kind'] == 'security']
+        try:
+            if logs:
+                SystemLog.objects.bulk_create(logs)
+            if events:
+                SecurityEvent.objects.bulk_create(events)
+        except Exception:
+            with self._lock:
+                self.failed += len(batch)
+            # Logging about a failed log write would feed straight back into the sink
+            record = logging.makeLogRecord({
+                'name': __name__, 'levelno': logging.ERROR, 'levelname': 'ERROR',
+                'msg': f'Could not write {len(batch)} system log records',
+            })
+            (self.error_handler or logging.lastResort or logging.Handler()).handleError(record)
+            return
+        with self._lock:
+            self.written += len(batch)
+
+    def stats(self):
+        with self._lock:
+            return {
+                'queued': self._queue.qsize(),
+                'written': self.written,
+                'dropped': self.dropped,
+                'failed': self.failed,
+            }
+
+
+sink = LogSink(
+    maxsize=getattr(settings, 'SYSTEM_LOG_QUEUE_SIZE', 10000),
+    batch_size=getattr(settings, 'SYSTEM_LOG_BATCH_SIZE', 200),
+)
+# The worker is a daemon thread, so records queued at exit would otherwise be lost
+atexit.register(sink.flush)
+
+
+def record_to_entry(record, message):
+    extra = record.__dict__
+    user_id = extra.get('user_id')
+    ip_address = extra.get('ip_address')
+    if extra.get('security_event'):
+        return {'kind': 'security', 'fields': {
+            'event_type': extra['security_event'],
+            'user_id': user_id,
+            'ip_address': ip_address or '0.0.0.0',
+            'location': (extra.get('location') or '')[:100],
+            'severity': extra.get('severity', 'low'),
+            'details': message,
+        }}
+    return {'kind': 'log', 'fields': {
+        'level': LEVELS.get(record.levelno, 'info'),
+        'message': message,
+        'source': (extra.get('source') or record.name)[:100],
+        'user_id': user_id,
+        'ip_address': ip_address,
+    }}
+
+
+class DatabaseLogHandler(logging.Handler):
+    def __init__(self, level=logging.NOTSET, sink_instance=None):
+        super().__init__(level)
+        self.sink = sink_instance or sink
+        self.sink.error_handler = self
+
+    def emit(self, record):
+        if not getattr(settings, 'SYSTEM_LOG_SINK_ENABLED', True):
+            return
+        if record.name.startswith(IGNORED_LOGGERS):
+            return
+        try:
+            self.sink.put(record_to_entry(record, self.format(record)))
+        except Exception:
+            self.handleError(record)
+
+
+def prune_logs(log_days, security_days, chunk_size=5000):
+    """
+    Delete SystemLog rows older than ``log_days`` and resolved SecurityEvent
+    rows older than ``security_days``, a chunk of ids at a time so no single
+    statement holds locks on a huge range. Returns deleted counts.
+    """
+    from .models import SystemLog, SecurityEvent
+    now = timezone.now()
+    targets = {
+        'logs': SystemLog.objects.filter(timestamp__lt=now - timedelta(days=log_days)),
+        'security_events': SecurityEvent.objects.filter(
+            timestamp__lt=now - timedelta(days=security_days), resolved=True
+        ),
+    }
+    deleted = {}
+    for name, queryset in targets.items():
+        total = 0
+        while True:
+            ids = list(queryset.order_by('id').values_list('id', flat=True)[:chunk_size])
+            if not ids:
+                break
+            total += queryset.model.objects.filter(id__in=ids).delete()[0]
+        deleted[name] = total
+    return deleted
@@ -0,0 +1,20 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from admin_system.log_sink import prune_logs
+
+class Command(BaseCommand):
+    help = 'Delete old system logs and resolved security events'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--days', type=int, default=settings.SYSTEM_LOG_RETENTION_DAYS, help='Keep system logs newer than this')
+        parser.add_argument('--security-days', type=int, default=settings.SECURITY_EVENT_RETENTION_DAYS, help='Keep resolved security events newer than this')
+        parser.add_argument('--chunk-size', type=int, default=5000, help='Rows deleted per statement')
+
+    def handle(self, *args, **options):
+        deleted = prune_logs(options['days'], options['security_days'], chunk_size=options['chunk_size'])
+        
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Deleted {deleted['logs']} system logs and {deleted['security_events']} security events"
+            )
+        )
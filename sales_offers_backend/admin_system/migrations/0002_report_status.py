@@ -0,0 +1,39 @@
+# Generated by Django 5.1.5 on 2026-10-19 13:09
+
+from django.db import migrations, models
+
+
+def mark_existing_ready(apps, schema_editor):
+    # Reports from before background generation were written synchronously
+    apps.get_model('admin_system', 'Report').objects.update(status='ready')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('admin_system', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='report',
+            name='completed_at',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='report',
+            name='error',
+            field=models.TextField(blank=True),
+        ),
+        migrations.AddField(
+            model_name='report',
+            name='row_count',
+            field=models.IntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='report',
+            name='status',
+            field=models.CharField(choices=[('pending', 'Pending'), ('running', 'Running'), ('ready', 'Ready'), ('failed', 'Failed')], default='pending', max_length=10),
+        ),
+        migrations.RunPython(mark_existing_ready, migrations.RunPython.noop),
+    ]
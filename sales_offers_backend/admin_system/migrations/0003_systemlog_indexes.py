@@ -0,0 +1,27 @@
+# Generated by Django 5.1.5 on 2026-10-19 13:10
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('admin_system', '0002_report_status'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='systemlog',
+            index=models.Index(fields=['timestamp', 'id'], name='systemlog_time_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='systemlog',
+            index=models.Index(fields=['level', 'timestamp', 'id'], name='systemlog_level_time_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='systemlog',
+            index=models.Index(fields=['source', 'timestamp', 'id'], name='systemlog_source_time_idx'),
+        ),
+    ]
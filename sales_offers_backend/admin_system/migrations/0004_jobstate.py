@@ -0,0 +1,24 @@
+# Generated by Django 5.1.5 on 2026-10-19 13:12
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('admin_system', '0003_systemlog_indexes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='JobState',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=100, unique=True)),
+                ('locked_until', models.DateTimeField(blank=True, null=True)),
+                ('lock_token', models.CharField(blank=True, max_length=32)),
+                ('state', models.JSONField(blank=True, default=dict)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+        ),
+    ]
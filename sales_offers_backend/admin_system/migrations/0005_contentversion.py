@@ -0,0 +1,22 @@
+# Generated by Django 5.1.5 on 2026-10-19 15:40
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('admin_system', '0004_jobstate'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ContentVersion',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=50, unique=True)),
+                ('token', models.CharField(max_length=32)),
+                ('bumped_at', models.DateTimeField()),
+            ],
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.1.5 on 2026-10-19 16:12
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('admin_system', '0005_contentversion'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='report',
+            name='started_at',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+    ]
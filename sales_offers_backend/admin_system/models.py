@@ -19,6 +19,11 @@ class SystemLog(models.Model):
     
     class Meta:
         ordering = ['-timestamp']
+        indexes = [
+            models.Index(fields=['timestamp', 'id'], name='systemlog_time_idx'),
+            models.Index(fields=['level', 'timestamp', 'id'], name='systemlog_level_time_idx'),
+            models.Index(fields=['source', 'timestamp', 'id'], name='systemlog_source_time_idx'),
+        ]
 
 class SecurityEvent(models.Model):
     TYPE_CHOICES = [
@@ -66,14 +71,47 @@ class Report(models.Model):
         ('sellers', 'Seller Analytics'),
     ]
     
+    STATUS_CHOICES = [
+        ('pending', 'Pending'),
+        ('running', 'Running'),
+        ('ready', 'Ready'),
+        ('failed', 'Failed'),
+    ]
+    
     name = models.CharField(max_length=200)
     report_type = models.CharField(max_length=20, choices=REPORT_TYPES)
     date_range = models.CharField(max_length=20)
     file_path = models.CharField(max_length=500)
     file_size = models.CharField(max_length=20)
     format = models.CharField(max_length=10)
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default='pending')
+    row_count = models.IntegerField(default=0)
+    error = models.TextField(blank=True)
     created_at = models.DateTimeField(auto_now_add=True)
+    started_at = models.DateTimeField(null=True, blank=True)
+    completed_at = models.DateTimeField(null=True, blank=True)
     created_by = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE)
     
     class Meta:
-        ordering = ['-created_at']
\ No newline at end of file
+        ordering = ['-created_at']
+
+class JobState(models.Model):
+    """Cross-process lock and resume state for a scheduled job (see admin_system/jobs.py)"""
+    name = models.CharField(max_length=100, unique=True)
+    locked_until = models.DateTimeField(null=True, blank=True)
+    lock_token = models.CharField(max_length=32, blank=True)
+    state = models.JSONField(default=dict, blank=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return self.name
+
+
+class ContentVersion(models.Model):
+    """Version stamp of one name of public read data (see backend/content_versions.py)"""
+    name = models.CharField(max_length=50, unique=True)
+    token = models.CharField(max_length=32)
+    bumped_at = models.DateTimeField()
+
+    def __str__(self):
+        return f'{self.name}={self.token}'
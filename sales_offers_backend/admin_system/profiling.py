@@ -0,0 +1,225 @@
+"""
+Opt-in request profiling.
+
+RequestProfilingMiddleware records, per resolved URL name, wall time, DB
+query count, DB time, renderer time and response size into in-process
+log-linear histograms. Renderer time covers only the response's render pass
+(e.g. DRF encoding already serialized data as JSON); serializers run inside
+the view, so their work shows up in wall time and DB time instead. The worst requests above a threshold are
+sampled into a bounded log together with their slowest SQL. Everything lives
+in the worker process; each gunicorn worker reports its own numbers.
+
+Enable with REQUEST_PROFILING_ENABLED=True.
+"""
+import heapq
+import math
+import random
+import threading
+import time
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import connections
+from django.utils import timezone
+
+METRICS = ('wall_ms', 'db_queries', 'db_ms', 'renderer_ms', 'response_bytes')
+
+
+class Histogram:
+    """
+    HDR-style histogram: values are bucketed by power of two with a fixed
+    number of linear sub-buckets, giving bounded relative error (~1/sub_buckets)
+    across the full range with constant memory per order of magnitude.
+    """
+
+    def __init__(self, sub_buckets=32):
+        self.sub_buckets = sub_buckets
+        self.counts = {}
+        self.count = 0
+        self.total = 0.0
+        self.min = None
+        self.max = None
+
+    def bucket_for(self, value):
+        if value < 1:
+            return (0, int(value * self.sub_buckets))
+        exponent = int(math.floor(math.log2(value)))
+        base = 2 ** exponent
+        return (exponent + 1, int((value - base) / base * self.sub_buckets))
+
+    def bucket_upper_bound(self, bucket):
+        exponent, sub = bucket
+        if exponent == 0:
+            return (sub + 1) / self.sub_buckets
+        base = 2 ** (exponent - 1)
+        return base + base * (sub + 1) / self.sub_buckets
+
+    def record(self, value):
+        value = max(0.0, float(value))
+        bucket = self.bucket_for(value)
+        self.counts[bucket] = self.counts.get(bucket, 0) + 1
+        self.count += 1
+        self.total += value
+        self.min = value if self.min is None else min(self.min, value)
+        self.max = value if self.max is None else max(self.max, value)
+
+    def percentile(self, p):
+        if not self.count:
+            return 0.0
+        target = max(1, math.ceil(self.count * p / 100))
+        seen = 0
+        for bucket in sorted(self.counts):
+            seen += self.counts[bucket]
+            if seen >= target:
+                return min(self.bucket_upper_bound(bucket), self.max)
+        return self.max
+
+    def summary(self):
+        return {
+            'count': self.count,
+            'mean': round(self.total / self.count, 3) if self.count else 0.0,
+            'min': round(self.min or 0.0, 3),
+            'p50': round(self.percentile(50), 3),
+            'p90': round(self.percentile(90), 3),
+            'p99': round(self.percentile(99), 3),
+            'max': round(self.max or 0.0, 3),
+        }
+
+
+class ProfileRegistry:
+    def __init__(self, slow_log_size=20):
+        self._lock = threading.Lock()
+        self.slow_log_size = slow_log_size
+        self.reset()
+
+    def reset(self):
+        with self._lock:
+            self.endpoints = {}
+            self._slow = []
+            self._sequence = 0
+            self.started_at = timezone.now()
+
+    def record(self, endpoint, sample):
+        with self._lock:
+            histograms = self.endpoints.get(endpoint)
+            if histograms is None:
+                histograms = self.endpoints[endpoint] = {metric: Histogram() for metric in METRICS}
+            for metric in METRICS:
+                histograms[metric].record(sample[metric])
+
+    def record_slow(self, entry):
+        # Min-heap on wall time keeps only the worst offenders
+        with self._lock:
+            self._sequence += 1
+            item = (entry['wall_ms'], self._sequence, entry)
+            if len(self._slow) < self.slow_log_size:
+                heapq.heappush(self._slow, item)
+            elif item[0] > self._slow[0][0]:
+                heapq.heapreplace(self._slow, item)
+
+    def snapshot(self):
+        with self._lock:
+            endpoints = {
+                endpoint: {metric: histograms[metric].summary() for metric in METRICS}
+                for endpoint, histograms in self.endpoints.items()
+            }
+            slow = [entry for _, _, entry in sorted(self._slow, reverse=True)]
+        return {'since': self.started_at.isoformat(), 'endpoints': endpoints, 'slow_requests': slow}
+
+    def prometheus(self):
+        """Render histograms in Prometheus text exposition format as summaries"""
+        lines = []
+        with self._lock:
+            for metric in METRICS:
+                name = f'salesandoffers_request_{metric}'
+                lines.append(f'# TYPE {name} summary')
+                for endpoint, histograms in sorted(self.endpoints.items()):
+                    histogram = histograms[metric]
+                    label = endpoint.replace('\\', '\\\\').replace('"', '\\"')
+                    for quantile in (0.5, 0.9, 0.99):
+                        lines.append(
+                            f'{name}{{endpoint="{label}",quantile="{quantile}"}} '
+                            f'{histogram.percentile(quantile * 100):.3f}'
+                        )
+                    lines.append(f'{name}_sum{{endpoint="{label}"}} {histogram.total:.3f}')
+                    lines.append(f'{name}_count{{endpoint="{label}"}} {histogram.count}')
+        return '\n'.join(lines) + '\n'
+
+
+registry = ProfileRegistry()
+
+
+class QueryRecorder:
+    """connection.execute_wrapper hook that counts and times queries"""
+
+    def __init__(self):
+        self.count = 0
+        self.seconds = 0.0
+        self.statements = []
+
+    def __call__(self, execute, sql, params, many, context):
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            elapsed = time.perf_counter() - started
+            self.count += 1
+            self.seconds += elapsed
+            self.statements.append((elapsed, sql))
+
+
+class RequestProfilingMiddleware:
+    def __init__(self, get_response):
+        if not getattr(settings, 'REQUEST_PROFILING_ENABLED', False):
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+        self.slow_ms = getattr(settings, 'REQUEST_PROFILING_SLOW_MS', 500)
+        self.slow_sample_rate = getattr(settings, 'REQUEST_PROFILING_SLOW_SAMPLE_RATE', 1.0)
+
+    def __call__(self, request):
+        recorder = QueryRecorder()
+        request._profiling_renderer_ms = 0.0
+        started = time.perf_counter()
+        wrappers = [connections[alias].execute_wrapper(recorder) for alias in connections]
+        for wrapper in wrappers:
+            wrapper.__enter__()
+        try:
+            response = self.get_response(request)
+        finally:
+            for wrapper in reversed(wrappers):
+                wrapper.__exit__(None, None, None)
+        wall_ms = (time.perf_counter() - started) * 1000
+
+        match = getattr(request, 'resolver_match', None)
+        endpoint = (match.view_name if match else None) or 'unresolved'
+        response_bytes = 0 if response.streaming else len(response.content)
+        sample = {
+            'wall_ms': wall_ms,
+            'db_queries': recorder.count,
+            'db_ms': recorder.seconds * 1000,
+            'renderer_ms': request._profiling_renderer_ms,
+            'response_bytes': response_bytes,
+        }
+        registry.record(endpoint, sample)
+
+        if wall_ms >= self.slow_ms and random.random() < self.slow_sample_rate:
+            worst = sorted(recorder.statements, key=lambda statement: statement[0], reverse=True)[:10]
+            registry.record_slow({
+                'endpoint': endpoint,
+                'method': request.method,
+                'path': request.path,
+                'status': response.status_code,
+                'at': timezone.now().isoformat(),
+                **{metric: round(value, 3) for metric, value in sample.items()},
+                'top_sql': [{'ms': round(elapsed * 1000, 3), 'sql': sql} for elapsed, sql in worst],
+            })
+        return response
+
+    def process_template_response(self, request, response):
+        # DRF responses render after the view returns; time that rendering pass
+        render_started = time.perf_counter()
+
+        def finished(rendered):
+            request._profiling_renderer_ms = (time.perf_counter() - render_started) * 1000
+
+        response.add_post_render_callback(finished)
+        return response
@@ -0,0 +1,227 @@
+"""
+Admin report engine.
+
+Each report is a values_list() queryset walked with iterator(chunk_size=...)
+and written row by row, so generation uses constant memory regardless of
+table size. Reports are generated in the background into REPORTS_ROOT and
+served from there by the download endpoint.
+"""
+import csv
+import gzip
+import json
+import logging
+import os
+from datetime import timedelta
+from django.conf import settings
+from django.db.models import Count
+from django.template.defaultfilters import filesizeformat
+from django.utils import timezone
+
+logger = logging.getLogger(__name__)
+
+CHUNK_SIZE = 2000
+# A report still running after this long lost its worker and is marked failed
+STALE_AFTER = timedelta(hours=1)
+
+DATE_RANGES = {
+    '7d': timedelta(days=7),
+    '30d': timedelta(days=30),
+    '90d': timedelta(days=90),
+    '6m': timedelta(days=182),
+    '1y': timedelta(days=365),
+}
+
+# Spreadsheets evaluate cells starting with these as formulas
+FORMULA_PREFIXES = ('=', '+', '-', '@', '\t', '\r')
+
+FORMATS = {
+    'csv': ('csv', 'text/csv'),
+    'jsonl': ('jsonl.gz', 'application/gzip'),
+}
+
+
+def revenue_report(since):
+    from sellers.models import Payment
+    queryset = Payment.objects.filter(status='completed')
+    if since:
+        queryset = queryset.filter(created_at__gte=since)
+    header = ['id', 'created_at', 'username', 'plan', 'amount', 'currency', 'payment_method', 'reference']
+    rows = queryset.order_by('id').values_list(
+        'id', 'created_at', 'user__username', 'subscription__plan__name',
+        'amount', 'currency', 'payment_method', 'payment_reference',
+    )
+    return header, rows
+
+
+def users_report(since):
+    from accounts.models import User
+    queryset = User.objects.all()
+    if since:
+        queryset = queryset.filter(date_joined__gte=since)
+    header = ['id', 'username', 'email', 'date_joined', 'last_login', 'is_active', 'is_seller', 'is_email_verified']
+    rows = queryset.order_by('id').values_list(
+        'id', 'username', 'email', 'date_joined', 'last_login', 'is_active', 'is_seller', 'is_email_verified',
+    )
+    return header, rows
+
+
+def deals_report(since):
+    from deals.models import Deal
+    queryset = Deal.objects.all()
+    if since:
+        queryset = queryset.filter(created_at__gte=since)
+    now = timezone.now()
+    header = ['id', 'title', 'seller', 'category', 'status', 'is_published', 'is_active', 'created_at', 'expires_at']
+    rows = queryset.order_by('id').values_list(
+        'id', 'title', 'seller__business_name', 'category', 'status', 'is_published', 'created_at', 'expires_at',
+    )
+    # Deal has no is_active column; active means published, approved and not yet expired
+    active_rows = (
+        (*row[:6], row[5] and row[4] == 'approved' and row[7] > now, *row[6:])
+        for row in rows.iterator(chunk_size=CHUNK_SIZE)
+    )
+    return header, active_rows
+
+
+def sellers_report(since):
+    from sellers.models import Seller
+    queryset = Seller.objects.all()
+    if since:
+        queryset = queryset.filter(created_at__gte=since)
+    header = ['id', 'business_name', 'email', 'is_verified', 'rating', 'total_reviews', 'deals', 'created_at']
+    rows = queryset.annotate(deal_count=Count('deals')).order_by('id').values_list(
+        'id', 'business_name', 'user__email', 'is_verified', 'rating', 'total_reviews', 'deal_count', 'created_at',
+    )
+    return header, rows
+
+
+REPORT_BUILDERS = {
+    'revenue': revenue_report,
+    'users': users_report,
+    'deals': deals_report,
+    'sellers': sellers_report,
+}
+
+
+def normalize_format(value):
+    value = (value or '').lower()
+    return value if value in FORMATS else 'csv'
+
+
+def range_start(date_range):
+    delta = DATE_RANGES.get(date_range)
+    return timezone.now() - delta if delta else None
+
+
+def iter_report_rows(report_type, date_range):
+    header, rows = REPORT_BUILDERS[report_type](range_start(date_range))
+    if hasattr(rows, 'iterator'):
+        rows = rows.iterator(chunk_size=CHUNK_SIZE)
+    return header, rows
+
+
+def csv_safe(value):
+    """Quote text cells a spreadsheet would otherwise run as a formula"""
+    if isinstance(value, str) and value.startswith(FORMULA_PREFIXES):
+        return f"'{value}"
+    return value
+
+
+def write_report(path, report_type, date_range, format_type):
+    """Stream a report to ``path`` and return the number of data rows"""
+    header, rows = iter_report_rows(report_type, date_range)
+    count = 0
+    if format_type == 'jsonl':
+        with gzip.open(path, 'wt', encoding='utf-8') as f:
+            for row in rows:
+                f.write(json.dumps(dict(zip(header, row)), default=str))
+                f.write('\n')
+                count += 1
+    else:
+        with open(path, 'w', newline='', encoding='utf-8') as f:
+            writer = csv.writer(f)
+            writer.writerow(header)
+            for row in rows:
+                writer.writerow([csv_safe(value) for value in row])
+                count += 1
+    return count
+
+
+def report_path(report):
+    extension = FORMATS[report.format][0]
+    return os.path.join(settings.REPORTS_ROOT, f'report_{report.id}_{report.report_type}.{extension}')
+
+
+def expire_stale_reports():
+    from .models import Report
+    return Report.objects.filter(status='running', started_at__lt=timezone.now() - STALE_AFTER).update(
+        status='failed', error='Report generation did not finish'
+    )
+
+
+def generate_report(report_id):
+    """Background task: write the file for a pending Report"""
+    from .models import Report
+    expire_stale_reports()
+    # Claiming with a conditional UPDATE lets exactly one worker run a report that was queued twice
+    if not Report.objects.filter(id=report_id, status='pending').update(status='running', started_at=timezone.now()):
+        return
+    report = Report.objects.get(id=report_id)
+
+    path = report_path(report)
+    temp_path = f'{path}.part'
+    try:
+        os.makedirs(settings.REPORTS_ROOT, exist_ok=True)
+        row_count = write_report(temp_path, report.report_type, report.date_range, report.format)
+        os.replace(temp_path, path)
+    except Exception as exc:
+        logger.exception('Report %s failed', report_id)
+        if os.path.exists(temp_path):
+            os.remove(temp_path)
+        Report.objects.filter(id=report_id).update(status='failed', error=str(exc)[:500])
+        return
+
+    Report.objects.filter(id=report_id).update(
+        status='ready',
+        file_path=path,
+        file_size=filesizeformat(os.path.getsize(path)),
+        row_count=row_count,
+        completed_at=timezone.now(),
+    )
+
+
+def parse_byte_range(header, size):
+    """
+    Parse a single-range ``Range: bytes=...`` header.
+
+    Returns (start, end) inclusive, None when the header is absent or not a
+    byte range (serve the whole file), or False when it is unsatisfiable.
+    """
+    if not header.startswith('bytes=') or ',' in header:
+        return None
+    start, _, end = header[len('bytes='):].strip().partition('-')
+    try:
+        if not start:
+            length = int(end)
+            if length <= 0:
+                return False
+            return max(0, size - length), size - 1
+        start = int(start)
+        end = int(end) if end else size - 1
+    except ValueError:
+        return None
+    if start >= size or end < start:
+        return False
+    return start, min(end, size - 1)
+
+
+def iter_file_range(path, start, end, block_size=64 * 1024):
+    with open(path, 'rb') as f:
+        f.seek(start)
+        remaining = end - start + 1
+        while remaining > 0:
+            chunk = f.read(min(block_size, remaining))
+            if not chunk:
+                break
+            remaining -= len(chunk)
+            yield chunk
@@ -0,0 +1,246 @@
+"""
+Typed, process-cached view of SystemSettings.
+
+Every process keeps a snapshot of all settings, parsed to their declared
+types and merged with defaults. Writes bump the 'settings' content version
+(see backend/content_versions.py), which lives in the database so every
+worker and cron process sees it; each process compares its snapshot's token
+at most every ``SYSTEM_SETTINGS_CHECK_INTERVAL`` seconds and reloads when it
+changed, so hot paths such as MaintenanceModeMiddleware cost one small query
+per interval rather than one per request.
+
+If SystemSettings cannot be read (table not migrated yet, database
+unreachable) the registry keeps its last snapshot, or the defaults when it
+has none, and retries on the next check rather than failing every request.
+"""
+import logging
+import threading
+import time
+from django.conf import settings as django_settings
+from django.db import DatabaseError
+from django.http import JsonResponse
+from rest_framework.exceptions import AuthenticationFailed
+
+
+class SettingDefinition:
+    def __init__(self, kind, default, choices=None, minimum=None):
+        self.kind = kind
+        self.default = default
+        self.choices = choices
+        self.minimum = minimum
+
+    def parse(self, value):
+        """Coerce a stored or submitted value; raises ValueError if it does not fit"""
+        if self.kind is bool:
+            if isinstance(value, bool):
+                return value
+            text = str(value).strip().lower()
+            if text in ('true', '1', 'yes', 'on'):
+                return True
+            if text in ('false', '0', 'no', 'off', ''):
+                return False
+            raise ValueError('Expected true or false')
+        if self.kind is int:
+            if isinstance(value, bool):
+                raise ValueError('Expected a whole number')
+            try:
+                number = int(str(value).strip())
+            except ValueError:
+                raise ValueError('Expected a whole number')
+            if self.minimum is not None and number < self.minimum:
+                raise ValueError(f'Must be at least {self.minimum}')
+            return number
+        text = str(value).strip()
+        if self.choices and text not in self.choices:
+            raise ValueError(f"Choose one of: {', '.join(self.choices)}")
+        return text
+
+    def serialize(self, value):
+        if self.kind is bool:
+            return 'true' if value else 'false'
+        return str(value)
+
+
+DEFINITIONS = {
+    'siteName': SettingDefinition(str, 'Sales & Offers'),
+    'siteDescription': SettingDefinition(str, 'Your trusted marketplace for amazing deals and offers'),
+    'adminEmail': SettingDefinition(str, 'admin@salesandoffers.com'),
+    'supportEmail': SettingDefinition(str, 'support@salesandoffers.com'),
+    'maintenanceMode': SettingDefinition(bool, False),
+    'userRegistration': SettingDefinition(bool, True),
+    'emailVerification': SettingDefinition(bool, True),
+    'newsletterEnabled': SettingDefinition(bool, True),
+    'maxFileSize': SettingDefinition(int, 10, minimum=1),
+    'sessionTimeout': SettingDefinition(int, 30, minimum=1),
+    'backupFrequency': SettingDefinition(str, 'daily', choices=('hourly', 'daily', 'weekly', 'monthly')),
+    'logLevel': SettingDefinition(str, 'info', choices=('debug', 'info', 'warning', 'error')),
+}
+
+VERSION_NAME = 'settings'
+
+logger = logging.getLogger(__name__)
+
+
+def default_values():
+    return {key: definition.default for key, definition in DEFINITIONS.items()}
+
+
+def get_version():
+    from backend import content_versions
+    return content_versions.get_versions(VERSION_NAME)[VERSION_NAME]
+
+
+def bump_version():
+    from backend import content_versions
+    content_versions.bump(VERSION_NAME)
+
+
+class SettingsRegistry:
+    def __init__(self, check_interval=5):
+        self.check_interval = check_interval
+        self._lock = threading.Lock()
+        self._values = None
+        self._version = None
+        self._checked_at = 0.0
+        self._stale = False
+
+    def load(self, version=None):
+        from .models import SystemSettings
+        values = default_values()
+        try:
+            # Read the version first, so a write landing during the load is picked up next time
+            if version is None:
+                version = get_version()
+            rows = list(SystemSettings.objects.filter(key__in=DEFINITIONS).values_list('key', 'value'))
+        except DatabaseError:
+            logger.warning('System settings unavailable, serving the last known values', exc_info=True)
+            with self._lock:
+                if self._values is None:
+                    self._values = values
+                self._stale = True
+                self._checked_at = time.monotonic()
+                return self._values
+        for key, value in rows:
+            try:
+                values[key] = DEFINITIONS[key].parse(value)
+            except ValueError:
+                # Rows written before values were typed keep the default
+                pass
+        with self._lock:
+            self._values = values
+            self._version = version
+            self._stale = False
+            self._checked_at = time.monotonic()
+        return values
+
+    def snapshot(self):
+        values = self._values
+        if values is None:
+            return self.load()
+        if time.monotonic() - self._checked_at >= self.check_interval:
+            if self._stale:
+                return self.load()
+            try:
+                version = get_version()
+            except DatabaseError:
+                logger.warning('System settings version unavailable, serving the last known values', exc_info=True)
+                version = self._version
+            if version != self._version:
+                return self.load(version)
+            self._checked_at = time.monotonic()
+        return values
+
+    def get(self, key):
+        return self.snapshot()[key]
+
+    def all(self):
+        return dict(self.snapshot())
+
+    def validate(self, data):
+        """Parse submitted values; returns (values, errors)"""
+        values, errors = {}, {}
+        for key, value in data.items():
+            definition = DEFINITIONS.get(key)
+            if definition is None:
+                errors[key] = 'Unknown setting'
+                continue
+            try:
+                values[key] = definition.parse(value)
+            except ValueError as exc:
+                errors[key] = str(exc)
+        return values, errors
+
+    def update(self, values, user=None):
+        """Upsert all values in one statement and invalidate every process's snapshot"""
+        from .models import SystemSettings
+        rows = [
+            SystemSettings(key=key, value=DEFINITIONS[key].serialize(value), updated_by=user)
+            for key, value in values.items()
+        ]
+        SystemSettings.objects.bulk_create(
+            rows,
+            update_conflicts=True,
+            unique_fields=['key'],
+            update_fields=['value', 'updated_by', 'updated_at'],
+        )
+        bump_version()
+        with self._lock:
+            if self._values is None:
+                merged = None
+            else:
+                merged = {**self._values, **values}
+                self._values = merged
+                # Unknown until the next check, which then reloads once and settles
+                self._version = None
+        return merged if merged is not None else self.load()
+
+    def invalidate(self):
+        with self._lock:
+            self._values = None
+
+    def reset(self):
+        """Start over from the defaults, as for an empty SystemSettings table (used between tests)"""
+        with self._lock:
+            self._values = default_values()
+            self._version = None
+            self._stale = False
+            self._checked_at = time.monotonic()
+
+
+registry = SettingsRegistry(check_interval=getattr(django_settings, 'SYSTEM_SETTINGS_CHECK_INTERVAL', 5))
+
+
+class MaintenanceModeMiddleware:
+    """
+    Answers 503 while ``maintenanceMode`` is on, except for the exempt path
+    prefixes (admin endpoints, login) and superusers, so staff can still
+    sign in and switch it back off.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.exempt_paths = tuple(getattr(django_settings, 'MAINTENANCE_EXEMPT_PATHS', ()))
+
+    def __call__(self, request):
+        if registry.get('maintenanceMode') and not self.is_exempt(request):
+            response = JsonResponse(
+                {'error': 'The site is down for maintenance', 'maintenance': True},
+                status=503
+            )
+            response['Retry-After'] = '300'
+            return response
+        return self.get_response(request)
+
+    def is_exempt(self, request):
+        if request.path.startswith(self.exempt_paths):
+            return True
+        user = getattr(request, 'user', None)
+        if user is None or not user.is_authenticated:
+            # API clients send tokens, which DRF only resolves inside the view
+            from accounts.authentication import CachingTokenAuthentication
+            try:
+                result = CachingTokenAuthentication().authenticate(request)
+            except AuthenticationFailed:
+                return False
+            user = result[0] if result else None
+        return bool(user and user.is_superuser)
@@ -0,0 +1,14 @@
+from django.core.signals import request_started
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import receiver
+from .host_metrics import count_request
+from .models import SystemSettings
+from .settings_registry import bump_version, registry as settings_registry
+
+request_started.connect(count_request, dispatch_uid='admin_system.count_request')
+
+@receiver([post_save, post_delete], sender=SystemSettings)
+def invalidate_settings_registry(sender, **kwargs):
+    """Edits made outside the settings endpoint (Django admin, shell) still reach every process"""
+    bump_version()
+    settings_registry.invalidate()
@@ -0,0 +1,376 @@
+import csv
+import gzip
+import io
+import json
+import logging
+import shutil
+import tempfile
+from datetime import timedelta
+from unittest import mock
+from django.core.cache import cache
+from django.db import DatabaseError
+from django.test import override_settings
+from django.utils import timezone
+from rest_framework.test import APITestCase
+from rest_framework import status
+from rest_framework.authtoken.models import Token
+from accounts.models import User
+from deals.models import Deal
+from sellers.models import Seller
+from .models import Report, SystemLog, SecurityEvent, SystemSettings
+from .host_metrics import HostMetricsSampler, sampler as host_sampler
+from .profiling import Histogram, registry
+from .reports import generate_report
+from .log_sink import DatabaseLogHandler, LogSink, prune_logs, sink as global_sink
+from .settings_registry import SettingsRegistry, registry as settings_registry
+from .views import create_system_log, create_security_event
+
+
+class HistogramTestCase(APITestCase):
+    def test_percentiles_within_bucket_error(self):
+        """Percentiles stay within the sub-bucket relative error"""
+        histogram = Histogram()
+        for value in range(1, 1001):
+            histogram.record(value)
+        self.assertEqual(histogram.count, 1000)
+        self.assertAlmostEqual(histogram.percentile(50), 500, delta=500 / 32 + 1)
+        self.assertAlmostEqual(histogram.percentile(99), 990, delta=990 / 32 + 1)
+        self.assertEqual(histogram.percentile(100), 1000)
+
+
+@override_settings(REQUEST_PROFILING_ENABLED=True, REQUEST_PROFILING_SLOW_MS=0, REQUEST_PROFILING_SLOW_SAMPLE_RATE=1.0, PROMETHEUS_METRICS_TOKEN='scrape-token')
+class RequestProfilingTestCase(APITestCase):
+    def setUp(self):
+        cache.clear()
+        registry.reset()
+        self.admin = User.objects.create_superuser(username='admin', email='admin@example.com', password='testpass123')
+
+    def tearDown(self):
+        registry.reset()
+
+    def test_records_per_endpoint_histograms(self):
+        """Requests are profiled per URL name and exposed to superusers"""
+        self.client.get('/api/blog/categories/')
+        self.client.force_authenticate(user=self.admin)
+        response = self.client.get('/api/admin/profiling/')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        stats = response.data['endpoints']['blog-categories']
+        self.assertEqual(stats['wall_ms']['count'], 1)
+        self.assertGreater(stats['db_queries']['max'], 0)
+        self.assertGreater(stats['response_bytes']['max'], 0)
+        slow = response.data['slow_requests'][0]
+        self.assertEqual(slow['endpoint'], 'blog-categories')
+        self.assertTrue(slow['top_sql'])
+
+    def test_prometheus_endpoint_requires_token(self):
+        """The Prometheus text endpoint accepts the scrape token only"""
+        self.client.get('/api/blog/categories/')
+        response = self.client.get('/api/admin/metrics/')
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+        response = self.client.get('/api/admin/metrics/', HTTP_AUTHORIZATION='Bearer scrape-token')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        body = response.content.decode()
+        self.assertIn('# TYPE salesandoffers_request_wall_ms summary', body)
+        self.assertIn('salesandoffers_request_db_queries_count{endpoint="blog-categories"} 1', body)
+
+    def test_non_admin_denied(self):
+        """Regular users cannot read profiling data"""
+        user = User.objects.create_user(username='user', email='user@example.com', password='testpass123')
+        self.client.force_authenticate(user=user)
+        response = self.client.get('/api/admin/profiling/')
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+
+
+class HostMetricsTestCase(APITestCase):
+    def setUp(self):
+        cache.clear()
+        self.admin = User.objects.create_superuser(username='admin', email='admin@example.com', password='testpass123')
+
+    def test_sampler_computes_rates_between_samples(self):
+        """Consecutive samples yield bounded CPU and memory percentages"""
+        sampler = HostMetricsSampler(history=3)
+        for _ in range(4):
+            point = sampler.sample()
+        self.assertEqual(len(sampler.series()), 3)
+        self.assertGreaterEqual(point['cpu'], 0)
+        self.assertLessEqual(point['cpu'], 100)
+        self.assertLessEqual(point['memory'], 100)
+
+    def test_system_metrics_endpoint(self):
+        """The endpoint serves the latest sample without hard-coded values"""
+        host_sampler.sample()
+        self.client.force_authenticate(user=self.admin)
+        response = self.client.get('/api/admin/system/')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['activeUsers'], 0)
+        self.assertIn('series', response.data)
+        self.assertRegex(response.data['uptime'], r'^\d+d \d+h \d+m$')
+
+
+@override_settings(BACKGROUND_TASK_QUEUE='backend.background.ImmediateTaskQueue')
+class ReportsTestCase(APITestCase):
+    def setUp(self):
+        self.reports_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.reports_root, ignore_errors=True)
+        override = override_settings(REPORTS_ROOT=self.reports_root)
+        override.enable()
+        self.addCleanup(override.disable)
+        self.admin = User.objects.create_superuser(username='admin', email='admin@example.com', password='testpass123')
+        seller = Seller.objects.create(user=self.admin, business_name='Shop', business_description='Shop', address='Nairobi')
+        Deal.objects.create(title='Live', description='d', seller=seller, status='approved', expires_at=timezone.now() + timedelta(days=3))
+        Deal.objects.create(title='Expired', description='d', seller=seller, status='approved', expires_at=timezone.now() - timedelta(days=1))
+        self.client.force_authenticate(user=self.admin)
+
+    def generate(self, report_type, format_type='csv'):
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.client.post('/api/admin/reports/', {'report_type': report_type, 'date_range': '30d', 'format': format_type})
+        self.assertEqual(response.status_code, status.HTTP_202_ACCEPTED)
+        return Report.objects.get(id=response.data['report_id'])
+
+    def test_deals_report_written_in_background(self):
+        """The deals report is a real CSV with a derived is_active column"""
+        report = self.generate('deals')
+        self.assertEqual(report.status, 'ready')
+        self.assertEqual(report.row_count, 2)
+        response = self.client.get(f'/api/admin/reports/{report.id}/download/')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        rows = list(csv.DictReader(io.StringIO(b''.join(response.streaming_content).decode())))
+        self.assertEqual({row['title']: row['is_active'] for row in rows}, {'Live': 'True', 'Expired': 'False'})
+
+    def test_report_claimed_once_and_stale_runs_expire(self):
+        """A report queued twice is written once; a run whose worker died is marked failed"""
+        report = self.generate('deals')
+        with mock.patch('admin_system.reports.write_report') as write:
+            generate_report(report.id)
+        write.assert_not_called()
+
+        stuck = Report.objects.create(
+            name='Stuck', report_type='users', date_range='30d', file_path='', file_size='', format='csv',
+            status='running', started_at=timezone.now() - timedelta(hours=2), created_by=self.admin
+        )
+        response = self.client.get('/api/admin/reports/')
+        self.assertEqual(next(row['status'] for row in response.data if row['id'] == stuck.id), 'failed')
+        self.assertEqual(Report.objects.get(id=report.id).status, 'ready')
+
+    def test_csv_cells_cannot_inject_formulas(self):
+        """Text cells starting with a formula character are quoted"""
+        Deal.objects.filter(title='Live').update(title='=HYPERLINK("http://evil")')
+        report = self.generate('deals')
+        with open(report.file_path, newline='') as f:
+            titles = {row['title'] for row in csv.DictReader(f)}
+        self.assertEqual(titles, {'\'=HYPERLINK("http://evil")', 'Expired'})
+
+    def test_download_supports_ranges(self):
+        """Range requests return 206 with the requested slice"""
+        report = self.generate('users')
+        with open(report.file_path, 'rb') as f:
+            content = f.read()
+        response = self.client.get(f'/api/admin/reports/{report.id}/download/', HTTP_RANGE='bytes=5-14')
+        self.assertEqual(response.status_code, status.HTTP_206_PARTIAL_CONTENT)
+        self.assertEqual(b''.join(response.streaming_content), content[5:15])
+        self.assertEqual(response['Content-Range'], f'bytes 5-14/{len(content)}')
+        response = self.client.get(f'/api/admin/reports/{report.id}/download/', HTTP_RANGE=f'bytes={len(content)}-')
+        self.assertEqual(response.status_code, status.HTTP_416_REQUESTED_RANGE_NOT_SATISFIABLE)
+
+    def test_jsonl_report_is_gzipped(self):
+        """JSONL reports are stored compressed, one object per line"""
+        report = self.generate('sellers', 'jsonl')
+        with gzip.open(report.file_path, 'rt') as f:
+            rows = [json.loads(line) for line in f]
+        self.assertEqual(rows[0]['business_name'], 'Shop')
+        self.assertEqual(rows[0]['deals'], 2)
+
+    def test_unknown_report_type_rejected(self):
+        """Unsupported report types are rejected up front"""
+        response = self.client.post('/api/admin/reports/', {'report_type': 'clicks'})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+
+class LogSinkTestCase(APITestCase):
+    def setUp(self):
+        self.admin = User.objects.create_superuser(username='admin', email='admin@example.com', password='testpass123')
+        self.sink = LogSink(maxsize=3, batch_size=2, background=False)
+        self.logger = logging.getLogger('salesandoffers.tests')
+        self.logger.propagate = False
+        self.handler = DatabaseLogHandler(sink_instance=self.sink)
+        self.logger.addHandler(self.handler)
+
+    def tearDown(self):
+        self.logger.removeHandler(self.handler)
+        self.logger.propagate = True
+
+    def test_records_batched_and_overflow_dropped(self):
+        """Records are queued, written in batches, and counted when the queue is full"""
+        for i in range(4):
+            self.logger.warning('event %s', i, extra={'source': 'tests', 'user_id': self.admin.id})
+        self.assertEqual(SystemLog.objects.count(), 0)
+        self.sink.flush()
+        logs = SystemLog.objects.order_by('id')
+        self.assertEqual([log.message for log in logs], ['event 0', 'event 1', 'event 2'])
+        self.assertEqual({(log.level, log.source, log.user_id) for log in logs}, {('warning', 'tests', self.admin.id)})
+        self.assertEqual(self.sink.stats(), {'queued': 0, 'written': 3, 'dropped': 1, 'failed': 0})
+
+    def test_security_event_extra(self):
+        """Records flagged as security events become SecurityEvent rows"""
+        self.logger.error('Too many attempts', extra={'security_event': 'failed_login', 'severity': 'high'})
+        self.sink.flush()
+        event = SecurityEvent.objects.get()
+        self.assertEqual((event.event_type, event.severity, event.ip_address), ('failed_login', 'high', '0.0.0.0'))
+        self.assertEqual(SystemLog.objects.count(), 0)
+
+    def test_helpers_go_through_sink(self):
+        """The helper functions enqueue instead of inserting inline"""
+        with mock.patch.object(global_sink, 'background', False), mock.patch.object(global_sink, 'enabled', True):
+            create_system_log('error', 'Payment webhook failed', 'payments', user=self.admin, ip_address='10.0.0.1')
+            create_security_event('account_locked', self.admin, '10.0.0.2', 'Nairobi', 'critical', 'Locked')
+            self.assertEqual(SystemLog.objects.count(), 0)
+            global_sink.flush()
+        log = SystemLog.objects.get()
+        self.assertEqual((log.level, log.source, log.ip_address), ('error', 'payments', '10.0.0.1'))
+        self.assertEqual(SecurityEvent.objects.get().location, 'Nairobi')
+
+    def test_failed_writes_reported_on_stderr(self):
+        """A batch that cannot be written is counted and reported, not silently dropped"""
+        self.logger.warning('lost')
+        with mock.patch('admin_system.models.SystemLog.objects.bulk_create', side_effect=DatabaseError('read only')), \
+                mock.patch('sys.stderr', new_callable=io.StringIO) as stderr:
+            self.sink.flush()
+        self.assertEqual(self.sink.stats()['failed'], 1)
+        self.assertIn('Could not write 1 system log records', stderr.getvalue())
+        self.assertIn('read only', stderr.getvalue())
+
+    def test_app_module_loggers_reach_sink(self):
+        """Records from any app module's logger propagate to the sink"""
+        handler = next(h for h in logging.getLogger().handlers if isinstance(h, DatabaseLogHandler))
+        with mock.patch.object(handler, 'sink', self.sink):
+            logging.getLogger('deals.expiry').info('Deal expiry sweep done')
+            logging.getLogger('django.request').warning('Not Found: /missing/')
+        self.sink.flush()
+        self.assertEqual(list(SystemLog.objects.values_list('source', 'message')), [('deals.expiry', 'Deal expiry sweep done')])
+
+    def test_prune_in_chunks(self):
+        """Old logs and resolved security events are deleted; recent or open ones kept"""
+        for i in range(5):
+            SystemLog.objects.create(level='info', message=f'old {i}', source='tests')
+        SystemLog.objects.create(level='info', message='new', source='tests')
+        SystemLog.objects.exclude(message='new').update(timestamp=timezone.now() - timedelta(days=40))
+        SecurityEvent.objects.create(event_type='failed_login', ip_address='10.0.0.1', details='old', resolved=True)
+        SecurityEvent.objects.create(event_type='failed_login', ip_address='10.0.0.1', details='open')
+        SecurityEvent.objects.update(timestamp=timezone.now() - timedelta(days=200))
+        deleted = prune_logs(30, 180, chunk_size=2)
+        self.assertEqual(deleted, {'logs': 5, 'security_events': 1})
+        self.assertEqual(list(SystemLog.objects.values_list('message', flat=True)), ['new'])
+        self.assertEqual(SecurityEvent.objects.get().details, 'open')
+
+    def test_admin_logs_filter_by_level_and_source(self):
+        """Admin log listing filters by level and source"""
+        SystemLog.objects.create(level='error', message='boom', source='payments')
+        SystemLog.objects.create(level='info', message='ok', source='payments')
+        SystemLog.objects.create(level='error', message='other', source='auth')
+        self.client.force_authenticate(user=self.admin)
+        response = self.client.get('/api/admin/logs/', {'level': 'error', 'source': 'payments'})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual([log['message'] for log in response.data['results']], ['boom'])
+
+
+class SettingsRegistryTestCase(APITestCase):
+    def setUp(self):
+        cache.clear()
+        settings_registry.load()
+        self.admin = User.objects.create_superuser(username='admin', email='admin@example.com', password='testpass123')
+        self.client.force_authenticate(user=self.admin)
+
+    def tearDown(self):
+        # Leave the process snapshot on defaults for the tests that follow
+        SystemSettings.objects.all().delete()
+        settings_registry.load()
+
+    def test_typed_values_and_bulk_upsert(self):
+        """Settings come back typed and a save is one upsert plus the version bump"""
+        response = self.client.get('/api/admin/settings/')
+        self.assertIs(response.data['userRegistration'], True)
+        self.assertEqual(response.data['maxFileSize'], 10)
+        with self.assertNumQueries(2), self.captureOnCommitCallbacks(execute=True):
+            settings_registry.update({'siteName': 'Deals KE', 'maxFileSize': 25, 'newsletterEnabled': False}, user=self.admin)
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.client.post('/api/admin/settings/', {'logLevel': 'error', 'sessionTimeout': '45'}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(SystemSettings.objects.get(key='newsletterEnabled').value, 'false')
+        data = self.client.get('/api/admin/settings/').data
+        self.assertEqual((data['siteName'], data['maxFileSize'], data['sessionTimeout']), ('Deals KE', 25, 45))
+        self.assertIs(data['newsletterEnabled'], False)
+
+    def test_invalid_values_rejected(self):
+        """Unknown keys and badly typed values are rejected without writing"""
+        response = self.client.post('/api/admin/settings/', {'maxFileSize': 'big', 'theme': 'dark'}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(set(response.data['fields']), {'maxFileSize', 'theme'})
+        self.assertFalse(SystemSettings.objects.exists())
+
+    def test_other_processes_reload_on_version_change(self):
+        """A registry in another process picks up writes through the database version"""
+        other = SettingsRegistry(check_interval=0)
+        self.assertIs(other.get('maintenanceMode'), False)
+        with self.captureOnCommitCallbacks(execute=True):
+            settings_registry.update({'maintenanceMode': True})
+        # The version check and the reload
+        with self.assertNumQueries(2):
+            self.assertIs(other.get('maintenanceMode'), True)
+        with self.assertNumQueries(1):
+            other.get('maintenanceMode')
+
+    def test_version_survives_a_separate_cache(self):
+        """A worker with its own (empty) cache still sees a change made elsewhere"""
+        other = SettingsRegistry(check_interval=0)
+        self.assertIs(other.get('userRegistration'), True)
+        with self.captureOnCommitCallbacks(execute=True):
+            settings_registry.update({'userRegistration': False})
+        cache.clear()
+        self.assertIs(other.get('userRegistration'), False)
+
+    def test_unreadable_settings_fall_back(self):
+        """A database error serves the last snapshot, or the defaults, and is retried"""
+        registry = SettingsRegistry(check_interval=0)
+        with mock.patch('admin_system.models.SystemSettings.objects.filter', side_effect=DatabaseError('no such table')):
+            self.assertIs(registry.get('maintenanceMode'), False)
+        settings_registry.update({'maintenanceMode': True})
+        self.assertIs(registry.get('maintenanceMode'), True)
+        with mock.patch('admin_system.models.SystemSettings.objects.filter', side_effect=DatabaseError('gone away')):
+            self.assertIs(registry.load()['maintenanceMode'], True)
+        settings_registry.update({'maintenanceMode': False})
+        self.client.force_authenticate(user=None)
+        with mock.patch('admin_system.models.SystemSettings.objects.filter', side_effect=DatabaseError('gone away')):
+            settings_registry.invalidate()
+            self.assertEqual(self.client.get('/api/deals/').status_code, status.HTTP_200_OK)
+
+    def test_google_sign_up_respects_registration_setting(self):
+        """Google sign-in cannot create accounts while registration is closed"""
+        settings_registry.update({'userRegistration': False})
+        User.objects.create_user(username='known', email='known@example.com', password='testpass123')
+        self.client.force_authenticate(user=None)
+        with mock.patch('accounts.views.FIREBASE_AVAILABLE', True), \
+                mock.patch('accounts.views.firebase_initialized', True), \
+                mock.patch('accounts.views.firebase_auth', create=True) as firebase_auth:
+            firebase_auth.verify_id_token.return_value = {'uid': 'u1', 'email': 'new@example.com', 'name': 'New User'}
+            response = self.client.post('/api/accounts/google/', {'id_token': 'x'})
+            self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+            self.assertFalse(User.objects.filter(email='new@example.com').exists())
+            firebase_auth.verify_id_token.return_value = {'uid': 'u2', 'email': 'known@example.com', 'name': 'Known'}
+            response = self.client.post('/api/accounts/google/', {'id_token': 'x'})
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+    def test_maintenance_mode(self):
+        """Maintenance mode blocks the API except for admins and exempt paths"""
+        settings_registry.update({'maintenanceMode': True, 'userRegistration': False})
+        self.client.force_authenticate(user=None)
+        response = self.client.get('/api/deals/')
+        self.assertEqual(response.status_code, status.HTTP_503_SERVICE_UNAVAILABLE)
+        self.assertEqual(response['Retry-After'], '300')
+        self.assertNotEqual(self.client.post('/api/accounts/login/', {}).status_code, status.HTTP_503_SERVICE_UNAVAILABLE)
+        token = Token.objects.create(user=self.admin)
+        response = self.client.get('/api/deals/', HTTP_AUTHORIZATION=f'Token {token.key}')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+        settings_registry.update({'maintenanceMode': False})
+        response = self.client.post('/api/accounts/register/', {'email': 'new@example.com', 'password': 'x'})
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
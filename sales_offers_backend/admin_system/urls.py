@@ -7,4 +7,7 @@ urlpatterns = [
     path('system/', views.admin_system_metrics, name='admin_system'),
     path('settings/', views.admin_settings, name='admin_settings'),
     path('reports/', views.admin_reports, name='admin_reports'),
+    path('reports/<int:report_id>/download/', views.admin_report_download, name='admin_report_download'),
+    path('profiling/', views.admin_profiling, name='admin_profiling'),
+    path('metrics/', views.prometheus_metrics, name='admin_prometheus_metrics'),
 ]
\ No newline at end of file
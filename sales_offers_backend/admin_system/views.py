@@ -1,25 +1,55 @@
 from rest_framework.decorators import api_view, permission_classes
-from rest_framework.permissions import IsAuthenticated
+from rest_framework.permissions import IsAuthenticated, AllowAny
 from rest_framework.response import Response
+from django.conf import settings
+from django.core.cache import cache
+from django.db import connection
+from django.http import HttpResponse, StreamingHttpResponse
+from django.utils.crypto import constant_time_compare
 from django.db.models import Count, Sum, Avg
 from django.utils import timezone
 from datetime import timedelta
-from .models import SystemLog, SecurityEvent, SystemSettings, Report
+from .models import SystemLog, SecurityEvent, Report
+from .profiling import registry as profile_registry
+from .host_metrics import sampler, format_uptime
+from .settings_registry import registry as settings_registry
+from .log_sink import audit_logger, sink as log_sink
+from .reports import (
+    FORMATS, REPORT_BUILDERS, expire_stale_reports, generate_report, iter_file_range, normalize_format,
+    parse_byte_range
+)
+from backend.admin_listing import AdminListing
+from backend.background import enqueue_on_commit
 from accounts.models import User
 from deals.models import Deal
 from sellers.models import Seller, Payment
+import logging
 import os
 
+DATABASE_STATS_CACHE_KEY = 'admin_system:database_stats'
+DATABASE_STATS_TTL = 30
+
+class SystemLogAdminListing(AdminListing):
+    filter_fields = {'level': 'level', 'source': 'source', 'user': 'user_id'}
+    search_fields = ('message',)
+    date_field = 'timestamp'
+    sort_fields = {'time': 'timestamp'}
+    default_sort = '-time'
+
 @api_view(['GET'])
 @permission_classes([IsAuthenticated])
 def admin_logs(request):
     if not (request.user.is_staff and request.user.is_superuser):
         return Response({'error': 'Permission denied'}, status=403)
     
-    logs = SystemLog.objects.all()[:100]
+    logs = SystemLog.objects.select_related('user').only(
+        'timestamp', 'level', 'message', 'source', 'ip_address', 'user__username'
+    )
+    listing = SystemLogAdminListing(request)
+    page = listing.paginate_queryset(logs)
     data = []
     
-    for log in logs:
+    for log in page:
         data.append({
             'id': log.id,
             'timestamp': log.timestamp.isoformat(),
@@ -30,7 +60,7 @@ def admin_logs(request):
             'ip': log.ip_address
         })
     
-    return Response(data)
+    return listing.get_paginated_response(data)
 
 @api_view(['GET'])
 @permission_classes([IsAuthenticated])
@@ -62,20 +92,70 @@ def admin_system_metrics(request):
     if not (request.user.is_staff and request.user.is_superuser):
         return Response({'error': 'Permission denied'}, status=403)
     
-    # Get active users (logged in within last 24 hours)
-    yesterday = timezone.now() - timedelta(days=1)
-    active_users = User.objects.filter(last_login__gte=yesterday).count()
+    sampler.ensure_started()
+    point = sampler.latest() or {}
+    db_stats = database_stats()
     
-    # Return mock system metrics since psutil is not available
     return Response({
-        'cpu': 25,
-        'memory': 68,
-        'disk': 52,
-        'network': 15,
-        'uptime': '15d 8h 32m',
-        'activeUsers': active_users
+        'cpu': point.get('cpu', 0),
+        'memory': point.get('memory', 0),
+        'disk': point.get('disk', 0),
+        'network': point.get('network', 0),
+        'uptime': format_uptime(point.get('uptimeSeconds')),
+        'activeUsers': db_stats['activeUsers'],
+        'requestRate': point.get('requestRate', 0),
+        'workerRssMb': point.get('rssMb', 0),
+        'workersRssMb': point.get('workersRssMb', {}),
+        'dbConnections': db_stats['dbConnections'],
+        'sampledAt': point.get('timestamp'),
+        'series': sampler.series(),
+        'logSink': log_sink.stats(),
     })
 
+def database_stats():
+    """Active users and open DB connections, cached so polling stays cheap"""
+    stats = cache.get(DATABASE_STATS_CACHE_KEY)
+    if stats is None:
+        yesterday = timezone.now() - timedelta(days=1)
+        stats = {
+            'activeUsers': User.objects.filter(last_login__gte=yesterday).count(),
+            'dbConnections': None,
+        }
+        if connection.vendor == 'postgresql':
+            with connection.cursor() as cursor:
+                cursor.execute('SELECT count(*) FROM pg_stat_activity WHERE datname = current_database()')
+                stats['dbConnections'] = cursor.fetchone()[0]
+        cache.set(DATABASE_STATS_CACHE_KEY, stats, DATABASE_STATS_TTL)
+    return stats
+
+@api_view(['GET', 'DELETE'])
+@permission_classes([IsAuthenticated])
+def admin_profiling(request):
+    if not (request.user.is_staff and request.user.is_superuser):
+        return Response({'error': 'Permission denied'}, status=403)
+    
+    if request.method == 'DELETE':
+        profile_registry.reset()
+        return Response({'message': 'Profiling data reset'})
+    
+    data = profile_registry.snapshot()
+    data['enabled'] = settings.REQUEST_PROFILING_ENABLED
+    data['pid'] = os.getpid()
+    return Response(data)
+
+@api_view(['GET'])
+@permission_classes([AllowAny])
+def prometheus_metrics(request):
+    # Scrapers authenticate with a bearer token; superusers can view it directly
+    token = settings.PROMETHEUS_METRICS_TOKEN
+    header = request.META.get('HTTP_AUTHORIZATION', '')
+    token_ok = bool(token) and constant_time_compare(header, f'Bearer {token}')
+    user = request.user
+    if not (token_ok or (user.is_authenticated and user.is_staff and user.is_superuser)):
+        return Response({'error': 'Permission denied'}, status=403)
+    
+    return HttpResponse(profile_registry.prometheus(), content_type='text/plain; version=0.0.4; charset=utf-8')
+
 @api_view(['GET', 'POST'])
 @permission_classes([IsAuthenticated])
 def admin_settings(request):
@@ -83,44 +163,14 @@ def admin_settings(request):
         return Response({'error': 'Permission denied'}, status=403)
     
     if request.method == 'GET':
-        settings = SystemSettings.objects.all()
-        data = {}
-        for setting in settings:
-            data[setting.key] = setting.value
-        
-        # Default settings if none exist
-        defaults = {
-            'siteName': 'Sales & Offers',
-            'siteDescription': 'Your trusted marketplace for amazing deals and offers',
-            'adminEmail': 'admin@salesandoffers.com',
-            'supportEmail': 'support@salesandoffers.com',
-            'maintenanceMode': 'false',
-            'userRegistration': 'true',
-            'emailVerification': 'true',
-            'newsletterEnabled': 'true',
-            'maxFileSize': '10',
-            'sessionTimeout': '30',
-            'backupFrequency': 'daily',
-            'logLevel': 'info'
-        }
-        
-        for key, default_value in defaults.items():
-            if key not in data:
-                data[key] = default_value
-        
-        return Response(data)
+        return Response(settings_registry.all())
     
     elif request.method == 'POST':
-        for key, value in request.data.items():
-            setting, created = SystemSettings.objects.get_or_create(
-                key=key,
-                defaults={'value': str(value), 'updated_by': request.user}
-            )
-            if not created:
-                setting.value = str(value)
-                setting.updated_by = request.user
-                setting.save()
+        values, errors = settings_registry.validate(request.data)
+        if errors:
+            return Response({'error': 'Invalid settings', 'fields': errors}, status=400)
         
+        settings_registry.update(values, user=request.user)
         return Response({'message': 'Settings updated successfully'})
 
 @api_view(['GET', 'POST'])
@@ -130,7 +180,8 @@ def admin_reports(request):
         return Response({'error': 'Permission denied'}, status=403)
     
     if request.method == 'GET':
-        reports = Report.objects.all()[:10]
+        expire_stale_reports()
+        reports = Report.objects.select_related('created_by')[:10]
         data = []
         
         for report in reports:
@@ -141,69 +192,89 @@ def admin_reports(request):
                 'date_range': report.date_range,
                 'file_size': report.file_size,
                 'format': report.format,
+                'status': report.status,
+                'row_count': report.row_count,
                 'created_at': report.created_at.isoformat(),
-                'created_by': report.created_by.username
+                'created_by': report.created_by.username,
+                'download_url': f"/api/admin/reports/{report.id}/download/" if report.status == 'ready' else None
             })
         
         return Response(data)
     
     elif request.method == 'POST':
         report_type = request.data.get('report_type')
-        date_range = request.data.get('date_range')
-        format_type = request.data.get('format', 'PDF')
+        date_range = request.data.get('date_range') or 'all'
+        format_type = normalize_format(request.data.get('format'))
         
-        # Generate report data based on type
-        if report_type == 'revenue':
-            total_revenue = Payment.objects.filter(status='completed').aggregate(
-                total=Sum('amount')
-            )['total'] or 0
-            data = f"Revenue Report - Total: KES {total_revenue}"
-        elif report_type == 'users':
-            user_count = User.objects.count()
-            data = f"User Activity Report - Total Users: {user_count}"
-        elif report_type == 'deals':
-            deal_count = Deal.objects.count()
-            active_deals = Deal.objects.filter(is_active=True).count()
-            data = f"Deals Performance - Total: {deal_count}, Active: {active_deals}"
-        elif report_type == 'sellers':
-            seller_count = Seller.objects.count()
-            data = f"Seller Analytics - Total Sellers: {seller_count}"
-        else:
-            data = "General Report"
+        if report_type not in REPORT_BUILDERS:
+            return Response({'error': f'Unknown report type: {report_type}'}, status=400)
         
         report = Report.objects.create(
             name=f"{report_type.title()} Report - {timezone.now().strftime('%Y-%m-%d')}",
             report_type=report_type,
             date_range=date_range,
-            file_path=f"/reports/{report_type}_{timezone.now().strftime('%Y%m%d')}.{format_type.lower()}",
-            file_size="2.4 MB",
+            file_path='',
+            file_size='',
             format=format_type,
             created_by=request.user
         )
+        enqueue_on_commit(generate_report, report.id)
         
         return Response({
-            'message': 'Report generated successfully',
+            'message': 'Report generation started',
             'report_id': report.id,
+            'status': report.status,
             'download_url': f"/api/admin/reports/{report.id}/download/"
-        })
+        }, status=202)
 
-# Helper function to create system logs
+@api_view(['GET'])
+@permission_classes([IsAuthenticated])
+def admin_report_download(request, report_id):
+    if not (request.user.is_staff and request.user.is_superuser):
+        return Response({'error': 'Permission denied'}, status=403)
+    
+    try:
+        report = Report.objects.get(id=report_id)
+    except Report.DoesNotExist:
+        return Response({'error': 'Report not found'}, status=404)
+    
+    if report.status != 'ready' or not os.path.exists(report.file_path):
+        return Response({'error': 'Report is not ready', 'status': report.status}, status=409)
+    
+    size = os.path.getsize(report.file_path)
+    byte_range = parse_byte_range(request.META.get('HTTP_RANGE', ''), size)
+    if byte_range is False:
+        response = HttpResponse(status=416)
+        response['Content-Range'] = f'bytes */{size}'
+        return response
+    
+    start, end = byte_range or (0, size - 1)
+    response = StreamingHttpResponse(
+        iter_file_range(report.file_path, start, end),
+        status=206 if byte_range else 200,
+        content_type=FORMATS[report.format][1]
+    )
+    response['Content-Length'] = str(end - start + 1)
+    response['Accept-Ranges'] = 'bytes'
+    response['Content-Disposition'] = f'attachment; filename="{os.path.basename(report.file_path)}"'
+    if byte_range:
+        response['Content-Range'] = f'bytes {start}-{end}/{size}'
+    return response
+
+# Helper function to create system logs; rows are written in batches by the log sink
 def create_system_log(level, message, source, user=None, ip_address=None):
-    SystemLog.objects.create(
-        level=level,
-        message=message,
-        source=source,
-        user=user,
-        ip_address=ip_address
+    audit_logger.log(
+        logging.getLevelName(level.upper()) if isinstance(level, str) else level,
+        message,
+        extra={'source': source, 'user_id': user.id if user else None, 'ip_address': ip_address}
     )
 
 # Helper function to create security events
 def create_security_event(event_type, user, ip_address, location, severity, details):
-    SecurityEvent.objects.create(
-        event_type=event_type,
-        user=user,
-        ip_address=ip_address,
-        location=location,
-        severity=severity,
-        details=details
-    )
\ No newline at end of file
+    audit_logger.warning(details, extra={
+        'security_event': event_type,
+        'user_id': user.id if user else None,
+        'ip_address': ip_address,
+        'location': location,
+        'severity': severity,
+    })
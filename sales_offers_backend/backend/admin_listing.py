@@ -0,0 +1,197 @@
+"""
+Shared machinery for admin list endpoints.
+
+An ``AdminListing`` subclass declares which query parameters filter which
+columns, which text columns ``search`` covers, the date column ``since`` /
+``until`` apply to, and the sort options. Pages are fetched by keyset over
+(sort column, id) so deep pages cost the same as the first, and the total is
+taken from the planner's row estimate on large PostgreSQL tables instead of
+a COUNT(*).
+
+Views use it like a DRF paginator::
+
+    listing = DealAdminListing(request)
+    page = listing.paginate_queryset(queryset)
+    return listing.get_paginated_response(DealSerializer(page, many=True).data)
+"""
+import base64
+import json
+from datetime import datetime, time, timedelta
+from django.core.exceptions import FieldError, ValidationError as DjangoValidationError
+from django.db import connection
+from django.db.models import Q
+from django.utils import timezone
+from django.utils.dateparse import parse_date, parse_datetime
+from rest_framework.exceptions import ValidationError
+from rest_framework.response import Response
+
+
+def _cursor_default(value):
+    # Full-precision isoformat; DjangoJSONEncoder truncates to milliseconds
+    return value.isoformat() if hasattr(value, 'isoformat') else str(value)
+
+
+def encode_cursor(values, direction):
+    raw = json.dumps({'v': values, 'd': direction}, default=_cursor_default)
+    return base64.urlsafe_b64encode(raw.encode()).decode()
+
+
+def decode_cursor(value):
+    try:
+        data = json.loads(base64.urlsafe_b64decode(value.encode()).decode())
+        sort_value, pk = data['v']
+        return sort_value, pk, data['d']
+    except (ValueError, TypeError, KeyError):
+        raise ValidationError({'cursor': 'Invalid cursor'})
+
+
+def estimate_count(queryset, exact_threshold):
+    """
+    Row count for a filtered queryset. On PostgreSQL the planner estimate is
+    used once it is above ``exact_threshold``; small results are counted
+    exactly. Returns (count, is_estimate).
+    """
+    if connection.vendor != 'postgresql':
+        return queryset.count(), False
+    sql, params = queryset.order_by().values('pk').query.sql_with_params()
+    with connection.cursor() as cursor:
+        cursor.execute(f'EXPLAIN (FORMAT JSON) {sql}', params)
+        plan = cursor.fetchone()[0]
+    if isinstance(plan, str):
+        plan = json.loads(plan)
+    estimate = int(plan[0]['Plan']['Plan Rows'])
+    if estimate < exact_threshold:
+        return queryset.count(), False
+    return estimate, True
+
+
+class AdminListing:
+    filter_fields = {}
+    search_fields = ()
+    date_field = 'created_at'
+    sort_fields = {'created': 'created_at'}
+    default_sort = '-created'
+    default_limit = 50
+    max_limit = 200
+    exact_count_threshold = 10000
+
+    def __init__(self, request):
+        self.request = request
+        self.params = request.query_params
+
+    def get_limit(self):
+        try:
+            limit = int(self.params.get('limit', self.default_limit))
+        except ValueError:
+            limit = self.default_limit
+        return max(1, min(limit, self.max_limit))
+
+    def get_sort(self):
+        sort = self.params.get('sort', self.default_sort)
+        descending = sort.startswith('-')
+        field = self.sort_fields.get(sort.lstrip('-'))
+        if field is None:
+            raise ValidationError({'sort': f"Choose one of: {', '.join(sorted(self.sort_fields))}"})
+        return field, descending
+
+    def parse_date_param(self, name, end_of_day=False):
+        value = self.params.get(name)
+        if not value:
+            return None
+        try:
+            parsed = parse_datetime(value)
+            if parsed is None:
+                day = parse_date(value)
+                if day is None:
+                    raise ValueError
+                # Whole days become half-open datetime bounds so the column index is used
+                parsed = datetime.combine(day + timedelta(days=1) if end_of_day else day, time.min)
+        except ValueError:
+            raise ValidationError({name: 'Use YYYY-MM-DD or an ISO 8601 datetime'})
+        if timezone.is_naive(parsed):
+            parsed = timezone.make_aware(parsed)
+        return parsed
+
+    def filter_queryset(self, queryset):
+        filters = {}
+        for param, lookup in self.filter_fields.items():
+            value = self.params.get(param)
+            if value in (None, '', 'all'):
+                continue
+            if value.lower() in ('true', 'false'):
+                value = value.lower() == 'true'
+            filters[lookup] = value
+
+        since = self.parse_date_param('since')
+        until = self.parse_date_param('until', end_of_day=True)
+        if since:
+            filters[f'{self.date_field}__gte'] = since
+        if until:
+            filters[f'{self.date_field}__lt'] = until
+
+        try:
+            queryset = queryset.filter(**filters)
+        except (ValueError, DjangoValidationError, FieldError) as exc:
+            raise ValidationError({'filters': str(exc)})
+
+        search = self.params.get('search', '').strip()
+        if search:
+            queryset = queryset.filter(self.get_search_filter(search))
+        return queryset
+
+    def get_search_filter(self, search):
+        condition = Q()
+        for field in self.search_fields:
+            condition |= Q(**{f'{field}__icontains': search})
+        return condition
+
+    def paginate_queryset(self, queryset):
+        queryset = self.filter_queryset(queryset)
+        self.total, self.total_is_estimate = estimate_count(queryset, self.exact_count_threshold)
+        self.limit = self.get_limit()
+        field, descending = self.get_sort()
+        self.sort_field = field
+
+        direction = 'next'
+        cursor = self.params.get('cursor')
+        if cursor:
+            value, pk, direction = decode_cursor(cursor)
+            # Walking backwards flips the comparison and the ordering, then the page is reversed
+            after = descending if direction == 'next' else not descending
+            op = 'lt' if after else 'gt'
+            try:
+                queryset = queryset.filter(
+                    Q(**{f'{field}__{op}': value}) | Q(**{field: value, f'pk__{op}': pk})
+                )
+            except (ValueError, DjangoValidationError):
+                raise ValidationError({'cursor': 'Invalid cursor'})
+
+        reverse = direction == 'prev'
+        ordering_desc = descending != reverse
+        prefix = '-' if ordering_desc else ''
+        page = list(queryset.order_by(f'{prefix}{field}', f'{prefix}pk')[:self.limit + 1])
+        has_more = len(page) > self.limit
+        page = page[:self.limit]
+        if reverse:
+            page.reverse()
+
+        self.has_next = has_more if not reverse else True
+        self.has_previous = bool(cursor) if not reverse else has_more
+        self.page = page
+        return page
+
+    def cursor_for(self, obj, direction):
+        value = obj
+        for part in self.sort_field.split('__'):
+            value = getattr(value, part)
+        return encode_cursor([value, obj.pk], direction)
+
+    def get_paginated_response(self, data):
+        return Response({
+            'results': data,
+            'next': self.cursor_for(self.page[-1], 'next') if self.page and self.has_next else None,
+            'previous': self.cursor_for(self.page[0], 'prev') if self.page and self.has_previous else None,
+            'total': self.total,
+            'total_is_estimate': self.total_is_estimate,
+            'limit': self.limit,
+        })
@@ -0,0 +1,112 @@
+"""
+Background work that should not hold up a request.
+
+Callers hand work to ``enqueue_on_commit`` so nothing runs until the
+surrounding transaction has committed. The queue implementation is picked by
+the BACKGROUND_TASK_QUEUE setting: ``LocalTaskQueue`` runs tasks on a daemon
+thread inside the web process, and ``ImmediateTaskQueue`` runs them inline,
+which is what tests and management commands want. Anything exposing the same
+``enqueue`` signature (e.g. a wrapper around an external broker) can be
+plugged in instead.
+"""
+import logging
+import queue
+import threading
+from django.conf import settings
+from django.db import close_old_connections, transaction
+from django.utils.module_loading import import_string
+
+logger = logging.getLogger(__name__)
+
+
+class ImmediateTaskQueue:
+    """Runs each task synchronously in the caller's thread"""
+
+    def enqueue(self, func, *args, dedupe_key=None, **kwargs):
+        try:
+            func(*args, **kwargs)
+        except Exception:
+            logger.exception('Background task %s failed', getattr(func, '__name__', func))
+
+
+class LocalTaskQueue:
+    """
+    In-process worker thread fed by a bounded queue.
+
+    Tasks enqueued with a ``dedupe_key`` that is already waiting are dropped,
+    so bursts of identical work (e.g. several messages in one conversation)
+    collapse into a single run. Tasks are expected to read current state
+    when they execute rather than rely on stale arguments.
+    """
+
+    def __init__(self, maxsize=10000):
+        self._queue = queue.Queue(maxsize=maxsize)
+        self._pending_keys = set()
+        self._lock = threading.Lock()
+        self._thread = None
+        self.dropped = 0
+
+    def _ensure_worker(self):
+        if self._thread is None or not self._thread.is_alive():
+            with self._lock:
+                if self._thread is None or not self._thread.is_alive():
+                    self._thread = threading.Thread(target=self._run, name='background-tasks', daemon=True)
+                    self._thread.start()
+
+    def enqueue(self, func, *args, dedupe_key=None, **kwargs):
+        if dedupe_key is not None:
+            with self._lock:
+                if dedupe_key in self._pending_keys:
+                    return
+                self._pending_keys.add(dedupe_key)
+        try:
+            self._queue.put_nowait((func, args, kwargs, dedupe_key))
+        except queue.Full:
+            self.dropped += 1
+            if dedupe_key is not None:
+                with self._lock:
+                    self._pending_keys.discard(dedupe_key)
+            logger.warning('Background task queue full, dropped %s', getattr(func, '__name__', func))
+            return
+        self._ensure_worker()
+
+    def _run(self):
+        while True:
+            func, args, kwargs, dedupe_key = self._queue.get()
+            if dedupe_key is not None:
+                with self._lock:
+                    self._pending_keys.discard(dedupe_key)
+            close_old_connections()
+            try:
+                func(*args, **kwargs)
+            except Exception:
+                logger.exception('Background task %s failed', getattr(func, '__name__', func))
+            finally:
+                close_old_connections()
+                self._queue.task_done()
+
+    def join(self):
+        """Block until every queued task has run"""
+        self._queue.join()
+
+
+_queues = {}
+_queues_lock = threading.Lock()
+
+
+def get_task_queue():
+    path = getattr(settings, 'BACKGROUND_TASK_QUEUE', 'backend.background.LocalTaskQueue')
+    if path not in _queues:
+        with _queues_lock:
+            if path not in _queues:
+                _queues[path] = import_string(path)()
+    return _queues[path]
+
+
+def enqueue(func, *args, dedupe_key=None, **kwargs):
+    get_task_queue().enqueue(func, *args, dedupe_key=dedupe_key, **kwargs)
+
+
+def enqueue_on_commit(func, *args, dedupe_key=None, **kwargs):
+    """Queue a task once the current transaction commits (immediately outside one)"""
+    transaction.on_commit(lambda: enqueue(func, *args, dedupe_key=dedupe_key, **kwargs))
@@ -0,0 +1,72 @@
+"""
+Conditional GET for public read endpoints.
+
+``conditional_get('deals', 'sellers')`` wraps a view so that GET and HEAD
+requests get an ETag and Last-Modified derived from the content version
+stamps of those names (see backend/content_versions.py) plus everything else
+the response depends on: the full path with its query string, the Accept
+header and the caller's credentials. A request whose If-None-Match or
+If-Modified-Since still matches is answered 304 before the view runs, at the
+cost of the one stamp lookup, so the view's queries and serialization are
+skipped. Successful responses carry Cache-Control
+with ``stale-while-revalidate`` so browsers and CDNs can absorb repeats;
+responses for signed-in callers are marked private.
+
+Endpoints whose output also changes with the clock (e.g. filters on "now")
+pass ``refresh_every`` seconds so their stamps roll over on that period.
+"""
+import hashlib
+import time
+from functools import wraps
+from django.conf import settings
+from django.utils.cache import get_conditional_response, patch_vary_headers
+from django.utils.http import http_date
+from . import content_versions
+
+# Cache lifetimes for public responses; override via environment in settings.py
+MAX_AGE = getattr(settings, 'PUBLIC_CACHE_MAX_AGE', 60)
+STALE_WHILE_REVALIDATE = getattr(settings, 'PUBLIC_CACHE_STALE_WHILE_REVALIDATE', 300)
+
+
+def credentials(request):
+    return request.META.get('HTTP_AUTHORIZATION', '') or request.COOKIES.get(settings.SESSION_COOKIE_NAME, '')
+
+
+def compute_validators(request, names, refresh_every=None):
+    """(etag, last_modified timestamp) for a request against the named stamps"""
+    stamps = content_versions.get_stamps(*names)
+    last_modified = max(bumped_at for token, bumped_at in stamps.values())
+    parts = [f'{name}={stamps[name][0]}' for name in sorted(stamps)]
+    if refresh_every:
+        period = int(time.time() // refresh_every)
+        parts.append(f'period={period}')
+        last_modified = max(last_modified, period * refresh_every)
+    parts += [request.get_full_path(), request.META.get('HTTP_ACCEPT', ''), credentials(request)]
+    digest = hashlib.sha256('\n'.join(parts).encode()).hexdigest()[:32]
+    return f'"{digest}"', int(last_modified)
+
+
+def set_cache_headers(response, request, etag, last_modified):
+    response['ETag'] = etag
+    response['Last-Modified'] = http_date(last_modified)
+    scope = 'private' if credentials(request) else 'public'
+    response['Cache-Control'] = f'{scope}, max-age={MAX_AGE}, stale-while-revalidate={STALE_WHILE_REVALIDATE}'
+    patch_vary_headers(response, ('Accept', 'Authorization', 'Cookie'))
+    return response
+
+
+def conditional_get(*names, refresh_every=None):
+    def decorator(view):
+        @wraps(view)
+        def wrapped(request, *args, **kwargs):
+            if request.method not in ('GET', 'HEAD'):
+                return view(request, *args, **kwargs)
+            etag, last_modified = compute_validators(request, names, refresh_every)
+            response = get_conditional_response(request, etag=etag, last_modified=last_modified)
+            if response is None:
+                response = view(request, *args, **kwargs)
+            if response.status_code not in (200, 304):
+                return response
+            return set_cache_headers(response, request, etag, last_modified)
+        return wrapped
+    return decorator
@@ -0,0 +1,78 @@
+"""
+Version stamps for public read data.
+
+Each name ('deals', 'sellers', 'featured', ...) maps to a (token, bumped_at)
+stamp that is replaced whenever data behind that name changes, so anything
+derived from the data, such as the ETags in backend/conditional.py, can be
+keyed on the stamp instead of re-reading it. Model signals bump the names of
+their app; writes that skip signals, such as bulk ``update()`` calls, bump
+the names they touched themselves.
+
+Stamps live in ContentVersion rows rather than the cache: web workers, cron
+commands and admin shells all run as separate processes, and the default
+cache is per process, so a bump there never reached the workers serving the
+ETags. A bump is applied once the writer's transaction commits, never inside
+it: an UPDATE there would hold the hot stamp row locked until the end of the
+transaction and serialize every writer of the same name. Applied after the
+commit, each bump is a short autocommit UPDATE, and a rollback drops it
+with the data. Readers take the stamp before the data, so between the commit
+and the bump they can only pair new data with the old stamp, which the bump
+then retires; they never pair old data with the new stamp.
+
+Tokens are random rather than counters so a recreated table can never hand
+out an old value again; a missing stamp is simply minted afresh.
+"""
+import uuid
+from functools import partial
+from django.db import transaction
+from django.utils import timezone
+from admin_system.models import ContentVersion
+
+
+def new_token():
+    return uuid.uuid4().hex
+
+
+def mint(names):
+    """Create stamps for names that have none; another process may win the race, which is fine"""
+    now = timezone.now()
+    ContentVersion.objects.bulk_create(
+        [ContentVersion(name=name, token=new_token(), bumped_at=now) for name in names],
+        ignore_conflicts=True,
+    )
+
+
+def get_stamps(*names):
+    """Current (token, bumped_at timestamp) per name, minting any that are missing"""
+    def read():
+        return {
+            name: (token, bumped_at.timestamp())
+            for name, token, bumped_at in ContentVersion.objects.filter(name__in=names).values_list('name', 'token', 'bumped_at')
+        }
+
+    stamps = read()
+    missing = [name for name in names if name not in stamps]
+    if missing:
+        mint(missing)
+        stamps = read()
+    return stamps
+
+
+def get_versions(*names):
+    return {name: token for name, (token, bumped_at) in get_stamps(*names).items()}
+
+
+def bump(*names):
+    """Replace the stamps once the current transaction commits (or right away in autocommit)"""
+    transaction.on_commit(partial(apply, names))
+
+
+def apply(names):
+    names = set(names)
+    if not names:
+        return
+    stamps = ContentVersion.objects.filter(name__in=names)
+    if stamps.update(token=new_token(), bumped_at=timezone.now()) < len(names):
+        mint(names)
+        # A reader may have minted a row between the two statements; make sure it carries this bump
+        stamps.update(token=new_token(), bumped_at=timezone.now())
@@ -49,12 +49,14 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    'admin_system.profiling.RequestProfilingMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'corsheaders.middleware.CorsMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
     'django.contrib.auth.middleware.AuthenticationMiddleware',
+    'admin_system.settings_registry.MaintenanceModeMiddleware',
     'sellers.middleware.SubscriptionMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
@@ -195,7 +197,7 @@ CSRF_TRUSTED_ORIGINS = [
 # REST Framework Settings
 REST_FRAMEWORK = {
     'DEFAULT_AUTHENTICATION_CLASSES': [
-        'rest_framework.authentication.TokenAuthentication',
+        'accounts.authentication.CachingTokenAuthentication',
         'rest_framework.authentication.SessionAuthentication',
     ],
     'DEFAULT_PERMISSION_CLASSES': [
@@ -203,6 +205,16 @@ REST_FRAMEWORK = {
     ],
 }
 
+# Token auth snapshot cache (see accounts/authentication.py)
+TOKEN_AUTH_CACHE_SIZE = int(os.environ.get('TOKEN_AUTH_CACHE_SIZE', '10000'))
+TOKEN_AUTH_CACHE_TTL = int(os.environ.get('TOKEN_AUTH_CACHE_TTL', '60'))
+# Seconds between checks of the shared auth version; 0 checks on every request
+TOKEN_AUTH_VERSION_CHECK_INTERVAL = float(os.environ.get('TOKEN_AUTH_VERSION_CHECK_INTERVAL', '1'))
+
+# Cache-Control lifetimes for conditional public endpoints (see backend/conditional.py)
+PUBLIC_CACHE_MAX_AGE = int(os.environ.get('PUBLIC_CACHE_MAX_AGE', '60'))
+PUBLIC_CACHE_STALE_WHILE_REVALIDATE = int(os.environ.get('PUBLIC_CACHE_STALE_WHILE_REVALIDATE', '300'))
+
 # Session Settings - 3 hours expiry
 SESSION_COOKIE_AGE = 10800  # 3 hours in seconds
 SESSION_EXPIRE_AT_BROWSER_CLOSE = False
@@ -229,3 +241,57 @@ FRONTEND_URL = os.environ.get('FRONTEND_URL', 'http://localhost:3000')
 
 AUTH_USER_MODEL = 'accounts.User'
 
+
+# Background task queue used for post-commit side effects (see backend/background.py)
+BACKGROUND_TASK_QUEUE = os.environ.get('BACKGROUND_TASK_QUEUE', 'backend.background.LocalTaskQueue')
+
+# Message attachment blob storage used by the expiry sweeper (see messaging/storage.py)
+MESSAGE_ATTACHMENT_STORAGE = os.environ.get('MESSAGE_ATTACHMENT_STORAGE', 'messaging.storage.VercelBlobStorage')
+MESSAGE_ATTACHMENT_LOCAL_ROOT = os.environ.get('MESSAGE_ATTACHMENT_LOCAL_ROOT', os.path.join(BASE_DIR, 'attachments'))
+# Hostname of this app's Vercel Blob store, e.g. abc123.public.blob.vercel-storage.com; empty accepts any store
+MESSAGE_ATTACHMENT_BLOB_HOST = os.environ.get('MESSAGE_ATTACHMENT_BLOB_HOST', '')
+
+# Opt-in request profiling (see admin_system/profiling.py)
+REQUEST_PROFILING_ENABLED = os.environ.get('REQUEST_PROFILING_ENABLED', 'False').lower() == 'true'
+REQUEST_PROFILING_SLOW_MS = int(os.environ.get('REQUEST_PROFILING_SLOW_MS', '500'))
+REQUEST_PROFILING_SLOW_SAMPLE_RATE = float(os.environ.get('REQUEST_PROFILING_SLOW_SAMPLE_RATE', '0.1'))
+# Bearer token a Prometheus scraper can use instead of a superuser session
+PROMETHEUS_METRICS_TOKEN = os.environ.get('PROMETHEUS_METRICS_TOKEN', '')
+
+# Host metrics sampler for the admin system page (see admin_system/host_metrics.py)
+HOST_METRICS_INTERVAL = int(os.environ.get('HOST_METRICS_INTERVAL', '5'))
+HOST_METRICS_HISTORY = int(os.environ.get('HOST_METRICS_HISTORY', '120'))
+
+# Generated admin report files (see admin_system/reports.py)
+REPORTS_ROOT = os.environ.get('REPORTS_ROOT', os.path.join(BASE_DIR, 'reports'))
+
+# Resets process-wide snapshots between tests (see backend/test_runner.py)
+TEST_RUNNER = 'backend.test_runner.TestRunner'
+
+# Process-cached SystemSettings (see admin_system/settings_registry.py)
+SYSTEM_SETTINGS_CHECK_INTERVAL = float(os.environ.get('SYSTEM_SETTINGS_CHECK_INTERVAL', '5'))
+# Paths still served while maintenance mode is on
+MAINTENANCE_EXEMPT_PATHS = ('/admin/', '/api/admin/', '/api/accounts/login/')
+
+# Batched SystemLog / SecurityEvent writer (see admin_system/log_sink.py)
+SYSTEM_LOG_SINK_ENABLED = os.environ.get('SYSTEM_LOG_SINK_ENABLED', 'True').lower() == 'true'
+SYSTEM_LOG_QUEUE_SIZE = int(os.environ.get('SYSTEM_LOG_QUEUE_SIZE', '10000'))
+SYSTEM_LOG_BATCH_SIZE = int(os.environ.get('SYSTEM_LOG_BATCH_SIZE', '200'))
+SYSTEM_LOG_RETENTION_DAYS = int(os.environ.get('SYSTEM_LOG_RETENTION_DAYS', '30'))
+SECURITY_EVENT_RETENTION_DAYS = int(os.environ.get('SECURITY_EVENT_RETENTION_DAYS', '180'))
+
+LOGGING = {
+    'version': 1,
+    'disable_existing_loggers': False,
+    'handlers': {
+        'console': {'class': 'logging.StreamHandler'},
+        'system_log': {'class': 'admin_system.log_sink.DatabaseLogHandler'},
+    },
+    # App modules log through getLogger(__name__), so the sink hangs off the root logger
+    'root': {'handlers': ['console', 'system_log'], 'level': 'INFO'},
+    'loggers': {
+        # Keep Django's INFO chatter and 4xx warnings out of the admin logs
+        'django': {'level': 'WARNING'},
+        'django.request': {'level': 'ERROR'},
+    },
+}
@@ -0,0 +1,37 @@
+"""
+Test runner that resets process-wide state before every test.
+
+Several modules keep per-process snapshots (e.g. the SystemSettings registry)
+that would otherwise carry one test's data into the next and make query
+counts depend on test order. The reset happens in the result's startTest, so
+no test case has to remember to do it.
+
+The SystemLog sink is closed for the whole run: the root logger would
+otherwise write every INFO record from the code under test into the test
+database from a background thread.
+"""
+import unittest
+from django.test.runner import DiscoverRunner
+
+
+def reset_process_state():
+    from admin_system.settings_registry import registry as settings_registry
+    # Each test starts from an empty SystemSettings table, i.e. the defaults
+    settings_registry.reset()
+
+
+class ResettingTestResultMixin:
+    def startTest(self, test):
+        reset_process_state()
+        super().startTest(test)
+
+
+class TestRunner(DiscoverRunner):
+    def setup_test_environment(self, **kwargs):
+        from admin_system.log_sink import sink
+        sink.close()
+        super().setup_test_environment(**kwargs)
+
+    def get_resultclass(self):
+        base = super().get_resultclass() or unittest.TextTestResult
+        return type(f'Resetting{base.__name__}', (ResettingTestResultMixin, base), {})
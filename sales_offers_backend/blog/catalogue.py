@@ -0,0 +1,33 @@
+from django.core.cache import cache
+from django.db.models import Count, Prefetch, Q
+from backend import content_versions
+from .models import BlogCategory, BlogSubcategory
+from .serializers import BlogCategoryWithSubsSerializer
+
+# A stamp of its own, so likes and comments (which bump 'blog') keep the catalogue cached
+CATALOGUE_VERSION_NAME = 'blog_catalogue'
+CATALOGUE_CACHE_TIMEOUT = 60 * 60
+
+
+def build_category_catalogue():
+    """Serialize every category with its subcategories using one annotated query per level"""
+    published = Count('posts', filter=Q(posts__is_published=True))
+    subcategories = BlogSubcategory.objects.annotate(published_posts_count=published).order_by('name')
+    categories = BlogCategory.objects.annotate(published_posts_count=published).prefetch_related(
+        Prefetch('subcategories', queryset=subcategories)
+    )
+    return BlogCategoryWithSubsSerializer(categories, many=True).data
+
+
+def get_category_catalogue():
+    # Keyed on a database stamp, so a change made by any process retires every process's copy
+    key = f'blog:category_catalogue:{content_versions.get_versions(CATALOGUE_VERSION_NAME)[CATALOGUE_VERSION_NAME]}'
+    catalogue = cache.get(key)
+    if catalogue is None:
+        catalogue = build_category_catalogue()
+        cache.set(key, catalogue, CATALOGUE_CACHE_TIMEOUT)
+    return catalogue
+
+
+def invalidate_category_catalogue():
+    content_versions.bump(CATALOGUE_VERSION_NAME)
@@ -0,0 +1,31 @@
+from django.core.management.base import BaseCommand
+from blog.models import BlogPost
+
+class Command(BaseCommand):
+    help = 'Backfill word_count, reading_time and excerpt on existing blog posts'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=500)
+
+    def handle(self, *args, **options):
+        batch_size = options['batch_size']
+        fields = ['word_count', 'reading_time', 'excerpt']
+        batch = []
+        updated = 0
+
+        posts = BlogPost.objects.only('id', 'content', *fields).order_by('pk')
+        for post in posts.iterator(chunk_size=batch_size):
+            post.update_text_stats()
+            batch.append(post)
+            if len(batch) >= batch_size:
+                BlogPost.objects.bulk_update(batch, fields)
+                updated += len(batch)
+                batch = []
+
+        if batch:
+            BlogPost.objects.bulk_update(batch, fields)
+            updated += len(batch)
+
+        self.stdout.write(
+            self.style.SUCCESS(f'Successfully backfilled text stats for {updated} blog posts')
+        )
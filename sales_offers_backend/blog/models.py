@@ -1,6 +1,11 @@
+from html import unescape
 from django.db import models
 from django.conf import settings
-from django.utils.text import slugify
+from django.utils.html import strip_tags
+from django.utils.text import slugify, Truncator
+
+WORDS_PER_MINUTE = 200
+EXCERPT_LENGTH = 300
 
 class BlogCategory(models.Model):
     name = models.CharField(max_length=100, unique=True)
@@ -51,6 +56,10 @@ class BlogPost(models.Model):
     category = models.ForeignKey(BlogCategory, on_delete=models.SET_NULL, null=True, blank=True, related_name='posts')
     subcategory = models.ForeignKey(BlogSubcategory, on_delete=models.SET_NULL, null=True, blank=True, related_name='posts')
     views_count = models.PositiveIntegerField(default=0)
+    # Derived from content on save so list pages never touch the full body
+    word_count = models.PositiveIntegerField(default=0)
+    reading_time = models.PositiveIntegerField(default=1)
+    excerpt = models.TextField(blank=True)
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
     is_published = models.BooleanField(default=True)
@@ -58,7 +67,19 @@ class BlogPost(models.Model):
     class Meta:
         ordering = ['-created_at']
     
+    def update_text_stats(self):
+        """Recompute word_count, reading_time and excerpt from content"""
+        text = ' '.join(unescape(strip_tags(self.content or '')).split())
+        self.word_count = len(text.split())
+        self.reading_time = max(1, round(self.word_count / WORDS_PER_MINUTE))
+        self.excerpt = Truncator(text).chars(EXCERPT_LENGTH)
+    
     def save(self, *args, **kwargs):
+        update_fields = kwargs.get('update_fields')
+        if update_fields is None or 'content' in update_fields:
+            self.update_text_stats()
+            if update_fields is not None:
+                kwargs['update_fields'] = set(update_fields) | {'word_count', 'reading_time', 'excerpt'}
         if not self.slug:
             base_slug = slugify(self.title) or "post"
             slug_candidate = base_slug
@@ -2,6 +2,13 @@ from rest_framework import serializers
 from .models import BlogPost, BlogLike, BlogComment, BlogFollow, BlogCategory, BlogSubcategory
 from accounts.serializers import UserSerializer
 
+def published_posts_count(obj):
+    # Catalogue querysets annotate the count up front; fall back to a query otherwise
+    count = getattr(obj, 'published_posts_count', None)
+    if count is None:
+        count = obj.posts.filter(is_published=True).count()
+    return count
+
 class BlogCategorySerializer(serializers.ModelSerializer):
     posts_count = serializers.SerializerMethodField()
     
@@ -10,7 +17,7 @@ class BlogCategorySerializer(serializers.ModelSerializer):
         fields = ['id', 'name', 'slug', 'description', 'icon', 'color', 'posts_count']
     
     def get_posts_count(self, obj):
-        return obj.posts.filter(is_published=True).count()
+        return published_posts_count(obj)
 
 class BlogSubcategorySerializer(serializers.ModelSerializer):
     posts_count = serializers.SerializerMethodField()
@@ -20,7 +27,7 @@ class BlogSubcategorySerializer(serializers.ModelSerializer):
         fields = ['id', 'name', 'slug', 'description', 'posts_count']
     
     def get_posts_count(self, obj):
-        return obj.posts.filter(is_published=True).count()
+        return published_posts_count(obj)
 
 class BlogCategoryWithSubsSerializer(serializers.ModelSerializer):
     subcategories = BlogSubcategorySerializer(many=True, read_only=True)
@@ -31,7 +38,7 @@ class BlogCategoryWithSubsSerializer(serializers.ModelSerializer):
         fields = ['id', 'name', 'slug', 'description', 'icon', 'color', 'posts_count', 'subcategories']
     
     def get_posts_count(self, obj):
-        return obj.posts.filter(is_published=True).count()
+        return published_posts_count(obj)
 
 class BlogPostSerializer(serializers.ModelSerializer):
     author = UserSerializer(read_only=True)
@@ -42,13 +49,13 @@ class BlogPostSerializer(serializers.ModelSerializer):
     likes_count = serializers.SerializerMethodField()
     comments_count = serializers.SerializerMethodField()
     is_liked = serializers.SerializerMethodField()
-    reading_time = serializers.SerializerMethodField()
     
     class Meta:
         model = BlogPost
-        fields = ['id', 'title', 'slug', 'content', 'image', 'category', 'subcategory', 'category_id', 'subcategory_id', 
-                 'author', 'views_count', 'created_at', 'updated_at', 'likes_count', 'comments_count', 'is_liked', 'reading_time']
-        read_only_fields = ['slug', 'author', 'created_at', 'updated_at', 'views_count']
+        fields = ['id', 'title', 'slug', 'content', 'excerpt', 'image', 'category', 'subcategory', 'category_id', 'subcategory_id', 
+                 'author', 'views_count', 'created_at', 'updated_at', 'likes_count', 'comments_count', 'is_liked',
+                 'reading_time', 'word_count']
+        read_only_fields = ['slug', 'author', 'created_at', 'updated_at', 'views_count', 'excerpt', 'reading_time', 'word_count']
     
     def get_likes_count(self, obj):
         return obj.likes.count()
@@ -61,13 +68,12 @@ class BlogPostSerializer(serializers.ModelSerializer):
         if request and request.user.is_authenticated:
             return obj.likes.filter(user=request.user).exists()
         return False
+
+class BlogPostExcerptSerializer(BlogPostSerializer):
+    """List representation without the full content body"""
     
-    def get_reading_time(self, obj):
-        # Calculate reading time based on word count (200 words per minute)
-        import re
-        text_content = re.sub(r'<[^>]*>', '', obj.content)
-        word_count = len(text_content.split())
-        return max(1, round(word_count / 200))
+    class Meta(BlogPostSerializer.Meta):
+        fields = [f for f in BlogPostSerializer.Meta.fields if f != 'content']
 
 class BlogCommentSerializer(serializers.ModelSerializer):
     user = UserSerializer(read_only=True)
@@ -0,0 +1,39 @@
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import receiver
+from backend import content_versions
+from .models import BlogPost, BlogCategory, BlogSubcategory, BlogLike, BlogComment, BlogFollow
+from .catalogue import invalidate_category_catalogue
+
+CATALOGUE_FIELDS = {'is_published', 'category', 'subcategory'}
+
+@receiver(post_save, sender=BlogPost)
+@receiver(post_delete, sender=BlogPost)
+def invalidate_catalogue_on_post_change(sender, instance, **kwargs):
+    """Published post counts change when a post is created, deleted, (un)published or recategorized"""
+    update_fields = kwargs.get('update_fields')
+    if update_fields is not None and not CATALOGUE_FIELDS.intersection(update_fields):
+        return
+    invalidate_category_catalogue()
+
+@receiver(post_save, sender=BlogCategory)
+@receiver(post_delete, sender=BlogCategory)
+@receiver(post_save, sender=BlogSubcategory)
+@receiver(post_delete, sender=BlogSubcategory)
+def invalidate_catalogue_on_category_change(sender, instance, **kwargs):
+    invalidate_category_catalogue()
+
+@receiver(post_save, sender=BlogPost)
+@receiver(post_delete, sender=BlogPost)
+@receiver(post_save, sender=BlogCategory)
+@receiver(post_delete, sender=BlogCategory)
+@receiver(post_save, sender=BlogSubcategory)
+@receiver(post_delete, sender=BlogSubcategory)
+@receiver(post_save, sender=BlogLike)
+@receiver(post_delete, sender=BlogLike)
+@receiver(post_save, sender=BlogComment)
+@receiver(post_delete, sender=BlogComment)
+@receiver(post_save, sender=BlogFollow)
+@receiver(post_delete, sender=BlogFollow)
+def bump_blog_version(sender, instance, **kwargs):
+    """Post listings carry like and comment counts, so those change the stamp too"""
+    content_versions.bump('blog')
@@ -3,7 +3,8 @@ from django.urls import reverse
 from rest_framework.test import APITestCase
 from rest_framework import status
 from django.contrib.auth import get_user_model
-from .models import BlogPost, BlogLike, BlogComment
+from django.core.cache import cache
+from .models import BlogPost, BlogLike, BlogComment, BlogCategory, BlogSubcategory
 from sellers.models import Seller, SubscriptionPlan, Subscription
 
 User = get_user_model()
@@ -286,4 +287,89 @@ class BlogModelTestCase(TestCase):
         
         posts = list(BlogPost.objects.all())
         self.assertEqual(posts[0], post2)  # Most recent first
-        self.assertEqual(posts[1], post1)
\ No newline at end of file
+        self.assertEqual(posts[1], post1)
+
+class BlogPostTextStatsTestCase(APITestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(
+            username='statsuser',
+            email='stats@example.com',
+            password='testpass123'
+        )
+        
+    def test_text_stats_computed_on_save(self):
+        """Test word count, reading time and excerpt are stored on save"""
+        post = BlogPost.objects.create(
+            author=self.user,
+            title='Stats Post',
+            content='<p>Hello <strong>world</strong> &amp; friends</p>' + ' word' * 400
+        )
+        self.assertEqual(post.word_count, 404)
+        self.assertEqual(post.reading_time, 2)
+        self.assertTrue(post.excerpt.startswith('Hello world & friends word'))
+        self.assertNotIn('<', post.excerpt)
+        
+        post.content = 'Short'
+        post.save()
+        self.assertEqual(post.word_count, 1)
+        self.assertEqual(post.reading_time, 1)
+        self.assertEqual(post.excerpt, 'Short')
+        
+    def test_excerpt_mode_omits_content(self):
+        """Test list endpoint excerpt mode"""
+        BlogPost.objects.create(
+            author=self.user,
+            title='Excerpt Post',
+            content='Some long body text'
+        )
+        
+        response = self.client.get('/api/blog/posts/?excerpt=true')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertNotIn('content', response.data[0])
+        self.assertEqual(response.data[0]['excerpt'], 'Some long body text')
+        self.assertEqual(response.data[0]['reading_time'], 1)
+        
+        response = self.client.get('/api/blog/posts/')
+        self.assertIn('content', response.data[0])
+
+
+class BlogCategoryCatalogueTestCase(APITestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user(
+            username='catuser',
+            email='cat@example.com',
+            password='testpass123'
+        )
+        self.category = BlogCategory.objects.create(name='Technology')
+        self.subcategory = BlogSubcategory.objects.create(category=self.category, name='Gadgets')
+        BlogCategory.objects.create(name='Lifestyle')
+        
+    def test_catalogue_counts_and_cache(self):
+        """Test category sidebar counts are aggregated, cached and invalidated on publish"""
+        with self.captureOnCommitCallbacks(execute=True):
+            post = BlogPost.objects.create(
+                author=self.user,
+                title='Gadget Post',
+                content='Content',
+                category=self.category,
+                subcategory=self.subcategory
+            )
+        
+        # The version stamp, then one query per level
+        with self.assertNumQueries(3):
+            response = self.client.get('/api/blog/categories/')
+        technology = next(c for c in response.data if c['name'] == 'Technology')
+        self.assertEqual(technology['posts_count'], 1)
+        self.assertEqual(technology['subcategories'][0]['posts_count'], 1)
+        
+        with self.assertNumQueries(1):
+            self.client.get('/api/blog/categories/')
+        
+        post.is_published = False
+        with self.captureOnCommitCallbacks(execute=True):
+            post.save()
+        response = self.client.get('/api/blog/categories/')
+        technology = next(c for c in response.data if c['name'] == 'Technology')
+        self.assertEqual(technology['posts_count'], 0)
+        self.assertEqual(technology['subcategories'][0]['posts_count'], 0)
@@ -6,10 +6,40 @@ from django.db.models import Count, Q, F
 from django.utils import timezone
 from datetime import timedelta
 from .models import BlogPost, BlogLike, BlogComment, BlogFollow, BlogCategory, BlogSubcategory
-from .serializers import BlogPostSerializer, BlogCommentSerializer, BlogFollowSerializer, BlogCategoryWithSubsSerializer
+from .serializers import (
+    BlogPostSerializer, BlogPostExcerptSerializer, BlogCommentSerializer, BlogFollowSerializer
+)
+from .catalogue import get_category_catalogue
 from accounts.models import User
+from backend.conditional import conditional_get
+from django.utils.decorators import method_decorator
 
-class BlogPostListView(generics.ListCreateAPIView):
+class ExcerptModeMixin:
+    """
+    List views accept ?excerpt=true to skip the content column entirely and
+    return the precomputed excerpt instead.
+    """
+    
+    def is_excerpt_mode(self):
+        return (
+            self.request.method == 'GET'
+            and self.request.query_params.get('excerpt', '').lower() in ('1', 'true', 'yes')
+        )
+    
+    def get_serializer_class(self):
+        if self.is_excerpt_mode():
+            return BlogPostExcerptSerializer
+        return super().get_serializer_class()
+    
+    def filter_queryset(self, queryset):
+        queryset = super().filter_queryset(queryset)
+        if self.is_excerpt_mode():
+            queryset = queryset.defer('content')
+        return queryset
+
+# Refreshed hourly as well, since the trending sort looks at the last seven days
+@method_decorator(conditional_get('blog', refresh_every=3600), name='dispatch')
+class BlogPostListView(ExcerptModeMixin, generics.ListCreateAPIView):
     serializer_class = BlogPostSerializer
     permission_classes = [IsAuthenticatedOrReadOnly]
     
@@ -87,7 +117,7 @@ class BlogPostDetailView(generics.RetrieveUpdateDestroyAPIView):
         serializer = self.get_serializer(instance)
         return Response(serializer.data)
 
-class UserBlogPostsView(generics.ListAPIView):
+class UserBlogPostsView(ExcerptModeMixin, generics.ListAPIView):
     serializer_class = BlogPostSerializer
     
     def get_queryset(self):
@@ -231,11 +261,9 @@ def user_stats(request, user_id):
 
 @api_view(['GET'])
 def categories_list(request):
-    categories = BlogCategory.objects.prefetch_related('subcategories')
-    serializer = BlogCategoryWithSubsSerializer(categories, many=True)
-    return Response(serializer.data)
+    return Response(get_category_catalogue())
 
-class RecommendedPostsView(generics.ListAPIView):
+class RecommendedPostsView(ExcerptModeMixin, generics.ListAPIView):
     serializer_class = BlogPostSerializer
     
     def get_queryset(self):
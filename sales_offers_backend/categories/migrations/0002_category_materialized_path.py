@@ -0,0 +1,51 @@
+# Generated by Django 5.1.5 on 2026-10-19 11:57
+
+from django.db import migrations, models
+
+
+def populate_paths(apps, schema_editor):
+    Category = apps.get_model('categories', 'Category')
+    nodes = {}
+    pending = list(Category.objects.order_by('level', 'id'))
+    # Parents are resolved before children regardless of stored level drift
+    while pending:
+        remaining = []
+        for category in pending:
+            if category.parent_id is None:
+                category.path = f"{category.pk:010d}/"
+                category.level = 0
+                category.full_name = category.name
+            elif category.parent_id in nodes:
+                parent = nodes[category.parent_id]
+                category.path = f"{parent.path}{category.pk:010d}/"
+                category.level = parent.level + 1
+                category.full_name = f"{parent.full_name} > {category.name}"
+            else:
+                remaining.append(category)
+                continue
+            nodes[category.pk] = category
+        if len(remaining) == len(pending):
+            break
+        pending = remaining
+    Category.objects.bulk_update(list(nodes.values()), ['path', 'level', 'full_name'], batch_size=500)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('categories', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='category',
+            name='full_name',
+            field=models.CharField(blank=True, editable=False, max_length=500),
+        ),
+        migrations.AddField(
+            model_name='category',
+            name='path',
+            field=models.CharField(blank=True, db_index=True, editable=False, max_length=255),
+        ),
+        migrations.RunPython(populate_paths, migrations.RunPython.noop),
+    ]
@@ -1,10 +1,22 @@
 from django.db import models
 
+PATH_STEP_WIDTH = 10
+PATH_SEPARATOR = '/'
+
+
+def path_segment(pk):
+    return f"{pk:0{PATH_STEP_WIDTH}d}{PATH_SEPARATOR}"
+
+
 class Category(models.Model):
     name = models.CharField(max_length=100)
     slug = models.SlugField(unique=True)
     parent = models.ForeignKey('self', on_delete=models.CASCADE, null=True, blank=True, related_name='children')
     level = models.PositiveIntegerField(default=0)
+    # Materialized path of zero-padded ancestor ids ("0000000001/0000000007/"),
+    # so a subtree is a single prefix range on an indexed column
+    path = models.CharField(max_length=255, db_index=True, blank=True, editable=False)
+    full_name = models.CharField(max_length=500, blank=True, editable=False)
     is_active = models.BooleanField(default=True)
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
@@ -17,20 +29,50 @@ class Category(models.Model):
         return self.get_full_path()
 
     def get_full_path(self):
+        if self.full_name:
+            return self.full_name
         if self.parent:
             return f"{self.parent.get_full_path()} > {self.name}"
         return self.name
 
     def save(self, *args, **kwargs):
+        old_path, old_full_name = self.path, self.full_name
         if self.parent:
+            if self.pk and old_path and self.parent.path.startswith(old_path):
+                raise ValueError('A category cannot be moved under itself or its descendants')
             self.level = self.parent.level + 1
+            self.full_name = f"{self.parent.get_full_path()} > {self.name}"
         else:
             self.level = 0
+            self.full_name = self.name
         super().save(*args, **kwargs)
 
+        # The path embeds our own id, so it can only be finalized after insert
+        path = (self.parent.path if self.parent else '') + path_segment(self.pk)
+        if path != self.path:
+            self.path = path
+            Category.objects.filter(pk=self.pk).update(path=path)
+
+        if old_path and (old_path != self.path or old_full_name != self.full_name):
+            self._rebuild_descendants(old_path)
+
+    def _rebuild_descendants(self, old_path):
+        """Re-derive path, level and full_name for the subtree in one read and one bulk write"""
+        descendants = list(
+            Category.objects.filter(path__startswith=old_path).exclude(pk=self.pk).order_by('path')
+        )
+        if not descendants:
+            return
+        parents = {self.pk: self}
+        for node in descendants:
+            parent = parents[node.parent_id]
+            node.path = parent.path + path_segment(node.pk)
+            node.level = parent.level + 1
+            node.full_name = f"{parent.full_name} > {node.name}"
+            parents[node.pk] = node
+        Category.objects.bulk_update(descendants, ['path', 'level', 'full_name'])
+
     def get_descendants(self):
-        descendants = []
-        for child in self.children.all():
-            descendants.append(child)
-            descendants.extend(child.get_descendants())
-        return descendants
\ No newline at end of file
+        if not self.path:
+            return Category.objects.none()
+        return Category.objects.filter(path__startswith=self.path).exclude(pk=self.pk).order_by('path')
@@ -0,0 +1,10 @@
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import receiver
+from .models import Category
+from backend import content_versions
+
+@receiver(post_save, sender=Category)
+@receiver(post_delete, sender=Category)
+def invalidate_tree_on_category_change(sender, instance, **kwargs):
+    """Retire the cached category tree whenever a category is added, edited or removed"""
+    content_versions.bump('categories')
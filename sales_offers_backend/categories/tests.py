@@ -1,3 +1,87 @@
+from django.core.cache import cache
 from django.test import TestCase
+from rest_framework.test import APITestCase
+from rest_framework import status
+from .models import Category
+from backend import content_versions
 
-# Create your tests here.
+class CategoryPathTestCase(TestCase):
+    def setUp(self):
+        self.goods = Category.objects.create(name='Goods', slug='goods')
+        self.electronics = Category.objects.create(name='Electronics', slug='electronics', parent=self.goods)
+        self.phones = Category.objects.create(name='Phones', slug='phones', parent=self.electronics)
+        
+    def test_path_and_full_name_maintained_on_save(self):
+        """Test materialized path and full name are stored on save"""
+        self.assertTrue(self.phones.path.startswith(self.electronics.path))
+        self.assertEqual(self.phones.level, 2)
+        self.assertEqual(self.phones.get_full_path(), 'Goods > Electronics > Phones')
+        
+    def test_get_descendants_single_query(self):
+        """Test descendants come from one prefix query"""
+        with self.assertNumQueries(1):
+            descendants = list(self.goods.get_descendants())
+        self.assertEqual(descendants, [self.electronics, self.phones])
+        
+    def test_moving_subtree_rebuilds_descendants(self):
+        """Test renaming and re-parenting updates the whole subtree"""
+        services = Category.objects.create(name='Services', slug='services')
+        self.electronics.parent = services
+        self.electronics.name = 'Gadgets'
+        self.electronics.save()
+        
+        self.phones.refresh_from_db()
+        self.assertEqual(self.phones.get_full_path(), 'Services > Gadgets > Phones')
+        self.assertTrue(self.phones.path.startswith(services.path))
+        self.assertEqual(list(self.goods.get_descendants()), [])
+        
+    def test_cannot_move_under_descendant(self):
+        """Test cycles are rejected"""
+        self.goods.parent = self.phones
+        with self.assertRaises(ValueError):
+            self.goods.save()
+
+class CategoryTreeAPITestCase(APITestCase):
+    def setUp(self):
+        cache.clear()
+        self.goods = Category.objects.create(name='Goods', slug='goods')
+        Category.objects.create(name='Fashion', slug='fashion', parent=self.goods)
+        Category.objects.create(name='Electronics', slug='electronics', parent=self.goods)
+        hidden = Category.objects.create(name='Hidden', slug='hidden', parent=self.goods, is_active=False)
+        Category.objects.create(name='Orphan', slug='orphan', parent=hidden)
+        
+    def test_tree_is_cached_and_invalidated(self):
+        """Test tree endpoint is served from cache until a category changes"""
+        response = self.client.get('/api/categories/tree/')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        children = response.data[0]['children']
+        self.assertEqual([c['name'] for c in children], ['Electronics', 'Fashion'])
+        
+        # Only the version stamp is read
+        with self.assertNumQueries(1):
+            self.client.get('/api/categories/tree/')
+
+        # A bulk write from another process only leaves the shared stamp behind
+        with self.captureOnCommitCallbacks(execute=True):
+            Category.objects.filter(slug='fashion').update(name='Clothing')
+            content_versions.bump('categories')
+        response = self.client.get('/api/categories/tree/')
+        self.assertEqual([c['name'] for c in response.data[0]['children']], ['Clothing', 'Electronics'])
+        
+        with self.captureOnCommitCallbacks(execute=True):
+            Category.objects.create(name='Books', slug='books', parent=self.goods)
+        response = self.client.get('/api/categories/tree/')
+        children = response.data[0]['children']
+        self.assertEqual([c['name'] for c in children], ['Books', 'Clothing', 'Electronics'])
+
+
+class CategoryListConditionalTestCase(APITestCase):
+    def test_category_change_invalidates_etag(self):
+        """The category list revalidates with 304 until a category changes"""
+        Category.objects.create(name='Goods', slug='goods')
+        first = self.client.get('/api/categories/')
+        self.assertEqual(first.status_code, status.HTTP_200_OK)
+        self.assertEqual(self.client.get('/api/categories/', HTTP_IF_NONE_MATCH=first['ETag']).status_code, status.HTTP_304_NOT_MODIFIED)
+        with self.captureOnCommitCallbacks(execute=True):
+            Category.objects.create(name='Services', slug='services')
+        self.assertEqual(self.client.get('/api/categories/', HTTP_IF_NONE_MATCH=first['ETag']).status_code, status.HTTP_200_OK)
@@ -0,0 +1,44 @@
+from django.core.cache import cache
+from backend import content_versions
+from .models import Category
+
+CATEGORY_TREE_CACHE_TIMEOUT = 60 * 60
+
+
+def build_category_tree():
+    """Assemble the active category tree from a single query"""
+    nodes = {}
+    roots = []
+    rows = Category.objects.filter(is_active=True).order_by('level', 'name').values(
+        'id', 'name', 'slug', 'level', 'parent_id'
+    )
+    # Ordering by level guarantees every parent is seen before its children,
+    # and ordering by name keeps siblings sorted as they are appended
+    for row in rows:
+        node = {
+            'id': row['id'],
+            'name': row['name'],
+            'slug': row['slug'],
+            'level': row['level'],
+            'children': [],
+        }
+        if row['parent_id'] is None:
+            roots.append(node)
+        elif row['parent_id'] in nodes:
+            nodes[row['parent_id']]['children'].append(node)
+        else:
+            # Parent is inactive, so the whole branch is hidden
+            continue
+        nodes[row['id']] = node
+    return roots
+
+
+def get_category_tree():
+    # Keyed on the 'categories' stamp, which lives in the database, so a change
+    # made by any process retires every process's cached tree
+    key = f"categories:tree:{content_versions.get_versions('categories')['categories']}"
+    tree = cache.get(key)
+    if tree is None:
+        tree = build_category_tree()
+        cache.set(key, tree, CATEGORY_TREE_CACHE_TIMEOUT)
+    return tree
@@ -2,41 +2,17 @@ from rest_framework import generics
 from rest_framework.response import Response
 from .models import Category
 from .serializers import CategorySerializer
+from .tree import get_category_tree
+from django.utils.decorators import method_decorator
+from backend.conditional import conditional_get
 
+@method_decorator(conditional_get('categories'), name='dispatch')
 class CategoryListView(generics.ListAPIView):
     queryset = Category.objects.filter(is_active=True).order_by('level', 'name')
     serializer_class = CategorySerializer
 
 class CategoryTreeView(generics.GenericAPIView):
     def get(self, request):
-        # Get root categories (Services and Goods)
-        root_categories = Category.objects.filter(parent=None, is_active=True).order_by('name')
-        data = []
-        
-        for root in root_categories:
-            category_data = {
-                'id': root.id,
-                'name': root.name,
-                'slug': root.slug,
-                'level': root.level,
-                'children': self.get_children(root)
-            }
-            data.append(category_data)
-        
-        return Response(data)
-    
-    def get_children(self, category):
-        children = category.children.filter(is_active=True).order_by('name')
-        result = []
-        
-        for child in children:
-            child_data = {
-                'id': child.id,
-                'name': child.name,
-                'slug': child.slug,
-                'level': child.level,
-                'children': self.get_children(child)
-            }
-            result.append(child_data)
-        
-        return result
\ No newline at end of file
+        # Root categories (Services and Goods) with nested children, built
+        # from one query and served from cache until a category changes
+        return Response(get_category_tree())
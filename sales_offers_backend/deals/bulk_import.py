@@ -0,0 +1,206 @@
+"""
+Bulk deal import for large sellers.
+
+Input is CSV or JSON Lines and is read as a stream, one batch of rows at a
+time, so a file of tens of thousands of deals never sits in memory.
+
+* JSONL: one deal object per line, store links nested as ``store_links``.
+* CSV: one row per deal with the deal columns, plus optional store link
+  columns (``store_name``, ``store_url``, ``price``, ``coupon_code``,
+  ``coupon_discount``, ``is_available``). Consecutive rows with the same
+  ``external_id`` add further store links to that deal; their deal columns
+  are ignored. Empty cells count as absent.
+
+Deals are matched on the seller's ``external_id``. Each batch is validated
+row by row, checked against the seller's plan limit once, and written in one
+transaction: one upsert for the deals, one update re-opening extended
+deals the expiry sweeper had closed, one id lookup, and a diffed write of
+their store links (see deals/store_link_sync.py) that also records changed
+prices. A row that fails validation or does not fit the plan is reported
+with its line number and skipped; the rest of the batch is still written.
+
+Unlike DealListView.perform_create no new-offer notifications are sent;
+a catalogue sync would otherwise notify users once per row.
+"""
+import csv
+import json
+from itertools import islice
+from django.db import transaction
+from django.utils import timezone
+from backend import content_versions
+from .models import Deal
+from .serializers import DealImportSerializer
+from .store_link_sync import sync_store_links
+
+BATCH_SIZE = 500
+MAX_REPORTED_ERRORS = 200
+LINK_COLUMNS = ('store_name', 'store_url', 'price', 'coupon_code', 'coupon_discount', 'is_available')
+DEAL_UPDATE_FIELDS = ['title', 'description', 'best_price', 'image', 'category', 'location', 'expires_at', 'is_published']
+PLAN_LIMIT_MESSAGE = 'Your plan limit of published advertisements has been reached. Upgrade your plan to import more.'
+
+
+def read_jsonl(stream):
+    """Yield (line_number, data, error) for each non-blank line"""
+    for line_number, line in enumerate(stream, 1):
+        if not line.strip():
+            continue
+        try:
+            data = json.loads(line)
+        except ValueError as exc:
+            yield line_number, None, f'Invalid JSON: {exc}'
+            continue
+        if not isinstance(data, dict):
+            yield line_number, None, 'Expected a JSON object'
+            continue
+        yield line_number, data, None
+
+
+def read_csv(stream):
+    """Yield (line_number, data, error) per deal, folding follow-on store link rows in"""
+    reader = csv.DictReader(stream)
+    current = None
+    for row in reader:
+        values = {
+            key.strip(): value.strip() for key, value in row.items()
+            if key and isinstance(value, str) and value.strip()
+        }
+        link = {name: values.pop(name) for name in LINK_COLUMNS if name in values}
+        if current is None or values.get('external_id') != current[1].get('external_id'):
+            if current is not None:
+                yield current
+            values['store_links'] = []
+            # The reader has consumed this row by now, so line_num is where it ended
+            current = (reader.line_num, values, None)
+        if link:
+            current[1]['store_links'].append(link)
+    if current is not None:
+        yield current
+
+
+READERS = {'csv': read_csv, 'jsonl': read_jsonl}
+
+
+def remaining_deal_quota(seller):
+    """Published deals the seller may still add; None for unlimited plans"""
+    from sellers.models import Subscription
+
+    subscription = Subscription.objects.filter(
+        user_id=seller.user_id, status='active'
+    ).select_related('plan').first()
+    # Same rule as DealListView.perform_create: no subscription allows one
+    limit = subscription.plan.max_offers if subscription else 1
+    if limit == -1:
+        return None
+    return max(limit - Deal.objects.filter(seller=seller, is_published=True).count(), 0)
+
+
+class DealImporter:
+    def __init__(self, seller, batch_size=BATCH_SIZE):
+        self.seller = seller
+        self.batch_size = batch_size
+        self.quota = remaining_deal_quota(seller)
+        self.stats = {'rows': 0, 'created': 0, 'updated': 0, 'failed': 0, 'store_links': 0}
+        self.errors = []
+
+    def reject(self, line_number, external_id, errors):
+        self.stats['failed'] += 1
+        if len(self.errors) < MAX_REPORTED_ERRORS:
+            self.errors.append({'row': line_number, 'external_id': external_id, 'errors': errors})
+
+    def run(self, rows):
+        rows = iter(rows)
+        while True:
+            batch = list(islice(rows, self.batch_size))
+            if not batch:
+                break
+            self.import_batch(batch)
+        return self.report()
+
+    def report(self):
+        return {
+            **self.stats,
+            'errors': self.errors,
+            'errors_truncated': self.stats['failed'] > len(self.errors),
+        }
+
+    def validate(self, batch):
+        """{external_id: (line_number, row)} for the valid rows; a repeated id keeps its last row"""
+        valid = {}
+        for line_number, data, error in batch:
+            self.stats['rows'] += 1
+            if error:
+                self.reject(line_number, None, {'non_field_errors': [error]})
+                continue
+            serializer = DealImportSerializer(data=data)
+            if not serializer.is_valid():
+                self.reject(line_number, data.get('external_id'), serializer.errors)
+                continue
+            row = serializer.validated_data
+            valid[row['external_id']] = (line_number, row)
+        return valid
+
+    def apply_quota(self, valid, existing):
+        """Drop rows that would publish more deals than the plan allows"""
+        if self.quota is None:
+            return
+        # Rows unpublishing a deal free their slot before any row takes one
+        for external_id, (line_number, row) in valid.items():
+            if existing.get(external_id) and not row['is_published']:
+                self.quota += 1
+        for external_id, (line_number, row) in list(valid.items()):
+            if not row['is_published'] or existing.get(external_id):
+                continue
+            if self.quota <= 0:
+                self.reject(line_number, external_id, {'non_field_errors': [PLAN_LIMIT_MESSAGE]})
+                del valid[external_id]
+            else:
+                self.quota -= 1
+
+    def import_batch(self, batch):
+        valid = self.validate(batch)
+        if not valid:
+            return
+        existing = dict(
+            Deal.objects.filter(seller=self.seller, external_id__in=valid).values_list('external_id', 'is_published')
+        )
+        self.apply_quota(valid, existing)
+        if not valid:
+            return
+
+        deals = []
+        for external_id, (line_number, row) in valid.items():
+            fields = {name: row[name] for name in DEAL_UPDATE_FIELDS}
+            fields['image'] = fields['image'] or None
+            deals.append(Deal(seller=self.seller, external_id=external_id, status='approved', **fields))
+        with transaction.atomic():
+            Deal.objects.bulk_create(
+                deals,
+                update_conflicts=True,
+                unique_fields=['seller', 'external_id'],
+                update_fields=DEAL_UPDATE_FIELDS,
+            )
+            # The upsert leaves status alone; deals the expiry sweeper closed go live again when extended
+            Deal.objects.filter(
+                seller=self.seller, external_id__in=valid, status='expired', expires_at__gt=timezone.now()
+            ).update(status='approved')
+            ids = dict(
+                Deal.objects.filter(seller=self.seller, external_id__in=valid).values_list('external_id', 'id')
+            )
+            links = [
+                {'deal_id': ids[external_id], **link}
+                for external_id, (line_number, row) in valid.items()
+                for link in row['store_links']
+            ]
+            sync_store_links(links)
+            # bulk_create skips the model signals that would bump this
+            content_versions.bump('deals')
+
+        updated = sum(1 for external_id in valid if external_id in existing)
+        self.stats['updated'] += updated
+        self.stats['created'] += len(valid) - updated
+        self.stats['store_links'] += len(links)
+
+
+def import_deals(seller, stream, file_format, batch_size=BATCH_SIZE):
+    """Import a text stream of CSV or JSONL deals for a seller; returns the report"""
+    return DealImporter(seller, batch_size=batch_size).run(READERS[file_format](stream))
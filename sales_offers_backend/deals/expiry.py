@@ -0,0 +1,120 @@
+"""
+Deal expiry and featured-expiry sweeper.
+
+Each run:
+
+* moves approved deals past ``expires_at`` to ``status='expired'``
+  (pending ones are left to moderation, so extending an expired deal can
+  safely put it back to approved, see DealDetailView and the importer);
+* clears ``is_featured`` on deals and sellers whose ``featured_until`` has
+  passed, and deactivates FeaturedContent past ``expires_at``;
+* tells users who favorited an approved deal that it expires within the
+  reminder window, once per expiry date.
+
+Every step reads ids in chunks over a partial index that only covers rows
+still to be handled, and flips each chunk with one ``update()``. Flipped rows
+leave the index, so the next chunk is again the head of it and no watermark
+is needed. ``update()`` bypasses signals, so the content versions of
+whatever changed are bumped at the end of the run. Overlapping cron runs are
+kept apart by the job's database lock (see admin_system/jobs.py).
+"""
+import logging
+import time
+from datetime import timedelta
+from django.db.models import F, Q
+from django.utils import timezone
+from admin_system.jobs import job_lock
+from backend import content_versions
+from sellers.models import Seller
+from .models import Deal, FeaturedContent
+
+logger = logging.getLogger(__name__)
+
+JOB_NAME = 'deals.expiry_sweep'
+REMINDER_WINDOW = timedelta(hours=24)
+
+
+class DealExpirySweeper:
+    def __init__(self, chunk_size=1000, reminder_window=REMINDER_WINDOW, lock_timeout=300):
+        self.chunk_size = chunk_size
+        self.reminder_window = reminder_window
+        self.lock_timeout = lock_timeout
+        self.stats = {
+            'expired_deals': 0, 'unfeatured_deals': 0, 'unfeatured_sellers': 0,
+            'deactivated_featured': 0, 'reminded_deals': 0, 'notifications': 0,
+        }
+
+    def targets(self, now):
+        """(stat, queryset, ordering, changes) for each flip the sweep makes"""
+        return [
+            ('expired_deals', Deal.objects.filter(status='approved', expires_at__lte=now),
+             ('expires_at', 'id'), {'status': 'expired'}),
+            ('unfeatured_deals', Deal.objects.filter(is_featured=True, featured_until__lte=now),
+             ('featured_until', 'id'), {'is_featured': False}),
+            ('unfeatured_sellers', Seller.objects.filter(is_featured=True, featured_until__lte=now),
+             ('featured_until', 'id'), {'is_featured': False}),
+            ('deactivated_featured', FeaturedContent.objects.filter(is_active=True, expires_at__lte=now),
+             ('expires_at', 'id'), {'is_active': False}),
+        ]
+
+    def flip(self, queryset, ordering, changes):
+        total = 0
+        while True:
+            ids = list(queryset.order_by(*ordering).values_list('id', flat=True)[:self.chunk_size])
+            if not ids:
+                return total
+            # Re-applying the filter keeps a row changed meanwhile from being flipped
+            total += queryset.filter(id__in=ids).update(**changes)
+
+    def reminder_queryset(self, now):
+        window = self.reminder_window
+        return Deal.objects.filter(
+            status='approved', is_published=True, expires_at__gt=now, expires_at__lte=now + window
+        ).filter(
+            # A reminder sent for an earlier expiry date does not count once the deal was extended
+            Q(expiry_reminder_sent_at__isnull=True) | Q(expiry_reminder_sent_at__lt=F('expires_at') - window)
+        )
+
+    def send_reminders(self, now):
+        from accounts.notification_service import NotificationService
+
+        queryset = self.reminder_queryset(now)
+        while True:
+            deals = list(queryset.only('id', 'title').order_by('expires_at', 'id')[:self.chunk_size])
+            if not deals:
+                return
+            self.stats['notifications'] += NotificationService.notify_offers_expiring_soon(deals)
+            self.stats['reminded_deals'] += Deal.objects.filter(
+                id__in=[deal.id for deal in deals]
+            ).update(expiry_reminder_sent_at=now)
+
+    def run(self):
+        with job_lock(JOB_NAME, self.lock_timeout) as acquired:
+            if not acquired:
+                logger.info('Deal expiry sweep already running, skipping')
+                return None
+
+            started = time.monotonic()
+            now = timezone.now()
+            try:
+                for stat, queryset, ordering, changes in self.targets(now):
+                    self.stats[stat] += self.flip(queryset, ordering, changes)
+                self.send_reminders(now)
+            finally:
+                self.bump_versions()
+
+        self.stats['seconds'] = round(time.monotonic() - started, 3)
+        logger.info(f'Deal expiry sweep: {self.stats}')
+        return self.stats
+
+    def bump_versions(self):
+        stats = self.stats
+        names = set()
+        if stats['expired_deals'] or stats['unfeatured_deals']:
+            names.update(('deals', 'featured'))
+        if stats['unfeatured_sellers']:
+            names.update(('sellers', 'featured'))
+        if stats['deactivated_featured']:
+            names.add('featured')
+        if names:
+            content_versions.bump(*sorted(names))
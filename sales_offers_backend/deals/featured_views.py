@@ -9,6 +9,7 @@ from .models import Deal, FeaturedContent
 from sellers.models import Seller, Subscription
 from .serializers import DealSerializer
 from sellers.serializers import SellerSerializer
+from backend.conditional import conditional_get
 
 @api_view(['GET'])
 @permission_classes([IsAuthenticated])
@@ -141,6 +142,8 @@ def remove_featured(request, content_type, object_id):
     except FeaturedContent.DoesNotExist:
         return Response({'error': 'Featured content not found'}, status=status.HTTP_404_NOT_FOUND)
 
+# Refreshed hourly as well, since featured entries lapse by expiry time
+@conditional_get('featured', 'deals', 'sellers', refresh_every=3600)
 @api_view(['GET'])
 def get_featured_content(request):
     """Get featured content for public display with fallback algorithms"""
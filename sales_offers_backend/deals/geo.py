@@ -0,0 +1,114 @@
+"""
+Grid-cell geo index for PhysicalStore.
+
+The globe is cut into CELLS_PER_DEGREE x CELLS_PER_DEGREE cells numbered
+row-major (``row * LON_CELLS + col``), and each store keeps the number of the
+cell it falls in. A radius search covers its bounding box with one
+contiguous ``geo_cell`` range per cell row, so the b-tree index on the column
+answers the prefilter on SQLite and PostgreSQL alike without PostGIS.
+Candidates are then ranked by exact haversine distance in Python.
+"""
+import math
+from django.db.models import Q
+
+EARTH_RADIUS_KM = 6371.0088
+CELLS_PER_DEGREE = 10
+LON_CELLS = 360 * CELLS_PER_DEGREE
+LAT_ROWS = 180 * CELLS_PER_DEGREE
+KM_PER_DEGREE_LAT = math.pi * EARTH_RADIUS_KM / 180
+
+
+def cell_row(latitude):
+    return min(int((float(latitude) + 90) * CELLS_PER_DEGREE), LAT_ROWS - 1)
+
+
+def cell_col(longitude):
+    return int((float(longitude) + 180) * CELLS_PER_DEGREE) % LON_CELLS
+
+
+def geo_cell(latitude, longitude):
+    if latitude is None or longitude is None:
+        return None
+    return cell_row(latitude) * LON_CELLS + cell_col(longitude)
+
+
+def bounding_box(latitude, longitude, radius_km):
+    """(min_lat, max_lat, min_lng, max_lng) around a point; longitudes may pass +-180"""
+    lat_delta = radius_km / KM_PER_DEGREE_LAT
+    min_lat, max_lat = max(latitude - lat_delta, -90.0), min(latitude + lat_delta, 90.0)
+    # Longitude degrees shrink towards the poles; use the widest latitude in the box
+    widest = max(abs(min_lat), abs(max_lat))
+    if widest >= 89.9:
+        return min_lat, max_lat, -180.0, 180.0
+    lng_delta = radius_km / (KM_PER_DEGREE_LAT * math.cos(math.radians(widest)))
+    if lng_delta >= 180:
+        return min_lat, max_lat, -180.0, 180.0
+    return min_lat, max_lat, longitude - lng_delta, longitude + lng_delta
+
+
+def longitude_col_ranges(min_lng, max_lng):
+    """Column ranges for a longitude span, split in two where it crosses the antimeridian"""
+    if max_lng - min_lng >= 360:
+        return [(0, LON_CELLS - 1)]
+    start, end = cell_col(min_lng), cell_col(max_lng)
+    if min_lng >= -180 and max_lng < 180 and start <= end:
+        return [(start, end)]
+    return [(start, LON_CELLS - 1), (0, end)]
+
+
+def cell_filter(latitude, longitude, radius_km, field='geo_cell'):
+    """Q object selecting every cell that intersects the search's bounding box"""
+    min_lat, max_lat, min_lng, max_lng = bounding_box(latitude, longitude, radius_km)
+    col_ranges = longitude_col_ranges(min_lng, max_lng)
+    condition = Q()
+    for row in range(cell_row(min_lat), cell_row(max_lat) + 1):
+        base = row * LON_CELLS
+        for start, end in col_ranges:
+            condition |= Q(**{f'{field}__gte': base + start, f'{field}__lte': base + end})
+    return condition
+
+
+def haversine_km(lat1, lng1, lat2, lng2):
+    phi1, phi2 = math.radians(lat1), math.radians(lat2)
+    d_phi = phi2 - phi1
+    d_lambda = math.radians(lng2 - lng1)
+    a = math.sin(d_phi / 2) ** 2 + math.cos(phi1) * math.cos(phi2) * math.sin(d_lambda / 2) ** 2
+    return 2 * EARTH_RADIUS_KM * math.asin(min(1.0, math.sqrt(a)))
+
+
+def rank_by_distance(latitude, longitude, candidates, radius_km):
+    """
+    Exact distances for (key, lat, lng) candidates within ``radius_km``,
+    nearest first. The origin's trigonometry is computed once and the loop
+    body stays in local names.
+    """
+    phi1 = math.radians(latitude)
+    cos_phi1 = math.cos(phi1)
+    lambda1 = math.radians(longitude)
+    sin, cos, asin, sqrt, radians = math.sin, math.cos, math.asin, math.sqrt, math.radians
+    diameter = 2 * EARTH_RADIUS_KM
+
+    ranked = []
+    for key, lat, lng in candidates:
+        phi2 = radians(lat)
+        a = sin((phi2 - phi1) / 2) ** 2 + cos_phi1 * cos(phi2) * sin((radians(lng) - lambda1) / 2) ** 2
+        distance = diameter * asin(min(1.0, sqrt(a)))
+        if distance <= radius_km:
+            ranked.append((distance, key))
+    ranked.sort(key=lambda item: item[0])
+    return ranked
+
+
+def nearby(queryset, latitude, longitude, radius_km):
+    """
+    Rank the physical stores of a queryset by distance from a point.
+    Returns [(distance_km, (store_id, deal_id))] nearest first.
+    """
+    candidates = queryset.filter(cell_filter(latitude, longitude, radius_km)).values_list(
+        'id', 'deal_id', 'latitude', 'longitude'
+    )
+    return rank_by_distance(
+        latitude, longitude,
+        (((pk, deal_id), float(lat), float(lng)) for pk, deal_id, lat, lng in candidates),
+        radius_km,
+    )
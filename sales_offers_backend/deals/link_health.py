@@ -0,0 +1,289 @@
+"""
+Store link health checks.
+
+Due links (``next_check_at`` in the past) are fetched concurrently on an
+asyncio event loop with a global and a per-host concurrency cap, so one slow
+shop cannot starve the rest and no shop sees more than a few parallel
+requests from us. Requests are conditional on the stored ETag /
+Last-Modified, only the status line and headers are read, and every fetch
+has a hard timeout.
+
+Store URLs come from sellers, so every hop of a redirect chain is resolved
+first and refused unless all of its addresses are public (no loopback,
+private, link-local or cloud metadata addresses); the connection then goes
+to the address that was checked, so a second DNS answer cannot swap it. The
+per-host cap also applies per hop, redirect targets included. Overlapping
+cron runs are kept apart by the job's database lock (see
+admin_system/jobs.py).
+
+Outcomes are written back in one bulk update:
+
+* healthy (2xx, 304, or a redirect chain ending in one): the next check is
+  scheduled ``CHECK_INTERVAL`` out, and a link this checker disabled is
+  re-enabled;
+* gone (404, 410): the link is disabled at once;
+* inconclusive (401, 403, 429: the shop is refusing bots, not missing the
+  page): the next check backs off, but nothing counts towards disabling;
+* anything else (timeouts, resets, 5xx...): the next check backs off
+  exponentially, and the link is disabled after ``FAILURE_THRESHOLD``
+  consecutive failures.
+
+Links a seller switched off by hand are never switched back on. Checks can
+take a while, so only the checker's own bookkeeping is bulk updated; a link
+whose availability flips is written on its own, guarded on the availability
+and URL it was loaded with, so a seller's change made meanwhile wins.
+
+The client is a small HTTP/1.1 implementation on asyncio streams, so the
+checker needs no dependency beyond the standard library.
+"""
+import asyncio
+import ipaddress
+import logging
+import random
+import socket
+import ssl
+from collections import defaultdict
+from contextlib import nullcontext
+from dataclasses import dataclass
+from datetime import timedelta
+from urllib.parse import urljoin, urlsplit
+from django.db import transaction
+from django.db.models import F, Q
+from django.utils import timezone
+from admin_system.jobs import job_lock
+from backend import content_versions
+
+logger = logging.getLogger(__name__)
+
+JOB_NAME = 'deals.link_health'
+CHECK_INTERVAL = timedelta(hours=24)
+RETRY_BASE = timedelta(minutes=30)
+RETRY_MAX = timedelta(days=7)
+FAILURE_THRESHOLD = 5
+MAX_REDIRECTS = 5
+GONE_STATUSES = {404, 410}
+# Bot blocking and rate limiting say nothing about whether the page exists
+INCONCLUSIVE_STATUSES = {401, 403, 429}
+USER_AGENT = 'SalesAndOffersLinkChecker/1.0 (+https://salesandoffers.com)'
+
+
+@dataclass
+class CheckResult:
+    status: int = None
+    etag: str = ''
+    last_modified: str = ''
+    error: str = ''
+
+    @property
+    def healthy(self):
+        return self.status is not None and (200 <= self.status < 300 or self.status == 304)
+
+    @property
+    def gone(self):
+        return self.status in GONE_STATUSES
+
+    @property
+    def inconclusive(self):
+        return self.status in INCONCLUSIVE_STATUSES
+
+
+def address_allowed(address):
+    return address.is_global
+
+
+async def resolve_public(hostname, port):
+    """An address to connect to for hostname; ValueError unless every address it resolves to is public"""
+    infos = await asyncio.get_running_loop().getaddrinfo(hostname, port, type=socket.SOCK_STREAM)
+    addresses = [info[4][0] for info in infos]
+    if not addresses:
+        raise ValueError(f'Could not resolve {hostname}')
+    for address in addresses:
+        if not address_allowed(ipaddress.ip_address(address.split('%')[0])):
+            raise ValueError(f'Refusing non-public address {address} for {hostname}')
+    return addresses[0]
+
+
+async def fetch_head(url, headers, timeout, ssl_context=None):
+    """
+    GET ``url`` and return (status, headers) without reading the body.
+    Header names are lower-cased. Raises ValueError for hosts that resolve
+    to non-public addresses.
+    """
+    parts = urlsplit(url)
+    if parts.scheme not in ('http', 'https') or not parts.hostname:
+        raise ValueError(f'Unsupported URL: {url}')
+    secure = parts.scheme == 'https'
+    port = parts.port or (443 if secure else 80)
+    path = parts.path or '/'
+    if parts.query:
+        path = f'{path}?{parts.query}'
+    host = parts.hostname if parts.port is None else f'{parts.hostname}:{parts.port}'
+
+    async def exchange():
+        address = await resolve_public(parts.hostname, port)
+        reader, writer = await asyncio.open_connection(
+            address, port,
+            ssl=(ssl_context or ssl.create_default_context()) if secure else None,
+            server_hostname=parts.hostname if secure else None,
+        )
+        try:
+            lines = [f'GET {path} HTTP/1.1', f'Host: {host}', f'User-Agent: {USER_AGENT}',
+                     'Accept: text/html,*/*', 'Connection: close']
+            lines += [f'{name}: {value}' for name, value in headers.items() if value]
+            writer.write(('\r\n'.join(lines) + '\r\n\r\n').encode('latin-1'))
+            await writer.drain()
+
+            status_line = (await reader.readline()).decode('latin-1')
+            try:
+                status = int(status_line.split()[1])
+            except (IndexError, ValueError):
+                raise ValueError(f'Malformed status line: {status_line!r}')
+            response_headers = {}
+            while True:
+                line = (await reader.readline()).decode('latin-1').strip()
+                if not line:
+                    break
+                name, _, value = line.partition(':')
+                response_headers[name.strip().lower()] = value.strip()
+            return status, response_headers
+        finally:
+            writer.close()
+
+    return await asyncio.wait_for(exchange(), timeout)
+
+
+async def check_url(url, etag='', last_modified='', timeout=10, ssl_context=None, hosts=None):
+    """
+    Fetch a URL conditionally, following redirects; never raises. ``hosts``
+    maps a hostname to the semaphore capping requests to it, taken per hop.
+    """
+    headers = {'If-None-Match': etag, 'If-Modified-Since': last_modified}
+    try:
+        for _ in range(MAX_REDIRECTS + 1):
+            async with hosts[urlsplit(url).hostname] if hosts is not None else nullcontext():
+                status, response_headers = await fetch_head(url, headers, timeout, ssl_context)
+            if status in (301, 302, 303, 307, 308) and response_headers.get('location'):
+                url = urljoin(url, response_headers['location'])
+                # Validators belong to the original URL
+                headers = {}
+                continue
+            return CheckResult(
+                status=status,
+                etag=response_headers.get('etag', etag if status == 304 else ''),
+                last_modified=response_headers.get('last-modified', last_modified if status == 304 else ''),
+            )
+        return CheckResult(error='Too many redirects')
+    except asyncio.TimeoutError:
+        return CheckResult(error='Timed out')
+    except (OSError, ValueError, ssl.SSLError) as exc:
+        return CheckResult(error=str(exc) or exc.__class__.__name__)
+
+
+async def check_links(links, concurrency=50, per_host=4, timeout=10, ssl_context=None):
+    """Check (id, url, etag, last_modified) tuples; returns {id: CheckResult}"""
+    overall = asyncio.Semaphore(concurrency)
+    hosts = defaultdict(lambda: asyncio.Semaphore(per_host))
+
+    async def run(link_id, url, etag, last_modified):
+        async with overall:
+            return link_id, await check_url(url, etag, last_modified, timeout, ssl_context, hosts)
+
+    results = await asyncio.gather(*(run(*link) for link in links))
+    return dict(results)
+
+
+def backoff(failures):
+    delay = min(RETRY_BASE * (2 ** max(failures - 1, 0)), RETRY_MAX)
+    # Jitter so links that failed together are not retried together
+    return delay * random.uniform(0.8, 1.2)
+
+
+def apply_result(link, result, now):
+    """Move one StoreLink's schedule and availability according to a check; returns the outcome"""
+    link.last_checked_at = now
+    link.last_check_status = result.status
+    if result.healthy:
+        link.check_failures = 0
+        link.etag = result.etag[:200]
+        link.last_modified = result.last_modified[:100]
+        link.next_check_at = now + CHECK_INTERVAL
+        if link.auto_disabled:
+            link.is_available = True
+            link.auto_disabled = False
+            return 'restored'
+        return 'healthy'
+
+    if result.inconclusive:
+        link.next_check_at = now + backoff(link.check_failures + 1)
+        return 'inconclusive'
+
+    link.check_failures += 1
+    link.etag = link.last_modified = ''
+    link.next_check_at = now + backoff(link.check_failures)
+    if link.is_available and (result.gone or link.check_failures >= FAILURE_THRESHOLD):
+        link.is_available = False
+        link.auto_disabled = True
+        return 'disabled'
+    return 'failed'
+
+
+SCHEDULE_FIELDS = [
+    'last_checked_at', 'last_check_status', 'check_failures', 'etag', 'last_modified', 'next_check_at',
+]
+AVAILABILITY_FIELDS = ['is_available', 'auto_disabled']
+
+
+def check_due_links(limit=500, concurrency=50, per_host=4, timeout=10, ssl_context=None, lock_timeout=900):
+    """
+    Check the links that are due and persist the outcome; returns counts per
+    outcome, or None while another run holds the lock.
+    """
+    from .models import StoreLink
+
+    with job_lock(JOB_NAME, lock_timeout) as acquired:
+        if not acquired:
+            logger.info('Store link check already running, skipping')
+            return None
+
+        now = timezone.now()
+        # Links switched off by their seller are not ours to check
+        due = StoreLink.objects.filter(
+            Q(next_check_at__isnull=True) | Q(next_check_at__lte=now)
+        ).exclude(is_available=False, auto_disabled=False).only(
+            'id', 'store_url', 'is_available', 'auto_disabled', 'check_failures', 'etag', 'last_modified'
+        ).order_by(F('next_check_at').asc(nulls_first=True), 'id')
+        links = list(due[:limit])
+        stats = {
+            'checked': len(links), 'healthy': 0, 'restored': 0, 'failed': 0, 'inconclusive': 0,
+            'disabled': 0, 'conflicts': 0,
+        }
+        if not links:
+            return stats
+
+        results = asyncio.run(check_links(
+            [(link.id, link.store_url, link.etag, link.last_modified) for link in links],
+            concurrency=concurrency, per_host=per_host, timeout=timeout, ssl_context=ssl_context,
+        ))
+        now = timezone.now()
+        scheduled, flipped = [], []
+        for link in links:
+            loaded = {'is_available': link.is_available, 'auto_disabled': link.auto_disabled, 'store_url': link.store_url}
+            outcome = apply_result(link, results[link.id], now)
+            stats[outcome] += 1
+            if outcome in ('disabled', 'restored'):
+                flipped.append((link, loaded))
+            else:
+                scheduled.append(link)
+
+        with transaction.atomic():
+            StoreLink.objects.bulk_update(scheduled, SCHEDULE_FIELDS, batch_size=500)
+            for link, loaded in flipped:
+                written = StoreLink.objects.filter(pk=link.pk, **loaded).update(
+                    **{field: getattr(link, field) for field in SCHEDULE_FIELDS + AVAILABILITY_FIELDS}
+                )
+                if not written:
+                    # The seller switched the link or changed its URL while it was being checked
+                    stats['conflicts'] += 1
+            if len(flipped) > stats['conflicts']:
+                content_versions.bump('deals')
+        return stats
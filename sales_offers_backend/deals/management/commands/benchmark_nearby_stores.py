@@ -0,0 +1,76 @@
+import random
+import time
+from datetime import timedelta
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+from django.utils import timezone
+from accounts.models import User
+from deals.geo import geo_cell, nearby, rank_by_distance
+from deals.models import Deal, PhysicalStore
+from sellers.models import Seller
+
+# Roughly Kenya, where the stores actually are
+LAT_RANGE = (-4.7, 5.0)
+LNG_RANGE = (33.9, 41.9)
+
+class Command(BaseCommand):
+    help = 'Compare the grid-cell nearby-store search with a full scan over synthetic stores'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--stores', type=int, default=100_000)
+        parser.add_argument('--queries', type=int, default=50)
+        parser.add_argument('--radius-km', type=float, default=10.0)
+        parser.add_argument('--seed', type=int, default=42)
+
+    def full_scan(self, latitude, longitude, radius_km):
+        candidates = (
+            ((pk, deal_id), float(lat), float(lng))
+            for pk, deal_id, lat, lng in PhysicalStore.objects.values_list('id', 'deal_id', 'latitude', 'longitude')
+        )
+        return rank_by_distance(latitude, longitude, candidates, radius_km)
+
+    def measure(self, search, points, radius_km):
+        started = time.perf_counter()
+        results = [search(lat, lng, radius_km) for lat, lng in points]
+        elapsed = time.perf_counter() - started
+        return elapsed / len(points) * 1000, results
+
+    def handle(self, *args, **options):
+        rng = random.Random(options['seed'])
+        radius_km = options['radius_km']
+        points = [(rng.uniform(*LAT_RANGE), rng.uniform(*LNG_RANGE)) for _ in range(options['queries'])]
+        
+        # Everything runs in a rolled-back transaction so no benchmark data is left behind
+        with transaction.atomic():
+            user = User.objects.create_user(username='__geo_benchmark__', password='unused-password')
+            seller = Seller.objects.create(user=user, business_name='Benchmark', business_description='-', address='-')
+            deals = Deal.objects.bulk_create([
+                Deal(title=f'Benchmark {i}', description='-', seller=seller, expires_at=timezone.now() + timedelta(days=1))
+                for i in range(100)
+            ])
+            stores = []
+            for i in range(options['stores']):
+                latitude, longitude = round(rng.uniform(*LAT_RANGE), 6), round(rng.uniform(*LNG_RANGE), 6)
+                stores.append(PhysicalStore(
+                    deal=deals[i % len(deals)], store_name=f'Store {i}', address='-',
+                    latitude=latitude, longitude=longitude, geo_cell=geo_cell(latitude, longitude),
+                ))
+            PhysicalStore.objects.bulk_create(stores, batch_size=5000)
+            
+            queryset = PhysicalStore.objects.all()
+            indexed_ms, indexed = self.measure(lambda *args: nearby(queryset, *args), points, radius_km)
+            scan_ms, scanned = self.measure(self.full_scan, points, radius_km)
+            transaction.set_rollback(True)
+        
+        if indexed != scanned:
+            self.stderr.write(self.style.ERROR('Grid search and full scan disagree'))
+            return
+        
+        matches = sum(len(result) for result in indexed) / len(points)
+        self.stdout.write(
+            f"{options['stores']} stores, {len(points)} queries, radius {radius_km} km "
+            f"({connection.vendor}), {matches:.1f} stores found per query"
+        )
+        self.stdout.write(f'  {"grid cells + haversine":<24} {indexed_ms:9.2f} ms/query')
+        self.stdout.write(f'  {"full scan + haversine":<24} {scan_ms:9.2f} ms/query')
+        self.stdout.write(self.style.SUCCESS(f'Speedup: {scan_ms / indexed_ms:.1f}x'))
@@ -0,0 +1,33 @@
+from django.core.management.base import BaseCommand
+from deals.link_health import check_due_links
+
+class Command(BaseCommand):
+    help = 'Check due store links and flip is_available for dead ones'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--limit', type=int, default=500, help='Links checked per run')
+        parser.add_argument('--concurrency', type=int, default=50, help='Requests in flight overall')
+        parser.add_argument('--per-host', type=int, default=4, help='Requests in flight per shop host')
+        parser.add_argument('--timeout', type=float, default=10, help='Seconds allowed per request')
+
+    def handle(self, *args, **options):
+        stats = check_due_links(
+            limit=options['limit'],
+            concurrency=options['concurrency'],
+            per_host=options['per_host'],
+            timeout=options['timeout'],
+        )
+        if stats is None:
+            self.stdout.write('Another store link check is running, skipped')
+            return
+
+        self.stdout.write(
+            f"Checked {stats['checked']} links: {stats['healthy']} healthy, {stats['failed']} failing, "
+            f"{stats['inconclusive']} inconclusive"
+        )
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Disabled {stats['disabled']} dead links, restored {stats['restored']}, "
+                f"left {stats['conflicts']} changed meanwhile"
+            )
+        )
@@ -0,0 +1,16 @@
+from django.core.management.base import BaseCommand
+from deals.price_history import detect_price_drops
+
+class Command(BaseCommand):
+    help = 'Notify users of price drops on their favorited deals since the last run'
+
+    def handle(self, *args, **options):
+        stats = detect_price_drops()
+        
+        if stats is None:
+            self.stdout.write(self.style.WARNING('Another price drop run is in progress, skipping'))
+            return
+        
+        self.stdout.write(
+            self.style.SUCCESS(f"Found price drops on {stats['deals']} deals, sent {stats['notifications']} notifications")
+        )
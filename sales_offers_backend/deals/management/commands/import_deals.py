@@ -0,0 +1,39 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.db.models import Q
+from sellers.models import Seller
+from deals.bulk_import import BATCH_SIZE, READERS, import_deals
+
+class Command(BaseCommand):
+    help = 'Upsert a seller\'s deals and store links from a CSV or JSONL file'
+
+    def add_arguments(self, parser):
+        parser.add_argument('path', help='CSV or JSONL file')
+        parser.add_argument('--seller', required=True, help='Seller id or username of the seller\'s user')
+        parser.add_argument('--format', choices=list(READERS), help='Defaults to the file extension')
+        parser.add_argument('--batch-size', type=int, default=BATCH_SIZE, help='Rows validated and written together')
+
+    def handle(self, *args, **options):
+        seller_ref = options['seller']
+        lookup = Q(user__username=seller_ref)
+        if seller_ref.isdigit():
+            lookup |= Q(pk=int(seller_ref))
+        seller = Seller.objects.filter(lookup).first()
+        if seller is None:
+            raise CommandError(f'No seller matches {seller_ref!r}')
+        file_format = options['format'] or options['path'].rsplit('.', 1)[-1].lower()
+        if file_format not in READERS:
+            raise CommandError(f"Cannot tell the format of {options['path']}; pass --format")
+
+        with open(options['path'], encoding='utf-8-sig', newline='') as stream:
+            report = import_deals(seller, stream, file_format, batch_size=options['batch_size'])
+
+        for error in report['errors']:
+            self.stderr.write(f"Row {error['row']} ({error['external_id'] or '-'}): {error['errors']}")
+        if report['errors_truncated']:
+            self.stderr.write(f"... {report['failed'] - len(report['errors'])} more rows failed")
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Imported {report['rows']} rows: {report['created']} created, {report['updated']} updated, "
+                f"{report['failed']} failed, {report['store_links']} store links"
+            )
+        )
@@ -0,0 +1,32 @@
+from datetime import timedelta
+from django.core.management.base import BaseCommand
+from deals.expiry import DealExpirySweeper
+
+class Command(BaseCommand):
+    help = 'Expire lapsed deals and featured entries and send expiring-soon reminders'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--chunk-size', type=int, default=1000, help='Rows flipped per update')
+        parser.add_argument('--reminder-hours', type=int, default=24, help='Remind about deals expiring within this many hours')
+
+    def handle(self, *args, **options):
+        sweeper = DealExpirySweeper(
+            chunk_size=options['chunk_size'],
+            reminder_window=timedelta(hours=options['reminder_hours']),
+        )
+        stats = sweeper.run()
+        
+        if stats is None:
+            self.stdout.write(self.style.WARNING('Another sweep is in progress, skipping'))
+            return
+        
+        self.stdout.write(
+            f"Unfeatured {stats['unfeatured_deals']} deals and {stats['unfeatured_sellers']} sellers, "
+            f"deactivated {stats['deactivated_featured']} featured entries"
+        )
+        self.stdout.write(
+            f"Reminded {stats['notifications']} users about {stats['reminded_deals']} deals expiring soon"
+        )
+        self.stdout.write(
+            self.style.SUCCESS(f"Successfully expired {stats['expired_deals']} deals in {stats['seconds']}s")
+        )
@@ -0,0 +1,22 @@
+# Generated by Django 5.1.5 on 2026-10-19 12:15
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('deals', '0019_physicalstore_physicalstoreimage'),
+        ('sellers', '0013_admin_list_indexes'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='deal',
+            index=models.Index(fields=['created_at', 'id'], name='deal_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='deal',
+            index=models.Index(fields=['status', 'created_at', 'id'], name='deal_status_created_idx'),
+        ),
+    ]
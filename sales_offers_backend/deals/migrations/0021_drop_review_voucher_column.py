@@ -0,0 +1,41 @@
+# Review.voucher was removed from the migration state in 0015 but the column
+# (and on SQLite its foreign key to the dropped deals_voucher table) was left
+# behind, so inserting a review on a freshly migrated database fails.
+#
+# The field is put back into the state just long enough for the schema editor
+# to remove it: declared indexed, SQLite rebuilds the table without it (its
+# ALTER TABLE DROP COLUMN refuses indexed and constrained columns), other
+# backends drop the column along with its constraints.
+
+from django.db import migrations, models
+
+
+def drop_review_voucher_column(apps, schema_editor):
+    connection = schema_editor.connection
+    with connection.cursor() as cursor:
+        columns = [column.name for column in connection.introspection.get_table_description(cursor, 'deals_review')]
+    if 'voucher_id' not in columns:
+        return
+    Review = apps.get_model('deals', 'Review')
+    schema_editor.remove_field(Review, Review._meta.get_field('voucher'))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('deals', '0020_admin_list_indexes'),
+    ]
+
+    operations = [
+        migrations.SeparateDatabaseAndState(state_operations=[
+            migrations.AddField(
+                model_name='review',
+                name='voucher',
+                field=models.IntegerField(null=True, db_index=True, db_column='voucher_id'),
+            ),
+        ]),
+        migrations.RunPython(drop_review_voucher_column, migrations.RunPython.noop),
+        migrations.SeparateDatabaseAndState(state_operations=[
+            migrations.RemoveField(model_name='review', name='voucher'),
+        ]),
+    ]
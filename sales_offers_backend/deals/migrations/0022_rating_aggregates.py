@@ -0,0 +1,75 @@
+# Generated by Django 5.1.5 on 2026-10-19 12:28
+
+from django.db import migrations, models
+from django.db.models import Count, Q, Sum
+
+
+def aggregate(reviews):
+    totals = reviews.aggregate(
+        rating_sum=Sum('rating', default=0),
+        rating_count=Count('id'),
+        **{f'rating_count_{stars}': Count('id', filter=Q(rating=stars)) for stars in range(1, 6)}
+    )
+    count = totals['rating_count']
+    totals['rating'] = round(totals['rating_sum'] / count, 2) if count else 0
+    return totals
+
+
+def backfill_rating_aggregates(apps, schema_editor):
+    Deal = apps.get_model('deals', 'Deal')
+    Review = apps.get_model('deals', 'Review')
+    Seller = apps.get_model('sellers', 'Seller')
+    for deal_id in Review.objects.values_list('deal_id', flat=True).distinct().iterator():
+        Deal.objects.filter(pk=deal_id).update(**aggregate(Review.objects.filter(deal_id=deal_id)))
+    for seller_id in Review.objects.values_list('deal__seller_id', flat=True).distinct().iterator():
+        totals = aggregate(Review.objects.filter(deal__seller_id=seller_id))
+        Seller.objects.filter(pk=seller_id).update(
+            rating_sum=totals['rating_sum'], total_reviews=totals['rating_count'], rating=totals['rating']
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('deals', '0021_drop_review_voucher_column'),
+        ('sellers', '0014_rating_aggregates'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='deal',
+            name='rating_count',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='deal',
+            name='rating_count_1',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='deal',
+            name='rating_count_2',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='deal',
+            name='rating_count_3',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='deal',
+            name='rating_count_4',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='deal',
+            name='rating_count_5',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='deal',
+            name='rating_sum',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.RunPython(backfill_rating_aggregates, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,39 @@
+# Generated by Django 5.1.5 on 2026-10-19 12:33
+
+from django.db import migrations, models
+
+CELLS_PER_DEGREE = 10
+LON_CELLS = 360 * CELLS_PER_DEGREE
+LAT_ROWS = 180 * CELLS_PER_DEGREE
+
+
+def populate_geo_cells(apps, schema_editor):
+    PhysicalStore = apps.get_model('deals', 'PhysicalStore')
+    batch = []
+    stores = PhysicalStore.objects.filter(latitude__isnull=False, longitude__isnull=False).only('id', 'latitude', 'longitude')
+    for store in stores.iterator(chunk_size=1000):
+        row = min(int((float(store.latitude) + 90) * CELLS_PER_DEGREE), LAT_ROWS - 1)
+        col = int((float(store.longitude) + 180) * CELLS_PER_DEGREE) % LON_CELLS
+        store.geo_cell = row * LON_CELLS + col
+        batch.append(store)
+        if len(batch) >= 1000:
+            PhysicalStore.objects.bulk_update(batch, ['geo_cell'])
+            batch = []
+    if batch:
+        PhysicalStore.objects.bulk_update(batch, ['geo_cell'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('deals', '0023_review_listing'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='physicalstore',
+            name='geo_cell',
+            field=models.IntegerField(blank=True, db_index=True, editable=False, null=True),
+        ),
+        migrations.RunPython(populate_geo_cells, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,52 @@
+# Generated by Django 5.1.5 on 2026-10-19 12:36
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('deals', '0024_physicalstore_geo_cell'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='storelink',
+            name='auto_disabled',
+            field=models.BooleanField(default=False),
+        ),
+        migrations.AddField(
+            model_name='storelink',
+            name='check_failures',
+            field=models.PositiveSmallIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='storelink',
+            name='etag',
+            field=models.CharField(blank=True, max_length=200),
+        ),
+        migrations.AddField(
+            model_name='storelink',
+            name='last_check_status',
+            field=models.PositiveSmallIntegerField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='storelink',
+            name='last_checked_at',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='storelink',
+            name='last_modified',
+            field=models.CharField(blank=True, max_length=100),
+        ),
+        migrations.AddField(
+            model_name='storelink',
+            name='next_check_at',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.AddIndex(
+            model_name='storelink',
+            index=models.Index(fields=['next_check_at', 'id'], name='storelink_next_check_idx'),
+        ),
+    ]
@@ -0,0 +1,46 @@
+# Generated by Django 5.1.5 on 2026-10-19 12:40
+
+import django.db.models.deletion
+import django.utils.timezone
+from django.db import migrations, models
+
+
+def seed_price_history(apps, schema_editor):
+    StoreLink = apps.get_model('deals', 'StoreLink')
+    StoreLinkPriceHistory = apps.get_model('deals', 'StoreLinkPriceHistory')
+    batch = []
+    links = StoreLink.objects.filter(price__isnull=False).only('id', 'deal_id', 'price', 'updated_at')
+    for link in links.iterator(chunk_size=1000):
+        batch.append(StoreLinkPriceHistory(
+            store_link_id=link.id, deal_id=link.deal_id, price=link.price, recorded_at=link.updated_at,
+        ))
+        if len(batch) >= 1000:
+            StoreLinkPriceHistory.objects.bulk_create(batch)
+            batch = []
+    if batch:
+        StoreLinkPriceHistory.objects.bulk_create(batch)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('deals', '0025_storelink_health'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='StoreLinkPriceHistory',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('price', models.DecimalField(decimal_places=2, max_digits=10)),
+                ('previous_price', models.DecimalField(blank=True, decimal_places=2, max_digits=10, null=True)),
+                ('recorded_at', models.DateTimeField(default=django.utils.timezone.now)),
+                ('deal', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='price_history', to='deals.deal')),
+                ('store_link', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='price_history', to='deals.storelink')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['deal', 'recorded_at'], name='pricehist_deal_recorded_idx'), models.Index(fields=['store_link', 'recorded_at'], name='pricehist_link_recorded_idx')],
+            },
+        ),
+        migrations.RunPython(seed_price_history, migrations.RunPython.noop),
+    ]
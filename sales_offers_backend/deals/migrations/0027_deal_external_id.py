@@ -0,0 +1,23 @@
+# Generated by Django 5.1.5 on 2026-10-19 12:48
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('deals', '0026_storelink_price_history'),
+        ('sellers', '0014_rating_aggregates'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='deal',
+            name='external_id',
+            field=models.CharField(blank=True, max_length=100, null=True),
+        ),
+        migrations.AddConstraint(
+            model_name='deal',
+            constraint=models.UniqueConstraint(fields=('seller', 'external_id'), name='deal_seller_external_id_uniq'),
+        ),
+    ]
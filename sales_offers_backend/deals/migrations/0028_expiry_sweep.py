@@ -0,0 +1,31 @@
+# Generated by Django 5.1.5 on 2026-10-19 12:54
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('deals', '0027_deal_external_id'),
+        ('sellers', '0015_expiry_sweep'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='deal',
+            name='expiry_reminder_sent_at',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.AddIndex(
+            model_name='deal',
+            index=models.Index(condition=models.Q(('status__in', ['pending', 'approved'])), fields=['expires_at', 'id'], name='deal_live_expiry_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='deal',
+            index=models.Index(condition=models.Q(('is_featured', True)), fields=['featured_until'], name='deal_featured_until_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='featuredcontent',
+            index=models.Index(condition=models.Q(('is_active', True)), fields=['expires_at'], name='featured_active_expiry_idx'),
+        ),
+    ]
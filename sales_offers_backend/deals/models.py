@@ -1,8 +1,10 @@
 from django.db import models
 from django.conf import settings
 from django.core.validators import MinValueValidator, MaxValueValidator
+from django.utils import timezone
 from sellers.models import Seller
 from categories.models import Category
+from . import geo
 import uuid
 import qrcode
 from io import BytesIO
@@ -18,6 +20,8 @@ class Deal(models.Model):
     
     title = models.CharField(max_length=200)
     description = models.TextField()
+    # Seller's own identifier, the upsert key for bulk imports (see deals/bulk_import.py)
+    external_id = models.CharField(max_length=100, null=True, blank=True)
     best_price = models.DecimalField(max_digits=10, decimal_places=2, null=True, blank=True)
     image = models.URLField(blank=True, null=True)
     main_image = models.URLField(blank=True, null=True)
@@ -29,8 +33,18 @@ class Deal(models.Model):
     is_verified = models.BooleanField(default=False)
     verification_date = models.DateTimeField(null=True, blank=True)
     rating = models.DecimalField(max_digits=3, decimal_places=2, default=0.0)
+    # Running review aggregates maintained by deals/ratings.py
+    rating_sum = models.PositiveIntegerField(default=0)
+    rating_count = models.PositiveIntegerField(default=0)
+    rating_count_1 = models.PositiveIntegerField(default=0)
+    rating_count_2 = models.PositiveIntegerField(default=0)
+    rating_count_3 = models.PositiveIntegerField(default=0)
+    rating_count_4 = models.PositiveIntegerField(default=0)
+    rating_count_5 = models.PositiveIntegerField(default=0)
     created_at = models.DateTimeField(auto_now_add=True)
     expires_at = models.DateTimeField()
+    # Set when favoriting users were told the deal expires soon, see deals/expiry.py
+    expiry_reminder_sent_at = models.DateTimeField(null=True, blank=True)
     
     # Featured content fields
     is_featured = models.BooleanField(default=False)
@@ -43,19 +57,37 @@ class Deal(models.Model):
     class Meta:
         verbose_name = "Offer"
         verbose_name_plural = "Offers"
+        indexes = [
+            models.Index(fields=['created_at', 'id'], name='deal_created_idx'),
+            models.Index(fields=['status', 'created_at', 'id'], name='deal_status_created_idx'),
+            models.Index(
+                fields=['expires_at', 'id'], name='deal_live_expiry_idx',
+                condition=models.Q(status__in=['pending', 'approved'])
+            ),
+            models.Index(fields=['featured_until'], name='deal_featured_until_idx', condition=models.Q(is_featured=True)),
+        ]
+        constraints = [
+            models.UniqueConstraint(fields=['seller', 'external_id'], name='deal_seller_external_id_uniq'),
+        ]
+    
+    def available_store_links(self):
+        # Reuse prefetched store links when a list view loaded them up front
+        if 'store_links' in getattr(self, '_prefetched_objects_cache', {}):
+            return [link for link in self.store_links.all() if link.is_available]
+        return list(self.store_links.filter(is_available=True))
     
     @property
     def store_count(self):
-        return self.store_links.filter(is_available=True).count() + self.physical_stores.count()
+        return len(self.available_store_links()) + self.physical_stores.count()
     
     @property
     def lowest_price(self):
-        prices = [link.price for link in self.store_links.filter(is_available=True) if link.price]
+        prices = [link.price for link in self.available_store_links() if link.price]
         return min(prices) if prices else None
     
     @property
     def highest_price(self):
-        prices = [link.price for link in self.store_links.filter(is_available=True) if link.price]
+        prices = [link.price for link in self.available_store_links() if link.price]
         return max(prices) if prices else None
     
     @property
@@ -91,13 +123,51 @@ class StoreLink(models.Model):
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
     
+    # Health check state maintained by deals/link_health.py
+    last_checked_at = models.DateTimeField(null=True, blank=True)
+    next_check_at = models.DateTimeField(null=True, blank=True)
+    last_check_status = models.PositiveSmallIntegerField(null=True, blank=True)
+    check_failures = models.PositiveSmallIntegerField(default=0)
+    etag = models.CharField(max_length=200, blank=True)
+    last_modified = models.CharField(max_length=100, blank=True)
+    auto_disabled = models.BooleanField(default=False)
+    
     class Meta:
         unique_together = ['deal', 'store_name']
         ordering = ['price']
+        indexes = [
+            models.Index(fields=['next_check_at', 'id'], name='storelink_next_check_idx'),
+        ]
+    
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        # Remember the stored price so a save only records history when it moved
+        if 'price' in instance.__dict__:
+            instance._stored_price = instance.price
+        return instance
     
     def __str__(self):
         return f"{self.deal.title} - {self.store_name}"
 
+class StoreLinkPriceHistory(models.Model):
+    """Append-only: one row each time a store link's price changes, see deals/price_history.py"""
+    store_link = models.ForeignKey(StoreLink, on_delete=models.CASCADE, related_name='price_history')
+    # Denormalised from store_link so charts and drop detection never join through it
+    deal = models.ForeignKey(Deal, on_delete=models.CASCADE, related_name='price_history')
+    price = models.DecimalField(max_digits=10, decimal_places=2)
+    previous_price = models.DecimalField(max_digits=10, decimal_places=2, null=True, blank=True)
+    recorded_at = models.DateTimeField(default=timezone.now)
+    
+    class Meta:
+        indexes = [
+            models.Index(fields=['deal', 'recorded_at'], name='pricehist_deal_recorded_idx'),
+            models.Index(fields=['store_link', 'recorded_at'], name='pricehist_link_recorded_idx'),
+        ]
+    
+    def __str__(self):
+        return f"{self.store_link_id}: {self.previous_price} -> {self.price}"
+
 class DealImage(models.Model):
     deal = models.ForeignKey(Deal, on_delete=models.CASCADE, related_name='images')
     image_url = models.URLField()
@@ -119,15 +189,36 @@ class Review(models.Model):
     rating = models.IntegerField(validators=[MinValueValidator(1), MaxValueValidator(5)])
     title = models.CharField(max_length=200)
     comment = models.TextField()
+    helpful_count = models.PositiveIntegerField(default=0)
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
     
     class Meta:
         unique_together = ('deal', 'customer')
+        indexes = [
+            models.Index(fields=['deal', 'created_at', 'id'], name='review_deal_created_idx'),
+            models.Index(fields=['deal', 'rating', 'id'], name='review_deal_rating_idx'),
+            models.Index(fields=['deal', 'helpful_count', 'id'], name='review_deal_helpful_idx'),
+        ]
+    
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        # Remember the stored rating so an edit only moves the aggregates by the difference
+        instance._stored_rating = instance.__dict__.get('rating')
+        return instance
     
     def __str__(self):
         return f"{self.customer.username} - {self.deal.title} ({self.rating}/5)"
 
+class ReviewHelpfulVote(models.Model):
+    review = models.ForeignKey(Review, on_delete=models.CASCADE, related_name='helpful_votes')
+    user = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name='helpful_review_votes')
+    created_at = models.DateTimeField(auto_now_add=True)
+    
+    class Meta:
+        unique_together = ('review', 'user')
+
 # Featured content management
 class FeaturedContent(models.Model):
     CONTENT_TYPES = [
@@ -154,6 +245,9 @@ class FeaturedContent(models.Model):
     class Meta:
         unique_together = ['content_type', 'object_id']
         ordering = ['-priority', '-created_at']
+        indexes = [
+            models.Index(fields=['expires_at'], name='featured_active_expiry_idx', condition=models.Q(is_active=True)),
+        ]
     
     def __str__(self):
         return f"Featured {self.content_type} #{self.object_id}"
@@ -164,6 +258,8 @@ class PhysicalStore(models.Model):
     address = models.CharField(max_length=500)
     latitude = models.DecimalField(max_digits=9, decimal_places=6, null=True, blank=True)
     longitude = models.DecimalField(max_digits=9, decimal_places=6, null=True, blank=True)
+    # Grid cell of (latitude, longitude) for radius searches, see deals/geo.py
+    geo_cell = models.IntegerField(null=True, blank=True, db_index=True, editable=False)
     phone_number = models.CharField(max_length=50, blank=True)
     opening_hours = models.CharField(max_length=200, blank=True)
     map_url = models.URLField(blank=True, null=True)
@@ -171,6 +267,13 @@ class PhysicalStore(models.Model):
 
     def __str__(self):
         return f"{self.store_name} ({self.deal.title})"
+    
+    def save(self, *args, **kwargs):
+        self.geo_cell = geo.geo_cell(self.latitude, self.longitude)
+        update_fields = kwargs.get('update_fields')
+        if update_fields is not None and {'latitude', 'longitude'} & set(update_fields):
+            kwargs['update_fields'] = set(update_fields) | {'geo_cell'}
+        super().save(*args, **kwargs)
 
 class PhysicalStoreImage(models.Model):
     store = models.ForeignKey(PhysicalStore, on_delete=models.CASCADE, related_name='images')
@@ -0,0 +1,73 @@
+from django.db.models import Q
+from rest_framework.exceptions import ValidationError
+from rest_framework.pagination import BasePagination
+from rest_framework.response import Response
+from backend.admin_listing import decode_cursor, encode_cursor
+
+
+class ReviewCursorPagination(BasePagination):
+    """
+    Keyset pagination over (sort column, id) for a deal's reviews.
+
+    ``sort`` picks one of SORTS; each is backed by a (deal, column, id)
+    index so every page is an index range scan however deep the client
+    scrolls. Pages only move forward, following ``next``.
+    """
+    SORTS = {
+        'newest': ('created_at', True),
+        'highest': ('rating', True),
+        'lowest': ('rating', False),
+        'helpful': ('helpful_count', True),
+    }
+    default_sort = 'newest'
+    default_limit = 10
+    max_limit = 50
+
+    def get_limit(self, request):
+        try:
+            limit = int(request.query_params.get('limit', self.default_limit))
+        except ValueError:
+            limit = self.default_limit
+        return max(1, min(limit, self.max_limit))
+
+    def get_sort(self, request):
+        sort = request.query_params.get('sort', self.default_sort)
+        if sort not in self.SORTS:
+            raise ValidationError({'sort': f"Choose one of: {', '.join(self.SORTS)}"})
+        return sort
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.limit = self.get_limit(request)
+        self.sort = self.get_sort(request)
+        field, descending = self.SORTS[self.sort]
+        self.field = field
+
+        cursor = request.query_params.get('cursor')
+        if cursor:
+            value, pk, _ = decode_cursor(cursor)
+            op = 'lt' if descending else 'gt'
+            try:
+                queryset = queryset.filter(Q(**{f'{field}__{op}': value}) | Q(**{field: value, f'id__{op}': pk}))
+            except (ValueError, TypeError):
+                raise ValidationError({'cursor': 'Invalid cursor'})
+
+        prefix = '-' if descending else ''
+        page = list(queryset.order_by(f'{prefix}{field}', f'{prefix}id')[:self.limit + 1])
+        self.has_next = len(page) > self.limit
+        self.page = page[:self.limit]
+        return self.page
+
+    def get_next_cursor(self):
+        if not (self.page and self.has_next):
+            return None
+        last = self.page[-1]
+        return encode_cursor([getattr(last, self.field), last.id], 'next')
+
+    def get_paginated_response(self, data, **extra):
+        return Response({
+            **extra,
+            'results': data,
+            'next': self.get_next_cursor(),
+            'sort': self.sort,
+            'limit': self.limit,
+        })
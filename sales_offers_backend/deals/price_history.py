@@ -0,0 +1,204 @@
+"""
+Price history for store links.
+
+StoreLinkPriceHistory is append-only and holds one row per price change,
+carrying the price it replaced, so a link that is re-checked a thousand times
+at the same price costs nothing. ``record_price_changes`` is the single write
+path: the StoreLink post_save signal feeds it one link, bulk writers feed it
+a batch and it inserts with one statement.
+
+Reading:
+
+* ``price_series`` returns per-link step series for a deal, reduced to at
+  most three points (open, low and close) per time bucket so a chart gets a
+  bounded payload whatever the change rate;
+* ``find_price_drops`` finds, in one grouped query per chunk of history
+  rows, every store link of a favorited deal whose price dropped and still
+  sits at the lower price, and keeps the largest drop per deal;
+  ``detect_price_drops`` turns them into notifications in bulk.
+"""
+from datetime import timedelta
+from decimal import Decimal
+from django.db.models import Exists, F, Max, Min, OuterRef, Subquery
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+
+JOB_NAME = 'deals.price_drops'
+# How far back the very first run looks; later runs resume from the previous run
+DETECTOR_LOOKBACK = timedelta(hours=24)
+# How long after its recorded_at a history row may still commit and be announced
+COMMIT_LAG = timedelta(minutes=15)
+
+
+def as_price(value):
+    if value is None or value == '':
+        return None
+    return Decimal(str(value)).quantize(Decimal('0.01'))
+
+
+def record_price_changes(changes, recorded_at=None):
+    """
+    Append a history row for each (store_link, previous_price) whose price
+    differs from ``previous_price``. Links without a price are skipped.
+    Returns the rows written.
+    """
+    from .models import StoreLinkPriceHistory
+
+    recorded_at = recorded_at or timezone.now()
+    rows = []
+    for link, previous in changes:
+        price, previous = as_price(link.price), as_price(previous)
+        if price is None or price == previous:
+            continue
+        rows.append(StoreLinkPriceHistory(
+            store_link_id=link.pk, deal_id=link.deal_id, price=price,
+            previous_price=previous, recorded_at=recorded_at,
+        ))
+    if rows:
+        StoreLinkPriceHistory.objects.bulk_create(rows, batch_size=1000)
+    return rows
+
+
+def last_recorded_price(store_link_id):
+    from .models import StoreLinkPriceHistory
+
+    return StoreLinkPriceHistory.objects.filter(store_link_id=store_link_id).order_by(
+        '-recorded_at', '-id'
+    ).values_list('price', flat=True).first()
+
+
+def downsample(points, start, end, buckets):
+    """
+    Reduce time-ordered (timestamp, price) changes to at most three per
+    bucket: the first, the lowest and the last, in time order. Short series
+    are returned untouched.
+    """
+    if len(points) <= buckets:
+        return points
+    width = (end - start) / buckets
+    reduced = []
+    bucket, kept = None, None
+    for point in points:
+        index = min(int((point[0] - start) / width), buckets - 1) if width else 0
+        if index != bucket:
+            if kept:
+                reduced.extend(sorted(set(kept)))
+            bucket, kept = index, [point, point, point]
+        elif point[1] < kept[1][1]:
+            kept[1] = point
+        kept[2] = point
+    reduced.extend(sorted(set(kept)))
+    return reduced
+
+
+def price_series(deal_id, since, until=None, buckets=100):
+    """
+    Step series per available store link of a deal between ``since`` and
+    ``until``. Each series opens at ``since`` with the price in effect then
+    (if there was one) so charts start flat rather than empty.
+    """
+    from .models import StoreLink, StoreLinkPriceHistory
+
+    until = until or timezone.now()
+    history = StoreLinkPriceHistory.objects.filter(deal_id=deal_id)
+    links = StoreLink.objects.filter(deal_id=deal_id, is_available=True).annotate(
+        opening_price=Subquery(
+            history.filter(store_link_id=OuterRef('pk'), recorded_at__lt=since).order_by(
+                '-recorded_at', '-id'
+            ).values('price')[:1]
+        )
+    ).only('id', 'store_name', 'price').order_by('id')
+    changes = {}
+    for link_id, recorded_at, price in history.filter(
+        recorded_at__gte=since, recorded_at__lte=until
+    ).order_by('recorded_at', 'id').values_list('store_link_id', 'recorded_at', 'price'):
+        changes.setdefault(link_id, []).append((recorded_at, price))
+
+    series = []
+    for link in links:
+        points = changes.get(link.id, [])
+        if link.opening_price is not None:
+            points.insert(0, (since, link.opening_price))
+        points = downsample(points, since, until, buckets)
+        series.append({
+            'store_link_id': link.id,
+            'store_name': link.store_name,
+            'current_price': float(link.price) if link.price is not None else None,
+            'points': [[recorded_at.isoformat(), float(price)] for recorded_at, price in points],
+        })
+    return series
+
+
+def find_price_drops(history_ids, chunk_size=500):
+    """
+    Favorited deals with a price drop among the given history rows, as dicts
+    of deal_id, title, store_name, old_price and new_price. Drops are
+    measured per store link, so both prices are the same shop's; a deal with
+    several dropped links reports the largest drop. A drop only counts while
+    its link still sells at the lower price, so a flash sale that is already
+    over is not announced.
+    """
+    from .models import StoreLinkPriceHistory
+    from accounts.models import Favorite
+
+    largest = {}
+    for start in range(0, len(history_ids), chunk_size):
+        link_drops = (
+            StoreLinkPriceHistory.objects.filter(
+                id__in=history_ids[start:start + chunk_size],
+                price__lt=F('previous_price'),
+                price=F('store_link__price'),
+                store_link__is_available=True,
+            ).filter(
+                Exists(Favorite.objects.filter(offer_id=OuterRef('deal_id')))
+            ).values('deal_id', 'store_link_id').annotate(
+                title=Max('deal__title'),
+                store_name=Max('store_link__store_name'),
+                old_price=Max('previous_price'),
+                new_price=Min('price'),
+            ).order_by('deal_id', 'store_link_id')
+        )
+        for drop in link_drops:
+            best = largest.get(drop['deal_id'])
+            if best is None or drop['old_price'] - drop['new_price'] > best['old_price'] - best['new_price']:
+                largest[drop['deal_id']] = drop
+    return [
+        {key: drop[key] for key in ('deal_id', 'title', 'store_name', 'old_price', 'new_price')}
+        for drop in largest.values()
+    ]
+
+
+def detect_price_drops():
+    """
+    Notify favoriting users of every price drop recorded since the previous
+    run. Ids are handed out before commit, so a row can become visible after
+    a higher id did and an id watermark would skip it. Each run therefore
+    re-scans history recorded since the previous run minus COMMIT_LAG and
+    leaves out the rows it already saw there; their ids and the run time are
+    kept in the job's JobState row, so separate cron processes pick up where
+    the last one stopped. Returns counts of deals with drops and
+    notifications created, or None when another run holds the lock.
+    """
+    from admin_system.jobs import job_lock, load_state, save_state
+    from .models import StoreLinkPriceHistory
+    from accounts.notification_service import NotificationService
+
+    with job_lock(JOB_NAME, timeout=600) as acquired:
+        if not acquired:
+            return None
+        now = timezone.now()
+        state = load_state(JOB_NAME)
+        scanned_at = parse_datetime(state['scanned_at']) if state.get('scanned_at') else None
+        since = scanned_at - COMMIT_LAG if scanned_at else now - DETECTOR_LOOKBACK
+        seen = set(state.get('seen', ()))
+
+        rows = list(StoreLinkPriceHistory.objects.filter(recorded_at__gte=since).values_list('id', 'recorded_at'))
+        # Drops are only looked for among these ids, so a row committing meanwhile waits for the next run
+        fresh = sorted(pk for pk, recorded_at in rows if pk not in seen)
+        drops = find_price_drops(fresh) if fresh else []
+        created = NotificationService.notify_price_drops(drops) if drops else 0
+        save_state(JOB_NAME, {
+            'scanned_at': now.isoformat(),
+            'seen': sorted(pk for pk, recorded_at in rows if recorded_at >= now - COMMIT_LAG),
+        })
+    return {'deals': len(drops), 'notifications': created}
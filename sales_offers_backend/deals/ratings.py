@@ -0,0 +1,118 @@
+"""
+Running rating aggregates for deals and sellers.
+
+Deal keeps ``rating_sum``, ``rating_count`` and one counter per star;
+Seller keeps ``rating_sum`` next to ``total_reviews``. A review being
+created, edited or deleted applies its delta with a single UPDATE per table
+built from F() expressions, so concurrent reviews never lose an increment
+and nothing is re-aggregated. ``rating`` is recomputed in the same statement
+from the pre-update column values plus the delta.
+"""
+from django.db import transaction
+from django.db.models import Case, Count, DecimalField, F, FloatField, Q, Subquery, Sum, Value, When
+from django.db.models.functions import Cast, Round
+
+STARS = range(1, 6)
+
+
+def star_field(stars):
+    return f'rating_count_{stars}'
+
+
+def average_expression(sum_field, count_field, sum_delta, count_delta):
+    new_count = F(count_field) + count_delta
+    average = Round(Cast(F(sum_field) + sum_delta, FloatField()) / new_count, 2)
+    return Case(
+        When(Q(**{f'{count_field}__gt': -count_delta}), then=Cast(average, DecimalField(max_digits=3, decimal_places=2))),
+        default=Value(0, output_field=DecimalField(max_digits=3, decimal_places=2)),
+    )
+
+
+def apply_rating_change(deal_id, old=None, new=None):
+    """
+    Move the aggregates of ``deal_id`` and its seller from a review rated
+    ``old`` to one rated ``new``. ``old=None`` is a new review and
+    ``new=None`` a deleted one.
+    """
+    from .models import Deal
+    from sellers.models import Seller
+
+    if old == new:
+        return
+    sum_delta = (new or 0) - (old or 0)
+    count_delta = (new is not None) - (old is not None)
+
+    deal_updates = {
+        'rating_sum': F('rating_sum') + sum_delta,
+        'rating_count': F('rating_count') + count_delta,
+        'rating': average_expression('rating_sum', 'rating_count', sum_delta, count_delta),
+    }
+    if old is not None:
+        deal_updates[star_field(old)] = F(star_field(old)) - 1
+    if new is not None:
+        deal_updates[star_field(new)] = F(star_field(new)) + 1
+
+    with transaction.atomic():
+        Deal.objects.filter(pk=deal_id).update(**deal_updates)
+        if count_delta or sum_delta:
+            Seller.objects.filter(
+                pk=Subquery(Deal.objects.filter(pk=deal_id).values('seller_id')[:1])
+            ).update(
+                rating_sum=F('rating_sum') + sum_delta,
+                total_reviews=F('total_reviews') + count_delta,
+                rating=average_expression('rating_sum', 'total_reviews', sum_delta, count_delta),
+            )
+
+
+def aggregate_reviews(reviews):
+    """Full recount of sum, count and per-star counts for a review queryset"""
+    totals = reviews.aggregate(
+        rating_sum=Sum('rating', default=0),
+        rating_count=Count('id'),
+        **{star_field(stars): Count('id', filter=Q(rating=stars)) for stars in STARS}
+    )
+    count = totals['rating_count']
+    totals['rating'] = round(totals['rating_sum'] / count, 2) if count else 0
+    return totals
+
+
+def recount_ratings(deal_id):
+    """Rebuild a deal's and its seller's aggregates from their reviews"""
+    from .models import Deal, Review
+    from sellers.models import Seller
+
+    with transaction.atomic():
+        Deal.objects.filter(pk=deal_id).update(**aggregate_reviews(Review.objects.filter(deal_id=deal_id)))
+        seller_id = Deal.objects.filter(pk=deal_id).values_list('seller_id', flat=True).first()
+        if seller_id is not None:
+            totals = aggregate_reviews(Review.objects.filter(deal__seller_id=seller_id))
+            Seller.objects.filter(pk=seller_id).update(
+                rating_sum=totals['rating_sum'], total_reviews=totals['rating_count'], rating=totals['rating']
+            )
+
+
+def rating_distribution(deal):
+    """Star histogram as {'1': n, ..., '5': n} straight from the deal row"""
+    return {str(stars): getattr(deal, star_field(stars)) for stars in STARS}
+
+
+def get_review_summary(deal_id):
+    """
+    Average, count and star distribution for a deal; None if the deal does
+    not exist. The counters are denormalized onto the deal row, so this is a
+    single primary key lookup and is not cached: a per-process cache went
+    stale in every worker but the one that saw the review, and a version
+    check would cost the same query.
+    """
+    from .models import Deal
+
+    deal = Deal.objects.filter(pk=deal_id).only(
+        'rating', 'rating_count', *(star_field(stars) for stars in STARS)
+    ).first()
+    if deal is None:
+        return None
+    return {
+        'average': float(deal.rating),
+        'count': deal.rating_count,
+        'distribution': rating_distribution(deal),
+    }
@@ -2,9 +2,10 @@ from rest_framework.decorators import api_view, permission_classes
 from rest_framework.permissions import IsAuthenticated
 from rest_framework.response import Response
 from rest_framework import status
-from django.db.models import Avg
-from .models import Review, Deal  # Removed Voucher for affiliate platform
-from sellers.models import Seller
+from django.db.models import F
+from .models import Review, ReviewHelpfulVote, Deal  # Removed Voucher for affiliate platform
+from .pagination import ReviewCursorPagination
+from .ratings import get_review_summary
 
 @api_view(['POST'])
 @permission_classes([IsAuthenticated])
@@ -38,8 +39,7 @@ def create_review(request):
             comment=comment
         )
         
-        # Update deal rating
-        update_deal_rating(deal)
+        # Deal and seller rating aggregates are moved by the Review signals
         
         return Response({
             'id': review.id,
@@ -54,42 +54,42 @@ def create_review(request):
     except Exception as e:
         return Response({'error': str(e)}, status=500)
 
+def serialize_review(review):
+    return {
+        'id': review.id,
+        'rating': review.rating,
+        'title': review.title,
+        'comment': review.comment,
+        'helpful_count': review.helpful_count,
+        'customer_name': review.customer.first_name or review.customer.username,
+        'created_at': review.created_at
+    }
+
 @api_view(['GET'])
 def get_deal_reviews(request, deal_id):
-    """Get all reviews for a deal"""
-    try:
-        deal = Deal.objects.get(id=deal_id)
-        reviews = Review.objects.filter(deal=deal).select_related('customer').order_by('-created_at')
-        
-        review_data = []
-        for review in reviews:
-            review_data.append({
-                'id': review.id,
-                'rating': review.rating,
-                'title': review.title,
-                'comment': review.comment,
-                'customer_name': review.customer.first_name or review.customer.username,
-                'created_at': review.created_at
-            })
-        
-        return Response(review_data)
-        
-    except Deal.DoesNotExist:
+    """Get a page of a deal's reviews with its rating summary"""
+    summary = get_review_summary(deal_id)
+    if summary is None:
         return Response({'error': 'Deal not found'}, status=404)
+    
+    reviews = Review.objects.filter(deal_id=deal_id).select_related('customer').only(
+        'id', 'rating', 'title', 'comment', 'helpful_count', 'created_at',
+        'customer__first_name', 'customer__username'
+    )
+    paginator = ReviewCursorPagination()
+    page = paginator.paginate_queryset(reviews, request)
+    return paginator.get_paginated_response([serialize_review(review) for review in page], summary=summary)
 
-def update_deal_rating(deal):
-    """Update deal's average rating"""
-    reviews = Review.objects.filter(deal=deal)
-    if reviews.exists():
-        avg_rating = reviews.aggregate(Avg('rating'))['rating__avg']
-        deal.rating = round(avg_rating, 2)
-        deal.save()
-        
-        # Also update seller rating
-        seller = deal.seller
-        seller_reviews = Review.objects.filter(deal__seller=seller)
-        if seller_reviews.exists():
-            seller_avg = seller_reviews.aggregate(Avg('rating'))['rating__avg']
-            seller.rating = round(seller_avg, 2)
-            seller.total_reviews = seller_reviews.count()
-            seller.save()
\ No newline at end of file
+@api_view(['POST'])
+@permission_classes([IsAuthenticated])
+def mark_review_helpful(request, review_id):
+    """Count a user's helpful vote on a review once"""
+    if not Review.objects.filter(id=review_id).exists():
+        return Response({'error': 'Review not found'}, status=404)
+    
+    _, created = ReviewHelpfulVote.objects.get_or_create(review_id=review_id, user=request.user)
+    if created:
+        Review.objects.filter(id=review_id).update(helpful_count=F('helpful_count') + 1)
+    
+    helpful_count = Review.objects.filter(id=review_id).values_list('helpful_count', flat=True).first()
+    return Response({'helpful_count': helpful_count, 'voted': True})
@@ -53,4 +53,41 @@ class DealSerializer(serializers.ModelSerializer):
             'seller', 'category', 'location', 'store_count', 'lowest_price', 'highest_price',
             'price_range', 'click_count', 'store_links', 'physical_stores', 'status', 'is_published', 'created_at', 'expires_at'
         ]
-        read_only_fields = ['store_count', 'lowest_price', 'highest_price', 'price_range', 'click_count', 'images', 'store_links', 'physical_stores']
\ No newline at end of file
+        read_only_fields = ['store_count', 'lowest_price', 'highest_price', 'price_range', 'click_count', 'images', 'store_links', 'physical_stores']
+
+class StoreLinkImportSerializer(serializers.Serializer):
+    store_name = serializers.CharField(max_length=100)
+    store_url = serializers.URLField(max_length=500)
+    price = serializers.DecimalField(max_digits=10, decimal_places=2, required=False, allow_null=True, default=None)
+    coupon_code = serializers.CharField(max_length=50, required=False, allow_blank=True, default='')
+    coupon_discount = serializers.CharField(max_length=20, required=False, allow_blank=True, default='')
+    is_available = serializers.BooleanField(required=False, default=True)
+
+class StoreLinkBulkSerializer(serializers.Serializer):
+    """One item of a bulk store link update; omitted fields keep their current value"""
+    deal = serializers.IntegerField()
+    store_name = serializers.CharField(max_length=100)
+    store_url = serializers.URLField(max_length=500, required=False)
+    price = serializers.DecimalField(max_digits=10, decimal_places=2, required=False, allow_null=True)
+    coupon_code = serializers.CharField(max_length=50, required=False, allow_blank=True)
+    coupon_discount = serializers.CharField(max_length=20, required=False, allow_blank=True)
+    is_available = serializers.BooleanField(required=False)
+
+class DealImportSerializer(serializers.Serializer):
+    """One row of a bulk import, see deals/bulk_import.py"""
+    external_id = serializers.CharField(max_length=100)
+    title = serializers.CharField(max_length=200)
+    description = serializers.CharField()
+    expires_at = serializers.DateTimeField()
+    best_price = serializers.DecimalField(max_digits=10, decimal_places=2, required=False, allow_null=True, default=None)
+    image = serializers.URLField(required=False, allow_null=True, allow_blank=True, default=None)
+    category = serializers.CharField(max_length=100, required=False, default='General')
+    location = serializers.CharField(max_length=200, required=False, allow_blank=True, default='')
+    is_published = serializers.BooleanField(required=False, default=True)
+    store_links = StoreLinkImportSerializer(many=True, required=False, default=list)
+    
+    def validate_store_links(self, value):
+        names = [link['store_name'] for link in value]
+        if len(names) != len(set(names)):
+            raise serializers.ValidationError('Each store may only appear once per deal')
+        return value
@@ -0,0 +1,56 @@
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import receiver
+from backend import content_versions
+from .models import Deal, DealImage, FeaturedContent, PhysicalStore, PhysicalStoreImage, Review, StoreLink
+from .ratings import apply_rating_change
+from .price_history import last_recorded_price, record_price_changes
+
+@receiver(post_save, sender=Review)
+def update_ratings_on_review_save(sender, instance, created, **kwargs):
+    old = None if created else getattr(instance, '_stored_rating', None)
+    if not created and old is None:
+        # Loaded without its rating (deferred) - the old value is unknown, so recount
+        from .ratings import recount_ratings
+        recount_ratings(instance.deal_id)
+    else:
+        apply_rating_change(instance.deal_id, old=old, new=instance.rating)
+    instance._stored_rating = instance.rating
+    content_versions.bump('deals', 'sellers')
+
+@receiver(post_delete, sender=Review)
+def update_ratings_on_review_delete(sender, instance, **kwargs):
+    apply_rating_change(instance.deal_id, old=getattr(instance, '_stored_rating', instance.rating), new=None)
+    content_versions.bump('deals', 'sellers')
+
+@receiver(post_save, sender=StoreLink)
+def record_store_link_price(sender, instance, created, update_fields=None, **kwargs):
+    if update_fields is not None and 'price' not in update_fields:
+        return
+    if created:
+        previous = None
+    elif hasattr(instance, '_stored_price'):
+        previous = instance._stored_price
+    else:
+        # Loaded with the price deferred - fall back to the last recorded one
+        previous = last_recorded_price(instance.pk)
+    record_price_changes([(instance, previous)])
+    instance._stored_price = instance.price
+
+@receiver(post_save, sender=Deal)
+@receiver(post_delete, sender=Deal)
+@receiver(post_save, sender=StoreLink)
+@receiver(post_delete, sender=StoreLink)
+@receiver(post_save, sender=DealImage)
+@receiver(post_delete, sender=DealImage)
+@receiver(post_save, sender=PhysicalStore)
+@receiver(post_delete, sender=PhysicalStore)
+@receiver(post_save, sender=PhysicalStoreImage)
+@receiver(post_delete, sender=PhysicalStoreImage)
+def bump_deals_version(sender, instance, **kwargs):
+    """Public deal payloads embed links, images and stores, so any of them changes the deals stamp"""
+    content_versions.bump('deals')
+
+@receiver(post_save, sender=FeaturedContent)
+@receiver(post_delete, sender=FeaturedContent)
+def bump_featured_version(sender, instance, **kwargs):
+    content_versions.bump('featured')
@@ -0,0 +1,189 @@
+"""
+Diff-based bulk writes of StoreLinks.
+
+``sync_store_links`` takes rows keyed on (deal_id, store_name), loads the
+current links for the whole batch in one query and compares field by field:
+
+* unknown keys are inserted with one bulk_create; one that a concurrent
+  writer inserted first is skipped there and diffed like a known key;
+* known keys with differences get one bulk_update limited to the fields that
+  actually changed anywhere in the batch;
+* identical rows are not written at all.
+
+Fields a row leaves out keep their current value, so a price feed can send
+just ``price`` and ``is_available``. Price changes are appended to the price
+history; a changed URL resets the link's health-check state; setting
+``is_available`` by hand takes the link out of the health checker's
+automatic re-enabling.
+
+``sync_seller_store_links`` is the entry point for seller feeds: it
+validates items, drops those for other sellers' deals and syncs the rest a
+batch at a time.
+"""
+from itertools import islice
+from django.db import transaction
+from backend import content_versions
+from django.utils import timezone
+from .models import Deal, StoreLink
+from .price_history import as_price, record_price_changes
+from .serializers import StoreLinkBulkSerializer
+
+BATCH_SIZE = 500
+MAX_REPORTED_ERRORS = 200
+SYNC_FIELDS = ('store_url', 'price', 'coupon_code', 'coupon_discount', 'is_available')
+# Health-check state that belongs to the old URL, see deals/link_health.py
+URL_STATE_RESET = {'etag': '', 'last_modified': '', 'next_check_at': None, 'check_failures': 0}
+
+
+def normalize(field, value):
+    return as_price(value) if field == 'price' else value
+
+
+def changed_fields(link, row):
+    return [
+        field for field in SYNC_FIELDS
+        if field in row and normalize(field, getattr(link, field)) != normalize(field, row[field])
+    ]
+
+
+def apply_row(link, row, now):
+    """Copy the row's differences onto link; returns the fields to write, empty when nothing changed"""
+    fields = changed_fields(link, row)
+    if not fields:
+        return fields
+    for field in fields:
+        setattr(link, field, row[field])
+    if 'store_url' in fields:
+        for field, value in URL_STATE_RESET.items():
+            setattr(link, field, value)
+        fields += list(URL_STATE_RESET)
+    if 'is_available' in fields:
+        link.auto_disabled = False
+        fields.append('auto_disabled')
+    link.updated_at = now
+    return fields
+
+
+def load_links(keys):
+    """Current links for (deal_id, store_name) keys, with just the fields a diff needs"""
+    links = StoreLink.objects.filter(
+        deal_id__in={deal_id for deal_id, _ in keys},
+        store_name__in={name for _, name in keys},
+    ).only('id', 'deal_id', 'store_name', 'auto_disabled', *SYNC_FIELDS)
+    return {(link.deal_id, link.store_name): link for link in links}
+
+
+def sync_store_links(rows, now=None):
+    """
+    Write dicts of deal_id, store_name and any of SYNC_FIELDS; a repeated
+    key keeps its last row. Returns counts of created, updated and
+    unchanged links, and the (deal_id, store_name) keys of rejected rows
+    with their reason.
+    """
+    now = now or timezone.now()
+    by_key = {(row['deal_id'], row['store_name']): row for row in rows}
+    stats = {'created': 0, 'updated': 0, 'unchanged': 0, 'rejected': []}
+    if not by_key:
+        return stats
+
+    created, updated, update_fields, price_changes = [], [], set(), []
+
+    def stage_update(link, row):
+        old_price = link.price
+        fields = apply_row(link, row, now)
+        if fields:
+            if 'price' in fields:
+                price_changes.append((link, old_price))
+            update_fields.update(fields)
+            updated.append(link)
+        return bool(fields)
+
+    existing = load_links(by_key)
+    for key, row in by_key.items():
+        link = existing.get(key)
+        if link is None:
+            if not row.get('store_url'):
+                stats['rejected'].append((key, 'store_url is required for a new store link'))
+            else:
+                created.append(StoreLink(**row))
+        elif not stage_update(link, row):
+            stats['unchanged'] += 1
+
+    # Joins the caller's transaction when there is one (e.g. a bulk import batch)
+    with transaction.atomic(savepoint=False):
+        if created:
+            StoreLink.objects.bulk_create(created, ignore_conflicts=True, batch_size=1000)
+            # Inserts do not hand back primary keys on every backend, and a link added concurrently
+            # was skipped; reloading the keys settles both, and the latter goes through the update
+            # branch so it gets the same partial write, health-check reset and price history
+            stored = load_links([(link.deal_id, link.store_name) for link in created])
+            inserted = []
+            for link in created:
+                key = (link.deal_id, link.store_name)
+                current = stored.get(key)
+                if current is None:
+                    stats['rejected'].append((key, 'store link was removed while syncing'))
+                elif not stage_update(current, by_key[key]):
+                    link.pk = current.pk
+                    inserted.append(link)
+            created = inserted
+            price_changes.extend((link, None) for link in created)
+        if updated:
+            StoreLink.objects.bulk_update(updated, sorted(update_fields) + ['updated_at'], batch_size=500)
+        record_price_changes(price_changes, recorded_at=now)
+        if created or updated:
+            content_versions.bump('deals')
+
+    stats['created'] = len(created)
+    stats['updated'] = len(updated)
+    return stats
+
+
+def sync_seller_store_links(seller, items, batch_size=BATCH_SIZE):
+    """
+    Validate and write a seller's bulk store link items in batches. Each
+    batch costs one ownership lookup and one sync_store_links call; items
+    for deals the seller does not own are rejected. Returns a summary with
+    per-item errors by index.
+    """
+    summary = {'received': 0, 'created': 0, 'updated': 0, 'unchanged': 0, 'failed': 0, 'errors': []}
+
+    def reject(index, errors):
+        summary['failed'] += 1
+        if len(summary['errors']) < MAX_REPORTED_ERRORS:
+            summary['errors'].append({'index': index, 'errors': errors})
+
+    items = iter(enumerate(items))
+    while True:
+        batch = list(islice(items, batch_size))
+        if not batch:
+            break
+        summary['received'] += len(batch)
+        rows = {}
+        for index, item in batch:
+            serializer = StoreLinkBulkSerializer(data=item)
+            if not serializer.is_valid():
+                reject(index, serializer.errors)
+                continue
+            row = dict(serializer.validated_data)
+            row['deal_id'] = row.pop('deal')
+            rows[index] = row
+
+        owned = set(Deal.objects.filter(
+            seller=seller, id__in={row['deal_id'] for row in rows.values()}
+        ).values_list('id', flat=True))
+        for index, row in list(rows.items()):
+            if row['deal_id'] not in owned:
+                reject(index, {'deal': ['Deal not found']})
+                del rows[index]
+
+        stats = sync_store_links(rows.values())
+        # A repeated key is written once from its last item; report rejections against that item
+        last_index = {(row['deal_id'], row['store_name']): index for index, row in rows.items()}
+        for key, message in stats.pop('rejected'):
+            reject(last_index[key], {'store_url': [message]})
+        for name, count in stats.items():
+            summary[name] += count
+
+    summary['errors_truncated'] = summary['failed'] > len(summary['errors'])
+    return summary
@@ -1,3 +1,816 @@
-from django.test import TestCase
+import asyncio
+import io
+import json
+import os
+import tempfile
+import threading
+import time
+from datetime import timedelta
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from unittest import mock
+from django.core.cache import cache
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.db import connection, transaction
+from django.test import override_settings
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from rest_framework.authtoken.models import Token
+from rest_framework.test import APITestCase
+from rest_framework import status
+from accounts.models import Favorite, Notification, User
+from accounts.tasks import check_expiring_offers
+from sellers.models import Seller, SellerProfile, Subscription, SubscriptionPlan
+from .models import Deal, FeaturedContent, PhysicalStore, Review, StoreLink, StoreLinkPriceHistory
+from admin_system.jobs import job_lock
+from . import link_health, price_history, store_link_sync
+from .bulk_import import import_deals
+from .expiry import JOB_NAME as EXPIRY_JOB_NAME, DealExpirySweeper
+from backend import content_versions
+from .geo import cell_filter, geo_cell, haversine_km
 
-# Create your tests here.
+
+class AdminDealListingTestCase(APITestCase):
+    def setUp(self):
+        self.admin = User.objects.create_superuser(username='admin', email='admin@example.com', password='testpass123')
+        seller = Seller.objects.create(user=self.admin, business_name='Shop', business_description='Shop', address='Nairobi')
+        self.deals = [
+            Deal.objects.create(
+                title=f'Deal {i}',
+                description='Description',
+                seller=seller,
+                status='approved' if i % 2 else 'pending',
+                expires_at=timezone.now() + timedelta(days=7),
+            )
+            for i in range(7)
+        ]
+        self.client.force_authenticate(user=self.admin)
+
+    def test_keyset_pages_forward_and_back(self):
+        """Cursor pages cover every deal once and previous returns to the same page"""
+        first = self.client.get('/api/deals/admin/deals/', {'limit': 3})
+        self.assertEqual(first.status_code, status.HTTP_200_OK)
+        self.assertEqual(first.data['total'], 7)
+        self.assertFalse(first.data['total_is_estimate'])
+        self.assertIsNone(first.data['previous'])
+        seen = [deal['id'] for deal in first.data['results']]
+
+        response = first
+        while response.data['next']:
+            response = self.client.get('/api/deals/admin/deals/', {'limit': 3, 'cursor': response.data['next']})
+            seen.extend(deal['id'] for deal in response.data['results'])
+        self.assertEqual(seen, [deal.id for deal in reversed(self.deals)])
+
+        second = self.client.get('/api/deals/admin/deals/', {'limit': 3, 'cursor': first.data['next']})
+        back = self.client.get('/api/deals/admin/deals/', {'limit': 3, 'cursor': second.data['previous']})
+        self.assertEqual(back.data['results'], first.data['results'])
+        self.assertIsNone(back.data['previous'])
+
+    def test_filters_search_and_sort(self):
+        """Status, search and sort parameters are applied server-side"""
+        response = self.client.get('/api/deals/admin/deals/', {'status': 'approved', 'sort': 'title'})
+        self.assertEqual([deal['title'] for deal in response.data['results']], ['Deal 1', 'Deal 3', 'Deal 5'])
+        response = self.client.get('/api/deals/admin/deals/', {'search': 'deal 4'})
+        self.assertEqual(response.data['total'], 1)
+        response = self.client.get('/api/deals/admin/deals/', {'until': '2000-01-01'})
+        self.assertEqual(response.data['results'], [])
+
+    def test_invalid_parameters_rejected(self):
+        """Unknown sorts and malformed cursors are client errors"""
+        self.assertEqual(self.client.get('/api/deals/admin/deals/', {'sort': 'password'}).status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(self.client.get('/api/deals/admin/deals/', {'cursor': 'garbage'}).status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(self.client.get('/api/deals/admin/deals/', {'since': 'yesterday'}).status_code, status.HTTP_400_BAD_REQUEST)
+
+
+class RatingAggregateTestCase(APITestCase):
+    def setUp(self):
+        self.owner = User.objects.create_user(username='owner', email='owner@example.com', password='testpass123')
+        self.seller = Seller.objects.create(user=self.owner, business_name='Shop', business_description='Shop', address='Nairobi')
+        expires = timezone.now() + timedelta(days=7)
+        self.deal = Deal.objects.create(title='Phone', description='Phone', seller=self.seller, expires_at=expires)
+        self.other = Deal.objects.create(title='Case', description='Case', seller=self.seller, expires_at=expires)
+        self.customers = [
+            User.objects.create_user(username=f'buyer{i}', email=f'buyer{i}@example.com', password='testpass123')
+            for i in range(3)
+        ]
+
+    def review(self, deal, customer, rating):
+        return Review.objects.create(deal=deal, customer=customer, rating=rating, title='Title', comment='Comment')
+
+    def test_create_update_delete_move_aggregates(self):
+        """Review changes adjust running sums, counts and the star histogram"""
+        first = self.review(self.deal, self.customers[0], 5)
+        self.review(self.deal, self.customers[1], 2)
+        self.review(self.other, self.customers[2], 4)
+        self.deal.refresh_from_db()
+        self.seller.refresh_from_db()
+        self.assertEqual((self.deal.rating_sum, self.deal.rating_count, float(self.deal.rating)), (7, 2, 3.5))
+        self.assertEqual((self.deal.rating_count_5, self.deal.rating_count_2), (1, 1))
+        self.assertEqual((self.seller.rating_sum, self.seller.total_reviews, float(self.seller.rating)), (11, 3, 3.67))
+
+        first = Review.objects.get(pk=first.pk)
+        first.rating = 3
+        first.save()
+        self.deal.refresh_from_db()
+        self.assertEqual((self.deal.rating_sum, self.deal.rating_count, self.deal.rating_count_5, self.deal.rating_count_3), (5, 2, 0, 1))
+
+        Review.objects.filter(deal=self.deal).delete()
+        self.deal.refresh_from_db()
+        self.seller.refresh_from_db()
+        self.assertEqual((self.deal.rating_sum, self.deal.rating_count, float(self.deal.rating)), (0, 0, 0))
+        self.assertEqual((self.seller.total_reviews, float(self.seller.rating)), (1, 4))
+
+    def test_rating_update_is_constant_queries(self):
+        """Posting a review does not re-aggregate existing reviews"""
+        for customer in self.customers[:2]:
+            self.review(self.deal, customer, 4)
+        self.client.force_authenticate(user=self.customers[2])
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.post('/api/deals/reviews/', {
+                'deal_id': self.deal.id, 'rating': 1, 'title': 'Meh', 'comment': 'Broke quickly'
+            })
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertFalse(any('AVG(' in query['sql'].upper() for query in queries))
+
+        response = self.client.get(f'/api/deals/{self.deal.id}/reviews/')
+        self.assertEqual(response.data['summary'], {
+            'average': 3.0, 'count': 3, 'distribution': {'1': 1, '2': 0, '3': 0, '4': 2, '5': 0},
+        })
+
+
+class ReviewListingTestCase(APITestCase):
+    def setUp(self):
+        cache.clear()
+        owner = User.objects.create_user(username='owner', email='owner@example.com', password='testpass123')
+        seller = Seller.objects.create(user=owner, business_name='Shop', business_description='Shop', address='Nairobi')
+        self.deal = Deal.objects.create(
+            title='Phone', description='Phone', seller=seller, expires_at=timezone.now() + timedelta(days=7)
+        )
+        self.customers = [
+            User.objects.create_user(username=f'buyer{i}', email=f'buyer{i}@example.com', password='testpass123')
+            for i in range(5)
+        ]
+        self.reviews = [
+            Review.objects.create(deal=self.deal, customer=customer, rating=rating, title='Title', comment='Comment')
+            for customer, rating in zip(self.customers, [4, 2, 5, 4, 1])
+        ]
+        self.url = f'/api/deals/{self.deal.id}/reviews/'
+
+    def collect(self, **params):
+        response = self.client.get(self.url, {'limit': 2, **params})
+        ids = [review['id'] for review in response.data['results']]
+        while response.data['next']:
+            response = self.client.get(self.url, {'limit': 2, 'cursor': response.data['next'], **params})
+            ids.extend(review['id'] for review in response.data['results'])
+        return ids
+
+    def test_sorts_page_through_every_review(self):
+        """Each sort walks all reviews once in order, ties broken by id"""
+        r = [review.id for review in self.reviews]
+        self.assertEqual(self.collect(), r[::-1])
+        self.assertEqual(self.collect(sort='highest'), [r[2], r[3], r[0], r[1], r[4]])
+        self.assertEqual(self.collect(sort='lowest'), [r[4], r[1], r[0], r[3], r[2]])
+        self.assertEqual(self.client.get(self.url, {'sort': 'random'}).status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_summary_follows_review_changes(self):
+        """The summary is one lookup of the deal's counters and follows review changes"""
+        self.client.get(self.url)
+        # The summary and the page of reviews
+        with self.assertNumQueries(2):
+            response = self.client.get(self.url)
+        self.assertEqual(response.data['summary']['count'], 5)
+        self.reviews[4].delete()
+        response = self.client.get(self.url)
+        self.assertEqual(response.data['summary']['count'], 4)
+        self.assertEqual(response.data['summary']['distribution']['1'], 0)
+        self.assertEqual(self.client.get('/api/deals/999999/reviews/').status_code, status.HTTP_404_NOT_FOUND)
+
+    def test_helpful_votes_counted_once(self):
+        """A user's helpful vote counts once and drives the helpful sort"""
+        target = self.reviews[1]
+        self.client.force_authenticate(user=self.customers[0])
+        self.client.post(f'/api/deals/reviews/{target.id}/helpful/')
+        response = self.client.post(f'/api/deals/reviews/{target.id}/helpful/')
+        self.assertEqual(response.data['helpful_count'], 1)
+        self.assertEqual(self.collect(sort='helpful')[0], target.id)
+
+
+class NearbyDealsTestCase(APITestCase):
+    def setUp(self):
+        owner = User.objects.create_user(username='owner', email='owner@example.com', password='testpass123')
+        seller = Seller.objects.create(user=owner, business_name='Shop', business_description='Shop', address='Nairobi')
+        SellerProfile.objects.create(seller=seller, company_name='Shop', description='Shop', phone='0700', email='s@example.com', address='Nairobi')
+        expires = timezone.now() + timedelta(days=7)
+        self.near = Deal.objects.create(title='Near', description='-', seller=seller, status='approved', expires_at=expires)
+        self.far = Deal.objects.create(title='Far', description='-', seller=seller, status='approved', expires_at=expires)
+        self.pending = Deal.objects.create(title='Pending', description='-', seller=seller, expires_at=expires)
+        # Around Nairobi CBD (-1.2864, 36.8172)
+        PhysicalStore.objects.create(deal=self.near, store_name='Westlands', address='-', latitude=-1.2676, longitude=36.8108)
+        PhysicalStore.objects.create(deal=self.near, store_name='Kilimani', address='-', latitude=-1.2921, longitude=36.7836)
+        PhysicalStore.objects.create(deal=self.far, store_name='Thika', address='-', latitude=-1.0333, longitude=37.0693)
+        PhysicalStore.objects.create(deal=self.pending, store_name='CBD', address='-', latitude=-1.2864, longitude=36.8172)
+
+    def test_geo_cell_maintained_on_save(self):
+        """geo_cell follows the coordinates and matches the search cells"""
+        store = PhysicalStore.objects.get(store_name='Westlands')
+        self.assertEqual(store.geo_cell, geo_cell(-1.2676, 36.8108))
+        store.latitude, store.longitude = None, None
+        store.save()
+        self.assertIsNone(PhysicalStore.objects.get(pk=store.pk).geo_cell)
+
+    def test_antimeridian_and_distance(self):
+        """Searches across +-180 keep both sides and haversine matches known distances"""
+        self.assertAlmostEqual(haversine_km(-1.2864, 36.8172, -4.0435, 39.6682), 440, delta=5)
+        cells = set()
+        for child in cell_filter(0, 179.99, 50).children:
+            bounds = dict(child.children)
+            cells.update(range(bounds['geo_cell__gte'], bounds['geo_cell__lte'] + 1))
+        self.assertIn(geo_cell(0.1, 179.9), cells)
+        self.assertIn(geo_cell(0.1, -179.9), cells)
+        self.assertNotIn(geo_cell(0.1, 0), cells)
+
+    def test_nearby_ranks_live_deals(self):
+        """Nearby returns live deals ordered by their nearest store"""
+        response = self.client.get('/api/deals/nearby/', {'lat': -1.2864, 'lng': 36.8172, 'radius_km': 50})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual([result['deal']['id'] for result in response.data['results']], [self.near.id, self.far.id])
+        self.assertEqual(response.data['results'][0]['store']['store_name'], 'Westlands')
+        self.assertLess(response.data['results'][0]['distance_km'], 3)
+
+        response = self.client.get('/api/deals/nearby/', {'lat': -1.2864, 'lng': 36.8172, 'radius_km': 5})
+        self.assertEqual([result['deal']['id'] for result in response.data['results']], [self.near.id])
+        self.assertEqual(self.client.get('/api/deals/nearby/', {'lat': 'x', 'lng': 1}).status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(self.client.get('/api/deals/nearby/', {'lat': 0, 'lng': 0, 'radius_km': 1000}).status_code, status.HTTP_400_BAD_REQUEST)
+
+
+class StubShopHandler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        # Recorded before responding, so the client never sees a reply the test has not
+        self.server.requests.append((self.path, self.headers.get('If-None-Match')))
+        if self.path == '/ok':
+            if self.headers.get('If-None-Match') == '"v1"':
+                self.send_response(304)
+            else:
+                self.send_response(200)
+                self.send_header('ETag', '"v1"')
+        elif self.path == '/moved':
+            self.send_response(301)
+            self.send_header('Location', '/ok')
+        elif self.path == '/slow':
+            time.sleep(0.5)
+            self.send_response(200)
+        elif self.path == '/flaky':
+            self.send_response(503)
+        elif self.path == '/blocked':
+            self.send_response(403)
+        elif self.path == '/escape':
+            self.send_response(302)
+            self.send_header('Location', 'http://169.254.169.254/latest/meta-data/')
+        else:
+            self.send_response(404)
+        self.send_header('Content-Length', '0')
+        self.end_headers()
+
+    def log_message(self, *args):
+        pass
+
+
+class StoreLinkHealthTestCase(APITestCase):
+    def setUp(self):
+        self.server = ThreadingHTTPServer(('127.0.0.1', 0), StubShopHandler)
+        self.server.requests = []
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+        self.base = f'http://127.0.0.1:{self.server.server_address[1]}'
+        # The stub shop lives on loopback, which the checker otherwise refuses
+        self.loopback_allowed = mock.patch.object(link_health, 'address_allowed', lambda address: address.is_global or address.is_loopback)
+        self.loopback_allowed.start()
+        owner = User.objects.create_user(username='owner', email='owner@example.com', password='testpass123')
+        seller = Seller.objects.create(user=owner, business_name='Shop', business_description='Shop', address='Nairobi')
+        self.deal = Deal.objects.create(title='Phone', description='-', seller=seller, expires_at=timezone.now() + timedelta(days=7))
+
+    def tearDown(self):
+        self.loopback_allowed.stop()
+        self.server.shutdown()
+        self.server.server_close()
+
+    def link(self, name, path, **fields):
+        return StoreLink.objects.create(deal=self.deal, store_name=name, store_url=f'{self.base}{path}', **fields)
+
+    def test_links_checked_and_flipped_in_bulk(self):
+        """Healthy links are scheduled, gone ones disabled, manual switches respected"""
+        ok = self.link('Jumia', '/ok')
+        moved = self.link('Kilimall', '/moved')
+        gone = self.link('Amazon', '/gone')
+        restored = self.link('Masoko', '/ok', is_available=False, auto_disabled=True)
+        manual = self.link('Carrefour', '/gone', is_available=False)
+        slow = self.link('Naivas', '/slow')
+
+        stats = link_health.check_due_links(timeout=0.2)
+        self.assertEqual(stats, {
+            'checked': 5, 'healthy': 2, 'restored': 1, 'failed': 1, 'inconclusive': 0, 'disabled': 1, 'conflicts': 0,
+        })
+        for link in (ok, moved, gone, restored, manual, slow):
+            link.refresh_from_db()
+        self.assertEqual((ok.etag, ok.last_check_status), ('"v1"', 200))
+        self.assertTrue(moved.is_available)
+        self.assertEqual((gone.is_available, gone.auto_disabled), (False, True))
+        self.assertEqual((restored.is_available, restored.auto_disabled), (True, False))
+        self.assertIsNone(manual.last_checked_at)
+        self.assertEqual((slow.is_available, slow.check_failures, slow.last_check_status), (True, 1, None))
+        self.assertGreater(ok.next_check_at, slow.next_check_at)
+
+        # Nothing is due until the schedule comes round; then validators are sent
+        self.assertEqual(link_health.check_due_links(timeout=0.2)['checked'], 0)
+        StoreLink.objects.filter(pk=ok.pk).update(next_check_at=timezone.now())
+        self.server.requests.clear()
+        self.assertEqual(link_health.check_due_links(timeout=0.2)['healthy'], 1)
+        self.assertEqual(self.server.requests, [('/ok', '"v1"')])
+
+    def test_transient_failures_back_off_then_disable(self):
+        """Repeated transient failures back off and eventually disable the link"""
+        flaky = self.link('Jumia', '/flaky')
+        for attempt in range(1, link_health.FAILURE_THRESHOLD + 1):
+            StoreLink.objects.filter(pk=flaky.pk).update(next_check_at=timezone.now())
+            link_health.check_due_links(timeout=1)
+            flaky.refresh_from_db()
+            self.assertEqual(flaky.check_failures, attempt)
+        self.assertFalse(flaky.is_available)
+        self.assertTrue(flaky.auto_disabled)
+
+    def test_bot_blocking_is_inconclusive(self):
+        """401/403/429 back off without counting towards auto-disable"""
+        blocked = self.link('Amazon', '/blocked')
+        for _ in range(link_health.FAILURE_THRESHOLD + 1):
+            StoreLink.objects.filter(pk=blocked.pk).update(next_check_at=timezone.now())
+            self.assertEqual(link_health.check_due_links(timeout=1)['inconclusive'], 1)
+        blocked.refresh_from_db()
+        self.assertEqual((blocked.is_available, blocked.check_failures, blocked.last_check_status), (True, 0, 403))
+        self.assertGreater(blocked.next_check_at, timezone.now())
+
+    def test_seller_change_during_check_wins(self):
+        """A link switched by its seller while being checked is not flipped back"""
+        gone = self.link('Jumia', '/gone')
+        disabled = self.link('Kilimall', '/ok', is_available=False, auto_disabled=True)
+        original_run = asyncio.run
+
+        def run_while_seller_edits(coroutine):
+            results = original_run(coroutine)
+            StoreLink.objects.filter(pk=gone.pk).update(store_url=f'{self.base}/ok')
+            StoreLink.objects.filter(pk=disabled.pk).update(auto_disabled=False)
+            return results
+
+        with mock.patch.object(link_health.asyncio, 'run', run_while_seller_edits):
+            stats = link_health.check_due_links(timeout=1)
+        self.assertEqual((stats['disabled'], stats['restored'], stats['conflicts']), (1, 1, 2))
+        gone.refresh_from_db()
+        disabled.refresh_from_db()
+        self.assertTrue(gone.is_available)
+        self.assertEqual((disabled.is_available, disabled.auto_disabled), (False, False))
+
+    def test_non_public_addresses_refused(self):
+        """Internal hosts are never contacted, neither directly nor through a redirect"""
+        result = asyncio.run(link_health.check_url(f'{self.base}/escape', timeout=1))
+        self.assertIn('169.254.169.254', result.error)
+        self.assertEqual(self.server.requests, [('/escape', None)])
+
+        self.loopback_allowed.stop()
+        try:
+            result = asyncio.run(link_health.check_url(f'{self.base}/ok', timeout=1))
+        finally:
+            self.loopback_allowed.start()
+        self.assertIn('non-public', result.error)
+        self.assertEqual(len(self.server.requests), 1)
+
+    def test_overlapping_run_skipped(self):
+        """A second run does nothing while another holds the job lock"""
+        self.link('Jumia', '/ok')
+        with job_lock(link_health.JOB_NAME, 60):
+            self.assertIsNone(link_health.check_due_links(timeout=1))
+        self.assertEqual(self.server.requests, [])
+        self.assertEqual(link_health.check_due_links(timeout=1)['healthy'], 1)
+
+    def test_per_host_limit(self):
+        """No more than per_host requests run against one host at a time"""
+        in_flight, peak = 0, 0
+        original = link_health.fetch_head
+
+        async def counting_fetch(*args, **kwargs):
+            nonlocal in_flight, peak
+            in_flight += 1
+            peak = max(peak, in_flight)
+            try:
+                return await original(*args, **kwargs)
+            finally:
+                in_flight -= 1
+
+        links = [(i, f'{self.base}/slow', '', '') for i in range(6)]
+        with mock.patch.object(link_health, 'fetch_head', counting_fetch):
+            results = asyncio.run(link_health.check_links(links, concurrency=10, per_host=2, timeout=2))
+        self.assertEqual(peak, 2)
+        self.assertTrue(all(result.healthy for result in results.values()))
+
+
+class PriceHistoryTestCase(APITestCase):
+    def setUp(self):
+        owner = User.objects.create_user(username='owner', email='owner@example.com', password='testpass123')
+        seller = Seller.objects.create(user=owner, business_name='Shop', business_description='Shop', address='Nairobi')
+        self.deal = Deal.objects.create(
+            title='Phone', description='-', seller=seller, status='approved', is_published=True,
+            expires_at=timezone.now() + timedelta(days=7),
+        )
+        self.link = StoreLink.objects.create(deal=self.deal, store_name='Jumia', store_url='https://jumia.co.ke/p', price='1000.00')
+
+    def test_only_changes_are_recorded(self):
+        """Saves at the same price add nothing; a change records the price it replaced"""
+        link = StoreLink.objects.get(pk=self.link.pk)
+        link.coupon_code = 'SAVE'
+        link.save()
+        link.price = '1000'
+        link.save()
+        link.price = '900.00'
+        link.save()
+        StoreLink.objects.only('id', 'deal_id', 'store_name').get(pk=self.link.pk).save()
+        rows = list(StoreLinkPriceHistory.objects.order_by('id').values_list('previous_price', 'price'))
+        self.assertEqual([(p and float(p), float(n)) for p, n in rows], [(None, 1000.0), (1000.0, 900.0)])
+
+    def test_series_downsampled_per_link(self):
+        """The endpoint opens each series at the window start and bounds its length"""
+        start = timezone.now() - timedelta(days=10)
+        StoreLinkPriceHistory.objects.all().update(recorded_at=start - timedelta(days=1))
+        StoreLinkPriceHistory.objects.bulk_create([
+            StoreLinkPriceHistory(store_link=self.link, deal=self.deal, price=1000 - i, recorded_at=start + timedelta(hours=i))
+            for i in range(1, 200)
+        ])
+        response = self.client.get(f'/api/deals/{self.deal.id}/price-history/', {'days': 10, 'points': 20})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        series = response.data['series'][0]
+        self.assertEqual(series['store_link_id'], self.link.id)
+        self.assertLessEqual(len(series['points']), 60)
+        self.assertEqual(series['points'][0][1], 1000.0)
+        self.assertEqual(series['points'][-1][1], 801.0)
+
+    def test_drops_detected_once_and_fanned_out(self):
+        """Favoriting users get one notification per dropped deal, and only once"""
+        fans = [User.objects.create_user(username=f'fan{i}', email=f'fan{i}@example.com', password='x') for i in range(3)]
+        Favorite.objects.bulk_create([Favorite(user=fan, offer=self.deal) for fan in fans])
+        other = StoreLink.objects.create(deal=self.deal, store_name='Kilimall', store_url='https://kilimall.co.ke/p', price='1100.00')
+        self.link.price = '850.00'
+        self.link.save()
+        other.price = '1050.00'
+        other.save()
+        ended = StoreLink.objects.create(deal=self.deal, store_name='Masoko', store_url='https://masoko.co.ke/p', price='1300.00')
+        ended.price = '500.00'
+        ended.save()
+        ended.price = '1300.00'
+        ended.save()
+
+        stats = price_history.detect_price_drops()
+        self.assertEqual(stats, {'deals': 1, 'notifications': 3})
+        # Old and new price come from the same shop, not the highest and lowest across shops
+        message = Notification.objects.filter(user=fans[0]).get().message
+        self.assertIn('from KES 1000.00 to KES 850.00 at Jumia', message)
+
+        # The scan state lives in the database, so a new process does not re-announce the drop
+        cache.clear()
+        self.assertEqual(price_history.detect_price_drops(), {'deals': 0, 'notifications': 0})
+        self.link.price = '800.00'
+        self.link.save()
+        # Lock and unlock (3), state read, history window and state write (3), drops, favorites, insert
+        with self.assertNumQueries(9):
+            self.assertEqual(price_history.detect_price_drops(), {'deals': 1, 'notifications': 3})
+
+    def test_late_commit_behind_newer_ids_announced_once(self):
+        """A row whose id was taken before a newer row's but committed after the run is still found"""
+        Favorite.objects.create(user=User.objects.create_user(username='fan', email='fan@example.com', password='x'), offer=self.deal)
+        # Holds an id below the rows that follow, like a transaction that has not committed yet
+        pending = StoreLinkPriceHistory.objects.create(store_link=self.link, deal=self.deal, price='1000.00')
+        other = StoreLink.objects.create(deal=self.deal, store_name='Kilimall', store_url='https://kilimall.co.ke/p', price='1100.00')
+        late_id = pending.id
+        pending.delete()
+        self.assertEqual(price_history.detect_price_drops(), {'deals': 0, 'notifications': 0})
+
+        StoreLink.objects.filter(pk=self.link.pk).update(price='700.00')
+        StoreLinkPriceHistory.objects.create(
+            id=late_id, store_link=self.link, deal=self.deal, price='700.00', previous_price='1000.00',
+            recorded_at=timezone.now() - timedelta(minutes=1),
+        )
+        self.assertLess(late_id, StoreLinkPriceHistory.objects.filter(store_link=other).get().id)
+        self.assertEqual(price_history.detect_price_drops(), {'deals': 1, 'notifications': 1})
+        self.assertEqual(price_history.detect_price_drops(), {'deals': 0, 'notifications': 0})
+
+
+class DealImportTestCase(APITestCase):
+    def setUp(self):
+        self.owner = User.objects.create_user(username='owner', email='owner@example.com', password='testpass123')
+        self.seller = Seller.objects.create(user=self.owner, business_name='Shop', business_description='Shop', address='Nairobi')
+        SellerProfile.objects.create(seller=self.seller, company_name='Shop', description='Shop', phone='0700', email='s@example.com', address='Nairobi')
+        plan = SubscriptionPlan.objects.create(name='Pro', price_ksh=1000, duration_days=30, max_offers=-1)
+        self.subscription = Subscription.objects.create(user=self.owner, plan=plan, status='active')
+        self.expires = (timezone.now() + timedelta(days=30)).isoformat()
+        self.client.force_authenticate(user=self.owner)
+
+    def upload(self, name, lines):
+        content = '\n'.join(lines).encode()
+        return self.client.post('/api/deals/import/', {'file': SimpleUploadedFile(name, content)}, format='multipart')
+
+    def row(self, external_id, **fields):
+        return json.dumps({
+            'external_id': external_id, 'title': f'Deal {external_id}', 'description': '-',
+            'expires_at': self.expires, **fields,
+        })
+
+    def test_jsonl_upserts_and_reports_row_errors(self):
+        """Re-importing updates in place, only changed prices are recorded, bad rows are reported"""
+        links = [{'store_name': 'Jumia', 'store_url': 'https://jumia.co.ke/p', 'price': '1000.00'}]
+        response = self.upload('deals.jsonl', [self.row('A1', store_links=links), self.row('A2'), '{broken', self.row('A3', expires_at='soon')])
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual((response.data['created'], response.data['updated'], response.data['failed']), (2, 0, 2))
+        self.assertEqual([error['row'] for error in response.data['errors']], [3, 4])
+        self.assertIn('expires_at', response.data['errors'][1]['errors'])
+
+        links[0]['price'] = '900.00'
+        response = self.upload('deals.jsonl', [self.row('A1', title='Renamed', store_links=links), self.row('A2')])
+        self.assertEqual((response.data['created'], response.data['updated']), (0, 2))
+        self.assertEqual(Deal.objects.filter(seller=self.seller).count(), 2)
+        deal = Deal.objects.get(seller=self.seller, external_id='A1')
+        self.assertEqual((deal.title, deal.status), ('Renamed', 'approved'))
+        self.assertEqual(float(deal.store_links.get().price), 900.0)
+        self.assertEqual(
+            [float(price) for price in StoreLinkPriceHistory.objects.order_by('id').values_list('price', flat=True)],
+            [1000.0, 900.0]
+        )
+
+    def test_csv_rows_grouped_and_plan_limit_enforced(self):
+        """Follow-on CSV rows add store links; deals beyond the plan limit are rejected"""
+        self.subscription.plan.max_offers = 2
+        self.subscription.plan.save()
+        lines = [
+            'external_id,title,description,expires_at,store_name,store_url,price',
+            f'C1,Phone,-,{self.expires},Jumia,https://jumia.co.ke/p,100',
+            f'C1,,,,Kilimall,https://kilimall.co.ke/p,',
+            f'C2,Laptop,-,{self.expires},,,',
+            f'C3,Tablet,-,{self.expires},,,',
+        ]
+        with tempfile.NamedTemporaryFile('w', suffix='.csv', delete=False) as handle:
+            handle.write('\n'.join(lines))
+        self.addCleanup(os.remove, handle.name)
+        call_command('import_deals', handle.name, seller='owner', stdout=open(os.devnull, 'w'), stderr=open(os.devnull, 'w'))
+
+        deals = Deal.objects.filter(seller=self.seller).order_by('external_id')
+        self.assertEqual([deal.external_id for deal in deals], ['C1', 'C2'])
+        self.assertEqual(sorted(deals[0].store_links.values_list('store_name', flat=True)), ['Jumia', 'Kilimall'])
+
+    def test_batch_written_without_per_row_queries(self):
+        """A batch of deals with store links costs a fixed number of lookups"""
+        lines = [
+            self.row(f'B{i}', store_links=[{'store_name': 'Jumia', 'store_url': 'https://jumia.co.ke/p', 'price': str(100 + i)}])
+            for i in range(200)
+        ]
+        with CaptureQueriesContext(connection) as queries:
+            response = self.upload('deals.jsonl', lines)
+        self.assertEqual(response.data['created'], 200)
+        self.assertEqual(StoreLinkPriceHistory.objects.count(), 200)
+        lookups = [query['sql'] for query in queries.captured_queries if not query['sql'].startswith('INSERT')]
+        # Inserts are only chunked by the backend's parameter limit; everything else, including
+        # the content version stamp writes, is per batch
+        self.assertLessEqual(len(lookups), 11)
+        self.assertLess(len(queries), 30)
+
+
+class BulkStoreLinkTestCase(APITestCase):
+    def setUp(self):
+        self.owner = User.objects.create_user(username='owner', email='owner@example.com', password='testpass123')
+        seller = Seller.objects.create(user=self.owner, business_name='Shop', business_description='Shop', address='Nairobi')
+        other = Seller.objects.create(
+            user=User.objects.create_user(username='other', email='other@example.com', password='testpass123'),
+            business_name='Other', business_description='Other', address='Nairobi'
+        )
+        expires = timezone.now() + timedelta(days=7)
+        self.deal = Deal.objects.create(title='Phone', description='-', seller=seller, expires_at=expires)
+        self.foreign = Deal.objects.create(title='Laptop', description='-', seller=other, expires_at=expires)
+        self.jumia = StoreLink.objects.create(deal=self.deal, store_name='Jumia', store_url='https://jumia.co.ke/p', price='1000.00')
+        self.masoko = StoreLink.objects.create(
+            deal=self.deal, store_name='Masoko', store_url='https://masoko.com/p', price='1200.00',
+            is_available=False, auto_disabled=True, etag='"v1"'
+        )
+        self.client.force_authenticate(user=self.owner)
+
+    def test_feed_diffed_against_current_links(self):
+        """New links are created, changed ones updated, identical ones left alone"""
+        response = self.client.post('/api/deals/store-links/bulk/', {'links': [
+            {'deal': self.deal.id, 'store_name': 'Jumia', 'price': '1000'},
+            {'deal': self.deal.id, 'store_name': 'Masoko', 'store_url': 'https://masoko.com/new', 'is_available': True},
+            {'deal': self.deal.id, 'store_name': 'Kilimall', 'store_url': 'https://kilimall.co.ke/p', 'price': '950'},
+            {'deal': self.deal.id, 'store_name': 'Naivas', 'price': '900'},
+            {'deal': self.foreign.id, 'store_name': 'Jumia', 'price': '1'},
+            {'deal': self.deal.id, 'store_name': 'Jumia', 'price': 'cheap'},
+        ]}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        summary = response.data
+        self.assertEqual(
+            [summary[key] for key in ('received', 'created', 'updated', 'unchanged', 'failed')],
+            [6, 1, 1, 1, 3]
+        )
+        self.assertEqual(sorted(error['index'] for error in summary['errors']), [3, 4, 5])
+
+        self.masoko.refresh_from_db()
+        self.assertEqual((self.masoko.store_url, self.masoko.is_available, self.masoko.auto_disabled), ('https://masoko.com/new', True, False))
+        self.assertEqual(self.masoko.etag, '')
+        self.assertEqual(float(self.masoko.price), 1200.0)
+        self.assertFalse(StoreLink.objects.filter(deal=self.foreign).exists())
+        history = StoreLinkPriceHistory.objects.filter(store_link__store_name='Kilimall')
+        self.assertEqual([float(price) for price in history.values_list('price', flat=True)], [950.0])
+
+    def test_link_inserted_concurrently_is_diffed_not_overwritten(self):
+        """A key another writer created after the lookup only gets the fields the row carries"""
+        load_links = store_link_sync.load_links
+        calls = []
+
+        def first_lookup_misses(keys):
+            calls.append(keys)
+            return {} if len(calls) == 1 else load_links(keys)
+
+        row = {'deal_id': self.deal.id, 'store_name': 'Masoko', 'store_url': 'https://masoko.com/new', 'is_available': True}
+        with mock.patch.object(store_link_sync, 'load_links', first_lookup_misses):
+            stats = store_link_sync.sync_store_links([row])
+        self.assertEqual((stats['created'], stats['updated']), (0, 1))
+        self.masoko.refresh_from_db()
+        self.assertEqual(float(self.masoko.price), 1200.0)
+        self.assertEqual((self.masoko.store_url, self.masoko.etag, self.masoko.auto_disabled), ('https://masoko.com/new', '', False))
+        self.assertEqual(StoreLink.objects.filter(deal=self.deal).count(), 2)
+
+    def test_price_feed_costs_a_handful_of_queries(self):
+        """Hundreds of price updates are one lookup, one bulk update and one history insert"""
+        StoreLink.objects.bulk_create([
+            StoreLink(deal=self.deal, store_name=f'Shop {i}', store_url=f'https://shop{i}.example/p', price=100)
+            for i in range(300)
+        ])
+        links = [{'deal': self.deal.id, 'store_name': f'Shop {i}', 'price': str(100 - (i % 3 == 0))} for i in range(300)]
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.post('/api/deals/store-links/bulk/', {'links': links}, format='json')
+        self.assertEqual((response.data['updated'], response.data['unchanged']), (100, 200))
+        self.assertEqual(StoreLinkPriceHistory.objects.filter(price=99).count(), 100)
+        self.assertLessEqual(len(queries), 8)
+
+
+class DealExpirySweepTestCase(APITestCase):
+    def setUp(self):
+        owner = User.objects.create_user(username='owner', email='owner@example.com', password='testpass123')
+        self.seller = Seller.objects.create(
+            user=owner, business_name='Shop', business_description='Shop', address='Nairobi',
+            is_featured=True, featured_until=timezone.now() - timedelta(hours=1)
+        )
+        now = timezone.now()
+        self.expired = [
+            Deal.objects.create(title=f'Old {i}', description='-', seller=self.seller, status='approved', expires_at=now - timedelta(days=i + 1))
+            for i in range(5)
+        ]
+        self.rejected = Deal.objects.create(title='Rejected', description='-', seller=self.seller, status='rejected', expires_at=now - timedelta(days=1))
+        self.soon = Deal.objects.create(
+            title='Soon', description='-', seller=self.seller, status='approved', expires_at=now + timedelta(hours=3),
+            is_featured=True, featured_until=now - timedelta(minutes=5)
+        )
+        self.later = Deal.objects.create(title='Later', description='-', seller=self.seller, status='approved', expires_at=now + timedelta(days=5))
+        FeaturedContent.objects.create(content_type='deal', object_id=self.later.id, expires_at=now - timedelta(minutes=1))
+        FeaturedContent.objects.create(content_type='seller', object_id=self.seller.id)
+        fans = [User.objects.create_user(username=f'fan{i}', email=f'fan{i}@example.com', password='x') for i in range(3)]
+        Favorite.objects.bulk_create([Favorite(user=fan, offer=deal) for fan in fans for deal in (self.soon, self.later)])
+
+    def test_sweep_flips_in_chunks_and_reminds_once(self):
+        """Lapsed rows are flipped, reminders go out once per expiry date and versions move"""
+        before = content_versions.get_versions('deals', 'featured', 'sellers')
+        with self.captureOnCommitCallbacks(execute=True):
+            stats = DealExpirySweeper(chunk_size=2).run()
+        self.assertEqual(
+            {key: stats[key] for key in ('expired_deals', 'unfeatured_deals', 'unfeatured_sellers', 'deactivated_featured', 'reminded_deals', 'notifications')},
+            {'expired_deals': 5, 'unfeatured_deals': 1, 'unfeatured_sellers': 1, 'deactivated_featured': 1, 'reminded_deals': 1, 'notifications': 3}
+        )
+        self.assertEqual(Deal.objects.filter(status='expired').count(), 5)
+        self.assertEqual(Deal.objects.get(pk=self.rejected.pk).status, 'rejected')
+        self.assertFalse(Deal.objects.get(pk=self.soon.pk).is_featured)
+        self.assertEqual(list(FeaturedContent.objects.filter(is_active=True).values_list('content_type', flat=True)), ['seller'])
+        self.assertEqual(set(Notification.objects.values_list('related_offer_id', flat=True)), {self.soon.id})
+        after = content_versions.get_versions('deals', 'featured', 'sellers')
+        self.assertTrue(all(before[name] != after[name] for name in before))
+
+        # Nothing left to flip or announce; a reminder sent for an earlier expiry date does not count
+        self.assertEqual(DealExpirySweeper().run()['notifications'], 0)
+        Deal.objects.filter(pk=self.soon.pk).update(expiry_reminder_sent_at=timezone.now() - timedelta(days=2))
+        DealExpirySweeper().run()
+        self.assertEqual(Notification.objects.filter(related_offer_id=self.soon.id).count(), 6)
+
+    def test_concurrent_run_skipped(self):
+        """A second sweep, or the reminder task, does nothing while another process holds the database lock"""
+        with job_lock(EXPIRY_JOB_NAME, 60):
+            cache.clear()
+            self.assertIsNone(DealExpirySweeper().run())
+            self.assertEqual(check_expiring_offers(), 0)
+        self.assertEqual(Deal.objects.filter(status='expired').count(), 0)
+        self.assertFalse(Notification.objects.exists())
+        self.assertEqual(check_expiring_offers(), 3)
+
+    def test_extending_an_expired_deal_puts_it_back_on_sale(self):
+        """Moving expires_at into the future restores approved, through the API and through imports"""
+        DealExpirySweeper().run()
+        self.client.force_authenticate(user=self.seller.user)
+        extended = (timezone.now() + timedelta(days=3)).isoformat()
+        response = self.client.patch(f'/api/deals/{self.expired[0].id}/', {'expires_at': extended}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(Deal.objects.get(pk=self.expired[0].pk).status, 'approved')
+        self.client.patch(f'/api/deals/{self.expired[1].id}/', {'title': 'Still old'}, format='json')
+        self.assertEqual(Deal.objects.get(pk=self.expired[1].pk).status, 'expired')
+
+        Deal.objects.filter(pk=self.expired[2].pk).update(external_id='sku-2')
+        row = {'external_id': 'sku-2', 'title': 'Back', 'description': '-', 'expires_at': extended}
+        report = import_deals(self.seller, io.StringIO(json.dumps(row)), 'jsonl')
+        self.assertEqual(report['updated'], 1)
+        self.assertEqual(Deal.objects.get(pk=self.expired[2].pk).status, 'approved')
+
+
+class ConditionalGetTestCase(APITestCase):
+    def setUp(self):
+        owner = User.objects.create_user(username='owner', email='owner@example.com', password='testpass123')
+        seller = Seller.objects.create(user=owner, business_name='Shop', business_description='Shop', address='Nairobi')
+        SellerProfile.objects.create(seller=seller, company_name='Shop', description='Shop', phone='0700', email='s@example.com', address='Nairobi')
+        self.deal = Deal.objects.create(
+            title='Phone', description='-', seller=seller, status='approved', expires_at=timezone.now() + timedelta(days=7)
+        )
+
+    def test_unchanged_list_answered_from_the_stamps(self):
+        """A matching If-None-Match gets 304 before the view runs; a change gives a fresh ETag"""
+        first = self.client.get('/api/deals/')
+        self.assertEqual(first.status_code, status.HTTP_200_OK)
+        self.assertIn('public', first['Cache-Control'])
+        self.assertIn('stale-while-revalidate', first['Cache-Control'])
+        self.assertIn('Last-Modified', first)
+
+        # Only the stamp lookup runs
+        with self.assertNumQueries(1):
+            cached = self.client.get('/api/deals/', HTTP_IF_NONE_MATCH=first['ETag'])
+        self.assertEqual(cached.status_code, status.HTTP_304_NOT_MODIFIED)
+        self.assertEqual(cached['ETag'], first['ETag'])
+        self.assertEqual(
+            self.client.get('/api/deals/', HTTP_IF_MODIFIED_SINCE=first['Last-Modified']).status_code,
+            status.HTTP_304_NOT_MODIFIED
+        )
+
+        with self.captureOnCommitCallbacks(execute=True):
+            StoreLink.objects.create(deal=self.deal, store_name='Jumia', store_url='https://jumia.co.ke/p', price='900.00')
+        fresh = self.client.get('/api/deals/', HTTP_IF_NONE_MATCH=first['ETag'])
+        self.assertEqual(fresh.status_code, status.HTTP_200_OK)
+        self.assertNotEqual(fresh['ETag'], first['ETag'])
+
+    def test_bumps_from_other_processes_change_the_etag(self):
+        """A cron command with its own cache still moves the ETag; a rolled back bump does not"""
+        first = self.client.get('/api/deals/')
+        other_process = {'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache', 'LOCATION': 'cron'}}
+        with override_settings(CACHES=other_process), self.captureOnCommitCallbacks(execute=True):
+            Deal.objects.filter(pk=self.deal.pk).update(title='Phone, cheaper')
+            content_versions.bump('deals')
+        fresh = self.client.get('/api/deals/', HTTP_IF_NONE_MATCH=first['ETag'])
+        self.assertEqual(fresh.status_code, status.HTTP_200_OK)
+        self.assertNotEqual(fresh['ETag'], first['ETag'])
+
+        with self.captureOnCommitCallbacks(execute=True):
+            with self.assertRaises(RuntimeError), transaction.atomic():
+                content_versions.bump('deals')
+                raise RuntimeError
+        cached = self.client.get('/api/deals/', HTTP_IF_NONE_MATCH=fresh['ETag'])
+        self.assertEqual(cached.status_code, status.HTTP_304_NOT_MODIFIED)
+
+    def test_bumps_wait_for_commit(self):
+        """Bumps in a transaction leave the stamp rows alone until it commits"""
+        before = content_versions.get_versions('deals', 'featured')
+        with self.captureOnCommitCallbacks(execute=True):
+            with transaction.atomic():
+                content_versions.bump('featured', 'deals')
+                self.assertEqual(content_versions.get_versions('deals', 'featured'), before)
+        after = content_versions.get_versions('deals', 'featured')
+        self.assertTrue(all(before[name] != after[name] for name in before))
+
+    def test_unpublishing_a_profile_moves_the_deals_etag(self):
+        """Deactivating a seller's deals in bulk still bumps the deals stamp"""
+        first = self.client.get('/api/deals/')
+        profile = SellerProfile.objects.get(seller=self.deal.seller)
+        profile.is_published = False
+        with self.captureOnCommitCallbacks(execute=True):
+            profile.save()
+        self.assertFalse(Deal.objects.get(pk=self.deal.pk).is_published)
+        fresh = self.client.get('/api/deals/', HTTP_IF_NONE_MATCH=first['ETag'])
+        self.assertEqual(fresh.status_code, status.HTTP_200_OK)
+
+    def test_validators_vary_by_query_and_caller(self):
+        """Different query strings and credentials never share an ETag"""
+        detail = self.client.get(f'/api/deals/{self.deal.id}/')
+        other = self.client.get(f'/api/deals/{self.deal.id}/?format=json')
+        featured = self.client.get('/api/deals/featured/')
+        self.assertEqual(featured.status_code, status.HTTP_200_OK)
+        self.assertEqual(len({detail['ETag'], other['ETag'], featured['ETag']}), 3)
+
+        token = Token.objects.create(user=User.objects.create_user(username='fan', email='fan@example.com', password='x'))
+        signed_in = self.client.get(f'/api/deals/{self.deal.id}/', HTTP_AUTHORIZATION=f'Token {token.key}')
+        self.assertNotEqual(signed_in['ETag'], detail['ETag'])
+        self.assertIn('private', signed_in['Cache-Control'])
+        missing = self.client.get('/api/deals/999999/')
+        self.assertEqual(missing.status_code, status.HTTP_404_NOT_FOUND)
+        self.assertNotIn('ETag', missing)
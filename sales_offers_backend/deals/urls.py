@@ -2,9 +2,10 @@ from django.urls import path
 from .views import (
     DealListView, DealDetailView, seller_detail, seller_offers, my_deals, deal_analytics, admin_deals,
     upload_deal_image, delete_deal_image, update_deal_image, track_click, deal_stores, create_store_link,
-    available_stores, create_physical_store, manage_physical_store, upload_physical_store_image
+    available_stores, create_physical_store, manage_physical_store, upload_physical_store_image, nearby_deals,
+    deal_price_history, import_deals_view, bulk_store_links
 )
-from .review_views import create_review, get_deal_reviews
+from .review_views import create_review, get_deal_reviews, mark_review_helpful
 from . import analytics_views
 from .featured_views import (
     admin_featured_deals, admin_featured_sellers, set_featured_deal, set_featured_seller,
@@ -15,10 +16,14 @@ urlpatterns = [
     path('', DealListView.as_view(), name='deal-list'),
     path('<int:pk>/', DealDetailView.as_view(), name='deal-detail'),
     path('my-deals/', my_deals, name='my-deals'),
+    path('nearby/', nearby_deals, name='nearby-deals'),
+    path('import/', import_deals_view, name='import-deals'),
+    path('store-links/bulk/', bulk_store_links, name='bulk-store-links'),
     path('<int:deal_id>/analytics/', deal_analytics, name='deal-analytics'),
     path('analytics/seller/', analytics_views.seller_analytics, name='seller-analytics'),
     path('analytics/deal/<int:deal_id>/', analytics_views.deal_analytics, name='deal-analytics-detailed'),
     path('<int:deal_id>/stores/', deal_stores, name='deal-stores'),
+    path('<int:deal_id>/price-history/', deal_price_history, name='deal-price-history'),
     path('<int:deal_id>/store-links/', create_store_link, name='create-store-link'),
     path('sellers/<int:seller_id>/', seller_detail, name='seller-detail'),
     path('sellers/<int:seller_id>/offers/', seller_offers, name='seller-offers'),
@@ -26,6 +31,7 @@ urlpatterns = [
     path('admin/deals/', admin_deals, name='admin-deals-alt'),
     path('reviews/', create_review, name='create-review'),
     path('<int:deal_id>/reviews/', get_deal_reviews, name='deal-reviews'),
+    path('reviews/<int:review_id>/helpful/', mark_review_helpful, name='mark-review-helpful'),
     path('<int:deal_id>/images/', upload_deal_image, name='upload-deal-image'),
     path('<int:deal_id>/images/<int:image_id>/', update_deal_image, name='update-deal-image'),
     path('<int:deal_id>/images/<int:image_id>/delete/', delete_deal_image, name='delete-deal-image'),
@@ -5,9 +5,40 @@ from rest_framework.response import Response
 from .models import Deal, DealImage, StoreLink, PhysicalStore, PhysicalStoreImage  # Removed Voucher, ClickTracking
 from .serializers import DealSerializer, DealImageSerializer, StoreLinkSerializer, PhysicalStoreSerializer, PhysicalStoreImageSerializer  # Removed VoucherSerializer, ClickTrackingSerializer
 from sellers.models import Seller
-from sellers.serializers import SellerSerializer
+from sellers.serializers import SellerSerializer, attach_deal_counts
 from accounts.models import User
 from accounts.notification_service import NotificationService
+from backend.admin_listing import AdminListing
+from backend.conditional import conditional_get
+from django.utils.decorators import method_decorator
+from django.utils import timezone
+from datetime import timedelta
+from .geo import nearby
+from .price_history import price_series
+from .bulk_import import READERS, import_deals
+from .store_link_sync import sync_seller_store_links
+import csv
+import io
+
+NEARBY_DEFAULT_RADIUS_KM = 10
+NEARBY_MAX_RADIUS_KM = 100
+NEARBY_MAX_LIMIT = 100
+PRICE_HISTORY_DEFAULT_DAYS = 90
+PRICE_HISTORY_MAX_DAYS = 730
+PRICE_HISTORY_DEFAULT_POINTS = 60
+PRICE_HISTORY_MAX_POINTS = 500
+STORE_LINK_BULK_MAX_ITEMS = 10000
+
+class DealAdminListing(AdminListing):
+    filter_fields = {
+        'status': 'status',
+        'is_published': 'is_published',
+        'is_featured': 'is_featured',
+        'seller': 'seller_id',
+        'category': 'category',
+    }
+    search_fields = ('title', 'seller__business_name')
+    sort_fields = {'created': 'created_at', 'expires': 'expires_at', 'title': 'title'}
 
 @api_view(['GET'])
 @permission_classes([IsAuthenticated])
@@ -15,10 +46,91 @@ def admin_deals(request):
     if not (request.user.is_staff and request.user.is_superuser):
         return Response({'error': 'Admin access required'}, status=403)
     
-    deals = Deal.objects.select_related('seller').all().order_by('-created_at')
-    serializer = DealSerializer(deals, many=True)
-    return Response(serializer.data)
+    deals = Deal.objects.select_related('seller__user', 'seller__profile').prefetch_related(
+        'images', 'store_links', 'physical_stores__images'
+    )
+    listing = DealAdminListing(request)
+    page = listing.paginate_queryset(deals)
+    attach_deal_counts([deal.seller for deal in page])
+    serializer = DealSerializer(page, many=True)
+    return listing.get_paginated_response(serializer.data)
+
+@api_view(['GET'])
+def nearby_deals(request):
+    """Live deals with a physical store within radius_km of lat/lng, nearest store first"""
+    try:
+        latitude = float(request.query_params['lat'])
+        longitude = float(request.query_params['lng'])
+        radius_km = float(request.query_params.get('radius_km', NEARBY_DEFAULT_RADIUS_KM))
+        limit = int(request.query_params.get('limit', 20))
+    except (KeyError, ValueError):
+        return Response({'error': 'lat and lng are required numbers'}, status=status.HTTP_400_BAD_REQUEST)
+    if not (-90 <= latitude <= 90 and -180 <= longitude <= 180):
+        return Response({'error': 'lat/lng out of range'}, status=status.HTTP_400_BAD_REQUEST)
+    if not 0 < radius_km <= NEARBY_MAX_RADIUS_KM:
+        return Response({'error': f'radius_km must be between 0 and {NEARBY_MAX_RADIUS_KM}'}, status=status.HTTP_400_BAD_REQUEST)
+    limit = max(1, min(limit, NEARBY_MAX_LIMIT))
+    
+    stores = PhysicalStore.objects.filter(
+        deal__status='approved',
+        deal__is_published=True,
+        deal__seller__profile__is_published=True,
+        deal__expires_at__gt=timezone.now(),
+    )
+    nearest = {}
+    for distance, (store_id, deal_id) in nearby(stores, latitude, longitude, radius_km):
+        if deal_id not in nearest:
+            nearest[deal_id] = (distance, store_id)
+            if len(nearest) == limit:
+                break
+    
+    deals = Deal.objects.filter(id__in=nearest).select_related('seller__user', 'seller__profile').prefetch_related(
+        'images', 'store_links', 'physical_stores__images'
+    ).in_bulk()
+    attach_deal_counts([deal.seller for deal in deals.values()])
+    results = []
+    for deal_id, (distance, store_id) in nearest.items():
+        deal = deals[deal_id]
+        store = next(store for store in deal.physical_stores.all() if store.id == store_id)
+        results.append({
+            'distance_km': round(distance, 3),
+            'store': PhysicalStoreSerializer(store).data,
+            'deal': DealSerializer(deal).data,
+        })
+    
+    return Response({'results': results, 'radius_km': radius_km, 'limit': limit})
+
+@api_view(['POST'])
+@permission_classes([IsAuthenticated])
+def import_deals_view(request):
+    """Upsert deals and their store links from an uploaded CSV or JSONL file"""
+    try:
+        seller = Seller.objects.select_related('profile').get(user=request.user)
+    except Seller.DoesNotExist:
+        return Response({'error': 'You must have a seller profile to create deals.'}, status=status.HTTP_403_FORBIDDEN)
+    if not hasattr(seller, 'profile') or not seller.profile.is_published:
+        return Response({
+            'error': 'You must publish your seller profile before creating offers.',
+            'action_required': 'setup_profile',
+            'redirect_url': '/seller/profile'
+        }, status=status.HTTP_400_BAD_REQUEST)
+    
+    upload = request.FILES.get('file')
+    if upload is None:
+        return Response({'error': 'Upload a CSV or JSONL file as "file"'}, status=status.HTTP_400_BAD_REQUEST)
+    file_format = request.data.get('format') or upload.name.rsplit('.', 1)[-1].lower()
+    if file_format not in READERS:
+        return Response({'error': f"format must be one of: {', '.join(READERS)}"}, status=status.HTTP_400_BAD_REQUEST)
+    
+    # Large uploads are spooled to disk by Django; this reads them line by line
+    stream = io.TextIOWrapper(upload.file, encoding='utf-8-sig', newline='')
+    try:
+        report = import_deals(seller, stream, file_format)
+    except (UnicodeDecodeError, csv.Error) as exc:
+        return Response({'error': f'Could not read the file: {exc}'}, status=status.HTTP_400_BAD_REQUEST)
+    return Response(report)
 
+@method_decorator(conditional_get('deals', 'sellers'), name='dispatch')
 class DealListView(generics.ListCreateAPIView):
     serializer_class = DealSerializer
     
@@ -98,6 +210,7 @@ class DealListView(generics.ListCreateAPIView):
             # Continue even if notification fails
             pass
 
+@method_decorator(conditional_get('deals', 'sellers'), name='dispatch')
 class DealDetailView(generics.RetrieveUpdateAPIView):
     serializer_class = DealSerializer
     
@@ -124,7 +237,12 @@ class DealDetailView(generics.RetrieveUpdateAPIView):
             from rest_framework.exceptions import PermissionDenied
             raise PermissionDenied("You must be a seller to update deals")
         
-        serializer.save()
+        expires_at = serializer.validated_data.get('expires_at')
+        if deal.status == 'expired' and expires_at and expires_at > timezone.now():
+            # Extending a deal the expiry sweeper closed puts it back on sale
+            serializer.save(status='approved')
+        else:
+            serializer.save()
 
 @api_view(['GET'])
 def seller_detail(request, seller_id):
@@ -293,6 +411,46 @@ def deal_stores(request, deal_id):
     except Deal.DoesNotExist:
         return Response({'error': 'Deal not found'}, status=404)
 
+@api_view(['GET'])
+def deal_price_history(request, deal_id):
+    """Downsampled price series per store link of a deal, for charts"""
+    try:
+        days = int(request.query_params.get('days', PRICE_HISTORY_DEFAULT_DAYS))
+        points = int(request.query_params.get('points', PRICE_HISTORY_DEFAULT_POINTS))
+    except ValueError:
+        return Response({'error': 'days and points must be whole numbers'}, status=status.HTTP_400_BAD_REQUEST)
+    days = max(1, min(days, PRICE_HISTORY_MAX_DAYS))
+    points = max(2, min(points, PRICE_HISTORY_MAX_POINTS))
+    
+    if not Deal.objects.filter(id=deal_id, is_published=True, status='approved').exists():
+        return Response({'error': 'Deal not found'}, status=404)
+    until = timezone.now()
+    since = until - timedelta(days=days)
+    return Response({
+        'deal_id': deal_id,
+        'from': since.isoformat(),
+        'to': until.isoformat(),
+        'series': price_series(deal_id, since, until, buckets=points),
+    })
+
+@api_view(['POST'])
+@permission_classes([IsAuthenticated])
+def bulk_store_links(request):
+    """Create or update many of the seller's store links, writing only what changed"""
+    try:
+        seller = Seller.objects.get(user=request.user)
+    except Seller.DoesNotExist:
+        return Response({'error': 'Seller profile not found'}, status=status.HTTP_403_FORBIDDEN)
+    items = request.data.get('links') if isinstance(request.data, dict) else None
+    if not isinstance(items, list):
+        return Response({'error': 'links must be a list'}, status=status.HTTP_400_BAD_REQUEST)
+    if len(items) > STORE_LINK_BULK_MAX_ITEMS:
+        return Response(
+            {'error': f'At most {STORE_LINK_BULK_MAX_ITEMS} links per request'},
+            status=status.HTTP_400_BAD_REQUEST
+        )
+    return Response(sync_seller_store_links(seller, items))
+
 @api_view(['POST'])
 @permission_classes([IsAuthenticated])
 def create_store_link(request, deal_id):
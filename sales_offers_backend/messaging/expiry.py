@@ -0,0 +1,198 @@
+import logging
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+from django.db.models import Q
+from django.utils import timezone
+from admin_system.jobs import job_lock, load_state, save_state
+from .models import Message, attachment_url_expression
+from .storage import get_attachment_storage
+
+logger = logging.getLogger(__name__)
+
+JOB_NAME = 'messaging.attachment_expiry'
+RETRY_BASE_DELAY = timedelta(minutes=15)
+MAX_DELETE_ATTEMPTS = 6
+
+
+class AttachmentExpirySweeper:
+    """
+    Expires file attachments in bounded keyset chunks.
+
+    Each chunk is read with a (expires_at, id) keyset over the partial expiry
+    index, blob deletions are fanned out to a bounded thread pool, and the
+    rows are flipped with a single bulk_update. The position of the last
+    committed chunk is kept in the job's JobState row so an interrupted run
+    resumes where it stopped; a run that drains the backlog clears it. The
+    job's lease is renewed after every chunk, and a run that finds it lost
+    stops rather than overlap the run that took it over.
+
+    A message whose blob could not be deleted stays unexpired, so it stays in
+    the index, and records a ``retry_at`` with exponential backoff in its
+    attachment data. Such messages are the only ones left behind the
+    watermark, so every run first re-scans that range for retries that are
+    due. Only after MAX_DELETE_ATTEMPTS failures is a message expired anyway,
+    with ``blob_deleted: False`` and an error logged for follow-up.
+
+    Attachment URLs are supplied by users, so a blob another live message
+    still points at is left alone; the last message referencing it deletes
+    it.
+    """
+
+    def __init__(self, storage=None, batch_size=500, workers=8, lock_timeout=300):
+        self.storage = storage or get_attachment_storage()
+        self.batch_size = batch_size
+        self.workers = workers
+        self.lock_timeout = lock_timeout
+        self.stats = {
+            'scanned': 0, 'expired': 0, 'blobs_deleted': 0, 'blobs_shared': 0, 'blob_failures': 0,
+            'retry_scheduled': 0, 'abandoned': 0, 'batches': 0,
+        }
+
+    def expired_queryset(self, now):
+        return Message.objects.filter(
+            message_type='file', is_expired=False, expires_at__lt=now
+        ).only('id', 'expires_at', 'attachment_data').order_by('expires_at', 'id')
+
+    def attachment_url(self, message):
+        return (message.attachment_data or {}).get('url')
+
+    def shared_urls(self, messages):
+        """URLs of these messages that some other live message still references"""
+        urls = {url for url in map(self.attachment_url, messages) if url}
+        if not urls:
+            return set()
+        return set(
+            Message.objects.filter(message_type='file', is_expired=False)
+            .annotate(url=attachment_url_expression())
+            .filter(url__in=urls)
+            .exclude(id__in=[message.id for message in messages])
+            .values_list('url', flat=True)
+        )
+
+    def delete_blob(self, message):
+        url = self.attachment_url(message)
+        if not url:
+            return message.id, None
+        try:
+            deleted = self.storage.delete(url)
+        except Exception as e:
+            logger.warning(f'Error deleting attachment for message {message.id}: {str(e)}')
+            return message.id, False
+        # None: not a blob this app stored, so there was nothing of ours to delete
+        return message.id, None if deleted is None else bool(deleted)
+
+    def retry_pending(self, message, now):
+        retry_at = (message.attachment_data or {}).get('retry_at')
+        return bool(retry_at) and datetime.fromisoformat(retry_at) > now
+
+    def schedule_retry(self, message, now):
+        """Keep a message whose blob delete failed for a later run; False once it is out of attempts"""
+        data = message.attachment_data or {}
+        attempts = data.get('delete_attempts', 0) + 1
+        if attempts >= MAX_DELETE_ATTEMPTS:
+            logger.error(f'Giving up deleting attachment for message {message.id} after {attempts} attempts')
+            return False
+        message.attachment_data = {
+            **data,
+            'delete_attempts': attempts,
+            'retry_at': (now + RETRY_BASE_DELAY * 2 ** (attempts - 1)).isoformat(),
+        }
+        return True
+
+    def process_batch(self, batch, executor, now):
+        due = [message for message in batch if not self.retry_pending(message, now)]
+        shared = self.shared_urls(due)
+        results = dict(executor.map(self.delete_blob, [
+            message for message in due if self.attachment_url(message) not in shared
+        ]))
+        expired_at = now.isoformat()
+        expired = []
+        for message in due:
+            if self.attachment_url(message) in shared:
+                self.stats['blobs_shared'] += 1
+                deleted = None
+            else:
+                deleted = results[message.id]
+            if deleted:
+                self.stats['blobs_deleted'] += 1
+            elif deleted is False:
+                self.stats['blob_failures'] += 1
+                if self.schedule_retry(message, now):
+                    self.stats['retry_scheduled'] += 1
+                    continue
+                self.stats['abandoned'] += 1
+            message.is_expired = True
+            message.attachment_data = {
+                **(message.attachment_data or {}),
+                'expired': True,
+                'expired_at': expired_at,
+                'blob_deleted': bool(deleted),
+            }
+            message.attachment_data.pop('retry_at', None)
+            expired.append(message)
+        if due:
+            Message.objects.bulk_update(due, ['is_expired', 'attachment_data'])
+        self.stats['expired'] += len(expired)
+
+    def run(self, max_batches=None):
+        with job_lock(JOB_NAME, self.lock_timeout) as lease:
+            if not lease:
+                logger.info('Attachment expiry sweep already running, skipping')
+                return None
+            return self.sweep(max_batches, lease)
+
+    def after(self, queryset, position):
+        expires_at = datetime.fromisoformat(position['expires_at'])
+        return queryset.filter(Q(expires_at__gt=expires_at) | Q(expires_at=expires_at, id__gt=position['id']))
+
+    def up_to(self, queryset, position):
+        expires_at = datetime.fromisoformat(position['expires_at'])
+        return queryset.filter(Q(expires_at__lt=expires_at) | Q(expires_at=expires_at, id__lte=position['id']))
+
+    def sweep(self, max_batches, lease=None):
+        started = time.monotonic()
+        now = timezone.now()
+        state = load_state(JOB_NAME)
+        watermark = state.get('watermark')
+        drained = lost = False
+
+        def batches(queryset):
+            """Yield keyset chunks of queryset until it runs out, the budget is spent or the lease is lost"""
+            nonlocal lost
+            position = None
+            while max_batches is None or self.stats['batches'] < max_batches:
+                batch = list((self.after(queryset, position) if position else queryset)[:self.batch_size])
+                if not batch:
+                    return
+                self.stats['scanned'] += len(batch)
+                self.process_batch(batch, executor, now)
+                self.stats['batches'] += 1
+                position = {'expires_at': batch[-1].expires_at.isoformat(), 'id': batch[-1].id}
+                yield position
+                if lease is not None and not lease.renew():
+                    logger.warning('Attachment expiry sweep lost its lock, stopping')
+                    lost = True
+                    return
+
+        with ThreadPoolExecutor(max_workers=self.workers) as executor:
+            if watermark:
+                # Failed deletes are all that is left behind the watermark
+                for _ in batches(self.up_to(self.expired_queryset(now), watermark)):
+                    pass
+            if not lost:
+                ahead = self.expired_queryset(now)
+                for position in batches(self.after(ahead, watermark) if watermark else ahead):
+                    watermark = position
+                    save_state(JOB_NAME, {'watermark': watermark})
+                # The chunks stopped short of the budget, so the backlog ran out
+                drained = not lost and (max_batches is None or self.stats['batches'] < max_batches)
+        if drained:
+            save_state(JOB_NAME, {})
+
+        elapsed = time.monotonic() - started
+        self.stats['seconds'] = round(elapsed, 3)
+        self.stats['rows_per_second'] = round(self.stats['expired'] / elapsed, 1) if elapsed else 0.0
+        self.stats['drained'] = drained
+        logger.info(f'Attachment expiry sweep: {self.stats}')
+        return self.stats
@@ -1,52 +1,29 @@
 from django.core.management.base import BaseCommand
-from django.utils import timezone
-from messaging.models import Message
-import requests
-import logging
-
-logger = logging.getLogger(__name__)
+from messaging.expiry import AttachmentExpirySweeper
 
 class Command(BaseCommand):
     help = 'Clean up expired file attachments'
 
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=500, help='Messages expired per chunk')
+        parser.add_argument('--workers', type=int, default=8, help='Concurrent blob deletions')
+        parser.add_argument('--max-batches', type=int, default=None, help='Stop after this many chunks (resumes next run)')
+
     def handle(self, *args, **options):
-        # Find expired file messages
-        expired_messages = Message.objects.filter(
-            message_type='file',
-            expires_at__lt=timezone.now(),
-            is_expired=False,
-            attachment_data__isnull=False
-        )
-        
-        deleted_count = 0
+        sweeper = AttachmentExpirySweeper(batch_size=options['batch_size'], workers=options['workers'])
+        stats = sweeper.run(max_batches=options['max_batches'])
         
-        for message in expired_messages:
-            try:
-                # Get file URL from attachment data
-                if message.attachment_data and 'url' in message.attachment_data:
-                    file_url = message.attachment_data['url']
-                    
-                    # Delete from Vercel Blob (if it's a blob URL)
-                    if 'blob.vercel-storage.com' in file_url:
-                        # Extract blob token from URL for deletion
-                        # This would require Vercel Blob delete API implementation
-                        pass
-                    
-                    # Mark as expired and clear attachment data
-                    message.is_expired = True
-                    message.attachment_data = {
-                        **message.attachment_data,
-                        'expired': True,
-                        'expired_at': timezone.now().isoformat()
-                    }
-                    message.save()
-                    deleted_count += 1
-                    
-                    self.stdout.write(f'Expired file: {message.attachment_data.get("name", "unknown")}')
-                    
-            except Exception as e:
-                logger.error(f'Error expiring message {message.id}: {str(e)}')
+        if stats is None:
+            self.stdout.write(self.style.WARNING('Another cleanup run is in progress, skipping'))
+            return
         
         self.stdout.write(
-            self.style.SUCCESS(f'Successfully expired {deleted_count} file attachments')
-        )
\ No newline at end of file
+            f"Scanned {stats['scanned']} messages in {stats['batches']} batches "
+            f"({stats['rows_per_second']} rows/s), {stats['blobs_deleted']} blobs deleted, "
+            f"{stats['blobs_shared']} kept for other messages, "
+            f"{stats['blob_failures']} deletion failures ({stats['retry_scheduled']} to retry, "
+            f"{stats['abandoned']} given up)"
+        )
+        self.stdout.write(
+            self.style.SUCCESS(f"Successfully expired {stats['expired']} file attachments")
+        )
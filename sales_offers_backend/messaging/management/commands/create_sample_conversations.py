@@ -32,9 +32,11 @@ class Command(BaseCommand):
             user1 = users[i]
             user2 = users[i + 1]
             
-            # Create conversation
-            conversation = Conversation.objects.create()
-            conversation.participants.add(user1, user2)
+            # Reuse the direct conversation if the pair already has one
+            conversation, created = Conversation.get_or_create_direct(user1, user2)
+            if not created:
+                self.stdout.write(f'Conversation between {user1.username} and {user2.username} already exists')
+                continue
             
             # Add messages
             for j, message_text in enumerate(sample_messages[:4]):  # Add 4 messages per conversation
@@ -0,0 +1,66 @@
+# Generated by Django 5.1.5 on 2026-10-19 11:59
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models import Max
+
+
+def seed_read_states(apps, schema_editor):
+    # Derive each participant's watermark from the legacy per-message is_read flags
+    Conversation = apps.get_model('messaging', 'Conversation')
+    Message = apps.get_model('messaging', 'Message')
+    ConversationReadState = apps.get_model('messaging', 'ConversationReadState')
+    states = []
+    for conversation in Conversation.objects.prefetch_related('participants').iterator(chunk_size=500):
+        for user in conversation.participants.all():
+            last_read = Message.objects.filter(
+                conversation=conversation, is_read=True
+            ).exclude(sender=user).aggregate(last=Max('id'))['last']
+            if last_read:
+                states.append(ConversationReadState(
+                    conversation=conversation, user=user, last_read_message_id=last_read
+                ))
+        if len(states) >= 500:
+            ConversationReadState.objects.bulk_create(states, ignore_conflicts=True)
+            states = []
+    if states:
+        ConversationReadState.objects.bulk_create(states, ignore_conflicts=True)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('messaging', '0003_message_expires_at_message_is_expired'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ConversationReadState',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('last_read_message_id', models.BigIntegerField(default=0)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+        ),
+        migrations.AddIndex(
+            model_name='message',
+            index=models.Index(fields=['conversation', 'timestamp', 'id'], name='message_conv_window_idx'),
+        ),
+        migrations.AddField(
+            model_name='conversationreadstate',
+            name='conversation',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='read_states', to='messaging.conversation'),
+        ),
+        migrations.AddField(
+            model_name='conversationreadstate',
+            name='user',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='conversation_read_states', to=settings.AUTH_USER_MODEL),
+        ),
+        migrations.AlterUniqueTogether(
+            name='conversationreadstate',
+            unique_together={('conversation', 'user')},
+        ),
+        migrations.RunPython(seed_read_states, migrations.RunPython.noop),
+    ]
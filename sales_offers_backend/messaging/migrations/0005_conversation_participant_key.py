@@ -0,0 +1,43 @@
+# Generated by Django 5.1.5 on 2026-10-19 12:00
+
+from django.db import migrations, models
+
+
+def populate_participant_keys(apps, schema_editor):
+    # When a pair already has duplicate conversations, the most recently
+    # active one becomes canonical and the rest keep a null key
+    Conversation = apps.get_model('messaging', 'Conversation')
+    seen = set()
+    batch = []
+    conversations = Conversation.objects.prefetch_related('participants').order_by('-updated_at')
+    for conversation in conversations.iterator(chunk_size=500):
+        user_ids = sorted(user.id for user in conversation.participants.all())
+        if len(user_ids) != 2:
+            continue
+        key = f"{user_ids[0]}:{user_ids[1]}"
+        if key in seen:
+            continue
+        seen.add(key)
+        conversation.participant_key = key
+        batch.append(conversation)
+        if len(batch) >= 500:
+            Conversation.objects.bulk_update(batch, ['participant_key'])
+            batch = []
+    if batch:
+        Conversation.objects.bulk_update(batch, ['participant_key'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('messaging', '0004_conversation_read_state'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='conversation',
+            name='participant_key',
+            field=models.CharField(blank=True, editable=False, max_length=64, null=True, unique=True),
+        ),
+        migrations.RunPython(populate_participant_keys, migrations.RunPython.noop),
+    ]
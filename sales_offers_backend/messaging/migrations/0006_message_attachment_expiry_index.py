@@ -0,0 +1,19 @@
+# Generated by Django 5.1.5 on 2026-10-19 12:02
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('messaging', '0005_conversation_participant_key'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='message',
+            index=models.Index(condition=models.Q(('is_expired', False), ('message_type', 'file')), fields=['expires_at', 'id'], name='message_attachment_expiry_idx'),
+        ),
+    ]
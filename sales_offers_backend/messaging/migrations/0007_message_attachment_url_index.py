@@ -0,0 +1,21 @@
+# Generated by Django 5.1.5 on 2026-10-19 13:48
+
+import django.db.models.fields.json
+import django.db.models.functions.comparison
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('messaging', '0006_message_attachment_expiry_index'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='message',
+            index=models.Index(django.db.models.functions.comparison.Cast(django.db.models.fields.json.KeyTextTransform('url', 'attachment_data'), models.TextField()), condition=models.Q(('is_expired', False), ('message_type', 'file')), name='message_attachment_url_idx'),
+        ),
+    ]
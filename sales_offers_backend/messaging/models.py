@@ -1,16 +1,48 @@
-from django.db import models
+from django.db import models, transaction
+from django.db.models import OuterRef, Subquery, F
+from django.db.models.fields.json import KT
+from django.db.models.functions import Cast, Coalesce
 from django.contrib.auth import get_user_model
+from django.utils import timezone
 
 User = get_user_model()
 
+
+def attachment_url_expression():
+    # Cast, so lookups compare plain text rather than JSON values
+    return Cast(KT('attachment_data__url'), models.TextField())
+
+
 class Conversation(models.Model):
     participants = models.ManyToManyField(User, related_name='conversations')
+    # "<lower user id>:<higher user id>" for 1:1 conversations, so the pair
+    # lookup is a single unique-index probe instead of a double join
+    participant_key = models.CharField(max_length=64, unique=True, null=True, blank=True, editable=False)
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
     
     class Meta:
         ordering = ['-updated_at']
     
+    @staticmethod
+    def make_participant_key(user_id, other_id):
+        low, high = sorted((user_id, other_id))
+        return f"{low}:{high}"
+    
+    @classmethod
+    def get_or_create_direct(cls, user, other):
+        """
+        Find or open the 1:1 conversation between two users. The unique key
+        makes concurrent first messages converge on one row: the losing insert
+        hits the constraint and get_or_create falls back to reading the winner.
+        """
+        key = cls.make_participant_key(user.id, other.id)
+        with transaction.atomic():
+            conversation, created = cls.objects.get_or_create(participant_key=key)
+            if created:
+                conversation.participants.add(user, other)
+        return conversation, created
+    
     def __str__(self):
         participant_names = ', '.join([user.username for user in self.participants.all()])
         return f"Conversation: {participant_names}"
@@ -19,6 +51,16 @@ class Conversation(models.Model):
     def last_message(self):
         return self.messages.first()
 
+class MessageQuerySet(models.QuerySet):
+    def unread_for(self, user):
+        """Messages from other participants past the user's read watermark"""
+        watermark = ConversationReadState.objects.filter(
+            conversation=OuterRef('conversation'), user=user
+        ).values('last_read_message_id')[:1]
+        return self.exclude(sender=user).annotate(
+            read_watermark=Coalesce(Subquery(watermark), 0)
+        ).filter(id__gt=F('read_watermark'))
+
 class Message(models.Model):
     MESSAGE_TYPES = [
         ('text', 'Text'),
@@ -34,8 +76,11 @@ class Message(models.Model):
     expires_at = models.DateTimeField(null=True, blank=True)
     is_expired = models.BooleanField(default=False)
     timestamp = models.DateTimeField(auto_now_add=True)
+    # Superseded by ConversationReadState; kept for existing rows and admin
     is_read = models.BooleanField(default=False)
     
+    objects = MessageQuerySet.as_manager()
+    
     def is_attachment_expired(self):
         if not self.expires_at or self.message_type == 'text':
             return False
@@ -57,6 +102,54 @@ class Message(models.Model):
     
     class Meta:
         ordering = ['-timestamp']
+        indexes = [
+            models.Index(fields=['conversation', 'timestamp', 'id'], name='message_conv_window_idx'),
+            models.Index(
+                fields=['expires_at', 'id'], name='message_attachment_expiry_idx',
+                condition=models.Q(message_type='file', is_expired=False)
+            ),
+            # Lets the expiry sweeper see whether a live message still points at a blob
+            # (see messaging/expiry.py; the query must use the same expression)
+            models.Index(
+                attachment_url_expression(), name='message_attachment_url_idx',
+                condition=models.Q(message_type='file', is_expired=False)
+            ),
+        ]
     
     def __str__(self):
-        return f"{self.sender.username}: {self.content[:50]}..."
\ No newline at end of file
+        return f"{self.sender.username}: {self.content[:50]}..."
+
+class ConversationReadState(models.Model):
+    """
+    Per-participant read receipt. Everything in the conversation up to
+    last_read_message_id counts as read, so marking a conversation read is a
+    single row write instead of an UPDATE over every message.
+    """
+    conversation = models.ForeignKey(Conversation, on_delete=models.CASCADE, related_name='read_states')
+    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='conversation_read_states')
+    last_read_message_id = models.BigIntegerField(default=0)
+    updated_at = models.DateTimeField(auto_now=True)
+    
+    class Meta:
+        unique_together = ('conversation', 'user')
+    
+    def __str__(self):
+        return f"{self.user.username} read conversation {self.conversation_id} up to {self.last_read_message_id}"
+    
+    @classmethod
+    def mark_read(cls, conversation_id, user, message_id):
+        """Advance the user's watermark; never moves it backwards"""
+        updated = cls.objects.filter(
+            conversation_id=conversation_id, user=user, last_read_message_id__lt=message_id
+        ).update(last_read_message_id=message_id, updated_at=timezone.now())
+        if not updated:
+            cls.objects.get_or_create(
+                conversation_id=conversation_id, user=user,
+                defaults={'last_read_message_id': message_id}
+            )
+    
+    @classmethod
+    def watermarks_for(cls, conversation_id):
+        return dict(
+            cls.objects.filter(conversation_id=conversation_id).values_list('user_id', 'last_read_message_id')
+        )
\ No newline at end of file
@@ -0,0 +1,78 @@
+import base64
+from datetime import datetime
+from django.db.models import Q
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import BasePagination
+from rest_framework.response import Response
+
+
+def encode_cursor(message):
+    raw = f"{message.timestamp.isoformat()}|{message.id}"
+    return base64.urlsafe_b64encode(raw.encode()).decode()
+
+
+def decode_cursor(value):
+    try:
+        timestamp, message_id = base64.urlsafe_b64decode(value.encode()).decode().split('|')
+        return datetime.fromisoformat(timestamp), int(message_id)
+    except (ValueError, TypeError):
+        raise NotFound('Invalid cursor')
+
+
+class MessageWindowPagination(BasePagination):
+    """
+    Keyset pagination over (timestamp, id) for chat history.
+
+    Without anchors the newest window is returned. ``before`` walks back into
+    older history for infinite scroll and ``after`` fetches anything newer
+    than the last message the client has, which is what polling uses. Pages
+    are always returned newest first.
+    """
+    default_limit = 50
+    max_limit = 200
+
+    def get_limit(self, request):
+        try:
+            limit = int(request.query_params.get('limit', self.default_limit))
+        except ValueError:
+            limit = self.default_limit
+        return max(1, min(limit, self.max_limit))
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.limit = self.get_limit(request)
+        before = request.query_params.get('before')
+        after = request.query_params.get('after')
+        self.after_cursor = after
+
+        if after:
+            timestamp, message_id = decode_cursor(after)
+            queryset = queryset.filter(
+                Q(timestamp__gt=timestamp) | Q(timestamp=timestamp, id__gt=message_id)
+            ).order_by('timestamp', 'id')
+            page = list(queryset[:self.limit + 1])
+            self.has_newer = len(page) > self.limit
+            self.has_older = True
+            page = page[:self.limit]
+            page.reverse()
+        else:
+            if before:
+                timestamp, message_id = decode_cursor(before)
+                queryset = queryset.filter(
+                    Q(timestamp__lt=timestamp) | Q(timestamp=timestamp, id__lt=message_id)
+                )
+            page = list(queryset.order_by('-timestamp', '-id')[:self.limit + 1])
+            self.has_older = len(page) > self.limit
+            self.has_newer = bool(before)
+            page = page[:self.limit]
+
+        self.page = page
+        return page
+
+    def get_paginated_response(self, data):
+        return Response({
+            'results': data,
+            'before': encode_cursor(self.page[-1]) if self.page and self.has_older else None,
+            'after': encode_cursor(self.page[0]) if self.page else self.after_cursor,
+            'has_older': self.has_older,
+            'has_newer': self.has_newer,
+        })
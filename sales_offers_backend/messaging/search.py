@@ -0,0 +1,68 @@
+from hashlib import md5
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db import connection
+from django.db.models import Case, When, Value, IntegerField, Exists, OuterRef, Q
+from accounts.models import UserSearchToken, normalize_search_text
+from .models import Conversation
+
+User = get_user_model()
+
+SEARCH_RESULT_LIMIT = 10
+SEARCH_CACHE_TIMEOUT = 30
+# Sorts after every other character, turning a prefix match into a b-tree range
+PREFIX_UPPER_BOUND = '\U0010ffff'
+
+
+def prefix_range(field, prefix):
+    return Q(**{f'{field}__gte': prefix, f'{field}__lt': prefix + PREFIX_UPPER_BOUND})
+
+
+def search_users_for(user, query):
+    """
+    Typeahead over the normalized search_name column ("first last
+    username", lowercased). PostgreSQL matches substrings through the pg_trgm
+    GIN index; other databases match the start of any word in it, so last
+    names and usernames are found regardless of case. There the first word
+    of the query is a range scan over the UserSearchToken index and only
+    the users it finds are checked for the whole query. Prefix matches and
+    people the user already talks to rank first.
+    """
+    term = normalize_search_text(query)
+    if not term:
+        return User.objects.none()
+    word_start = prefix_range('search_name', term) | Q(search_name__contains=f' {term}')
+    if connection.vendor == 'postgresql':
+        # search_name is already lowercase, so a plain LIKE can use the trigram index
+        match = Q(search_name__contains=term)
+    else:
+        tokens = UserSearchToken.objects.filter(prefix_range('token', term.split()[0]))
+        match = Q(id__in=tokens.values('user_id')) & word_start
+    
+    partner = Conversation.participants.through.objects.filter(
+        user_id=OuterRef('pk'),
+        conversation__participants=user
+    )
+    return User.objects.filter(match).exclude(id=user.id).annotate(
+        is_prefix=Case(
+            When(word_start, then=Value(1)),
+            default=Value(0),
+            output_field=IntegerField()
+        ),
+        is_partner=Exists(partner)
+    ).order_by('-is_partner', '-is_prefix', 'search_name')[:SEARCH_RESULT_LIMIT]
+
+
+def search_cache_key(user, query):
+    digest = md5(normalize_search_text(query).encode()).hexdigest()
+    return f'messaging:user_search:{user.id}:{digest}'
+
+
+def cached_user_search(user, query, serialize):
+    """Serve hot prefixes from a short-lived per-user cache"""
+    key = search_cache_key(user, query)
+    results = cache.get(key)
+    if results is None:
+        results = serialize(search_users_for(user, query))
+        cache.set(key, results, SEARCH_CACHE_TIMEOUT)
+    return results
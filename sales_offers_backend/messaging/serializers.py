@@ -1,6 +1,6 @@
 from rest_framework import serializers
 from django.contrib.auth import get_user_model
-from .models import Conversation, Message
+from .models import Conversation, Message, ConversationReadState
 
 User = get_user_model()
 
@@ -24,6 +24,7 @@ class UserSerializer(serializers.ModelSerializer):
 class MessageSerializer(serializers.ModelSerializer):
     sender = UserSerializer(read_only=True)
     is_attachment_expired = serializers.SerializerMethodField()
+    is_read = serializers.SerializerMethodField()
     
     class Meta:
         model = Message
@@ -32,6 +33,18 @@ class MessageSerializer(serializers.ModelSerializer):
     def get_is_attachment_expired(self, obj):
         return obj.is_attachment_expired()
     
+    def get_is_read(self, obj):
+        # A message is read once any other participant's watermark has passed it.
+        # List views pass the conversation's watermarks in context to avoid a lookup per row.
+        watermarks = self.context.get('read_watermarks')
+        if watermarks is None:
+            watermarks = ConversationReadState.watermarks_for(obj.conversation_id)
+        return any(
+            last_read >= obj.id
+            for user_id, last_read in watermarks.items()
+            if user_id != obj.sender_id
+        )
+    
     def to_representation(self, instance):
         data = super().to_representation(instance)
         # Hide attachment data if expired
@@ -56,7 +69,7 @@ class ConversationSerializer(serializers.ModelSerializer):
     def get_unread_count(self, obj):
         request = self.context.get('request')
         if request and request.user:
-            return obj.messages.filter(is_read=False).exclude(sender=request.user).count()
+            return obj.messages.unread_for(request.user).count()
         return 0
     
     def get_other_participant(self, obj):
@@ -0,0 +1,83 @@
+"""
+Storage clients for message attachment blobs.
+
+The sweeper only needs ``delete(url)``, which returns True once the blob is
+gone, False when the delete failed and None when the URL is not a message
+attachment this app stored (so nothing is deleted). The backend is chosen by
+the MESSAGE_ATTACHMENT_STORAGE setting. A delete that finds nothing to
+remove counts as success so reruns are idempotent.
+"""
+import logging
+import os
+from urllib.parse import urlparse
+import requests
+from django.conf import settings
+from django.utils.module_loading import import_string
+
+logger = logging.getLogger(__name__)
+
+# Chat uploads are stored under this prefix (see the frontend's app/api/upload/route.ts)
+MESSAGE_ATTACHMENT_PREFIX = '/messages/'
+
+
+class LocalFileBlobStorage:
+    """Filesystem stand-in: maps the URL path onto a local directory"""
+
+    def __init__(self, root=None):
+        self.root = os.path.abspath(root or getattr(settings, 'MESSAGE_ATTACHMENT_LOCAL_ROOT', 'attachments'))
+
+    def path_for(self, url):
+        relative = urlparse(url).path.lstrip('/')
+        path = os.path.abspath(os.path.join(self.root, relative))
+        if os.path.commonpath([self.root, path]) != self.root:
+            raise ValueError(f'Attachment path escapes storage root: {url}')
+        return path
+
+    def delete(self, url):
+        try:
+            os.remove(self.path_for(url))
+        except FileNotFoundError:
+            pass
+        return True
+
+
+class VercelBlobStorage:
+    """
+    Deletes blobs through the Vercel Blob HTTP API. Attachment URLs come from
+    users, so only https URLs on a Vercel Blob host (this app's store, when
+    MESSAGE_ATTACHMENT_BLOB_HOST is set) under the message upload prefix are
+    ever sent with the store token.
+    """
+    api_url = 'https://blob.vercel-storage.com/delete'
+
+    def __init__(self, token=None, timeout=10, store_host=None):
+        self.token = token or os.environ.get('BLOB_READ_WRITE_TOKEN', '')
+        self.timeout = timeout
+        self.store_host = store_host if store_host is not None else getattr(settings, 'MESSAGE_ATTACHMENT_BLOB_HOST', '')
+        self.session = requests.Session()
+
+    def owns(self, url):
+        parts = urlparse(url)
+        host = (parts.hostname or '').lower()
+        if parts.scheme != 'https' or parts.port is not None or not host.endswith('.blob.vercel-storage.com'):
+            return False
+        if self.store_host and host != self.store_host.lower():
+            return False
+        return parts.path.startswith(MESSAGE_ATTACHMENT_PREFIX)
+
+    def delete(self, url):
+        if not self.owns(url):
+            logger.warning('Not deleting %s: not a message attachment in this blob store', url)
+            return None
+        response = self.session.post(
+            self.api_url,
+            json={'urls': [url]},
+            headers={'Authorization': f'Bearer {self.token}'},
+            timeout=self.timeout
+        )
+        return response.status_code < 400
+
+
+def get_attachment_storage():
+    path = getattr(settings, 'MESSAGE_ATTACHMENT_STORAGE', 'messaging.storage.LocalFileBlobStorage')
+    return import_string(path)()
@@ -0,0 +1,54 @@
+from django.utils import timezone
+from accounts.models import Notification
+from .models import Conversation, Message
+
+def message_side_effects_key(conversation_id, sender_id):
+    return ('message-side-effects', conversation_id, sender_id)
+
+def process_message_side_effects(conversation_id, sender_id):
+    """
+    Deferred work after a message is sent: bump the conversation and notify
+    the other participants. Runs against the sender's latest message, so a
+    burst of messages handled in one run yields one notification per recipient.
+    """
+    message = Message.objects.filter(
+        conversation_id=conversation_id, sender_id=sender_id
+    ).select_related('sender').order_by('-timestamp', '-id').first()
+    if message is None:
+        return
+    
+    Conversation.objects.filter(pk=conversation_id).update(updated_at=timezone.now())
+    
+    sender = message.sender
+    recipient_ids = set(
+        Conversation.participants.through.objects.filter(
+            conversation_id=conversation_id
+        ).exclude(user_id=sender_id).values_list('user_id', flat=True)
+    )
+    if not recipient_ids:
+        return
+    
+    title = f'New message from {sender.first_name or sender.username}'
+    body = message.content[:100] + ('...' if len(message.content) > 100 else '')
+    
+    # Collapse into any unread notification the recipient already has for this conversation
+    unread = Notification.objects.filter(
+        user_id__in=recipient_ids,
+        type='message',
+        related_conversation_id=conversation_id,
+        is_read=False
+    )
+    already_notified = set(unread.values_list('user_id', flat=True))
+    if already_notified:
+        unread.update(title=title, message=body, created_at=timezone.now())
+    
+    Notification.objects.bulk_create([
+        Notification(
+            user_id=user_id,
+            title=title,
+            message=body,
+            type='message',
+            related_conversation_id=conversation_id
+        )
+        for user_id in recipient_ids - already_notified
+    ])
@@ -1,3 +1,309 @@
-from django.test import TestCase
+import os
+import tempfile
+from datetime import timedelta
+from io import StringIO
+from unittest import mock
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.management import call_command
+from django.utils import timezone
+from django.test import override_settings
+from accounts.models import Notification
+from rest_framework.test import APITestCase
+from rest_framework import status
+from admin_system.jobs import Lease, job_lock
+from admin_system.models import JobState
+from .models import Conversation, Message, ConversationReadState
+from .expiry import JOB_NAME, RETRY_BASE_DELAY, AttachmentExpirySweeper
+from .storage import LocalFileBlobStorage, VercelBlobStorage
 
-# Create your tests here.
+User = get_user_model()
+
+class MessageHistoryTestCase(APITestCase):
+    def setUp(self):
+        self.alice = User.objects.create_user(username='alice', email='alice@example.com', password='testpass123')
+        self.bob = User.objects.create_user(username='bob', email='bob@example.com', password='testpass123')
+        self.conversation = Conversation.objects.create()
+        self.conversation.participants.add(self.alice, self.bob)
+        self.messages = [
+            Message.objects.create(conversation=self.conversation, sender=self.alice, content=f'Message {i}')
+            for i in range(5)
+        ]
+        self.url = f'/api/messages/conversations/{self.conversation.id}/messages/'
+        
+    def test_windowed_history(self):
+        """Test cursor pagination walks back through history and polls forward"""
+        self.client.force_authenticate(user=self.bob)
+        
+        response = self.client.get(self.url, {'limit': 2})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual([m['content'] for m in response.data['results']], ['Message 4', 'Message 3'])
+        self.assertTrue(response.data['has_older'])
+        
+        older = self.client.get(self.url, {'limit': 2, 'before': response.data['before']})
+        self.assertEqual([m['content'] for m in older.data['results']], ['Message 2', 'Message 1'])
+        
+        Message.objects.create(conversation=self.conversation, sender=self.alice, content='Message 5')
+        newer = self.client.get(self.url, {'after': response.data['after']})
+        self.assertEqual([m['content'] for m in newer.data['results']], ['Message 5'])
+        
+    def test_invalid_cursor(self):
+        """Test malformed cursors are rejected"""
+        self.client.force_authenticate(user=self.bob)
+        response = self.client.get(self.url, {'before': 'not-a-cursor'})
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+        
+    def test_read_watermark(self):
+        """Test reading advances a single watermark row instead of every message"""
+        self.client.force_authenticate(user=self.bob)
+        self.assertEqual(self.client.get('/api/messages/unread-count/').data['unread_count'], 5)
+        
+        self.client.get(self.url)
+        self.assertEqual(ConversationReadState.objects.count(), 1)
+        self.assertEqual(
+            ConversationReadState.objects.get(user=self.bob).last_read_message_id,
+            self.messages[-1].id
+        )
+        self.assertFalse(Message.objects.filter(is_read=True).exists())
+        self.assertEqual(self.client.get('/api/messages/unread-count/').data['unread_count'], 0)
+        
+        # Alice sees her messages as read by Bob
+        self.client.force_authenticate(user=self.alice)
+        response = self.client.get(self.url)
+        self.assertTrue(all(m['is_read'] for m in response.data['results']))
+
+class DirectConversationTestCase(APITestCase):
+    def setUp(self):
+        self.alice = User.objects.create_user(username='alice', email='alice@example.com', password='testpass123')
+        self.bob = User.objects.create_user(username='bob', email='bob@example.com', password='testpass123')
+        
+    def test_pair_lookup_reuses_conversation(self):
+        """Test start and send converge on one keyed conversation regardless of direction"""
+        self.client.force_authenticate(user=self.alice)
+        response = self.client.post('/api/messages/start-conversation/', {'recipient_id': self.bob.id})
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        
+        self.client.force_authenticate(user=self.bob)
+        response = self.client.post('/api/messages/send/', {'recipient_id': self.alice.id, 'content': 'Hi'})
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        
+        self.assertEqual(Conversation.objects.count(), 1)
+        conversation = Conversation.objects.get()
+        self.assertEqual(conversation.participant_key, Conversation.make_participant_key(self.bob.id, self.alice.id))
+        self.assertEqual(conversation.participants.count(), 2)
+
+    def test_sample_conversations_are_keyed(self):
+        """Test the sample data command opens keyed conversations and can be re-run"""
+        call_command('create_sample_conversations', stdout=StringIO())
+        call_command('create_sample_conversations', stdout=StringIO())
+        conversation = Conversation.objects.get()
+        self.assertEqual(conversation.participant_key, Conversation.make_participant_key(self.alice.id, self.bob.id))
+        self.assertEqual(conversation.messages.count(), 4)
+
+@override_settings(BACKGROUND_TASK_QUEUE='backend.background.ImmediateTaskQueue')
+class MessageSideEffectsTestCase(APITestCase):
+    def setUp(self):
+        self.alice = User.objects.create_user(username='alice', email='alice@example.com', password='testpass123')
+        self.bob = User.objects.create_user(username='bob', email='bob@example.com', password='testpass123')
+        self.conversation, _ = Conversation.get_or_create_direct(self.alice, self.bob)
+        
+    def send(self, content):
+        with self.captureOnCommitCallbacks(execute=True):
+            return self.client.post('/api/messages/send/', {'conversation_id': self.conversation.id, 'content': content})
+        
+    def test_notifications_run_after_commit_and_collapse(self):
+        """Test repeated messages leave one unread notification per conversation"""
+        self.client.force_authenticate(user=self.alice)
+        before = Conversation.objects.get().updated_at
+        
+        self.send('First')
+        self.send('Second')
+        
+        notifications = Notification.objects.filter(user=self.bob, type='message')
+        self.assertEqual(notifications.count(), 1)
+        self.assertEqual(notifications.get().message, 'Second')
+        self.assertFalse(Notification.objects.filter(user=self.alice).exists())
+        self.assertGreater(Conversation.objects.get().updated_at, before)
+        
+        notifications.update(is_read=True)
+        self.send('Third')
+        self.assertEqual(Notification.objects.filter(user=self.bob, type='message').count(), 2)
+
+class AttachmentExpirySweeperTestCase(APITestCase):
+    def setUp(self):
+        cache.clear()
+        self.root = tempfile.TemporaryDirectory()
+        self.addCleanup(self.root.cleanup)
+        self.storage = LocalFileBlobStorage(root=self.root.name)
+        alice = User.objects.create_user(username='alice', email='alice@example.com', password='testpass123')
+        bob = User.objects.create_user(username='bob', email='bob@example.com', password='testpass123')
+        conversation, _ = Conversation.get_or_create_direct(alice, bob)
+        
+        past = timezone.now() - timedelta(hours=1)
+        self.expired = []
+        for i in range(5):
+            name = f'file-{i}.txt'
+            with open(os.path.join(self.root.name, name), 'w') as f:
+                f.write('data')
+            self.expired.append(Message.objects.create(
+                conversation=conversation, sender=alice, content=name, message_type='file',
+                attachment_data={'url': f'https://files.example.com/{name}', 'name': name},
+                expires_at=past
+            ))
+        self.live = Message.objects.create(
+            conversation=conversation, sender=alice, content='live', message_type='file',
+            attachment_data={'url': 'https://files.example.com/live.txt', 'name': 'live.txt'}
+        )
+        
+    def test_sweeper_expires_in_resumable_batches(self):
+        """Test chunks are bounded, blobs removed and the run resumes from its watermark"""
+        stats = AttachmentExpirySweeper(storage=self.storage, batch_size=2).run(max_batches=1)
+        self.assertEqual(stats['expired'], 2)
+        self.assertFalse(stats['drained'])
+        
+        stats = AttachmentExpirySweeper(storage=self.storage, batch_size=2).run()
+        self.assertEqual(stats['expired'], 3)
+        self.assertEqual(stats['blobs_deleted'], 3)
+        self.assertTrue(stats['drained'])
+        
+        self.assertEqual(Message.objects.filter(is_expired=True).count(), 5)
+        self.assertEqual(os.listdir(self.root.name), [])
+        message = Message.objects.get(pk=self.expired[0].pk)
+        self.assertTrue(message.attachment_data['expired'])
+        self.assertEqual(message.attachment_data['name'], 'file-0.txt')
+        self.assertFalse(Message.objects.get(pk=self.live.pk).is_expired)
+
+    def test_failed_blob_delete_retried_with_backoff(self):
+        """Test a failed delete keeps the message unexpired until a later retry succeeds"""
+        failing = mock.Mock(delete=mock.Mock(return_value=False))
+        stats = AttachmentExpirySweeper(storage=failing).run()
+        self.assertEqual((stats['expired'], stats['retry_scheduled']), (0, 5))
+        message = Message.objects.get(pk=self.expired[0].pk)
+        self.assertFalse(message.is_expired)
+        self.assertEqual(message.attachment_data['delete_attempts'], 1)
+
+        # Not due yet: nothing is attempted again
+        stats = AttachmentExpirySweeper(storage=self.storage).run()
+        self.assertEqual((stats['scanned'], stats['expired']), (5, 0))
+
+        later = timezone.now() + RETRY_BASE_DELAY + timedelta(minutes=1)
+        with mock.patch('messaging.expiry.timezone.now', return_value=later):
+            stats = AttachmentExpirySweeper(storage=self.storage).run()
+        self.assertEqual(stats['expired'], 5)
+        message = Message.objects.get(pk=self.expired[0].pk)
+        self.assertTrue(message.attachment_data['blob_deleted'])
+        self.assertNotIn('retry_at', message.attachment_data)
+
+    def test_failure_behind_watermark_retried(self):
+        """Test a failed delete left behind a saved watermark is retried by a later partial run"""
+        first = self.expired[0].attachment_data['url']
+        flaky = mock.Mock(delete=mock.Mock(side_effect=lambda url: url != first and self.storage.delete(url)))
+        stats = AttachmentExpirySweeper(storage=flaky, batch_size=2).run(max_batches=1)
+        self.assertEqual((stats['expired'], stats['retry_scheduled'], stats['drained']), (1, 1, False))
+
+        later = timezone.now() + RETRY_BASE_DELAY + timedelta(minutes=1)
+        with mock.patch('messaging.expiry.timezone.now', return_value=later):
+            stats = AttachmentExpirySweeper(storage=self.storage, batch_size=2).run(max_batches=1)
+        self.assertEqual((stats['scanned'], stats['expired']), (1, 1))
+        self.assertTrue(Message.objects.get(pk=self.expired[0].pk).attachment_data['blob_deleted'])
+        self.assertFalse(Message.objects.get(pk=self.expired[2].pk).is_expired)
+
+    def test_lease_renewed_and_lost(self):
+        """Test every chunk renews the lease, and a run that lost it stops"""
+        original = AttachmentExpirySweeper.process_batch
+
+        def process_then_lose_lock(sweeper, *args):
+            original(sweeper, *args)
+            # Another run took the lock over after ours expired
+            JobState.objects.filter(name=JOB_NAME).update(lock_token='other-run')
+
+        with mock.patch.object(AttachmentExpirySweeper, 'process_batch', process_then_lose_lock):
+            stats = AttachmentExpirySweeper(storage=self.storage, batch_size=2).run()
+        self.assertEqual((stats['batches'], stats['expired'], stats['drained']), (1, 2, False))
+
+        JobState.objects.filter(name=JOB_NAME).update(locked_until=None, lock_token='')
+        with mock.patch.object(Lease, 'renew', autospec=True, return_value=True) as renew:
+            AttachmentExpirySweeper(storage=self.storage, batch_size=2).run()
+        self.assertEqual(renew.call_count, 2)
+
+    def test_blob_still_referenced_is_kept(self):
+        """Test a blob another live message points at is not deleted with the expired one"""
+        shared = self.expired[0].attachment_data
+        Message.objects.create(
+            conversation=self.live.conversation, sender=self.live.sender, content='copy', message_type='file',
+            attachment_data=dict(shared)
+        )
+        stats = AttachmentExpirySweeper(storage=self.storage).run()
+        self.assertEqual((stats['expired'], stats['blobs_shared'], stats['blobs_deleted']), (5, 1, 4))
+        self.assertEqual(os.listdir(self.root.name), ['file-0.txt'])
+        self.assertFalse(Message.objects.get(pk=self.expired[0].pk).attachment_data['blob_deleted'])
+
+    def test_vercel_storage_only_deletes_own_attachments(self):
+        """Test only message uploads in this app's blob store are sent to the delete API"""
+        storage = VercelBlobStorage(token='secret', store_host='abc.public.blob.vercel-storage.com')
+        storage.session = mock.Mock(post=mock.Mock(return_value=mock.Mock(status_code=200)))
+        for url in (
+            'https://evil.example.com/?blob.vercel-storage.com',
+            'https://blob.vercel-storage.com.evil.example.com/messages/a.png',
+            'http://abc.public.blob.vercel-storage.com/messages/a.png',
+            'https://other.public.blob.vercel-storage.com/messages/a.png',
+            'https://abc.public.blob.vercel-storage.com/deal-images/a.png',
+        ):
+            self.assertIsNone(storage.delete(url), url)
+        storage.session.post.assert_not_called()
+        self.assertTrue(storage.delete('https://abc.public.blob.vercel-storage.com/messages/1-a.png'))
+        storage.session.post.assert_called_once()
+
+    def test_overlapping_run_skipped(self):
+        """Test the database lock keeps a second run out while the first holds it"""
+        with job_lock(JOB_NAME, 300):
+            self.assertIsNone(AttachmentExpirySweeper(storage=self.storage).run())
+        self.assertIsNotNone(AttachmentExpirySweeper(storage=self.storage).run())
+
+class UserSearchTestCase(APITestCase):
+    def setUp(self):
+        cache.clear()
+        self.me = User.objects.create_user(username='me', email='me@example.com', password='testpass123')
+        self.stranger = User.objects.create_user(
+            username='mstranger', email='s@example.com', password='testpass123', first_name='Maria', last_name='Stranger'
+        )
+        self.partner = User.objects.create_user(
+            username='mpartner', email='p@example.com', password='testpass123', first_name='Márta', last_name='Partner'
+        )
+        User.objects.create_user(username='other', email='o@example.com', password='testpass123', first_name='Zed')
+        Conversation.get_or_create_direct(self.me, self.partner)
+        
+    def test_search_name_normalized(self):
+        """Test search_name is maintained on save"""
+        self.assertEqual(self.partner.search_name, 'marta partner mpartner')
+        
+    def test_search_ranks_partners_and_caches(self):
+        """Test prefix search ranks conversation partners first and caches hot prefixes"""
+        self.client.force_authenticate(user=self.me)
+        response = self.client.get('/api/messages/search-users/', {'q': 'Mar'})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual([u['username'] for u in response.data], ['mpartner', 'mstranger'])
+        
+        with self.assertNumQueries(0):
+            cached = self.client.get('/api/messages/search-users/', {'q': 'mar'})
+        self.assertEqual(cached.data, response.data)
+
+    def test_search_matches_last_name_and_mixed_case_username(self):
+        """Test any word of the name matches, and usernames match case-insensitively"""
+        User.objects.create_user(username='KWanjiru', email='k@example.com', password='testpass123', first_name='Grace')
+        self.client.force_authenticate(user=self.me)
+        response = self.client.get('/api/messages/search-users/', {'q': 'Strang'})
+        self.assertEqual([u['username'] for u in response.data], ['mstranger'])
+        response = self.client.get('/api/messages/search-users/', {'q': 'kwan'})
+        self.assertEqual([u['username'] for u in response.data], ['KWanjiru'])
+
+    def test_search_tokens_follow_renames(self):
+        """Test renaming replaces the word tokens behind the non-PostgreSQL search"""
+        self.assertEqual(set(self.stranger.search_tokens.values_list('token', flat=True)), {'maria', 'stranger', 'mstranger'})
+        self.stranger.last_name = 'Okafor'
+        self.stranger.save(update_fields=['last_name'])
+        self.assertEqual(set(self.stranger.search_tokens.values_list('token', flat=True)), {'maria', 'okafor', 'mstranger'})
+        self.client.force_authenticate(user=self.me)
+        response = self.client.get('/api/messages/search-users/', {'q': 'maria oka'})
+        self.assertEqual([u['username'] for u in response.data], ['mstranger'])
+        self.assertEqual(self.client.get('/api/messages/search-users/', {'q': 'strang'}).data, [])
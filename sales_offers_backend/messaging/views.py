@@ -1,11 +1,16 @@
 from rest_framework import generics, status
 from rest_framework.decorators import api_view, permission_classes
+from rest_framework.exceptions import NotFound
 from rest_framework.permissions import IsAuthenticated
 from rest_framework.response import Response
-from django.db.models import Q, Max
+from django.db.models import Max
 from django.contrib.auth import get_user_model
-from .models import Conversation, Message
+from .models import Conversation, Message, ConversationReadState
+from .pagination import MessageWindowPagination
 from .serializers import ConversationSerializer, MessageSerializer, UserSerializer
+from .tasks import process_message_side_effects, message_side_effects_key
+from .search import cached_user_search
+from backend.background import enqueue_on_commit
 
 User = get_user_model()
 
@@ -26,13 +31,37 @@ class ConversationDetailView(generics.RetrieveAPIView):
 class MessageListView(generics.ListAPIView):
     serializer_class = MessageSerializer
     permission_classes = [IsAuthenticated]
+    pagination_class = MessageWindowPagination
+    
+    def get_conversation(self):
+        if not hasattr(self, '_conversation'):
+            try:
+                self._conversation = Conversation.objects.get(
+                    id=self.kwargs['conversation_id'], participants=self.request.user
+                )
+            except Conversation.DoesNotExist:
+                raise NotFound('Conversation not found')
+        return self._conversation
     
     def get_queryset(self):
-        conversation_id = self.kwargs['conversation_id']
-        conversation = Conversation.objects.get(id=conversation_id, participants=self.request.user)
-        # Mark messages as read
-        conversation.messages.exclude(sender=self.request.user).update(is_read=True)
-        return conversation.messages.all()
+        return Message.objects.filter(conversation=self.get_conversation()).select_related('sender')
+    
+    def list(self, request, *args, **kwargs):
+        conversation = self.get_conversation()
+        page = self.paginate_queryset(self.filter_queryset(self.get_queryset()))
+        
+        # Fetching the live end of the conversation advances our read watermark;
+        # scrolling back through older history does not
+        if page and not request.query_params.get('before'):
+            ConversationReadState.mark_read(conversation.id, request.user, page[0].id)
+        
+        serializer = self.get_serializer(page, many=True)
+        return self.get_paginated_response(serializer.data)
+    
+    def get_serializer_context(self):
+        context = super().get_serializer_context()
+        context['read_watermarks'] = ConversationReadState.watermarks_for(self.get_conversation().id)
+        return context
 
 @api_view(['POST'])
 @permission_classes([IsAuthenticated])
@@ -55,16 +84,7 @@ def send_message(request):
     elif recipient_id:
         try:
             recipient = User.objects.get(id=recipient_id)
-            # Check if conversation already exists
-            conversation = Conversation.objects.filter(
-                participants=request.user
-            ).filter(
-                participants=recipient
-            ).first()
-            
-            if not conversation:
-                conversation = Conversation.objects.create()
-                conversation.participants.add(request.user, recipient)
+            conversation, _ = Conversation.get_or_create_direct(request.user, recipient)
         except User.DoesNotExist:
             return Response({'error': 'Recipient not found'}, status=status.HTTP_404_NOT_FOUND)
     else:
@@ -79,20 +99,11 @@ def send_message(request):
         attachment_data=attachment_data
     )
     
-    # Create notification for other participants
-    from accounts.models import Notification
-    other_participants = conversation.participants.exclude(id=request.user.id)
-    for participant in other_participants:
-        Notification.objects.create(
-            user=participant,
-            title=f'New message from {request.user.first_name or request.user.username}',
-            message=content[:100] + ('...' if len(content) > 100 else ''),
-            type='message',
-            related_conversation_id=conversation.id
-        )
-    
-    # Update conversation timestamp
-    conversation.save()
+    # Notifications and the conversation bump happen after commit, off the request
+    enqueue_on_commit(
+        process_message_side_effects, conversation.id, request.user.id,
+        dedupe_key=message_side_effects_key(conversation.id, request.user.id)
+    )
     
     return Response(MessageSerializer(message).data, status=status.HTTP_201_CREATED)
 
@@ -103,13 +114,10 @@ def search_users(request):
     if len(query) < 2:
         return Response([], status=status.HTTP_200_OK)
     
-    users = User.objects.filter(
-        Q(username__icontains=query) | 
-        Q(first_name__icontains=query) | 
-        Q(last_name__icontains=query)
-    ).exclude(id=request.user.id)[:10]
-    
-    return Response(UserSerializer(users, many=True).data, status=status.HTTP_200_OK)
+    results = cached_user_search(
+        request.user, query, lambda users: UserSerializer(users, many=True).data
+    )
+    return Response(results, status=status.HTTP_200_OK)
 
 @api_view(['POST'])
 @permission_classes([IsAuthenticated])
@@ -124,16 +132,7 @@ def start_conversation(request):
     except User.DoesNotExist:
         return Response({'error': 'Recipient not found'}, status=status.HTTP_404_NOT_FOUND)
     
-    # Check if conversation already exists
-    conversation = Conversation.objects.filter(
-        participants=request.user
-    ).filter(
-        participants=recipient
-    ).first()
-    
-    if not conversation:
-        conversation = Conversation.objects.create()
-        conversation.participants.add(request.user, recipient)
+    conversation, _ = Conversation.get_or_create_direct(request.user, recipient)
     
     return Response(ConversationSerializer(conversation, context={'request': request}).data, status=status.HTTP_201_CREATED)
 
@@ -147,7 +146,9 @@ def mark_messages_read(request):
     
     try:
         conversation = Conversation.objects.get(id=conversation_id, participants=request.user)
-        conversation.messages.exclude(sender=request.user).update(is_read=True)
+        last_message_id = conversation.messages.aggregate(last=Max('id'))['last']
+        if last_message_id:
+            ConversationReadState.mark_read(conversation.id, request.user, last_message_id)
         return Response({'success': True}, status=status.HTTP_200_OK)
     except Conversation.DoesNotExist:
         return Response({'error': 'Conversation not found'}, status=status.HTTP_404_NOT_FOUND)
@@ -156,8 +157,7 @@ def mark_messages_read(request):
 @permission_classes([IsAuthenticated])
 def unread_count(request):
     total_unread = Message.objects.filter(
-        conversation__participants=request.user,
-        is_read=False
-    ).exclude(sender=request.user).count()
+        conversation__participants=request.user
+    ).unread_for(request.user).count()
     
     return Response({'unread_count': total_unread}, status=status.HTTP_200_OK)
\ No newline at end of file
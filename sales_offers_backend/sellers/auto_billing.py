@@ -1,3 +1,4 @@
+import logging
 import requests
 from django.conf import settings
 from django.utils import timezone
@@ -5,6 +6,8 @@ from datetime import timedelta
 from .models import Subscription, Payment
 import uuid
 
+logger = logging.getLogger(__name__)
+
 def process_auto_renewals():
     """Process auto-renewals for subscriptions expiring in 3 days"""
     
@@ -61,19 +64,19 @@ def process_auto_renewals():
                     subscription.end_date = subscription.end_date + timedelta(days=subscription.plan.duration_days)
                     subscription.save()
                     
-                    print(f"Auto-renewal successful for subscription {subscription.id}")
+                    logger.info('Auto-renewal successful for subscription %s', subscription.id)
                 else:
                     # Payment failed
                     payment.status = 'failed'
                     payment.save()
-                    print(f"Auto-renewal failed for subscription {subscription.id}: {data.get('message', 'Unknown error')}")
+                    logger.warning('Auto-renewal failed for subscription %s: %s', subscription.id, data.get('message', 'Unknown error'))
             else:
                 payment.status = 'failed'
                 payment.save()
-                print(f"Auto-renewal request failed for subscription {subscription.id}")
+                logger.warning('Auto-renewal request failed for subscription %s', subscription.id)
                 
         except Exception as e:
-            print(f"Error processing auto-renewal for subscription {subscription.id}: {str(e)}")
+            logger.exception('Error processing auto-renewal for subscription %s', subscription.id)
 
 def validate_card_type(authorization_code):
     """Validate that the card is not prepaid"""
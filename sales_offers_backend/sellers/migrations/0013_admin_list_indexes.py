@@ -0,0 +1,31 @@
+# Generated by Django 5.1.5 on 2026-10-19 12:15
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('sellers', '0012_seller_featured_priority_seller_featured_until_and_more'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='payment',
+            index=models.Index(fields=['created_at', 'id'], name='payment_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='payment',
+            index=models.Index(fields=['status', 'created_at', 'id'], name='payment_status_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='seller',
+            index=models.Index(fields=['created_at', 'id'], name='seller_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='subscription',
+            index=models.Index(fields=['status', 'created_at', 'id'], name='subscription_status_idx'),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.1.5 on 2026-10-19 12:28
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('sellers', '0013_admin_list_indexes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='seller',
+            name='rating_sum',
+            field=models.PositiveIntegerField(default=0),
+        ),
+    ]
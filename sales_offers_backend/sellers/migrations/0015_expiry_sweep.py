@@ -0,0 +1,19 @@
+# Generated by Django 5.1.5 on 2026-10-19 12:54
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('sellers', '0014_rating_aggregates'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='seller',
+            index=models.Index(condition=models.Q(('is_featured', True)), fields=['featured_until'], name='seller_featured_until_idx'),
+        ),
+    ]
@@ -11,6 +11,7 @@ class Seller(models.Model):
     cover_image = models.URLField(blank=True, null=True)
     rating = models.DecimalField(max_digits=3, decimal_places=2, default=0.0)
     total_reviews = models.IntegerField(default=0)
+    rating_sum = models.PositiveIntegerField(default=0)
     address = models.CharField(max_length=300)
     phone = models.CharField(max_length=20, blank=True)
     email = models.EmailField(blank=True)
@@ -25,6 +26,12 @@ class Seller(models.Model):
     featured_priority = models.IntegerField(default=0)
     featured_until = models.DateTimeField(null=True, blank=True)
 
+    class Meta:
+        indexes = [
+            models.Index(fields=['created_at', 'id'], name='seller_created_idx'),
+            models.Index(fields=['featured_until'], name='seller_featured_until_idx', condition=models.Q(is_featured=True)),
+        ]
+
     def __str__(self):
         return self.business_name
     
@@ -78,6 +85,11 @@ class Subscription(models.Model):
             self.end_date = timezone.now() + timedelta(days=self.plan.duration_days)
         super().save(*args, **kwargs)
     
+    class Meta:
+        indexes = [
+            models.Index(fields=['status', 'created_at', 'id'], name='subscription_status_idx'),
+        ]
+    
     @property
     def is_active(self):
         return self.status == 'active' and self.end_date > timezone.now()
@@ -103,6 +115,12 @@ class Payment(models.Model):
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
     
+    class Meta:
+        indexes = [
+            models.Index(fields=['created_at', 'id'], name='payment_created_idx'),
+            models.Index(fields=['status', 'created_at', 'id'], name='payment_status_idx'),
+        ]
+    
     def __str__(self):
         return f"{self.user.username} - {self.amount} {self.currency}"
 
@@ -1,6 +1,18 @@
 from rest_framework import serializers
+from django.db.models import Count
 from .models import Seller, SubscriptionPlan, Subscription, SellerProfile, Payment
 
+def attach_deal_counts(sellers):
+    """Annotate a page of sellers with deal_count in one grouped query"""
+    from deals.models import Deal
+    sellers = [seller for seller in sellers if seller is not None]
+    counts = dict(
+        Deal.objects.filter(seller_id__in={seller.id for seller in sellers})
+        .values_list('seller_id').annotate(count=Count('id'))
+    )
+    for seller in sellers:
+        seller.deal_count = counts.get(seller.id, 0)
+
 class SellerSerializer(serializers.ModelSerializer):
     total_deals = serializers.SerializerMethodField()
     user = serializers.SerializerMethodField()
@@ -11,6 +23,9 @@ class SellerSerializer(serializers.ModelSerializer):
         fields = '__all__'
     
     def get_total_deals(self, obj):
+        # Admin listings annotate the count up front
+        if hasattr(obj, 'deal_count'):
+            return obj.deal_count
         from deals.models import Deal
         return Deal.objects.filter(seller=obj).count()
     
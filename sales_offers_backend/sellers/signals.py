@@ -1,6 +1,7 @@
-from django.db.models.signals import post_save
+from django.db.models.signals import post_save, post_delete
 from django.dispatch import receiver
-from .models import SellerProfile
+from backend import content_versions
+from .models import Seller, SellerProfile
 
 @receiver(post_save, sender=SellerProfile)
 def update_deals_on_profile_change(sender, instance, created, **kwargs):
@@ -11,10 +12,19 @@ def update_deals_on_profile_change(sender, instance, created, **kwargs):
     # and only if the profile was explicitly unpublished
     if not created and not instance.is_published:
         # Only deactivate deals when profile is explicitly unpublished
-        Deal.objects.filter(seller=instance.seller, is_active=True).update(
-            is_active=False
-        )
+        if Deal.objects.filter(seller=instance.seller, is_published=True).update(
+            is_published=False
+        ):
+            # update() skips the deal signals
+            content_versions.bump('deals')
     elif not created and instance.is_published:
         # When profile is published, we don't automatically activate all deals
         # Let sellers manage their individual deals
-        pass
\ No newline at end of file
+        pass
+
+@receiver(post_save, sender=Seller)
+@receiver(post_delete, sender=Seller)
+@receiver(post_save, sender=SellerProfile)
+@receiver(post_delete, sender=SellerProfile)
+def bump_sellers_version(sender, instance, **kwargs):
+    content_versions.bump('sellers')
@@ -1,36 +1,12 @@
 from django.urls import path
-from rest_framework.decorators import api_view, permission_classes
-from rest_framework.permissions import IsAuthenticated
-from rest_framework.response import Response
-from .models import Subscription, Payment
-from .serializers import SubscriptionSerializer, PaymentSerializer
 from .views import (
     SellerListView, SubscriptionPlanListView, seller_stats, seller_offers, seller_detail,
     subscribe_to_plan, verify_payment, user_subscription, cancel_subscription,
-    seller_profile, toggle_profile_publish, manage_seller_offer, admin_sellers
+    seller_profile, toggle_profile_publish, manage_seller_offer, admin_sellers,
+    admin_subscriptions, admin_payments
 )
 from .withdrawal_views import seller_balance, request_withdrawal, withdrawal_history, bank_list
 
-@api_view(['GET'])
-@permission_classes([IsAuthenticated])
-def admin_subscriptions(request):
-    if not request.user.is_staff:
-        return Response({'error': 'Permission denied'}, status=403)
-    
-    subscriptions = Subscription.objects.select_related('user', 'plan').all().order_by('-created_at')
-    serializer = SubscriptionSerializer(subscriptions, many=True)
-    return Response(serializer.data)
-
-@api_view(['GET'])
-@permission_classes([IsAuthenticated])
-def admin_payments(request):
-    if not request.user.is_staff:
-        return Response({'error': 'Permission denied'}, status=403)
-    
-    payments = Payment.objects.select_related('user', 'subscription__plan').all().order_by('-created_at')
-    serializer = PaymentSerializer(payments, many=True)
-    return Response(serializer.data)
-
 urlpatterns = [
     path('', SellerListView.as_view(), name='seller-list'),
     path('<int:seller_id>/', seller_detail, name='seller-detail'),
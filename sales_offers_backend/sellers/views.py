@@ -5,14 +5,18 @@ from rest_framework.response import Response
 from django.db.models import Count, Sum, Avg
 from django.utils import timezone
 from .models import Seller, SubscriptionPlan, Subscription, Payment, SellerProfile
-from .serializers import SellerSerializer, SubscriptionPlanSerializer, SubscriptionSerializer, PaymentSerializer, SellerProfileSerializer
+from .serializers import SellerSerializer, SubscriptionPlanSerializer, SubscriptionSerializer, PaymentSerializer, SellerProfileSerializer, attach_deal_counts
 from deals.models import Deal
 from accounts.models import User
+from backend.admin_listing import AdminListing
+from backend.conditional import conditional_get
+from django.utils.decorators import method_decorator
 import uuid
 import requests
 import json
 from django.conf import settings
 
+@method_decorator(conditional_get('sellers', 'deals'), name='dispatch')
 class SellerListView(generics.ListCreateAPIView):
     serializer_class = SellerSerializer
     permission_classes = [AllowAny]
@@ -375,35 +379,60 @@ def seller_profile(request):
             return Response(serializer.data)
         return Response(serializer.errors, status=400)
 
+class SellerAdminListing(AdminListing):
+    filter_fields = {'is_verified': 'is_verified', 'is_featured': 'is_featured'}
+    search_fields = ('business_name', 'email', 'user__email')
+    sort_fields = {'created': 'created_at', 'name': 'business_name', 'rating': 'rating'}
+
+class SubscriptionAdminListing(AdminListing):
+    filter_fields = {'status': 'status', 'plan': 'plan_id', 'billing_type': 'billing_type'}
+    search_fields = ('user__username', 'user__email')
+    sort_fields = {'created': 'created_at', 'ends': 'end_date'}
+
+class PaymentAdminListing(AdminListing):
+    filter_fields = {'status': 'status', 'payment_method': 'payment_method', 'currency': 'currency'}
+    search_fields = ('payment_reference', 'user__username', 'user__email')
+    sort_fields = {'created': 'created_at', 'amount': 'amount'}
+
 @api_view(['GET'])
 @permission_classes([IsAuthenticated])
 def admin_sellers(request):
     if not (request.user.is_staff and request.user.is_superuser):
         return Response({'error': 'Permission denied'}, status=403)
     
-    sellers = Seller.objects.select_related('user').all().order_by('-created_at')
-    serializer = SellerSerializer(sellers, many=True)
-    return Response(serializer.data)
+    sellers = Seller.objects.select_related('user', 'profile')
+    listing = SellerAdminListing(request)
+    page = listing.paginate_queryset(sellers)
+    attach_deal_counts(page)
+    serializer = SellerSerializer(page, many=True)
+    return listing.get_paginated_response(serializer.data)
 
 @api_view(['GET'])
 @permission_classes([IsAuthenticated])
 def admin_subscriptions(request):
-    if not (request.user.is_staff and request.user.is_superuser):
+    if not request.user.is_staff:
         return Response({'error': 'Permission denied'}, status=403)
     
-    subscriptions = Subscription.objects.select_related('user', 'plan').all().order_by('-created_at')
-    serializer = SubscriptionSerializer(subscriptions, many=True)
-    return Response(serializer.data)
+    subscriptions = Subscription.objects.select_related('user', 'plan')
+    listing = SubscriptionAdminListing(request)
+    page = listing.paginate_queryset(subscriptions)
+    serializer = SubscriptionSerializer(page, many=True)
+    return listing.get_paginated_response(serializer.data)
 
 @api_view(['GET'])
 @permission_classes([IsAuthenticated])
 def admin_payments(request):
-    if not (request.user.is_staff and request.user.is_superuser):
+    if not request.user.is_staff:
         return Response({'error': 'Permission denied'}, status=403)
     
-    payments = Payment.objects.select_related('user', 'subscription__plan').all().order_by('-created_at')
-    serializer = PaymentSerializer(payments, many=True)
-    return Response(serializer.data)
+    payments = Payment.objects.select_related('user', 'subscription__plan').only(
+        'id', 'amount', 'currency', 'payment_method', 'payment_reference', 'status', 'created_at',
+        'user__username', 'user__email', 'subscription__plan__name'
+    )
+    listing = PaymentAdminListing(request)
+    page = listing.paginate_queryset(payments)
+    serializer = PaymentSerializer(page, many=True)
+    return listing.get_paginated_response(serializer.data)
 
 @api_view(['POST'])
 @permission_classes([IsAuthenticated])
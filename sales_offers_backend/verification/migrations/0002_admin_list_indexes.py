@@ -0,0 +1,24 @@
+# Generated by Django 5.1.5 on 2026-10-19 12:15
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('sellers', '0013_admin_list_indexes'),
+        ('verification', '0001_initial'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='ticket',
+            index=models.Index(fields=['status', 'created_at', 'id'], name='ticket_status_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='verificationrequest',
+            index=models.Index(fields=['status', 'submitted_at', 'id'], name='verification_status_idx'),
+        ),
+    ]
@@ -32,6 +32,11 @@ class VerificationRequest(models.Model):
     reviewed_at = models.DateTimeField(null=True, blank=True)
     reviewed_by = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.SET_NULL, null=True, blank=True, related_name='reviewed_verifications')
     
+    class Meta:
+        indexes = [
+            models.Index(fields=['status', 'submitted_at', 'id'], name='verification_status_idx'),
+        ]
+    
     def __str__(self):
         return f"{self.seller.business_name} - {self.status}"
 
@@ -74,6 +79,11 @@ class Ticket(models.Model):
     updated_at = models.DateTimeField(auto_now=True)
     resolved_at = models.DateTimeField(null=True, blank=True)
     
+    class Meta:
+        indexes = [
+            models.Index(fields=['status', 'created_at', 'id'], name='ticket_status_created_idx'),
+        ]
+    
     def __str__(self):
         return f"#{self.id} - {self.title}"
 
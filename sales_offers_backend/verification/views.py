@@ -6,7 +6,21 @@ from django.utils import timezone
 from .models import VerificationRequest, Ticket, TicketMessage, AdminNotification
 from .serializers import VerificationRequestSerializer, TicketSerializer, TicketMessageSerializer, AdminNotificationSerializer
 from sellers.models import Seller
+from sellers.serializers import attach_deal_counts
 from accounts.models import User
+from backend.admin_listing import AdminListing
+
+class VerificationAdminListing(AdminListing):
+    filter_fields = {'status': 'status'}
+    search_fields = ('seller__business_name',)
+    date_field = 'submitted_at'
+    sort_fields = {'submitted': 'submitted_at'}
+    default_sort = '-submitted'
+
+class TicketAdminListing(AdminListing):
+    filter_fields = {'status': 'status', 'priority': 'priority', 'category': 'category', 'assigned_to': 'assigned_to_id'}
+    search_fields = ('title', 'user__username', 'user__email')
+    sort_fields = {'created': 'created_at', 'updated': 'updated_at'}
 
 @api_view(['GET', 'POST'])
 @permission_classes([IsAuthenticated])
@@ -46,13 +60,12 @@ def verification_request(request):
 @api_view(['GET'])
 @permission_classes([IsAdminUser])
 def admin_verification_requests(request):
-    requests = VerificationRequest.objects.all().order_by('-submitted_at')
-    status_filter = request.GET.get('status')
-    if status_filter and status_filter != 'all':
-        requests = requests.filter(status=status_filter)
-    
-    serializer = VerificationRequestSerializer(requests, many=True)
-    return Response(serializer.data)
+    requests = VerificationRequest.objects.select_related('seller__user', 'seller__profile')
+    listing = VerificationAdminListing(request)
+    page = listing.paginate_queryset(requests)
+    attach_deal_counts([verification.seller for verification in page])
+    serializer = VerificationRequestSerializer(page, many=True)
+    return listing.get_paginated_response(serializer.data)
 
 @api_view(['PATCH'])
 @permission_classes([IsAdminUser])
@@ -106,17 +119,11 @@ def tickets(request):
 @api_view(['GET'])
 @permission_classes([IsAdminUser])
 def admin_tickets(request):
-    all_tickets = Ticket.objects.all().order_by('-created_at')
-    status_filter = request.GET.get('status')
-    priority_filter = request.GET.get('priority')
-    
-    if status_filter and status_filter != 'all':
-        all_tickets = all_tickets.filter(status=status_filter)
-    if priority_filter and priority_filter != 'all':
-        all_tickets = all_tickets.filter(priority=priority_filter)
-    
-    serializer = TicketSerializer(all_tickets, many=True)
-    return Response(serializer.data)
+    all_tickets = Ticket.objects.select_related('user', 'assigned_to').prefetch_related('messages__user')
+    listing = TicketAdminListing(request)
+    page = listing.paginate_queryset(all_tickets)
+    serializer = TicketSerializer(page, many=True)
+    return listing.get_paginated_response(serializer.data)
 
 @api_view(['PATCH'])
 @permission_classes([IsAdminUser])
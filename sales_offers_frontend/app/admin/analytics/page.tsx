@@ -16,19 +16,17 @@ export default function AnalyticsPage() {
   const fetchAnalytics = async () => {
     try {
       const [usersRes, dealsRes, sellersRes] = await Promise.all([
-        api.get('/api/accounts/admin/users/'),
-        api.get('/api/deals/admin/deals/'),
-        api.get('/api/sellers/admin/sellers/')
+        api.get('/api/accounts/admin/users/', { params: { limit: 1 } }),
+        api.get('/api/deals/admin/deals/', { params: { is_published: true, limit: 200 } }),
+        api.get('/api/sellers/admin/sellers/', { params: { limit: 1 } })
       ]);
       
-      const users = usersRes.data;
-      const deals = dealsRes.data;
-      const sellers = sellersRes.data;
+      const deals = dealsRes.data.results;
       
       setMetrics({
         totalClicks: deals.reduce((sum: number, deal: any) => sum + (deal.click_count || 0), 0),
-        totalUsers: users.length,
-        totalDeals: deals.filter((deal: any) => deal.is_published).length,
+        totalUsers: usersRes.data.total,
+        totalDeals: dealsRes.data.total,
         clickThroughRate: 3.2,
         clickGrowth: 18.5,
         userGrowth: 12.3,
@@ -30,7 +30,7 @@ export default function AdminContent() {
   const fetchContent = async () => {
     try {
       const response = await api.get('/api/deals/admin/deals/');
-      const deals = response.data;
+      const deals = response.data.results;
       
       // Transform deals into content format for display
       const contentData = deals.slice(0, 10).map((deal: any, index: number) => ({
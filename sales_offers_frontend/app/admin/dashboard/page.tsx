@@ -55,31 +55,25 @@ export default function AdminDashboard() {
 
   const fetchDashboardStats = async () => {
     try {
-      const [usersRes, dealsRes, sellersRes, paymentsRes] = await Promise.all([
-        api.get('/api/accounts/admin/users/'),
-        api.get('/api/deals/admin/deals/'),
-        api.get('/api/sellers/admin/sellers/'),
-        api.get('/api/sellers/admin/payments/')
+      // Counts come from each listing's total; limit=1 keeps the payloads tiny
+      const [usersRes, activeUsersRes, dealsRes, sellersRes, paymentsRes] = await Promise.all([
+        api.get('/api/accounts/admin/users/', { params: { limit: 1 } }),
+        api.get('/api/accounts/admin/users/', { params: { is_active: true, limit: 1 } }),
+        api.get('/api/deals/admin/deals/', { params: { is_published: true, limit: 1 } }),
+        api.get('/api/sellers/admin/sellers/', { params: { limit: 1 } }),
+        api.get('/api/sellers/admin/payments/', { params: { status: 'completed', limit: 200 } })
       ]);
       
-      const users = usersRes.data;
-      const deals = dealsRes.data;
-      const sellers = sellersRes.data;
-      const payments = paymentsRes.data;
-      
-      const totalRevenue = payments
-        .filter((p: any) => p.status === 'completed')
-        .reduce((sum: number, p: any) => sum + p.amount, 0);
-      
-      const activeUsers = users.filter((u: any) => u.is_active).length;
+      const totalRevenue = paymentsRes.data.results
+        .reduce((sum: number, p: any) => sum + Number(p.amount), 0);
       
       setStats({
-        totalUsers: users.length,
-        totalDeals: deals.filter((d: any) => d.is_published).length,
-        totalSellers: sellers.length,
-        newsletterSubscribers: users.filter((u: any) => u.email).length, // Users with emails as subscribers
+        totalUsers: usersRes.data.total,
+        totalDeals: dealsRes.data.total,
+        totalSellers: sellersRes.data.total,
+        newsletterSubscribers: usersRes.data.total, // Users with emails as subscribers
         revenue: totalRevenue,
-        activeUsers: activeUsers
+        activeUsers: activeUsersRes.data.total
       });
       setLoading(false);
     } catch (error) {
@@ -144,12 +138,12 @@ export default function AdminDashboard() {
   const fetchRecentActivities = async () => {
     try {
       const [usersRes, dealsRes] = await Promise.all([
-        api.get('/api/accounts/admin/users/'),
-        api.get('/api/deals/admin/deals/')
+        api.get('/api/accounts/admin/users/', { params: { limit: 3 } }),
+        api.get('/api/deals/admin/deals/', { params: { limit: 2 } })
       ]);
       
-      const users = usersRes.data.slice(0, 3);
-      const deals = dealsRes.data.slice(0, 2);
+      const users = usersRes.data.results;
+      const deals = dealsRes.data.results;
       
       const activities = [
         ...users.map((user: any, index: number) => ({
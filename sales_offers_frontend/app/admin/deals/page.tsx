@@ -36,7 +36,7 @@ export default function DealsManagement() {
       });
       
       if (response.ok) {
-        const data = await response.json();
+        const data = (await response.json()).results;
         setDeals(data.map((deal: any) => ({
           id: deal.id,
           title: deal.title,
@@ -34,8 +34,8 @@ export default function NewsletterManagement() {
 
   const fetchNewsletterData = async () => {
     try {
-      const usersResponse = await api.get('/api/accounts/admin/users/');
-      const users = usersResponse.data;
+      const usersResponse = await api.get('/api/accounts/admin/users/', { params: { limit: 20 } });
+      const users = usersResponse.data.results;
       
       // Transform users into subscribers format
       const subscribersData = users.slice(0, 20).map((user: any, index: number) => ({
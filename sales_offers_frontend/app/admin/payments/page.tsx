@@ -40,15 +40,20 @@ export default function AdminPayments() {
 
   const fetchPayments = async () => {
     try {
-      const response = await api.get('/api/sellers/admin/payments/');
-      const data = response.data;
+      const [response, completedRes, failedRes, pendingRes] = await Promise.all([
+        api.get('/api/sellers/admin/payments/'),
+        api.get('/api/sellers/admin/payments/', { params: { status: 'completed', limit: 200 } }),
+        api.get('/api/sellers/admin/payments/', { params: { status: 'failed', limit: 1 } }),
+        api.get('/api/sellers/admin/payments/', { params: { status: 'pending', limit: 1 } })
+      ]);
+      const data = response.data.results;
       
       setPayments(data);
       setStats({
-        totalRevenue: data.filter((p: any) => p.status === 'completed').reduce((sum: number, p: any) => sum + p.amount, 0),
-        successfulPayments: data.filter((p: any) => p.status === 'completed').length,
-        failedPayments: data.filter((p: any) => p.status === 'failed').length,
-        pendingPayments: data.filter((p: any) => p.status === 'pending').length
+        totalRevenue: completedRes.data.results.reduce((sum: number, p: any) => sum + Number(p.amount), 0),
+        successfulPayments: completedRes.data.total,
+        failedPayments: failedRes.data.total,
+        pendingPayments: pendingRes.data.total
       });
       setLoading(false);
     } catch (error) {
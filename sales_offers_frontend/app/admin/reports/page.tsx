@@ -62,10 +62,10 @@ export default function ReportsPage() {
       const response = await api.post('/api/admin/reports/', {
         report_type: selectedReport,
         date_range: dateRange,
-        format: 'PDF'
+        format: 'CSV'
       });
       
-      alert(`Report generated successfully! ${response.data.message}`);
+      alert(`Report queued! ${response.data.message}`);
       fetchRecentReports(); // Refresh the list
     } catch (error) {
       console.error('Error generating report:', error);
@@ -74,6 +74,21 @@ export default function ReportsPage() {
     setLoading(false);
   };
 
+  const downloadReport = async (report: any) => {
+    if (!report.download_url) return;
+    try {
+      const response = await api.get(report.download_url, { responseType: 'blob' });
+      const url = window.URL.createObjectURL(response.data);
+      const link = document.createElement('a');
+      link.href = url;
+      link.download = `${report.name}.${report.format === 'jsonl' ? 'jsonl.gz' : 'csv'}`;
+      link.click();
+      window.URL.revokeObjectURL(url);
+    } catch (error) {
+      console.error('Error downloading report:', error);
+    }
+  };
+
   return (
     <AdminLayout>
       <div className="space-y-6">
@@ -195,11 +210,15 @@ export default function ReportsPage() {
                         <div>
                           <p className="text-sm font-medium text-[rgb(var(--color-fg))]">{report.name}</p>
                           <p className="text-xs text-[rgb(var(--color-muted))]">
-                            {new Date(report.created_at).toLocaleDateString()} • {report.file_size} • {report.format}
+                            {new Date(report.created_at).toLocaleDateString()} • {report.status === 'ready' ? report.file_size : report.status} • {report.format}
                           </p>
                         </div>
                       </div>
-                      <button className="p-2 text-[rgb(var(--color-muted))] hover:text-red-600 transition-colors">
+                      <button
+                        onClick={() => downloadReport(report)}
+                        disabled={!report.download_url}
+                        className="p-2 text-[rgb(var(--color-muted))] hover:text-red-600 transition-colors disabled:opacity-50"
+                      >
                         <FiDownload className="w-4 h-4" />
                       </button>
                     </div>
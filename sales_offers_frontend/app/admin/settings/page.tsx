@@ -36,12 +36,12 @@ export default function AdminSettings() {
         siteDescription: data.siteDescription || "Your trusted marketplace for amazing deals and offers",
         adminEmail: data.adminEmail || "admin@salesandoffers.com",
         supportEmail: data.supportEmail || "support@salesandoffers.com",
-        maintenanceMode: data.maintenanceMode === 'true',
-        userRegistration: data.userRegistration === 'true',
-        emailVerification: data.emailVerification === 'true',
-        newsletterEnabled: data.newsletterEnabled === 'true',
-        maxFileSize: data.maxFileSize || "10",
-        sessionTimeout: data.sessionTimeout || "30",
+        maintenanceMode: Boolean(data.maintenanceMode),
+        userRegistration: Boolean(data.userRegistration),
+        emailVerification: Boolean(data.emailVerification),
+        newsletterEnabled: Boolean(data.newsletterEnabled),
+        maxFileSize: String(data.maxFileSize ?? "10"),
+        sessionTimeout: String(data.sessionTimeout ?? "30"),
         backupFrequency: data.backupFrequency || "daily",
         logLevel: data.logLevel || "info"
       });
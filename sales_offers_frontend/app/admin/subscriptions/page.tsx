@@ -39,13 +39,16 @@ export default function AdminSubscriptions() {
 
   const fetchSubscriptions = async () => {
     try {
-      const response = await api.get('/api/sellers/admin/subscriptions/');
-      const data = response.data;
+      const [response, activeRes] = await Promise.all([
+        api.get('/api/sellers/admin/subscriptions/'),
+        api.get('/api/sellers/admin/subscriptions/', { params: { status: 'active', limit: 1 } })
+      ]);
+      const data = response.data.results;
       
       setSubscriptions(data);
       setStats({
-        total: data.length,
-        active: data.filter((s: any) => s.status === 'active').length,
+        total: response.data.total,
+        active: activeRes.data.total,
         revenue: data.reduce((sum: number, s: any) => sum + (s.plan?.price_ksh || 0), 0),
         growth: 15.2
       });
@@ -44,7 +44,7 @@ export default function AdminTickets() {
   const fetchTickets = async () => {
     try {
       const response = await api.get('/api/verification/admin/tickets/');
-      setTickets(response.data);
+      setTickets(response.data.results);
       setLoading(false);
     } catch (error) {
       console.error("Error fetching tickets:", error);
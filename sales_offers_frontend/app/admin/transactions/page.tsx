@@ -45,9 +45,9 @@ export default function AdminTransactions() {
         api.get('/api/accounts/admin/users/')
       ]);
       
-      const payments = paymentsRes.data;
-      const deals = dealsRes.data;
-      const users = usersRes.data;
+      const payments = paymentsRes.data.results;
+      const deals = dealsRes.data.results;
+      const users = usersRes.data.results;
       
       // Transform payments into transaction format
       const transactionsData = payments.map((payment: any) => {
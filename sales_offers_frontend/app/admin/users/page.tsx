@@ -36,7 +36,7 @@ export default function UsersManagement() {
       });
       
       if (response.ok) {
-        const data = await response.json();
+        const data = (await response.json()).results;
         setUsers(data.map((user: any) => ({
           id: user.id,
           username: user.username,
@@ -41,7 +41,7 @@ export default function AdminVerification() {
   const fetchRequests = async () => {
     try {
       const response = await api.get('/api/verification/admin/requests/');
-      setRequests(response.data);
+      setRequests(response.data.results);
       setLoading(false);
     } catch (error) {
       console.error("Error fetching verification requests:", error);
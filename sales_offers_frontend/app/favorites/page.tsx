@@ -30,6 +30,8 @@ interface Favorite {
 export default function FavoritesPage() {
   const [favorites, setFavorites] = useState<Favorite[]>([]);
   const [loading, setLoading] = useState(true);
+  const [nextUrl, setNextUrl] = useState<string | null>(null);
+  const [loadingMore, setLoadingMore] = useState(false);
   const [showStoreModal, setShowStoreModal] = useState(false);
   const [selectedDeal, setSelectedDeal] = useState<Favorite['deal'] | null>(null);
 
@@ -43,7 +45,8 @@ export default function FavoritesPage() {
       const response = await axios.get(`${API_BASE_URL}/api/accounts/favorites/`, {
         headers: { Authorization: `Token ${token}` }
       });
-      setFavorites(response.data);
+      setFavorites(response.data.results);
+      setNextUrl(response.data.next);
       setLoading(false);
     } catch (error) {
       console.error("Error fetching favorites:", error);
@@ -51,6 +54,27 @@ export default function FavoritesPage() {
     }
   };
 
+  const loadMoreFavorites = async () => {
+    if (!nextUrl) return;
+    setLoadingMore(true);
+    try {
+      const token = localStorage.getItem("token");
+      const response = await axios.get(nextUrl, {
+        headers: { Authorization: `Token ${token}` }
+      });
+      // Offsets shift when favorites are removed meanwhile, so skip any already shown
+      setFavorites(prev => {
+        const seen = new Set(prev.map(fav => fav.id));
+        return [...prev, ...response.data.results.filter((fav: Favorite) => !seen.has(fav.id))];
+      });
+      setNextUrl(response.data.next);
+    } catch (error) {
+      console.error("Error loading more favorites:", error);
+    } finally {
+      setLoadingMore(false);
+    }
+  };
+
   const handleRemoveFavorite = async (dealId: number) => {
     try {
       const token = localStorage.getItem("token");
@@ -150,6 +174,14 @@ export default function FavoritesPage() {
             ))}
           </div>
         )}
+
+        {!loading && nextUrl && (
+          <div className="text-center mt-8">
+            <Button variant="outline" size="md" onClick={loadMoreFavorites} disabled={loadingMore}>
+              {loadingMore ? 'Loading...' : 'Load more favorites'}
+            </Button>
+          </div>
+        )}
       </div>
       
       {selectedDeal && (
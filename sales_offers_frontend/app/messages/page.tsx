@@ -76,6 +76,9 @@ export default function MessagesPage() {
   const [loading, setLoading] = useState(true);
   const [currentUserId, setCurrentUserId] = useState<number | null>(null);
   const [isClient, setIsClient] = useState(false);
+  // Cursor for the next older window; null once the start of history is loaded
+  const [olderCursor, setOlderCursor] = useState<string | null>(null);
+  const [loadingOlder, setLoadingOlder] = useState(false);
 
   // Initialize current user ID on client side
   useEffect(() => {
@@ -117,11 +120,13 @@ export default function MessagesPage() {
 
   const loadMessages = async (conversationId: number) => {
     try {
-      const apiMessages = await messagingApi.getMessages(conversationId);
-      const transformedMessages = apiMessages.map(msg => 
+      setOlderCursor(null);
+      const messageWindow = await messagingApi.getMessageWindow(conversationId);
+      const transformedMessages = messageWindow.results.map(msg => 
         transformMessage(msg, currentUserId)
       );
       setMessages(transformedMessages.reverse()); // Reverse to show oldest first
+      setOlderCursor(messageWindow.has_older ? messageWindow.before : null);
       
       // Mark messages as read
       await messagingApi.markMessagesRead(conversationId);
@@ -130,6 +135,27 @@ export default function MessagesPage() {
     }
   };
 
+  const loadOlderMessages = async () => {
+    if (!selectedConversation || !olderCursor || loadingOlder) return;
+    
+    setLoadingOlder(true);
+    try {
+      const messageWindow = await messagingApi.getMessageWindow(selectedConversation.id, { before: olderCursor });
+      const olderMessages = messageWindow.results.map(msg => 
+        transformMessage(msg, currentUserId)
+      ).reverse();
+      setMessages(prev => {
+        const seen = new Set(prev.map(msg => msg.id));
+        return [...olderMessages.filter(msg => !seen.has(msg.id)), ...prev];
+      });
+      setOlderCursor(messageWindow.has_older ? messageWindow.before : null);
+    } catch (error) {
+      console.error('Failed to load older messages:', error);
+    } finally {
+      setLoadingOlder(false);
+    }
+  };
+
   const handleConversationSelect = (conversation: ComponentConversation) => {
     setSelectedConversation(conversation);
     setShowUserInfo(false);
@@ -215,6 +241,9 @@ export default function MessagesPage() {
               conversation={selectedConversation}
               messages={messages}
               onSendMessage={handleSendMessage}
+              hasOlderMessages={olderCursor !== null}
+              loadingOlderMessages={loadingOlder}
+              onLoadOlderMessages={loadOlderMessages}
               onShowUserInfo={handleShowUserInfo}
               showBackButton={false}
               onBack={() => {}}
@@ -265,6 +294,9 @@ export default function MessagesPage() {
             conversation={selectedConversation}
             messages={messages}
             onSendMessage={handleSendMessage}
+            hasOlderMessages={olderCursor !== null}
+            loadingOlderMessages={loadingOlder}
+            onLoadOlderMessages={loadOlderMessages}
             onShowUserInfo={handleShowUserInfo}
             showBackButton={true}
             onBack={handleBackToConversations}
@@ -85,12 +85,28 @@ export default function DealDetailsPage() {
       const response = await axios.get(`${API_BASE_URL}/api/deals/${params.id}/`);
       setDeal(response.data);
       setLoading(false);
+      fetchFavoriteStatus(response.data.id);
     } catch (error) {
       console.error("Error fetching deal:", error);
       setLoading(false);
     }
   };
 
+  const fetchFavoriteStatus = async (dealId: number) => {
+    const token = localStorage.getItem("token");
+    if (!token) return;
+
+    try {
+      const response = await axios.get(`${API_BASE_URL}/api/accounts/favorites/status/`, {
+        params: { ids: dealId },
+        headers: { Authorization: `Token ${token}` }
+      });
+      setIsFavorited(response.data.favorited_ids.includes(dealId));
+    } catch (error) {
+      console.error("Error fetching favorite status:", error);
+    }
+  };
+
   const handleFavorite = () => {
     setIsFavorited(!isFavorited);
   };
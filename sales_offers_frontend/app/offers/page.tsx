@@ -66,6 +66,9 @@ interface Offer {
   };
 }
 
+// Matches MAX_FAVORITE_STATUS_IDS on the backend
+const FAVORITE_STATUS_BATCH = 200;
+
 export default function OffersPage() {
   const [offers, setOffers] = useState<Offer[]>([]);
   const [loading, setLoading] = useState(true);
@@ -136,12 +139,35 @@ export default function OffersPage() {
       const response = await axios.get(`${API_BASE_URL}/api/deals/`);
       setOffers(response.data);
       setLoading(false);
+      fetchFavoriteStatus(response.data);
     } catch (error) {
       console.error("Error fetching deals:", error);
       setLoading(false);
     }
   };
 
+  // One bulk lookup per FAVORITE_STATUS_BATCH deals instead of a status call per card
+  const fetchFavoriteStatus = async (loadedOffers: Offer[]) => {
+    const token = localStorage.getItem("token");
+    if (!token || loadedOffers.length === 0) return;
+
+    try {
+      const favorited = new Set<number>();
+      for (let start = 0; start < loadedOffers.length; start += FAVORITE_STATUS_BATCH) {
+        const ids = loadedOffers.slice(start, start + FAVORITE_STATUS_BATCH).map(offer => offer.id);
+        const response = await axios.post(
+          `${API_BASE_URL}/api/accounts/favorites/status/`,
+          { ids },
+          { headers: { Authorization: `Token ${token}` } }
+        );
+        response.data.favorited_ids.forEach((id: number) => favorited.add(id));
+      }
+      setOffers(prev => prev.map(offer => ({ ...offer, is_favorited: favorited.has(offer.id) })));
+    } catch (error) {
+      console.error("Error fetching favorite status:", error);
+    }
+  };
+
   const fetchSubscription = async () => {
     try {
       const token = localStorage.getItem("token");
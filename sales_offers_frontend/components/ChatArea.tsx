@@ -58,6 +58,9 @@ interface ChatAreaProps {
   onBack: () => void;
   isMobile?: boolean;
   currentUserId?: number | null;
+  hasOlderMessages?: boolean;
+  loadingOlderMessages?: boolean;
+  onLoadOlderMessages?: () => void;
 }
 
 export default function ChatArea({
@@ -68,7 +71,10 @@ export default function ChatArea({
   showBackButton,
   onBack,
   isMobile = false,
-  currentUserId = null
+  currentUserId = null,
+  hasOlderMessages = false,
+  loadingOlderMessages = false,
+  onLoadOlderMessages
 }: ChatAreaProps) {
   const [newMessage, setNewMessage] = useState("");
   const [showEmojiPicker, setShowEmojiPicker] = useState(false);
@@ -76,11 +82,35 @@ export default function ChatArea({
   const [showAttachmentModal, setShowAttachmentModal] = useState(false);
   const messagesEndRef = useRef<HTMLDivElement>(null);
   const textareaRef = useRef<HTMLTextAreaElement>(null);
+  const scrollAreaRef = useRef<HTMLDivElement>(null);
+  const lastMessageIdRef = useRef<number | null>(null);
+  // Scroll height before older messages were prepended, to keep the view in place
+  const prependHeightRef = useRef<number | null>(null);
 
   useEffect(() => {
-    scrollToBottom();
+    const lastMessageId = messages.length ? messages[messages.length - 1].id : null;
+    const scrollArea = scrollAreaRef.current;
+    if (prependHeightRef.current !== null && scrollArea && lastMessageId === lastMessageIdRef.current) {
+      scrollArea.scrollTop += scrollArea.scrollHeight - prependHeightRef.current;
+    } else if (lastMessageId !== lastMessageIdRef.current) {
+      scrollToBottom();
+    }
+    prependHeightRef.current = null;
+    lastMessageIdRef.current = lastMessageId;
   }, [messages]);
 
+  const handleLoadOlder = () => {
+    if (!onLoadOlderMessages || !hasOlderMessages || loadingOlderMessages) return;
+    prependHeightRef.current = scrollAreaRef.current?.scrollHeight ?? null;
+    onLoadOlderMessages();
+  };
+
+  const handleMessagesScroll = (e: React.UIEvent<HTMLDivElement>) => {
+    if (e.currentTarget.scrollTop < 80) {
+      handleLoadOlder();
+    }
+  };
+
   const scrollToBottom = () => {
     messagesEndRef.current?.scrollIntoView({ behavior: "smooth" });
   };
@@ -315,7 +345,18 @@ export default function ChatArea({
       </div>
 
       {/* Messages Area */}
-      <div className="flex-1 overflow-y-auto p-4 space-y-4">
+      <div ref={scrollAreaRef} onScroll={handleMessagesScroll} className="flex-1 overflow-y-auto p-4 space-y-4">
+        {hasOlderMessages && (
+          <div className="text-center">
+            <button
+              onClick={handleLoadOlder}
+              disabled={loadingOlderMessages}
+              className="text-sm text-purple-600 hover:text-purple-700 disabled:opacity-60"
+            >
+              {loadingOlderMessages ? 'Loading earlier messages...' : 'Load earlier messages'}
+            </button>
+          </div>
+        )}
         {messages.map((message, index) => {
           const actualCurrentUserId = currentUserId || getCurrentUserId();
           const isCurrentUser = message.sender_id === actualCurrentUserId;
@@ -32,8 +32,8 @@ export default function FeaturedContentManager({ onClose }: FeaturedContentManag
       
       setFeaturedDeals(featuredDealsRes.data);
       setFeaturedSellers(featuredSellersRes.data);
-      setAllDeals(allDealsRes.data);
-      setAllSellers(allSellersRes.data);
+      setAllDeals(allDealsRes.data.results);
+      setAllSellers(allSellersRes.data.results);
       setLoading(false);
     } catch (error) {
       console.error('Error fetching data:', error);
@@ -48,6 +48,15 @@ export interface Conversation {
   updated_at: string;
 }
 
+// One keyset window of chat history, newest first (see MessageWindowPagination)
+export interface MessageWindow {
+  results: Message[];
+  before: string | null;
+  after: string | null;
+  has_older: boolean;
+  has_newer: boolean;
+}
+
 export const messagingApi = {
   // Get all conversations
   getConversations: async (): Promise<Conversation[]> => {
@@ -55,9 +64,15 @@ export const messagingApi = {
     return response.data;
   },
 
-  // Get messages for a conversation
-  getMessages: async (conversationId: number): Promise<Message[]> => {
-    const response = await api.get(`/conversations/${conversationId}/messages/`);
+  // Get messages for a conversation (newest window; pass `before` to page back)
+  getMessages: async (conversationId: number, params?: { before?: string; after?: string; limit?: number }): Promise<Message[]> => {
+    const response = await api.get(`/conversations/${conversationId}/messages/`, { params });
+    return response.data.results;
+  },
+
+  // Same as getMessages, with the cursors needed to keep paging
+  getMessageWindow: async (conversationId: number, params?: { before?: string; after?: string; limit?: number }): Promise<MessageWindow> => {
+    const response = await api.get(`/conversations/${conversationId}/messages/`, { params });
     return response.data;
   },
 